@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试工具
+提供计时、结果记录、JSON输出和回归对比功能
+"""
+
+import sys
+import json
+import time
+import platform
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _percentile(sorted_values, fraction):
+    """获取已排序序列的百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _git_revision():
+    """获取当前git提交，失败时返回None"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """基准测试结果记录器"""
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self.results = []
+
+    def _add(self, result):
+        self.results.append(result)
+        if self.verbose:
+            size = f"[{result['size']}]" if result['size'] is not None else ""
+            line = f"{result['name'] + size:<36} {result['ops_per_s']:>12.1f} ops/s"
+            if 'p50_us' in result:
+                line += f"  p50 {result['p50_us']:>10.1f} us  p95 {result['p95_us']:>10.1f} us"
+            if 'peak_bytes' in result:
+                line += f"  peak {result['peak_bytes'] / 1e6:>8.1f} MB"
+            if 'retained_bytes' in result:
+                line += f"  retained {result['retained_bytes'] / 1e6:>8.1f} MB"
+            print(line, flush=True)
+
+    def measure(self, name, func, iterations, size=None):
+        """
+        逐次调用函数并记录每次调用的延迟
+
+        Args:
+            name (str): 测试名称
+            func (callable): 接收迭代序号的被测函数
+            iterations (int): 调用次数
+            size (int): 测试所用的数据规模
+        """
+        samples = []
+        perf_counter = time.perf_counter
+        for i in range(iterations):
+            start = perf_counter()
+            func(i)
+            samples.append(perf_counter() - start)
+        samples.sort()
+        total = sum(samples)
+        self._add({
+            'name': name,
+            'size': size,
+            'iterations': iterations,
+            'total_s': total,
+            'ops_per_s': iterations / total if total else 0.0,
+            'mean_us': total / iterations * 1e6,
+            'p50_us': _percentile(samples, 0.50) * 1e6,
+            'p95_us': _percentile(samples, 0.95) * 1e6,
+            'p99_us': _percentile(samples, 0.99) * 1e6,
+        })
+
+    def measure_bulk(self, name, func, items, size=None, **extra):
+        """
+        调用一次批量操作并按处理的条目数计算吞吐量
+
+        Args:
+            name (str): 测试名称
+            func (callable): 无参数的被测函数
+            items (int): 本次操作处理的条目数
+            size (int): 测试所用的数据规模
+            extra: 附加到结果中的字段
+        """
+        start = time.perf_counter()
+        func()
+        total = time.perf_counter() - start
+        result = {
+            'name': name,
+            'size': size,
+            'iterations': items,
+            'total_s': total,
+            'ops_per_s': items / total if total else 0.0,
+        }
+        result.update(extra)
+        self._add(result)
+
+    def record(self, name, size=None, **fields):
+        """直接记录一条自定义结果"""
+        result = {'name': name, 'size': size, 'ops_per_s': 0.0}
+        result.update(fields)
+        self._add(result)
+
+    def to_dict(self):
+        """生成包含运行环境信息的结果字典"""
+        return {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'git_revision': _git_revision(),
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'sqlite': sqlite3.sqlite_version,
+            },
+            'results': self.results,
+        }
+
+    def write_json(self, path=None):
+        """
+        将结果写入JSON文件
+
+        Args:
+            path (Path): 输出文件路径，为None时写入results目录
+
+        Returns:
+            Path: 输出文件路径
+        """
+        if path is None:
+            RESULTS_DIR.mkdir(exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = RESULTS_DIR / f"bench-{stamp}.json"
+        path = Path(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def compare(results, baseline_path, threshold):
+    """
+    与基线结果对比，找出吞吐量下降超过阈值的测试
+
+    Args:
+        results (list): 本次结果
+        baseline_path (Path): 基线JSON文件
+        threshold (float): 允许的吞吐量下降比例，例如0.2表示20%
+
+    Returns:
+        list: (name, size, baseline_ops, current_ops) 回归列表
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result['name'], result['size']))
+        if not old or not old.get('ops_per_s') or not result.get('ops_per_s'):
+            continue
+        if result['ops_per_s'] < old['ops_per_s'] * (1 - threshold):
+            regressions.append((result['name'], result['size'], old['ops_per_s'], result['ops_per_s']))
+    return regressions
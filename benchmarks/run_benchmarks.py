@@ -0,0 +1,754 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试套件
+在合成密码库上测量核心操作的性能，结果写入JSON文件以便跨版本追踪回归
+整个套件不依赖图形界面，可在无显示器的环境中运行
+
+用法:
+    python benchmarks/run_benchmarks.py --sizes 1k,10k
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k,1M --output results.json
+    python benchmarks/run_benchmarks.py --baseline results/old.json --threshold 0.2
+"""
+
+import os
+import sys
+import random
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+# 基准测试不需要显示器
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from harness import Recorder, compare
+from vault_generator import (
+    generate_vault, synthetic_records, write_csv, write_bitwarden_json, write_keepass_xml,
+    MASTER_PASSWORD, GENERATE_BATCH_SIZE
+)
+from core.database import PasswordDatabase
+
+
+def parse_size(text):
+    """将1k/10k/1M形式的规模解析为整数"""
+    text = text.strip().lower()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1000000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def bench_vault(recorder, workdir, size):
+    """在指定规模的密码库上测量数据库操作"""
+    db_file = workdir / f"vault-{size}.db"
+
+    # add_passwords 批量写入：向空密码库写入全部合成记录
+    db = generate_vault(db_file, 0)
+    records = list(synthetic_records(size))
+
+    def insert_all():
+        for start in range(0, size, GENERATE_BATCH_SIZE):
+            db.add_passwords(records[start:start + GENERATE_BATCH_SIZE])
+
+    recorder.measure_bulk("add_passwords", insert_all, size, size=size)
+    del records
+
+    rng = random.Random(size)
+    ids = [rng.randint(1, size) for _ in range(min(size, 2000))]
+    recorder.measure("get_password", lambda i: db.get_password(ids[i]), len(ids), size=size)
+
+    repeat = max(1, min(5, 100000 // size))
+    recorder.measure("get_all_passwords", lambda i: db.get_all_passwords(), repeat, size=size)
+
+    count = min(size, 500)
+    recorder.measure(
+        "add_password",
+        lambda i: db.add_password(f"bench{i}.example.com", f"bench{i}", "Bench-Passw0rd!"),
+        count, size=size
+    )
+
+    # CSV导入：把同规模的浏览器导出文件导入一个空密码库
+    from core.csv_import import import_csv
+    csv_file = workdir / f"export-{size}.csv"
+    write_csv(csv_file, size, seed=1)
+    import_db_file = workdir / f"import-{size}.db"
+    if import_db_file.exists():
+        import_db_file.unlink()
+    import_db = PasswordDatabase(import_db_file)
+    import_db.set_master_password(MASTER_PASSWORD)
+    recorder.measure_bulk("import_csv", lambda: import_csv(import_db, csv_file), size, size=size)
+    # 重复导入同一文件：全部记录与已有记录冲突，由集合化合并判定为未变化
+    recorder.measure_bulk("reimport_csv", lambda: import_csv(import_db, csv_file), size, size=size)
+
+    for path in (db_file, csv_file, import_db_file):
+        path.unlink()
+
+
+def bench_kdf(recorder, workdir):
+    """测量管理员密码解锁（PBKDF2派生密钥）"""
+    db = PasswordDatabase(workdir / "kdf.db")
+    db.set_master_password(MASTER_PASSWORD)
+    recorder.measure(
+        "kdf_unlock", lambda i: db.initialize_encryption_with_password(MASTER_PASSWORD), 5
+    )
+
+
+def bench_totp(recorder):
+    """测量TOTP验证和二维码生成"""
+    import pyotp
+    from core.auth import TOTPAuth
+
+    auth = TOTPAuth(secret=pyotp.random_base32())
+    token = auth.get_current_token()
+    recorder.measure("totp_verify", lambda i: auth.verify_token(token), 2000)
+    recorder.measure("qr_generate", lambda i: auth.generate_qr_code(f"user{i}"), 20)
+
+
+def bench_metrics(recorder):
+    """测量性能指标装饰器在停用和启用时的额外开销"""
+    from core.metrics import get_metrics, timed
+
+    metrics = get_metrics()
+    previous = metrics.enabled
+
+    def noop(i):
+        return i
+
+    wrapped = timed("bench.noop")(noop)
+    recorder.measure("call_plain", noop, 100000)
+    metrics.enabled = False
+    recorder.measure("call_timed_disabled", wrapped, 100000)
+    metrics.enabled = True
+    recorder.measure("call_timed_enabled", wrapped, 100000)
+    metrics.enabled = previous
+
+
+def bench_breach(recorder, workdir, size):
+    """测量泄露密码索引的构建、查询和全库扫描"""
+    import hashlib
+    from core.breach import build_index, BreachIndex, scan_vault
+
+    rng = random.Random(size)
+    # 一半哈希来自密码库中的密码，便于扫描时产生命中
+    vault_passwords = [password for _, _, password in synthetic_records(size)]
+    digests = [hashlib.sha1(p.encode('utf-8')).hexdigest().upper() for p in vault_passwords[::2]]
+    digests += ["%040X" % rng.getrandbits(160) for _ in range(size - len(digests))]
+
+    unsorted_file = workdir / f"hibp-{size}.txt"
+    sorted_file = workdir / f"hibp-sorted-{size}.txt"
+    rng.shuffle(digests)
+    with open(unsorted_file, 'w') as f:
+        f.writelines(f"{d}:1\n" for d in digests)
+    with open(sorted_file, 'w') as f:
+        f.writelines(f"{d}:1\n" for d in sorted(digests))
+
+    index_file = workdir / f"breach-{size}.idx"
+    recorder.measure_bulk("breach_build_unsorted",
+                          lambda: build_index(unsorted_file, index_file), size, size=size)
+    recorder.measure_bulk("breach_build_sorted",
+                          lambda: build_index(sorted_file, index_file), size, size=size)
+
+    queries = [bytes.fromhex(d) for d in digests[:5000]]
+    queries += [rng.getrandbits(160).to_bytes(20, 'big') for _ in range(5000)]
+    with BreachIndex(index_file) as index:
+        recorder.measure("breach_lookup", lambda i: index.contains_digest(queries[i]),
+                         len(queries), size=size)
+
+        db = generate_vault(workdir / f"breach-vault-{size}.db", size)
+        recorder.measure_bulk("breach_scan_vault", lambda: scan_vault(db, index), size, size=size)
+
+    for path in (unsorted_file, sorted_file, index_file, db.db_file):
+        path.unlink()
+
+
+def bench_audit(recorder, workdir, size):
+    """测量全库密码审计和熵估算"""
+    from core.password_audit import audit_vault, estimate_entropy_batch
+
+    passwords = [password for _, _, password in synthetic_records(size)]
+    recorder.measure_bulk("entropy_estimate", lambda: estimate_entropy_batch(passwords),
+                          size, size=size)
+
+    db = generate_vault(workdir / f"audit-vault-{size}.db", size)
+    recorder.measure_bulk("audit_vault", lambda: audit_vault(db), size, size=size)
+    recorder.measure("count_reused", lambda i: db.count_reused(passwords[i]),
+                     min(size, 1000), size=size)
+    db.db_file.unlink()
+
+
+# 测试套件：名称 -> 函数(recorder, workdir, sizes)
+def bench_import(recorder, workdir, size):
+    """测量各导入格式的流式解析吞吐量和内存峰值，以及完整导入"""
+    import tracemalloc
+    from core.importers import get_importer, import_file
+
+    files = {
+        'chrome_csv': workdir / f"chrome-{size}.csv",
+        'bitwarden_json': workdir / f"bitwarden-{size}.json",
+        'keepass_xml': workdir / f"keepass-{size}.xml",
+    }
+    write_csv(files['chrome_csv'], size)
+    write_bitwarden_json(files['bitwarden_json'], size)
+    write_keepass_xml(files['keepass_xml'], size)
+
+    for name, path in files.items():
+        importer = get_importer(name)
+
+        def parse_all():
+            for _ in importer.read(path):
+                pass
+
+        recorder.measure_bulk(f"parse_{name}", parse_all, size, size=size)
+        # 单独测量内存峰值（tracemalloc 会显著拖慢解析，不计入吞吐量）
+        tracemalloc.start()
+        parse_all()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        recorder.record(f"parse_{name}_memory", size=size, peak_bytes=peak,
+                        file_bytes=path.stat().st_size)
+
+    db_file = workdir / f"import-formats-{size}.db"
+    if db_file.exists():
+        db_file.unlink()
+    db = PasswordDatabase(db_file)
+    db.set_master_password(MASTER_PASSWORD)
+    recorder.measure_bulk("import_bitwarden_json",
+                          lambda: import_file(db, files['bitwarden_json']), size, size=size)
+
+    for path in list(files.values()) + [db_file]:
+        path.unlink()
+
+
+def bench_export(recorder, workdir, size):
+    """测量加密导出、校验和恢复"""
+    from core.vault_export import export_vault, ExportReader, restore_export
+
+    db = generate_vault(workdir / f"export-vault-{size}.db", size)
+    export_file = workdir / f"export-{size}.tfapm"
+    recorder.measure_bulk("export_vault", lambda: export_vault(db, export_file, MASTER_PASSWORD),
+                          size, size=size)
+
+    def verify():
+        with ExportReader(export_file, MASTER_PASSWORD) as reader:
+            reader.verify()
+
+    recorder.measure_bulk("export_verify", verify, size, size=size)
+
+    restore_db_file = workdir / f"restore-{size}.db"
+    if restore_db_file.exists():
+        restore_db_file.unlink()
+    restore_db = PasswordDatabase(restore_db_file)
+    restore_db.set_master_password(MASTER_PASSWORD)
+    recorder.measure_bulk("restore_export",
+                          lambda: restore_export(restore_db, export_file, MASTER_PASSWORD),
+                          size, size=size)
+
+    for path in (db.db_file, export_file, restore_db_file):
+        path.unlink()
+
+
+def bench_integrity(recorder, workdir, size):
+    """测量完整性校验（解密校验认证标签，以及未解锁时的格式检查）"""
+    from core.integrity import verify_vault
+
+    db = generate_vault(workdir / f"integrity-vault-{size}.db", size)
+    recorder.measure_bulk("verify_vault", lambda: verify_vault(db), size, size=size)
+    recorder.measure_bulk("verify_vault_format_only",
+                          lambda: verify_vault(PasswordDatabase(db.db_file)), size, size=size)
+    db.db_file.unlink()
+
+
+def bench_history(recorder, workdir, size, versions=12):
+    """测量历史版本的分页读取和批量清理（每条记录 versions 个历史版本）"""
+    import sqlite3
+
+    db = generate_vault(workdir / f"history-vault-{size}.db", size)
+    conn = sqlite3.connect(db.db_file)
+    for age in range(versions):
+        conn.execute('''
+            INSERT INTO password_history (entry_id, encrypted_password, changed_at)
+            SELECT id, encrypted_password, datetime('now', ?) FROM passwords
+        ''', (f"-{age} days",))
+    conn.commit()
+    conn.close()
+
+    rng = random.Random(42)
+    recorder.measure("history_page",
+                     lambda i: db.get_password_history(rng.randint(1, size)), 200, size=size)
+    recorder.measure_bulk("history_prune", lambda: db.prune_history(keep_versions=10),
+                          size * (versions - 10), size=size)
+    db.db_file.unlink()
+
+
+def bench_audit_log(recorder, workdir, size):
+    """测量审计日志的记录延迟、批量写入和哈希链校验"""
+    from core.audit_log import AuditLog, ACTION_VIEW
+
+    db_file = workdir / f"audit-log-{size}.db"
+    if db_file.exists():
+        db_file.unlink()
+    db = PasswordDatabase(db_file)
+    # 只按条数触发写入，定时器不参与测量
+    audit_log = AuditLog(db, flush_interval=3600)
+    recorder.measure("audit_log_event", lambda i: audit_log.log(ACTION_VIEW, i), size, size=size)
+    audit_log.close()
+    recorder.measure_bulk("audit_log_verify_chain", audit_log.verify_chain, size, size=size)
+    recorder.measure("audit_log_query_entry",
+                     lambda i: audit_log.query(entry_id=i, limit=20), 200, size=size)
+    db_file.unlink()
+
+
+def bench_tags(recorder, workdir, size, tag_count=3000, tagged_per_tag=None):
+    """测量标签和文件夹的组合筛选，以及侧边栏按页读取标签"""
+    db = generate_vault(workdir / f"tags-vault-{size}.db", size)
+    rng = random.Random(7)
+    ids = list(range(1, size + 1))
+    if tagged_per_tag is None:
+        tagged_per_tag = max(size // 20, 1)
+    tag_ids = [db.create_tag(f"tag{i:05d}") for i in range(tag_count)]
+    for tag_id in tag_ids[:20]:
+        db.tag_entries(rng.sample(ids, tagged_per_tag), tag_id)
+    folder_id = db.create_folder("Work")
+    db.move_to_folder(ids[:size // 3], folder_id)
+
+    recorder.measure("tags_page", lambda i: db.get_tags(i * 10, 200), 50, size=size)
+    recorder.measure("filter_tag",
+                     lambda i: db.filter_passwords(tag_ids=[tag_ids[i % 20]]), 20, size=size)
+    recorder.measure("filter_two_tags",
+                     lambda i: db.filter_passwords(tag_ids=tag_ids[i % 10:i % 10 + 2]), 20, size=size)
+    recorder.measure("filter_folder_tag_text",
+                     lambda i: db.filter_passwords("s", [tag_ids[i % 20]], folder_id), 20, size=size)
+    db.db_file.unlink()
+
+
+def bench_usage(recorder, workdir, size, hot=20):
+    """测量使用统计的记录延迟和批量写入、按使用情况排序的列表，以及预先解密的命中"""
+    from core.database import ORDER_RECENT, ORDER_FREQUENT
+    from core.usage import UsageTracker
+
+    db = generate_vault(workdir / f"usage-vault-{size}.db", size)
+    rng = random.Random(3)
+    ids = [rng.randint(1, size) for _ in range(size // 10)]
+    # 只按条数触发写入，定时器不参与测量
+    usage = UsageTracker(db, flush_interval=3600)
+    recorder.measure("usage_record", lambda i: usage.record(ids[i]), len(ids), size=size)
+    usage.close()
+    recorder.measure("listing_recent", lambda i: db.get_listing(ORDER_RECENT), 5, size=size)
+    recorder.measure("listing_frequent", lambda i: db.get_listing(ORDER_FREQUENT), 5, size=size)
+
+    hot_ids = db.hot_entry_ids(hot)
+    recorder.measure("open_cold", lambda i: db.get_password(hot_ids[i % len(hot_ids)]),
+                     200, size=size)
+    recorder.measure_bulk("prefetch_hot", lambda: db.prefetch_hot_entries(hot), len(hot_ids), size=size)
+    recorder.measure("open_hot", lambda i: db.get_password(hot_ids[i % len(hot_ids)]),
+                     200, size=size)
+    db.db_file.unlink()
+
+
+def bench_vaults(recorder, workdir, size, vault_count=5):
+    """测量跨密码库搜索（ATTACH + UNION ALL，对比逐库查询）和并行解锁（对比逐个解锁）"""
+    from core.vaults import VaultRegistry
+
+    paths = []
+    for index in range(vault_count):
+        db = generate_vault(workdir / f"vault{index}-{size}.db", size // vault_count, seed=index)
+        paths.append(db.db_file)
+    registry = VaultRegistry(vaults_file=workdir / "vaults.json", active_file=paths[0],
+                             extra_vaults=paths[1:])
+    prefixes = ["a", "go", "st", "mi", "x"]
+    recorder.measure("vaults_search_union",
+                     lambda i: registry.search(prefixes[i % len(prefixes)]), 20, size=size)
+    databases = [registry.open(path) for path in paths]
+    recorder.measure("vaults_search_loop",
+                     lambda i: [db.filter_passwords(prefixes[i % len(prefixes)]) for db in databases],
+                     20, size=size)
+    passwords = {path: MASTER_PASSWORD for path in paths}
+    recorder.measure_bulk("vaults_unlock_parallel", lambda: registry.unlock(passwords),
+                          vault_count, size=size)
+    recorder.measure_bulk("vaults_unlock_serial", lambda: registry.unlock(passwords, workers=1),
+                          vault_count, size=size)
+    for path in paths:
+        path.unlink()
+
+
+def bench_sync(recorder, workdir, size, changed_fraction=0.001):
+    """测量密码库同步：首次完整同步，以及两边各修改 changed_fraction 的记录后的增量同步"""
+    from core.sync import sync_vaults
+
+    laptop = generate_vault(workdir / f"sync-laptop-{size}.db", size)
+    workstation = PasswordDatabase(workdir / f"sync-workstation-{size}.db")
+    workstation.set_master_password(MASTER_PASSWORD)
+    workstation.initialize_encryption_with_password(MASTER_PASSWORD)
+    recorder.measure_bulk("sync_initial", lambda: sync_vaults(laptop, workstation), size, size=size)
+
+    # 每边修改、删除和新增的记录各占变更的三分之一
+    changes = max(3, int(size * changed_fraction))
+    rng = random.Random(7)
+    for side, db in (("laptop", laptop), ("workstation", workstation)):
+        ids = rng.sample([record['id'] for record in db.get_listing()], 2 * (changes // 3))
+        for record_id in ids[:changes // 3]:
+            record = db.get_password(record_id)
+            db.update_password(record_id, record['service_name'], record['username'], f"{side}-edit")
+        for record_id in ids[changes // 3:]:
+            db.delete_password(record_id)
+        db.add_passwords((f"{side}-{i}.example.com", "user", "password")
+                         for i in range(changes - 2 * (changes // 3)))
+    recorder.measure_bulk("sync_incremental", lambda: sync_vaults(laptop, workstation),
+                          2 * changes, size=size)
+    recorder.measure_bulk("sync_noop", lambda: sync_vaults(laptop, workstation), 1, size=size)
+    laptop.db_file.unlink()
+    workstation.db_file.unlink()
+
+
+def bench_attachments(recorder, workdir, size, file_mb=20, small_count=1000):
+    """测量附件的流式加密写入和解密读取（吞吐量和内存峰值），以及只读元数据的附件列表"""
+    import io
+    import tracemalloc
+    from core import attachments
+
+    db = generate_vault(workdir / f"attachments-vault-{size}.db", size)
+    entry_ids = [record['id'] for record in db.get_listing()]
+    source = workdir / f"attachment-{file_mb}mb.bin"
+    with open(source, 'wb') as f:
+        for _ in range(file_mb):
+            f.write(os.urandom(1024 * 1024))
+    file_bytes = source.stat().st_size
+    target = workdir / "attachment-out.bin"
+
+    attachment_id = None
+
+    def write():
+        nonlocal attachment_id
+        attachment_id = attachments.add_attachment(db, entry_ids[0], source)
+
+    recorder.measure_bulk("attachment_write", write, file_bytes, size=size)
+    recorder.measure_bulk("attachment_read",
+                          lambda: attachments.save_attachment(db, attachment_id, target),
+                          file_bytes, size=size)
+    # 单独测量内存峰值（tracemalloc 会拖慢加密，不计入吞吐量）
+    for name, func in (("attachment_write_memory", write),
+                       ("attachment_read_memory",
+                        lambda: attachments.save_attachment(db, attachment_id, target))):
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        recorder.record(name, size=size, peak_bytes=peak, file_bytes=file_bytes)
+
+    # 多条记录各有小附件时，列出一条记录的附件只读取元数据
+    rng = random.Random(3)
+    for entry_id in rng.sample(entry_ids, min(small_count, len(entry_ids))):
+        attachments.add_attachment(db, entry_id, io.BytesIO(os.urandom(4096)), name="key.pem")
+    recorder.measure("attachment_list",
+                     lambda i: attachments.list_attachments(db, entry_ids[i % len(entry_ids)]),
+                     200, size=size)
+    for path in (source, target, db.db_file):
+        path.unlink()
+
+
+def bench_records(recorder, workdir, size):
+    """比较列表的构建时间和内存：原来的字典列表、EntrySummary 列表和按列存储的 ListingSnapshot"""
+    import tracemalloc
+    from core.records import EntrySummary
+
+    db = generate_vault(workdir / f"records-vault-{size}.db", size)
+    query = "SELECT id, service_name, username, created_at, updated_at FROM passwords ORDER BY service_name"
+
+    def as_dicts():
+        # 原来 get_listing 的返回形式
+        with db._connect() as conn:
+            rows = conn.execute(query).fetchall()
+        return [
+            {'id': row[0], 'service_name': row[1], 'username': row[2],
+             'created_at': row[3], 'updated_at': row[4]}
+            for row in rows
+        ]
+
+    def as_tuples():
+        with db._connect() as conn:
+            return [EntrySummary(*row) for row in conn.execute(query)]
+
+    for name, build in (("dicts", as_dicts), ("tuples", as_tuples), ("snapshot", db.get_listing)):
+        recorder.measure_bulk(f"listing_{name}", build, size, size=size)
+        # 单独测量内存：构建期间的峰值，以及构建完成后结果占用的内存
+        tracemalloc.start()
+        result = build()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        recorder.record(f"listing_{name}_memory", size=size, peak_bytes=peak, retained_bytes=retained)
+    db.db_file.unlink()
+
+
+def bench_snapshot(recorder, workdir, size):
+    """测量在线快照的创建、完整性检查、恢复，以及快照期间的写入延迟"""
+    db = generate_vault(workdir / f"snapshot-vault-{size}.db", size)
+    snapshot = None
+
+    def create():
+        nonlocal snapshot
+        snapshot = db.create_snapshot()
+
+    recorder.measure_bulk("snapshot_create", create, size, size=size)
+    recorder.measure_bulk("snapshot_verify", lambda: db.verify_snapshot(snapshot), size, size=size)
+
+    # 后台创建快照时，界面线程的写入只在每一步复制的间隙等待
+    thread = db.create_snapshot_async()
+    recorder.measure("snapshot_concurrent_write",
+                     lambda i: db.add_password(f"concurrent-{i}.example.com", "user", "password"),
+                     200, size=size)
+    thread.join()
+
+    recorder.measure_bulk("snapshot_restore", lambda: db.restore_snapshot(snapshot), size, size=size)
+
+    db.db_file.unlink()
+    shutil.rmtree(db.backup_dir)
+
+
+
+def _stress_worker(db_file, operations, write_ratio, seed):
+    """
+    并发压力测试的一个进程：随机混合读写
+
+    Returns:
+        tuple: (读延迟列表, 写延迟列表, 失败次数, 等待写锁的总秒数)
+    """
+    import time
+    from core.concurrency import get_write_queue
+
+    db = PasswordDatabase(Path(db_file))
+    db.initialize_encryption_with_password(MASTER_PASSWORD)
+    rng = random.Random(seed)
+    ids = list(db.get_listing().ids)
+    prefixes = ["a", "go", "st", "mi", "x"]
+    reads, writes, errors = [], [], 0
+    for i in range(operations):
+        record_id = rng.choice(ids)
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                kind = i % 3
+                if kind == 0:
+                    db.add_password(f"stress-{seed}-{i}.example.com", "user", "password")
+                elif kind == 1:
+                    record = db.get_password(record_id)
+                    if record is not None:
+                        db.update_password(record_id, record['service_name'], record['username'],
+                                           f"stress-{seed}-{i}")
+                else:
+                    db.record_usage({record_id: (1, "2026-01-01 00:00:00")})
+                writes.append(time.perf_counter() - start)
+            else:
+                if i % 2:
+                    db.get_password(record_id)
+                else:
+                    db.filter_passwords(prefixes[i % len(prefixes)])
+                reads.append(time.perf_counter() - start)
+        except Exception:
+            errors += 1
+    return reads, writes, errors, get_write_queue(db.db_file).lock_wait
+
+
+def bench_concurrency(recorder, workdir, size, processes=(1, 4), operations=300, write_ratio=0.3):
+    """
+    多进程压力测试：N个进程同时对同一个密码库随机读写，记录吞吐量、读写延迟、写锁等待时间和失败次数
+    （失败次数应为0，即没有进程遇到 database is locked）
+    """
+    import time
+    import multiprocessing
+    from harness import _percentile
+
+    db = generate_vault(workdir / f"stress-vault-{size}.db", size)
+    # 和独立启动的命令行工具、图形界面一样，每个工作进程从头导入模块
+    context = multiprocessing.get_context("spawn")
+    for count in processes:
+        # 每轮使用不同的种子，新增的记录不会与上一轮重复
+        jobs = [(str(db.db_file), operations, write_ratio, f"{count}-{worker}")
+                for worker in range(count)]
+        with context.Pool(count) as pool:
+            start = time.perf_counter()
+            results = pool.starmap(_stress_worker, jobs)
+            elapsed = time.perf_counter() - start
+        reads = sorted(latency for result in results for latency in result[0])
+        writes = sorted(latency for result in results for latency in result[1])
+        errors = sum(result[2] for result in results)
+        lock_wait = sum(result[3] for result in results)
+        for kind, samples in (("reads", reads), ("writes", writes)):
+            fields = {
+                'processes': count,
+                'iterations': len(samples),
+                'p50_us': _percentile(samples, 0.50) * 1e6,
+                'p95_us': _percentile(samples, 0.95) * 1e6,
+                'p99_us': _percentile(samples, 0.99) * 1e6,
+            }
+            if kind == "writes":
+                fields.update(errors=errors, lock_wait_s=lock_wait,
+                              lock_wait_mean_us=lock_wait / len(samples) * 1e6 if samples else 0.0)
+            recorder.record(f"concurrency_{count}p_{kind}", size=size,
+                            ops_per_s=len(samples) / elapsed, **fields)
+        print(f"  {count} 个进程: 失败 {errors} 次，等待写锁共 {lock_wait:.3f} 秒", flush=True)
+    db.db_file.unlink()
+
+
+def bench_bulk(recorder, workdir, size, selected=10000):
+    """测量多选批量操作：一个事务中给选中的记录打标签、移动、轮换密码和删除"""
+    db = generate_vault(workdir / f"bulk-vault-{size}.db", size)
+    rng = random.Random(11)
+    chosen = rng.sample(range(1, size + 1), min(selected, size))
+    folder_id = db.create_folder("Bulk")
+
+    recorder.measure_bulk("bulk_retag", lambda: db.retag_entries(chosen, add=["bulk"]),
+                          len(chosen), size=size)
+    recorder.measure_bulk("bulk_move", lambda: db.move_to_folder(chosen, folder_id),
+                          len(chosen), size=size)
+    passwords = {record_id: f"Rotated-{record_id}!" for record_id in chosen}
+    recorder.measure_bulk("bulk_rotate", lambda: db.rotate_passwords(passwords),
+                          len(chosen), size=size)
+    recorder.measure_bulk("bulk_delete", lambda: db.delete_passwords(chosen),
+                          len(chosen), size=size)
+    db.db_file.unlink()
+
+
+def bench_generator(recorder, size):
+    """测量密码生成器每秒生成的密码数（随机密码、口令短语，以及逐字符调用 secrets.choice 作为对照）"""
+    import secrets
+    from core.password_generator import PasswordGenerator, PasswordPolicy, PassphrasePolicy
+
+    generator = PasswordGenerator()
+    policy = PasswordPolicy()
+    alphabet = policy.alphabet
+    recorder.measure_bulk("generate_passwords", lambda: generator.passwords(size, policy), size, size=size)
+    recorder.measure_bulk("generate_passwords_no_symbols",
+                          lambda: generator.passwords(size, PasswordPolicy(symbols=False, exclude="Il1O0")),
+                          size, size=size)
+    recorder.measure_bulk("generate_passphrases",
+                          lambda: generator.passphrases(size, PassphrasePolicy()), size, size=size)
+    recorder.measure("generate_password_single", lambda i: generator.password(policy),
+                     min(size, 10000), size=size)
+    count = min(size, 20000)
+    recorder.measure_bulk(
+        "secrets_choice_passwords",
+        lambda: ["".join(secrets.choice(alphabet) for _ in range(policy.length)) for _ in range(count)],
+        count, size=size
+    )
+
+
+def bench_listing_cache(recorder, workdir, size):
+    """对比启动时从数据库读取完整列表和从列表缓存文件读取"""
+    from core.database import ORDER_NAME
+    from core.listing_cache import ListingCache
+
+    db = generate_vault(workdir / f"listing-vault-{size}.db", size)
+    cache = ListingCache(db)
+    recorder.measure_bulk("listing_cache_write", cache.fetch, size, size=size)
+    repeat = max(3, min(20, 1000000 // size))
+    recorder.measure("listing_from_db", lambda i: db.get_listing(ORDER_NAME), repeat, size=size)
+    recorder.measure("listing_from_cache", lambda i: ListingCache(db).load(), repeat, size=size)
+    cache.discard()
+    db.db_file.unlink()
+
+
+def bench_sort_orders(recorder, workdir, size):
+    """测量每种排序方式读取完整列表的时间（按名称、用户名、时间都按索引顺序读取）"""
+    from core.database import ORDERS
+
+    db = generate_vault(workdir / f"sort-vault-{size}.db", size)
+    repeat = max(3, min(20, 1000000 // size))
+    for order in ORDERS:
+        recorder.measure(f"listing_order_{order}", lambda i, order=order: db.get_listing(order),
+                         repeat, size=size)
+    db.db_file.unlink()
+
+
+def bench_quick_switcher(recorder, workdir, size):
+    """测量快速切换索引的建立、无变更时的更新，以及逐字输入查询时每次按键的查找时间"""
+    from core.quick_switcher import QuickSwitchIndex
+
+    db = generate_vault(workdir / f"switch-vault-{size}.db", size)
+    index = QuickSwitchIndex(db)
+    recorder.measure("quick_switcher_build", lambda i: (index.clear(), index.refresh()), 3, size=size)
+    recorder.measure("quick_switcher_refresh_noop", lambda i: index.refresh(), 20, size=size)
+    # 依次输入每个查询的前缀，模拟逐字输入（包含前缀、子串、子序列和拼写错误的查询）
+    keystrokes = [query[:length] for query in ("github", "gthb", "githbu", "mail", "user12345")
+                  for length in range(1, len(query) + 1)]
+    recorder.measure("quick_switcher_keystroke", lambda i: index.search(keystrokes[i % len(keystrokes)]),
+                     len(keystrokes) * 3, size=size)
+    db.db_file.unlink()
+
+
+SUITES = {
+    'vault': lambda recorder, workdir, sizes: [bench_vault(recorder, workdir, s) for s in sizes],
+    'kdf': lambda recorder, workdir, sizes: bench_kdf(recorder, workdir),
+    'totp': lambda recorder, workdir, sizes: bench_totp(recorder),
+    'breach': lambda recorder, workdir, sizes: [bench_breach(recorder, workdir, s) for s in sizes],
+    'audit': lambda recorder, workdir, sizes: [bench_audit(recorder, workdir, s) for s in sizes],
+    'metrics': lambda recorder, workdir, sizes: bench_metrics(recorder),
+    'import': lambda recorder, workdir, sizes: [bench_import(recorder, workdir, s) for s in sizes],
+    'export': lambda recorder, workdir, sizes: [bench_export(recorder, workdir, s) for s in sizes],
+    'integrity': lambda recorder, workdir, sizes: [bench_integrity(recorder, workdir, s) for s in sizes],
+    'history': lambda recorder, workdir, sizes: [bench_history(recorder, workdir, s) for s in sizes],
+    'auditlog': lambda recorder, workdir, sizes: [bench_audit_log(recorder, workdir, s) for s in sizes],
+    'tags': lambda recorder, workdir, sizes: [bench_tags(recorder, workdir, s) for s in sizes],
+    'snapshot': lambda recorder, workdir, sizes: [bench_snapshot(recorder, workdir, s) for s in sizes],
+    'usage': lambda recorder, workdir, sizes: [bench_usage(recorder, workdir, s) for s in sizes],
+    'vaults': lambda recorder, workdir, sizes: [bench_vaults(recorder, workdir, s) for s in sizes],
+    'sync': lambda recorder, workdir, sizes: [bench_sync(recorder, workdir, s) for s in sizes],
+    'records': lambda recorder, workdir, sizes: [bench_records(recorder, workdir, s) for s in sizes],
+    'attachments': lambda recorder, workdir, sizes: [bench_attachments(recorder, workdir, s)
+                                                     for s in sizes],
+    'concurrency': lambda recorder, workdir, sizes: [bench_concurrency(recorder, workdir, s)
+                                                     for s in sizes],
+    'bulk': lambda recorder, workdir, sizes: [bench_bulk(recorder, workdir, s) for s in sizes],
+    'generator': lambda recorder, workdir, sizes: [bench_generator(recorder, s) for s in sizes],
+    'listingcache': lambda recorder, workdir, sizes: [bench_listing_cache(recorder, workdir, s)
+                                                      for s in sizes],
+    'sortorders': lambda recorder, workdir, sizes: [bench_sort_orders(recorder, workdir, s)
+                                                    for s in sizes],
+    'quickswitcher': lambda recorder, workdir, sizes: [bench_quick_switcher(recorder, workdir, s)
+                                                       for s in sizes],
+}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="2FA Password Manager 基准测试")
+    parser.add_argument("--sizes", default="1k,10k",
+                        help="逗号分隔的密码库规模，例如 1k,10k,100k,1M")
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"逗号分隔的测试套件，可选: {','.join(SUITES)}")
+    parser.add_argument("--output", type=Path, default=None, help="JSON结果输出文件")
+    parser.add_argument("--workdir", type=Path, default=None, help="临时密码库存放目录")
+    parser.add_argument("--baseline", type=Path, default=None, help="用于回归对比的基线JSON文件")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="吞吐量下降超过该比例视为回归（默认0.2）")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        parser.error(f"未知的测试套件: {', '.join(unknown)}")
+
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        workdir = Path(tmp)
+        for suite in suites:
+            SUITES[suite](recorder, workdir, sizes)
+
+    path = recorder.write_json(args.output)
+    print(f"\n结果已写入: {path}")
+
+    if args.baseline:
+        regressions = compare(recorder.results, args.baseline, args.threshold)
+        for name, size, old, new in regressions:
+            print(f"REGRESSION {name}[{size}]: {old:.1f} -> {new:.1f} ops/s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
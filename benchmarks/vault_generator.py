@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合成密码库生成器
+生成指定规模（如1k/10k/100k/1M条）的测试密码库，供基准测试使用
+
+用法:
+    python benchmarks/vault_generator.py 100000 /tmp/vault-100k.db
+"""
+
+import argparse
+import csv
+import json
+import random
+import string
+
+import harness  # noqa: F401  设置项目根目录路径
+from core.database import PasswordDatabase
+
+# 测试密码库使用的管理员密码
+MASTER_PASSWORD = "benchmark-master-password"
+
+# 每批写入的记录数
+GENERATE_BATCH_SIZE = 10000
+
+_WORDS = [
+    "mail", "cloud", "bank", "shop", "git", "news", "video", "music", "chat",
+    "drive", "photo", "travel", "game", "forum", "wiki", "docs", "pay", "mobile",
+    "work", "home", "office", "school", "health", "market", "stream", "social",
+]
+_TLDS = ["com", "net", "org", "io", "cn", "dev", "co.uk", "com.cn"]
+_CJK_NAMES = ["邮箱", "网盘", "银行", "购物", "论坛", "视频", "音乐", "地图"]
+_PASSWORD_CHARS = string.ascii_letters + string.digits + "!@#$%^&*-_"
+
+
+def synthetic_records(count, seed=0):
+    """
+    生成合成密码记录
+
+    Args:
+        count (int): 记录数
+        seed (int): 随机种子，相同种子生成相同数据
+
+    Yields:
+        tuple: (service_name, username, password)
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        if rng.random() < 0.1:
+            service_name = f"{rng.choice(_CJK_NAMES)}{i}"
+        else:
+            service_name = f"{rng.choice(_WORDS)}{rng.choice(_WORDS)}{i}.{rng.choice(_TLDS)}"
+        username = f"user{rng.randrange(count * 2)}@example.com"
+        password = "".join(rng.choice(_PASSWORD_CHARS) for _ in range(rng.randint(10, 24)))
+        yield service_name, username, password
+
+
+def _batched(iterable, size):
+    """按固定大小分批"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_vault(db_file, count, seed=0, master_password=MASTER_PASSWORD,
+                   batch_size=GENERATE_BATCH_SIZE):
+    """
+    生成合成密码库
+
+    Args:
+        db_file (Path): 数据库文件路径（已存在的文件会被覆盖）
+        count (int): 记录数
+        seed (int): 随机种子
+        master_password (str): 管理员密码
+        batch_size (int): 每批写入的记录数
+
+    Returns:
+        PasswordDatabase: 已解锁的数据库实例
+    """
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        path = db_file.with_name(db_file.name + suffix)
+        if path.exists():
+            path.unlink()
+    db = PasswordDatabase(db_file)
+    db.set_master_password(master_password)
+    for batch in _batched(synthetic_records(count, seed), batch_size):
+        db.add_passwords(batch)
+    return db
+
+
+def write_csv(csv_file, count, seed=0):
+    """
+    生成浏览器格式（name,url,username,password）的CSV导出文件
+
+    Args:
+        csv_file (Path): CSV文件路径
+        count (int): 记录数
+        seed (int): 随机种子
+    """
+    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "username", "password"])
+        for service_name, username, password in synthetic_records(count, seed):
+            writer.writerow([service_name, f"https://{service_name}/login", username, password])
+
+
+def write_bitwarden_json(json_file, count, seed=0):
+    """
+    生成Bitwarden未加密JSON格式的导出文件（逐条写出，不在内存中构造整个文档）
+
+    Args:
+        json_file (Path): JSON文件路径
+        count (int): 记录数
+        seed (int): 随机种子
+    """
+    with open(json_file, 'w', encoding='utf-8') as f:
+        f.write('{"encrypted": false, "folders": [{"id": "f1", "name": "Work"}], "items": [')
+        for i, (service_name, username, password) in enumerate(synthetic_records(count, seed)):
+            item = {
+                "id": f"item-{i}", "folderId": None, "type": 1, "name": service_name,
+                "notes": None, "favorite": False,
+                "login": {"uris": [{"match": None, "uri": f"https://{service_name}/login"}],
+                          "username": username, "password": password, "totp": None},
+                "revisionDate": "2024-01-01T00:00:00.000Z",
+            }
+            f.write((",\n" if i else "\n") + json.dumps(item, ensure_ascii=False))
+        f.write("\n]}\n")
+
+
+def write_keepass_xml(xml_file, count, seed=0):
+    """
+    生成KeePass 2 XML格式的导出文件（每个条目带一条历史版本）
+
+    Args:
+        xml_file (Path): XML文件路径
+        count (int): 记录数
+        seed (int): 随机种子
+    """
+    from xml.sax.saxutils import escape
+
+    with open(xml_file, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n<KeePassFile>\n'
+                '<Meta><RecycleBinUUID>AAAAAAAAAAAAAAAAAAAAAA==</RecycleBinUUID></Meta>\n'
+                '<Root><Group><UUID>MTIzNDU2Nzg5MDEyMzQ1Ng==</UUID><Name>Root</Name>\n')
+        for service_name, username, password in synthetic_records(count, seed):
+            strings = "".join(
+                f"<String><Key>{key}</Key><Value>{escape(value)}</Value></String>"
+                for key, value in (("Title", service_name), ("UserName", username),
+                                   ("Password", password), ("URL", f"https://{service_name}/"))
+            )
+            f.write(f"<Entry><UUID>x</UUID><Times><LastModificationTime>2024-01-01T00:00:00Z"
+                    f"</LastModificationTime></Times>{strings}"
+                    f"<History><Entry>{strings}</Entry></History></Entry>\n")
+        f.write('</Group></Root>\n</KeePassFile>\n')
+
+
+def main():
+    """主函数"""
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="生成合成测试密码库")
+    parser.add_argument("count", type=int, help="记录数")
+    parser.add_argument("db_file", type=Path, help="输出数据库文件")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--password", default=MASTER_PASSWORD, help="管理员密码")
+    args = parser.parse_args()
+
+    generate_vault(args.db_file, args.count, args.seed, args.password)
+    print(f"已生成 {args.count} 条记录: {args.db_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,17 @@ from pathlib import Path
 # 项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-# 数据存储目录
-DATA_DIR = BASE_DIR / "data"
-DATA_DIR.mkdir(exist_ok=True)
+# 数据存储目录（首次写入时再创建，避免导入时的磁盘I/O）
+# 可通过环境变量 TFAPM_DATA_DIR 或 --data-dir 参数指定
+DATA_DIR = (Path(os.environ["TFAPM_DATA_DIR"]).expanduser() if os.environ.get("TFAPM_DATA_DIR")
+            else BASE_DIR / "data")
+
+
+def ensure_data_dir():
+    """确保数据目录存在"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR
+
 
 # 加密相关配置
 ENCRYPTION_KEY_FILE = DATA_DIR / "encryption.key"
@@ -15,6 +23,17 @@ SECRET_KEY_FILE = DATA_DIR / "secret.key"
 # 数据库文件
 DATABASE_FILE = DATA_DIR / "passwords.db"
 
+# 多密码库配置
+# 主窗口打开的密码库，可通过环境变量 TFAPM_VAULT 或 --vault 参数指定，默认为 DATABASE_FILE
+VAULT_FILE = (Path(os.environ["TFAPM_VAULT"]).expanduser() if os.environ.get("TFAPM_VAULT")
+              else DATABASE_FILE)
+# 额外的密码库：环境变量 TFAPM_VAULTS（用路径分隔符分隔），或多次使用 --vault 参数
+EXTRA_VAULTS = [Path(p).expanduser() for p in os.environ.get("TFAPM_VAULTS", "").split(os.pathsep) if p]
+# 已登记的密码库列表（名称和路径）
+VAULTS_FILE = DATA_DIR / "vaults.json"
+# 并行解锁多个密码库的线程数，None表示每个密码库一个线程（PBKDF2计算时释放GIL）
+VAULT_UNLOCK_WORKERS = None
+
 # TOTP配置
 TOTP_ISSUER = "2FA Password Manager"
 TOTP_DIGITS = 6
@@ -27,3 +46,127 @@ APP_TITLE = "2FA Password Manager"
 
 # 日志配置
 LOG_FILE = BASE_DIR / "app.log"
+
+# 启动性能分析配置
+# 设置环境变量 TFAPM_PROFILE_STARTUP=1 或使用 --profile-startup 参数启用
+PROFILE_STARTUP = os.environ.get("TFAPM_PROFILE_STARTUP", "") == "1"
+# 冷启动时间预算（毫秒），超出时在报告中给出警告
+STARTUP_BUDGET_MS = 1500
+# 启动报告输出文件
+STARTUP_PROFILE_FILE = DATA_DIR / "startup_profile.json"
+
+# 性能指标配置
+# 设置环境变量 TFAPM_METRICS=1 启用（也可在主窗口的统计面板中开启）
+METRICS_ENABLED = os.environ.get("TFAPM_METRICS", "") == "1"
+METRICS_JSON_FILE = DATA_DIR / "metrics.json"
+METRICS_PROM_FILE = DATA_DIR / "metrics.prom"
+
+# 全库扫描配置（泄露检查、密码审计等）
+# 每批解密的记录数
+VAULT_SCAN_BATCH_SIZE = 2000
+# 并行解密的进程数，None表示使用CPU核心数，1表示在当前进程中执行
+VAULT_SCAN_WORKERS = None
+
+# 密码库完整性校验配置
+# 设置环境变量 TFAPM_VERIFY_ON_STARTUP=1 后，启动时在后台检查元数据和密文格式，
+# 首次验证管理员密码后再在后台解密校验全部记录
+VERIFY_ON_STARTUP = os.environ.get("TFAPM_VERIFY_ON_STARTUP", "") == "1"
+
+# 离线泄露密码索引文件
+BREACH_INDEX_FILE = DATA_DIR / "breach.idx"
+
+# 密码审计配置
+# 是否在密码表中保存带密钥的密码指纹，用于在添加/修改时即时发现重复使用的密码
+STORE_PASSWORD_FINGERPRINTS = True
+# 估算熵低于该值（比特）的密码视为弱密码
+AUDIT_WEAK_BITS = 50
+# 超过该天数未修改的密码视为过旧
+AUDIT_MAX_AGE_DAYS = 365
+
+# 服务名称和用户名加密（盲索引）配置
+# 前缀盲索引覆盖的前缀长度范围。较短的前缀会泄露更多分布信息，
+# 因此不为单个字符建立前缀索引
+BLIND_INDEX_MIN_PREFIX = 2
+BLIND_INDEX_MAX_PREFIX = 8
+
+# 在线快照备份配置（基于 SQLite 备份API，不阻塞正在使用的密码库）
+BACKUP_DIR = DATA_DIR / "backups"
+# 保留的快照数量，超出时删除最旧的快照
+BACKUP_KEEP = 7
+# 每一步复制的页数，以及两步之间的间隔（秒），期间其他连接可以正常读写
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.005
+# 自动快照间隔（分钟），密码库在上次快照后有修改时才会创建新快照；0表示不自动创建
+BACKUP_INTERVAL_MINUTES = 60
+
+# 密码历史版本配置
+# 每条记录最多保留的历史版本数，None表示不限制
+HISTORY_KEEP_VERSIONS = 10
+# 历史版本最多保留的天数，None表示不限制
+HISTORY_KEEP_DAYS = 365
+# 后台清理历史版本的间隔（分钟），清理不在每次修改密码时进行
+HISTORY_PRUNE_INTERVAL_MINUTES = 30
+# 清理时每个事务删除的行数，避免长时间占用写锁
+HISTORY_PRUNE_BATCH_SIZE = 1000
+# 密码详情对话框中每页加载的历史版本数
+HISTORY_PAGE_SIZE = 20
+
+# 访问审计日志配置
+# 事件先缓存在内存中，达到条数或间隔（秒）时在一个事务中批量写入
+AUDIT_LOG_FLUSH_SIZE = 100
+AUDIT_LOG_FLUSH_INTERVAL = 2.0
+
+# 使用统计配置
+# 访问次数先在内存中累计，达到条数或间隔（秒）时在一个事务中批量写入
+USAGE_FLUSH_SIZE = 50
+USAGE_FLUSH_INTERVAL = 5.0
+# 解锁后在后台预先解密的常用记录数（最常用和最近使用各取这么多条）
+PREFETCH_HOT_ENTRIES = 20
+
+# 密码库同步配置（见 core.sync）
+# 应用对方变更时每个事务写入的记录数
+SYNC_BATCH_SIZE = 1000
+
+# 安全笔记和附件配置（见 core.attachments）
+# 附件按块加密（AES-GCM），读写时每次只在内存中保留一块
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+# 单个附件的最大字节数
+ATTACHMENT_MAX_SIZE = 64 * 1024 * 1024
+
+# 多进程并发访问配置（见 core.concurrency）
+# 数据库被其他连接锁定时的忙等待超时（秒）
+SQLITE_BUSY_TIMEOUT = 5.0
+# 忙等待超时后仍被锁定时的重试次数，以及退避的初始间隔和最大间隔（秒），每次间隔加倍并随机抖动
+SQLITE_RETRY_ATTEMPTS = 5
+SQLITE_RETRY_BASE_DELAY = 0.05
+SQLITE_RETRY_MAX_DELAY = 2.0
+# 写队列中合并到一个事务提交的最大写操作数
+WRITE_QUEUE_MAX_BATCH = 64
+
+# 密码生成器配置（见 core.password_generator）
+# 每次从 os.urandom 读取的随机字节数，生成的密码从缓冲区中取用
+GENERATOR_BUFFER_SIZE = 64 * 1024
+# 默认密码长度，以及默认排除的字符（例如 "Il1O0"，为空表示不排除）
+GENERATOR_DEFAULT_LENGTH = 20
+GENERATOR_DEFAULT_EXCLUDE = ""
+# 口令短语的默认单词数和分隔符
+PASSPHRASE_DEFAULT_WORDS = 6
+PASSPHRASE_SEPARATOR = "-"
+# 口令短语使用的单词表（每行一个单词），None表示使用自带的 core/wordlist.txt（2048个单词，每个11比特）
+PASSPHRASE_WORDLIST_FILE = None
+
+# 列表缓存配置（见 core.listing_cache）
+# 启动时先用缓存文件显示按名称排序的完整列表，与密码库不一致时在后台重新读取
+LISTING_CACHE_ENABLED = True
+# 缓存文件放在密码库所在目录，文件名为密码库文件名加此后缀
+LISTING_CACHE_SUFFIX = ".listing"
+# 列表按内容自动调整列宽时参考的行数（不遍历全部记录）
+LISTING_RESIZE_SAMPLE_ROWS = 200
+
+# 快速切换面板配置（见 core.quick_switcher）
+# 打开面板的快捷键
+QUICK_SWITCHER_SHORTCUT = "Ctrl+K"
+# 最多显示的结果数
+QUICK_SWITCHER_RESULTS = 50
+# 每个匹配等级最多检查的候选数（超过时只在前面的候选中排序，保证每次按键的响应时间）
+QUICK_SWITCHER_SCAN_LIMIT = 500
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+安全笔记和附件模块
+附件（SSH密钥、证书、恢复码PDF等）和笔记按块加密后存放在 attachments 表的 content 列中。
+写入时先插入 zeroblob 占位，再通过增量BLOB I/O（Connection.blobopen）逐块写入密文；
+读取时逐块读出并解密，任何时候内存中只有一块，完整文件不会被读入内存
+
+内容格式:
+    第i块   AES-256-GCM密文（明文为 chunk_size 字节，最后一块可以更短），每块附带16字节认证标签
+
+第i块的nonce为 nonce_prefix(8) + i(u32)，附加认证数据为 size(u64) chunk_size(u32) i(u32) 是否最后一块(1)，
+因此任何块被修改、重排或截断，或者元数据中的大小被修改，都会在读取时被发现。
+密钥是从主密钥派生的子密钥（见 EncryptionManager.derive_subkey）
+"""
+
+import io
+import os
+import struct
+from pathlib import Path
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from config.settings import ATTACHMENT_CHUNK_SIZE, ATTACHMENT_MAX_SIZE
+from core.metrics import timed
+
+
+# 附件类型
+KIND_FILE = "file"
+KIND_NOTE = "note"
+
+# AES-GCM 认证标签长度
+TAG_SIZE = 16
+
+_INDEX = struct.Struct(">I")
+_AAD = struct.Struct(">QII?")
+
+
+def _cipher(db):
+    """附件使用的AES-256-GCM加密器"""
+    db._require_encryption()
+    return AESGCM(db.encryption.derive_subkey("attachments"))
+
+
+def _chunk_count(size, chunk_size):
+    """内容分成的块数（空内容也有一块，用于认证）"""
+    return max(1, -(-size // chunk_size))
+
+
+def stored_size(size, chunk_size=None):
+    """
+    加密后的内容长度
+
+    Args:
+        size (int): 明文字节数
+        chunk_size (int): 每块的明文字节数，None表示使用默认配置
+
+    Returns:
+        int: 密文字节数
+    """
+    chunk_size = chunk_size or ATTACHMENT_CHUNK_SIZE
+    return size + _chunk_count(size, chunk_size) * TAG_SIZE
+
+
+def _nonce_and_aad(nonce_prefix, size, chunk_size, index, count):
+    return (nonce_prefix + _INDEX.pack(index),
+            _AAD.pack(size, chunk_size, index, index == count - 1))
+
+
+def _read_exact(stream, length):
+    """从流中读取指定长度（文件对象可能返回较短的结果）"""
+    parts = []
+    remaining = length
+    while remaining:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+
+def _stream_size(stream):
+    """可随机访问的流中剩余的字节数"""
+    position = stream.tell()
+    end = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return end - position
+
+
+def _write(db, entry_id, kind, name, stream, size, replace_id=None):
+    """
+    在写队列的一个写操作中插入附件并逐块写入密文（失败时整个写操作回滚）
+
+    Args:
+        replace_id (int): 同一事务中删除的旧附件ID（更新笔记时），None表示不删除
+
+    Returns:
+        int: 附件ID
+    """
+    if size > ATTACHMENT_MAX_SIZE:
+        raise ValueError(f"附件过大: {size} 字节，最大 {ATTACHMENT_MAX_SIZE} 字节")
+    cipher = _cipher(db)
+    chunk_size = ATTACHMENT_CHUNK_SIZE
+    count = _chunk_count(size, chunk_size)
+    nonce_prefix = os.urandom(8)
+
+    def store(conn):
+        if replace_id is not None:
+            conn.execute('''
+                DELETE FROM attachments WHERE id = ?
+            ''', (replace_id,))
+        cursor = conn.execute('''
+            INSERT INTO attachments (entry_id, kind, name, size, chunk_size, nonce_prefix, content)
+            VALUES (?, ?, ?, ?, ?, ?, zeroblob(?))
+        ''', (entry_id, kind, db._encode_name(name), size, chunk_size, nonce_prefix,
+              stored_size(size, chunk_size)))
+        attachment_id = cursor.lastrowid
+        with conn.blobopen("attachments", "content", attachment_id) as blob:
+            remaining = size
+            for index in range(count):
+                plaintext = _read_exact(stream, min(chunk_size, remaining))
+                if len(plaintext) != min(chunk_size, remaining):
+                    raise ValueError("附件在写入过程中被修改")
+                remaining -= len(plaintext)
+                nonce, aad = _nonce_and_aad(nonce_prefix, size, chunk_size, index, count)
+                blob.write(cipher.encrypt(nonce, plaintext, aad))
+        return attachment_id
+
+    return db._write(store)
+
+
+@timed("attachments.add")
+def add_attachment(db, entry_id, source, name=None):
+    """
+    为记录添加附件
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        entry_id (int): 记录ID
+        source (Path or file): 文件路径，或可随机访问的二进制文件对象
+        name (str): 附件名称，None表示使用文件名
+
+    Returns:
+        int: 附件ID
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        with open(path, 'rb') as stream:
+            return _write(db, entry_id, KIND_FILE, name or path.name, stream,
+                          os.fstat(stream.fileno()).st_size)
+    if not name:
+        raise ValueError("从文件对象添加附件时必须指定名称")
+    return _write(db, entry_id, KIND_FILE, name, source, _stream_size(source))
+
+
+def list_attachments(db, entry_id):
+    """
+    列出记录的附件（只读取元数据，不读取内容）
+
+    Args:
+        db (PasswordDatabase): 数据库实例
+        entry_id (int): 记录ID
+
+    Returns:
+        list: 附件字典列表（id, name, size, created_at），按添加顺序
+    """
+    with db._connect() as conn:
+        rows = conn.execute('''
+            SELECT id, name, size, created_at
+            FROM attachments
+            WHERE entry_id = ? AND kind = ?
+            ORDER BY id
+        ''', (entry_id, KIND_FILE)).fetchall()
+    return [
+        {'id': attachment_id, 'name': db._decode_name(name), 'size': size, 'created_at': created_at}
+        for attachment_id, name, size, created_at in rows
+    ]
+
+
+def count_attachments(db, entry_id):
+    """记录的附件数"""
+    with db._connect() as conn:
+        return conn.execute('''
+            SELECT COUNT(*) FROM attachments WHERE entry_id = ? AND kind = ?
+        ''', (entry_id, KIND_FILE)).fetchone()[0]
+
+
+def iter_attachment(db, attachment_id):
+    """
+    逐块读取并解密附件内容
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        attachment_id (int): 附件ID
+
+    Yields:
+        bytes: 明文块
+    """
+    cipher = _cipher(db)
+    conn = db._connect()
+    try:
+        row = conn.execute('''
+            SELECT size, chunk_size, nonce_prefix FROM attachments WHERE id = ?
+        ''', (attachment_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"附件不存在: {attachment_id}")
+        size, chunk_size, nonce_prefix = row
+        count = _chunk_count(size, chunk_size)
+        with conn.blobopen("attachments", "content", attachment_id, readonly=True) as blob:
+            if len(blob) != stored_size(size, chunk_size):
+                raise ValueError("附件已损坏：内容长度与大小不符")
+            remaining = size
+            for index in range(count):
+                length = min(chunk_size, remaining)
+                remaining -= length
+                nonce, aad = _nonce_and_aad(nonce_prefix, size, chunk_size, index, count)
+                try:
+                    yield cipher.decrypt(nonce, blob.read(length + TAG_SIZE), aad)
+                except InvalidTag:
+                    raise ValueError("附件已损坏或被篡改")
+    finally:
+        conn.close()
+
+
+@timed("attachments.save")
+def save_attachment(db, attachment_id, path):
+    """
+    将附件解密保存到文件（先写临时文件，完整解密后再替换，文件只有所有者可读写）
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        attachment_id (int): 附件ID
+        path (Path): 保存路径
+
+    Returns:
+        int: 写入的字节数
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".part")
+    written = 0
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter_attachment(db, attachment_id):
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def delete_attachment(db, attachment_id):
+    """
+    删除附件
+
+    Returns:
+        bool: 是否删除
+    """
+    return db._write(lambda conn: conn.execute('''
+        DELETE FROM attachments WHERE id = ?
+    ''', (attachment_id,)).rowcount > 0)
+
+
+def _note_id(db, entry_id):
+    with db._connect() as conn:
+        row = conn.execute('''
+            SELECT id FROM attachments WHERE entry_id = ? AND kind = ?
+        ''', (entry_id, KIND_NOTE)).fetchone()
+    return row[0] if row else None
+
+
+@timed("attachments.set_note")
+def set_note(db, entry_id, text):
+    """
+    设置记录的安全笔记（空文本表示删除笔记）
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        entry_id (int): 记录ID
+        text (str): 笔记内容
+    """
+    note_id = _note_id(db, entry_id)
+    if not text:
+        if note_id is not None:
+            delete_attachment(db, note_id)
+        return
+    data = text.encode('utf-8')
+    _write(db, entry_id, KIND_NOTE, "", io.BytesIO(data), len(data), replace_id=note_id)
+
+
+def get_note(db, entry_id):
+    """
+    获取记录的安全笔记
+
+    Returns:
+        str: 笔记内容，没有笔记时为空字符串
+    """
+    note_id = _note_id(db, entry_id)
+    if note_id is None:
+        return ""
+    return b"".join(iter_attachment(db, note_id)).decode('utf-8')
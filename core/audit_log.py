@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+访问审计日志模块
+记录查看、复制、修改和删除密码记录的操作。事件先缓存在内存中，
+达到条数阈值或定时器到期时在一个事务中批量写入，不拖慢界面操作。
+
+每条日志的哈希包含上一条日志的哈希（哈希链），
+修改、删除或重排任何一条日志都会使 verify_chain 在该处失败；
+表上的触发器禁止修改和删除已写入的日志
+"""
+
+import getpass
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from config.settings import AUDIT_LOG_FLUSH_SIZE, AUDIT_LOG_FLUSH_INTERVAL
+from core.metrics import timed
+
+
+# 操作类型
+ACTION_VIEW = "view"
+ACTION_COPY = "copy"
+ACTION_ADD = "add"
+ACTION_EDIT = "edit"
+ACTION_DELETE = "delete"
+ACTIONS = (ACTION_VIEW, ACTION_COPY, ACTION_ADD, ACTION_EDIT, ACTION_DELETE)
+
+# 哈希链第一条日志的上一条哈希
+GENESIS_HASH = "0" * 64
+# 查询默认返回的最大条数
+QUERY_LIMIT = 1000
+
+
+def record_hash(prev_hash, ts, action, entry_id, actor):
+    """
+    计算一条日志的哈希
+
+    Args:
+        prev_hash (str): 上一条日志的哈希
+        ts (str): 时间（UTC）
+        action (str): 操作类型
+        entry_id (int): 记录ID，可为None
+        actor (str): 操作者
+
+    Returns:
+        str: 十六进制SHA-256哈希
+    """
+    entry = "" if entry_id is None else str(entry_id)
+    message = f"{prev_hash}\x1f{ts}\x1f{action}\x1f{entry}\x1f{actor}".encode('utf-8')
+    return hashlib.sha256(message).hexdigest()
+
+
+def utc_now():
+    """当前UTC时间，格式与 CURRENT_TIMESTAMP 相同并带微秒，可直接按字符串比较"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(' ', 'microseconds')
+
+
+class AuditLog:
+    """
+    缓冲写入的审计日志
+
+    log 只把事件加入内存缓冲区；后台线程每隔 flush_interval 秒写入一次，
+    缓冲区达到 flush_size 条时立即写入
+    """
+
+    def __init__(self, db, flush_size=None, flush_interval=None):
+        """
+        初始化审计日志
+
+        Args:
+            db (PasswordDatabase): 数据库实例
+            flush_size (int): 触发写入的缓冲条数，None表示使用默认配置
+            flush_interval (float): 定时写入的间隔（秒），None表示使用默认配置
+        """
+        self.db = db
+        self.flush_size = AUDIT_LOG_FLUSH_SIZE if flush_size is None else flush_size
+        self.flush_interval = AUDIT_LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        try:
+            self.actor = getpass.getuser()
+        except Exception:
+            self.actor = "unknown"
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        # 保证同一进程中的写入按顺序进行，哈希链不会分叉
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def log(self, action, entry_id=None):
+        """
+        记录一个事件（只写入内存缓冲区）
+
+        Args:
+            action (str): 操作类型，ACTIONS 之一
+            entry_id (int): 相关的记录ID
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"未知的审计操作类型: {action}")
+        with self._buffer_lock:
+            self._buffer.append((utc_now(), action, entry_id))
+            pending = len(self._buffer)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._flusher.start()
+        if pending >= self.flush_size:
+            self.flush()
+
+    def log_many(self, action, entry_ids):
+        """
+        为多条记录各记录一个事件（批量操作，一次加入缓冲区）
+
+        Args:
+            action (str): 操作类型，ACTIONS 之一
+            entry_ids (iterable): 相关的记录ID
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"未知的审计操作类型: {action}")
+        ts = utc_now()
+        with self._buffer_lock:
+            self._buffer.extend((ts, action, entry_id) for entry_id in entry_ids)
+            pending = len(self._buffer)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._flusher.start()
+        if pending >= self.flush_size:
+            self.flush()
+
+    def _run(self):
+        """后台定时写入"""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 写入失败的事件已放回缓冲区，下次再试
+                pass
+
+    @timed("audit_log.flush")
+    def flush(self):
+        """
+        将缓冲区中的事件在一个事务中写入数据库
+
+        Returns:
+            int: 写入的事件数
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+            try:
+                self._append(events)
+            except Exception:
+                with self._buffer_lock:
+                    self._buffer[:0] = events
+                raise
+            return len(events)
+
+    def _append(self, events):
+        """追加一批事件并延续哈希链（在写队列的事务中，其他进程不能在读取链尾和写入之间插入日志）"""
+        def append(conn):
+            row = conn.execute("SELECT hash FROM audit_log ORDER BY id DESC LIMIT 1").fetchone()
+            prev_hash = row[0] if row else GENESIS_HASH
+            rows = []
+            for ts, action, entry_id in events:
+                digest = record_hash(prev_hash, ts, action, entry_id, self.actor)
+                rows.append((ts, action, entry_id, self.actor, prev_hash, digest))
+                prev_hash = digest
+            conn.executemany('''
+                INSERT INTO audit_log (ts, action, entry_id, actor, prev_hash, hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        self.db._write(append)
+
+    def close(self):
+        """停止后台线程并写入剩余的事件"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    @timed("audit_log.query")
+    def query(self, entry_id=None, start=None, end=None, action=None, limit=QUERY_LIMIT):
+        """
+        按记录、时间范围和操作类型查询日志（从新到旧），查询前先写入缓冲区中的事件
+
+        Args:
+            entry_id (int): 只返回该记录的日志
+            start: 开始时间（含），UTC字符串或datetime
+            end: 结束时间（不含），UTC字符串或datetime
+            action (str): 只返回该类型的操作
+            limit (int): 最多返回的条数
+
+        Returns:
+            list: 日志列表，每项包含 id, ts, action, entry_id, actor
+        """
+        from core.merge import normalize_timestamp
+
+        self.flush()
+        conditions = []
+        params = []
+        if entry_id is not None:
+            conditions.append("entry_id = ?")
+            params.append(entry_id)
+        if action is not None:
+            conditions.append("action = ?")
+            params.append(action)
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(normalize_timestamp(start))
+        if end is not None:
+            conditions.append("ts < ?")
+            params.append(normalize_timestamp(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+
+        with self.db._connect() as conn:
+            rows = conn.execute(f'''
+                SELECT id, ts, action, entry_id, actor
+                FROM audit_log
+                {where}
+                ORDER BY ts DESC, id DESC
+                LIMIT ?
+            ''', params).fetchall()
+        return [
+            {'id': row[0], 'ts': row[1], 'action': row[2], 'entry_id': row[3], 'actor': row[4]}
+            for row in rows
+        ]
+
+    @timed("audit_log.verify_chain")
+    def verify_chain(self, batch_size=5000):
+        """
+        按顺序重新计算全部日志的哈希链
+
+        Returns:
+            tuple: (是否完好, 第一条不一致的日志ID或None, 校验的日志条数)
+        """
+        self.flush()
+        conn = self.db._connect()
+        try:
+            cursor = conn.execute('''
+                SELECT id, ts, action, entry_id, actor, prev_hash, hash
+                FROM audit_log ORDER BY id
+            ''')
+            expected_prev = GENESIS_HASH
+            count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for record_id, ts, action, entry_id, actor, prev_hash, digest in rows:
+                    if (prev_hash != expected_prev
+                            or record_hash(prev_hash, ts, action, entry_id, actor) != digest):
+                        return False, record_id, count
+                    expected_prev = digest
+                    count += 1
+            return True, None, count
+        finally:
+            conn.close()
+
+
+# 单例模式实例
+_audit_log_instance = None
+
+
+def get_audit_log():
+    """获取审计日志实例（单例模式）"""
+    global _audit_log_instance
+    if _audit_log_instance is None:
+        from core.database import get_database
+        _audit_log_instance = AuditLog(get_database())
+    return _audit_log_instance
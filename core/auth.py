@@ -6,43 +6,55 @@
 提供TOTP二次验证功能
 """
 
-import pyotp
-import qrcode
-import base64
-import os
-from io import BytesIO
-from PIL import Image
-from config.settings import TOTP_ISSUER, TOTP_DIGITS, TOTP_INTERVAL, SECRET_KEY_FILE
+from config.settings import (
+    TOTP_ISSUER, TOTP_DIGITS, TOTP_INTERVAL, SECRET_KEY_FILE, ensure_data_dir
+)
+from core.concurrency import load_or_create_file
+from core.metrics import timed
 
 
 class TOTPAuth:
     """TOTP二次验证类"""
     
-    def __init__(self):
-        """初始化"""
-        self.secret = self._load_or_create_secret()
-        self.totp = pyotp.TOTP(
-            self.secret, 
-            digits=TOTP_DIGITS, 
-            interval=TOTP_INTERVAL
-        )
+    def __init__(self, secret=None):
+        """
+        初始化
+        
+        Args:
+            secret (str): Base32编码的TOTP密钥，为None时从密钥文件加载（不存在则创建）
+        """
+        if secret is None:
+            secret = self._load_or_create_secret()
+        self.secret = secret
+        self._totp = None
+    
+    @property
+    def totp(self):
+        """TOTP对象（首次使用时才导入pyotp并创建）"""
+        if self._totp is None:
+            import pyotp
+            self._totp = pyotp.TOTP(
+                self.secret, 
+                digits=TOTP_DIGITS, 
+                interval=TOTP_INTERVAL
+            )
+        return self._totp
     
     def _load_or_create_secret(self):
-        """加载或创建密钥"""
-        if SECRET_KEY_FILE.exists():
-            with open(SECRET_KEY_FILE, 'r') as f:
-                secret = f.read().strip()
-        else:
+        """加载或创建密钥（多个进程同时创建时只有一个密钥生效）"""
+        def generate():
             # 生成新的随机密钥
-            secret = pyotp.random_base32()
-            with open(SECRET_KEY_FILE, 'w') as f:
-                f.write(secret)
-        return secret
+            import pyotp
+            return pyotp.random_base32().encode('ascii')
+        
+        ensure_data_dir()
+        return load_or_create_file(SECRET_KEY_FILE, generate).decode('ascii').strip()
     
     def get_secret(self):
         """获取密钥"""
         return self.secret
     
+    @timed("totp.generate_qr_code")
     def generate_qr_code(self, account_name):
         """
         生成二维码供手机应用扫描
@@ -59,7 +71,8 @@ class TOTPAuth:
             issuer_name=TOTP_ISSUER
         )
         
-        # 生成二维码
+        # 生成二维码（qrcode和PIL较重，仅在需要时导入）
+        import qrcode
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -73,6 +86,7 @@ class TOTPAuth:
         img = qr.make_image(fill_color="black", back_color="white")
         return img
     
+    @timed("totp.verify_token")
     def verify_token(self, token):
         """
         验证TOTP令牌
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+盲索引模块
+服务名称和用户名加密存储时，为其完整值和规范化前缀计算带密钥的HMAC令牌，
+令牌存入带索引的表中，使精确查找和前缀查找无需解密即可走索引
+"""
+
+import hmac
+import hashlib
+
+from config.settings import BLIND_INDEX_MIN_PREFIX, BLIND_INDEX_MAX_PREFIX
+
+
+FIELD_SERVICE = "service"
+FIELD_USERNAME = "username"
+# 服务名称和用户名组合（用于唯一性约束）
+FIELD_ENTRY = "entry"
+
+# 令牌长度（十六进制字符数），128位足以避免碰撞
+TOKEN_LENGTH = 32
+
+
+def normalize(value):
+    """规范化字段值：去除首尾空白并进行大小写折叠"""
+    return value.strip().casefold()
+
+
+def matches_prefix(normalized_prefix, service_name, username):
+    """解密后的服务名称或用户名是否以规范化的前缀开头（前缀超过索引长度时的明文复查）"""
+    return (normalize(service_name).startswith(normalized_prefix)
+            or normalize(username).startswith(normalized_prefix))
+
+
+def _token(key, field, kind, value):
+    """计算单个令牌，字段名和令牌类型参与计算，不同字段的相同值得到不同令牌"""
+    message = f"{field}\x1f{kind}\x1f{value}".encode('utf-8')
+    return hmac.new(key, message, hashlib.sha256).hexdigest()[:TOKEN_LENGTH]
+
+
+def _key(encryption):
+    """获取盲索引子密钥"""
+    return encryption.derive_subkey("blind-index")
+
+
+def entry_tokens(encryption, service_name, username):
+    """
+    计算一条记录的全部盲索引令牌
+
+    Args:
+        encryption (EncryptionManager): 加密器
+        service_name (str): 服务名称明文
+        username (str): 用户名明文
+
+    Returns:
+        set: 令牌集合
+    """
+    key = _key(encryption)
+    tokens = set()
+    for field, value in ((FIELD_SERVICE, service_name), (FIELD_USERNAME, username)):
+        value = normalize(value)
+        tokens.add(_token(key, field, "eq", value))
+        for length in range(BLIND_INDEX_MIN_PREFIX, min(len(value), BLIND_INDEX_MAX_PREFIX) + 1):
+            tokens.add(_token(key, field, "prefix", value[:length]))
+    return tokens
+
+
+def exact_token(encryption, field, value):
+    """
+    计算精确查找令牌
+
+    Args:
+        encryption (EncryptionManager): 加密器
+        field (str): FIELD_SERVICE 或 FIELD_USERNAME
+        value (str): 要查找的值
+
+    Returns:
+        str: 令牌
+    """
+    return _token(_key(encryption), field, "eq", normalize(value))
+
+
+def prefix_token(encryption, field, prefix):
+    """
+    计算前缀查找令牌，超过最大索引长度的前缀按最大长度截断（调用方需再精确过滤）
+
+    Args:
+        encryption (EncryptionManager): 加密器
+        field (str): FIELD_SERVICE 或 FIELD_USERNAME
+        prefix (str): 前缀
+
+    Returns:
+        str or None: 令牌，前缀短于最小索引长度时返回None
+    """
+    prefix = normalize(prefix)
+    if len(prefix) < BLIND_INDEX_MIN_PREFIX:
+        return None
+    return _token(_key(encryption), field, "prefix", prefix[:BLIND_INDEX_MAX_PREFIX])
+
+
+def plain_entry_key(service_name, username):
+    """
+    计算明文模式下的记录唯一键：规范化的服务名称和用户名组合
+
+    Args:
+        service_name (str): 服务名称
+        username (str): 用户名
+
+    Returns:
+        str: 唯一键
+    """
+    return f"{normalize(service_name)}\x1f{normalize(username)}"
+
+
+def entry_key_token(encryption, service_name, username):
+    """
+    计算加密模式下的记录唯一键令牌
+
+    Args:
+        encryption (EncryptionManager): 加密器
+        service_name (str): 服务名称明文
+        username (str): 用户名明文
+
+    Returns:
+        str: 令牌
+    """
+    return _token(_key(encryption), FIELD_ENTRY, "eq", plain_entry_key(service_name, username))
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线泄露密码检查模块
+将本地下载的HIBP格式SHA-1列表构建为紧凑的有序二进制索引，
+通过mmap和二分查找判断密码是否出现在泄露数据中，全程无需联网
+
+索引文件格式（所有整数均为大端序）:
+    文件头   magic(8) version(u16) prefix_bytes(u16) reserved(u32) count(u64)
+    扇出表   65536 个 u64，第i项为前两个字节 <= i 的记录数
+    记录     count 个定长的SHA-1前缀（prefix_bytes 字节），升序且无重复
+"""
+
+import os
+import sys
+import mmap
+import heapq
+import bisect
+import struct
+import hashlib
+import tempfile
+from array import array
+
+from core.metrics import timed
+
+
+INDEX_MAGIC = b"TFABRIDX"
+INDEX_VERSION = 1
+# 保存的SHA-1前缀长度（字节）。8字节在十亿级数据下误报率约为 1e-10
+PREFIX_BYTES = 8
+
+_HEADER = struct.Struct(">8sHHIQ")
+_FANOUT_SIZE = 65536
+_FANOUT_BYTES = _FANOUT_SIZE * 8
+_DATA_OFFSET = _HEADER.size + _FANOUT_BYTES
+_BIG_ENDIAN = sys.byteorder == "big"
+
+# 构建索引时每个排序段的记录数
+BUILD_RUN_SIZE = 2000000
+
+
+def _to_big_endian(values):
+    """将 array('Q') 转换为大端序字节"""
+    if not _BIG_ENDIAN:
+        values = array('Q', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_big_endian(data):
+    """将大端序字节转换为 array('Q')"""
+    values = array('Q')
+    values.frombytes(data)
+    if not _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def _parse_prefixes(source_path):
+    """
+    逐行读取HIBP格式文件（"SHA1:次数" 或仅 "SHA1"），提取前缀整数
+
+    Yields:
+        int: SHA-1前 PREFIX_BYTES 字节对应的整数
+    """
+    hex_chars = PREFIX_BYTES * 2
+    with open(source_path, 'r', encoding='ascii', errors='ignore') as f:
+        for line in f:
+            if len(line) < 40:
+                continue
+            try:
+                yield int(line[:hex_chars], 16)
+            except ValueError:
+                continue
+
+
+def _read_run(path, block_size=1 << 16):
+    """读取一个已排序的段文件"""
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(block_size * 8)
+            if not data:
+                break
+            yield from _from_big_endian(data)
+
+
+def _write_sorted_run(values, directory):
+    """将一段前缀排序后写入临时文件"""
+    values.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_to_big_endian(array('Q', values)))
+    return path
+
+
+def _merge_runs(run_paths, out, fanout):
+    """多路归并已排序的段文件，去重后写出，并统计扇出计数"""
+    count = 0
+    buffer = array('Q')
+    previous = None
+    for value in heapq.merge(*(_read_run(path) for path in run_paths)):
+        if value == previous:
+            continue
+        previous = value
+        buffer.append(value)
+        fanout[value >> 48] += 1
+        count += 1
+        if len(buffer) >= 65536:
+            out.write(_to_big_endian(buffer))
+            buffer = array('Q')
+    if buffer:
+        out.write(_to_big_endian(buffer))
+    return count
+
+
+def _concat_runs(run_paths, out, fanout):
+    """
+    输入本身严格递增时（HIBP官方下载文件按哈希排序），直接拼接各段，
+    并用二分查找统计扇出计数，避免逐条归并
+    """
+    count = 0
+    for path in run_paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        values = _from_big_endian(data)
+        if not values:
+            continue
+        out.write(data)
+        first_bucket, last_bucket = values[0] >> 48, values[-1] >> 48
+        if len(values) < last_bucket - first_bucket:
+            # 段内记录稀疏时逐条统计更快
+            for value in values:
+                fanout[value >> 48] += 1
+        else:
+            start = 0
+            for bucket in range(first_bucket, last_bucket + 1):
+                end = bisect.bisect_right(values, ((bucket + 1) << 48) - 1, start)
+                fanout[bucket] += end - start
+                start = end
+        count += len(values)
+    return count
+
+
+@timed("breach.build_index")
+def build_index(source_path, index_path, run_size=BUILD_RUN_SIZE):
+    """
+    从HIBP格式的SHA-1列表构建二进制索引（外部排序，内存占用与 run_size 成正比）
+
+    Args:
+        source_path (Path): HIBP格式文本文件
+        index_path (Path): 输出索引文件
+        run_size (int): 每个排序段的记录数
+
+    Returns:
+        int: 索引中的记录数（去重后）
+    """
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    with tempfile.TemporaryDirectory(dir=index_dir) as tmp_dir:
+        # 第一阶段：分段排序，同时检查输入是否已严格递增
+        run_paths = []
+        chunk = []
+        strictly_increasing = True
+        previous = -1
+        for prefix in _parse_prefixes(source_path):
+            if prefix <= previous:
+                strictly_increasing = False
+            previous = prefix
+            chunk.append(prefix)
+            if len(chunk) >= run_size:
+                run_paths.append(_write_sorted_run(chunk, tmp_dir))
+                chunk = []
+        if chunk or not run_paths:
+            run_paths.append(_write_sorted_run(chunk, tmp_dir))
+        del chunk
+
+        # 第二阶段：合并各段并写出索引
+        fanout = array('Q', bytes(_FANOUT_BYTES))
+        tmp_index = f"{index_path}.tmp"
+        with open(tmp_index, 'wb') as out:
+            out.write(bytes(_DATA_OFFSET))
+            if strictly_increasing:
+                count = _concat_runs(run_paths, out, fanout)
+            else:
+                count = _merge_runs(run_paths, out, fanout)
+
+            # 扇出表转换为累计计数
+            total = 0
+            for i in range(_FANOUT_SIZE):
+                total += fanout[i]
+                fanout[i] = total
+
+            out.seek(0)
+            out.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, PREFIX_BYTES, 0, count))
+            out.write(_to_big_endian(fanout))
+        os.replace(tmp_index, index_path)
+    return count
+
+
+class BreachIndex:
+    """泄露密码索引（只读，通过mmap访问）"""
+
+    def __init__(self, index_path):
+        """
+        打开索引文件
+
+        Args:
+            index_path (Path): 索引文件路径
+        """
+        self._file = open(index_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise Exception("泄露密码索引文件为空")
+        magic, version, prefix_bytes, _, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise Exception("无效的泄露密码索引文件")
+        if len(self._mm) != _DATA_OFFSET + count * prefix_bytes:
+            self.close()
+            raise Exception("泄露密码索引文件已损坏")
+        self.prefix_bytes = prefix_bytes
+        self.count = count
+        self._fanout = _from_big_endian(self._mm[_HEADER.size:_DATA_OFFSET])
+
+    def close(self):
+        """关闭索引文件"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def contains_digest(self, digest):
+        """
+        判断SHA-1摘要是否在索引中
+
+        Args:
+            digest (bytes): SHA-1摘要（至少 prefix_bytes 字节）
+
+        Returns:
+            bool: 是否存在
+        """
+        width = self.prefix_bytes
+        key = digest[:width]
+        bucket = (key[0] << 8) | key[1]
+        lo = self._fanout[bucket - 1] if bucket else 0
+        hi = self._fanout[bucket]
+        mm = self._mm
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            offset = _DATA_OFFSET + mid * width
+            value = mm[offset:offset + width]
+            if value < key:
+                lo = mid + 1
+            elif value > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_password(self, password):
+        """
+        判断明文密码是否出现在泄露数据中
+
+        Args:
+            password (str): 明文密码
+
+        Returns:
+            bool: 是否泄露
+        """
+        return self.contains_digest(hashlib.sha1(password.encode('utf-8')).digest())
+
+
+def _hash_batch(encryption, batch):
+    """
+    解密一批记录并计算SHA-1前缀（在工作进程中执行，明文不离开该进程）
+
+    Returns:
+        list: (id, service_name, username, 前缀或None) 元组列表，解密失败时前缀为None
+    """
+    results = []
+    for record_id, service_name, username, encrypted_password in batch:
+        try:
+            password = encryption.decrypt(encrypted_password)
+        except Exception:
+            results.append((record_id, service_name, username, None))
+            continue
+        digest = hashlib.sha1(password.encode('utf-8')).digest()
+        results.append((record_id, service_name, username, digest[:PREFIX_BYTES]))
+    return results
+
+
+@timed("breach.scan_vault")
+def scan_vault(db, index, batch_size=None, workers=None, progress=None):
+    """
+    扫描整个密码库，找出密码出现在泄露数据中的记录
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        index (BreachIndex): 泄露密码索引
+        batch_size (int): 每批解密的记录数，None表示使用默认配置
+        workers (int): 并行解密的进程数，None表示使用默认配置
+        progress (callable): 进度回调，参数为已扫描的记录数
+
+    Returns:
+        list: 泄露记录字典列表（id, service_name, username）
+    """
+    from config.settings import VAULT_SCAN_BATCH_SIZE, VAULT_SCAN_WORKERS
+    from core.parallel import map_batches
+
+    if db.encryption is None:
+        raise Exception("加密器未初始化，请先验证管理员密码")
+    if batch_size is None:
+        batch_size = VAULT_SCAN_BATCH_SIZE
+    if workers is None:
+        workers = VAULT_SCAN_WORKERS
+
+    compromised = []
+    scanned = 0
+    batches = db.iter_encrypted(batch_size)
+    for results in map_batches(_hash_batch, batches, db.encryption, workers):
+        for record_id, service_name, username, prefix in results:
+            if prefix is not None and index.contains_digest(prefix):
+                compromised.append({
+                    'id': record_id,
+                    'service_name': service_name,
+                    'username': username,
+                })
+        scanned += len(results)
+        if progress is not None:
+            progress(scanned)
+    # 只还原需要展示的记录的名称
+    return db.decode_entry_names(compromised)
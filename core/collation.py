@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+排序键模块
+为服务名称和用户名计算预先保存在数据库中的排序键，列表按排序键上的索引读取，
+中英文混排的名称按读音排在一起，而不是按Unicode码位排序
+
+- 拉丁字母：NFKC规范化（全角字母和数字转为半角）后 casefold，再去掉重音符号，
+  "Ebay"、"eBay"、"école" 排在一起
+- 汉字：安装了 pypinyin 时转为不带声调的拼音，"百度" 排在 "Baidu" 旁边、"淘宝" 排在 "Taobao" 旁边；
+  未安装时汉字排在拉丁字母之后，按Unicode码位（即部首笔画）排序
+- 排序键的后半部分是 casefold 后的原文，读音相同的名称也有确定的顺序
+
+排序键的计算方法由 SORT_KEY_VERSION 标识，安装或卸载 pypinyin 后版本不同，
+打开密码库时会重新计算所有记录的排序键
+"""
+
+import unicodedata
+
+try:
+    from pypinyin import lazy_pinyin  # 可选：汉字按拼音排序
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    PYPINYIN_AVAILABLE = False
+
+
+# 排序键计算方法的版本（保存在密码库的元数据中）
+SORT_KEY_VERSION = "1-pinyin" if PYPINYIN_AVAILABLE else "1-codepoint"
+
+# 主键和原文之间的分隔符（小于所有可见字符，主键相同时才比较原文）
+_SEPARATOR = "\x01"
+
+
+def _has_cjk(text):
+    """是否包含CJK统一表意文字"""
+    return any('\u3400' <= char <= '\u9fff' or '\uf900' <= char <= '\ufaff' for char in text)
+
+
+def _strip_accents(text):
+    """去掉重音等组合符号"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def sort_key(text):
+    """
+    计算一个名称的排序键
+
+    Args:
+        text (str): 服务名称或用户名（明文），可以为None
+
+    Returns:
+        str or None: 排序键，按二进制比较即为显示顺序
+    """
+    if text is None:
+        return None
+    folded = _fold(text)
+    return f"{_primary(folded)}{_SEPARATOR}{folded}"
+
+
+def _fold(text):
+    """NFKC规范化、去掉首尾空白并 casefold"""
+    return unicodedata.normalize('NFKC', text).strip().casefold()
+
+
+def _primary(folded):
+    """排序键的主键：汉字转为拼音（安装了 pypinyin 时），去掉重音符号"""
+    primary = folded
+    if PYPINYIN_AVAILABLE and _has_cjk(folded):
+        # 非汉字部分原样保留；每个汉字转为一个拼音音节
+        primary = "".join(lazy_pinyin(folded))
+    if not primary.isascii():
+        primary = _strip_accents(primary)
+    return primary
+
+
+def fold(text):
+    """
+    计算用于匹配的文本（与排序键的主键相同：忽略全角半角、大小写和重音，汉字转为拼音）
+
+    Args:
+        text (str): 名称或用户输入的查询
+
+    Returns:
+        str: 折叠后的文本
+    """
+    return _primary(_fold(text))
+
+
+def search_text(text):
+    """
+    计算建立搜索索引用的文本：fold 的结果；汉字转为拼音时再附上原来的汉字，
+    输入拼音或汉字都能匹配
+
+    Args:
+        text (str): 服务名称或用户名（明文），可以为None
+
+    Returns:
+        str: 索引文本（None时为空字符串）
+    """
+    if not text:
+        return ""
+    folded = _fold(text)
+    primary = _primary(folded)
+    if primary != folded and _has_cjk(folded):
+        return f"{primary} {folded}"
+    return primary
+
+
+def sort_keys(service_name, username):
+    """计算一条记录的 (服务名称排序键, 用户名排序键)"""
+    return sort_key(service_name), sort_key(username)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并发访问模块
+图形界面、命令行工具和自动化脚本等多个进程可以同时打开同一个密码库:
+
+- 数据库使用WAL日志模式，读操作不阻塞写操作；连接带忙等待超时，
+  超时后仍被锁定时按带随机抖动的指数退避重试（retry_busy）
+- 每个进程中对同一个密码库的写操作交给一个写线程依次执行（WriteQueue），进程内的写操作不再互相争抢写锁；
+  排队中的多个写操作合并到一个 BEGIN IMMEDIATE 事务中提交，每个写操作在自己的保存点中执行，失败时只回滚自己。
+  分批的长任务（清理历史版本、同步）每批提交一个写操作，批与批之间其他写操作可以执行。
+  以下写入不能在写线程的事务中执行，使用自己的连接，获取写锁时同样带忙等待超时并退避重试：
+  打开密码库时的建表和结构升级（PasswordDatabase._create_tables）、
+  从快照恢复（备份API要求目标连接没有未完成的事务）、
+  导入合并（暂存的记录在该连接的临时表中，见 core.merge.ImportMerger.apply）
+- 密钥文件在咨询锁（advisory lock）保护下创建：先写入临时文件，再以不覆盖的方式链接到目标路径，
+  多个进程同时第一次启动时只有一个密钥生效（load_or_create_file）
+"""
+
+import os
+import time
+import random
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from config.settings import (
+    SQLITE_BUSY_TIMEOUT, SQLITE_RETRY_ATTEMPTS, SQLITE_RETRY_BASE_DELAY, SQLITE_RETRY_MAX_DELAY,
+    WRITE_QUEUE_MAX_BATCH
+)
+from core.metrics import get_metrics, timer
+
+
+# SQLite 结果码：数据库文件被其他连接锁定 / 表被同一连接中的其他语句锁定
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+def connect(db_file, **kwargs):
+    """打开带忙等待超时的数据库连接"""
+    return sqlite3.connect(db_file, timeout=SQLITE_BUSY_TIMEOUT, **kwargs)
+
+
+def enable_wal(conn):
+    """
+    切换到WAL日志模式（模式保存在数据库文件中，只需设置一次）
+
+    Returns:
+        bool: 是否为WAL模式（内存数据库和不支持共享内存的文件系统上不能使用WAL）
+    """
+    mode = retry_busy(lambda: conn.execute("PRAGMA journal_mode = WAL").fetchone()[0])
+    return mode.lower() == "wal"
+
+
+def is_busy_error(error):
+    """是否为数据库被锁定（可以重试）的错误"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+
+def backoff_delays(attempts=None, base_delay=None, max_delay=None):
+    """
+    带随机抖动的指数退避间隔：第i次在 [0, base_delay * 2^i] 中均匀随机（不超过 max_delay），
+    同时等待的多个进程不会在同一时刻一起重试
+
+    Yields:
+        float: 等待的秒数
+    """
+    attempts = SQLITE_RETRY_ATTEMPTS if attempts is None else attempts
+    base_delay = SQLITE_RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = SQLITE_RETRY_MAX_DELAY if max_delay is None else max_delay
+    for attempt in range(attempts):
+        yield random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def retry_busy(func, attempts=None):
+    """
+    执行 func()，数据库被锁定时退避后重试，重试次数用完后抛出最后一次的错误
+
+    Args:
+        func (callable): 要执行的操作（整个操作需要可以安全地重新执行）
+        attempts (int): 重试次数，None表示使用默认配置
+
+    Returns:
+        func 的返回值
+    """
+    for delay in backoff_delays(attempts):
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e):
+                raise
+        metrics = get_metrics()
+        if metrics.enabled:
+            metrics.observe("db.busy_retry", delay)
+        time.sleep(delay)
+    return func()
+
+
+@contextmanager
+def file_lock(path):
+    """
+    进程间的排他咨询锁（锁文件为 path + ".lock"，文件句柄关闭时锁自动释放，进程崩溃也不会留下死锁）
+
+    Args:
+        path (Path): 要保护的文件
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        with timer("file.lock_wait"):
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # msvcrt.locking 最多等待约10秒后报错，继续等待
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(path):
+    """把目录项的修改写入磁盘（Windows 上不能打开目录，跳过）"""
+    if fcntl is None:
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_or_create_file(path, generate):
+    """
+    读取文件，不存在时生成内容并原子地创建（文件只有所有者可读写）
+
+    已存在时直接读取，不加锁；不存在时在咨询锁中再检查一次，然后写入临时文件并用 os.link 链接到目标路径
+    （目标已存在时失败而不是覆盖），其他进程任何时候都不会读到半个文件，
+    多个进程同时创建时都得到同一份内容
+
+    Args:
+        path (Path): 文件路径
+        generate (callable): 生成文件内容（bytes）的函数
+
+    Returns:
+        bytes: 文件内容
+    """
+    path = Path(path)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    with file_lock(path):
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        data = generate()
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.link(temp_path, path)
+            except FileExistsError:
+                # 不遵守锁的旧版本程序抢先创建了文件
+                return path.read_bytes()
+            except OSError:
+                # 不支持硬链接的文件系统，在锁的保护下替换
+                os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        _fsync_directory(path.parent)
+        return data
+
+
+class WriteQueue:
+    """
+    一个密码库在当前进程中的写队列
+
+    写操作 func(conn) 在专用的写线程中执行。写线程每次取出所有排队的写操作（最多 max_batch 个），
+    在一个 BEGIN IMMEDIATE 事务中依次执行并一起提交，每个写操作在自己的保存点中执行：
+    写操作抛出异常时只回滚它自己的修改，异常传给提交它的调用者。
+    写操作不能自行提交或回滚事务
+    """
+
+    def __init__(self, db_file, max_batch=None):
+        """
+        初始化写队列
+
+        Args:
+            db_file (Path): 数据库文件路径
+            max_batch (int): 一个事务中最多执行的写操作数，None表示使用默认配置
+        """
+        self.db_file = db_file
+        self.max_batch = max_batch or WRITE_QUEUE_MAX_BATCH
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        # 写线程当前事务使用的连接
+        self._conn = None
+        # 统计：提交的事务数、执行的写操作数、等待写锁的总时间（秒）
+        self.transactions = 0
+        self.operations = 0
+        self.lock_wait = 0.0
+
+    def submit(self, func, *args):
+        """
+        提交写操作
+
+        Args:
+            func (callable): func(conn, *args)，在写线程的事务中执行
+
+        Returns:
+            Future: 事务提交后完成，结果为 func 的返回值
+        """
+        future = Future()
+        with self._condition:
+            self._pending.append((future, func, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def run(self, func, *args):
+        """提交写操作并等待事务提交，返回 func 的返回值（写操作中再次调用时直接在当前事务中执行）"""
+        if threading.current_thread() is self._thread:
+            return func(self._conn, *args)
+        return self.submit(func, *args).result()
+
+    def _run(self):
+        """写线程"""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                batch = []
+                while self._pending and len(batch) < self.max_batch:
+                    batch.append(self._pending.popleft())
+            jobs = [job for job in batch if job[0].set_running_or_notify_cancel()]
+            if jobs:
+                self._execute(jobs)
+
+    def _begin(self, conn):
+        """获取写锁，记录等待时间"""
+        start = time.perf_counter()
+        try:
+            retry_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
+        finally:
+            wait = time.perf_counter() - start
+            self.lock_wait += wait
+            metrics = get_metrics()
+            if metrics.enabled:
+                metrics.observe("db.lock_wait", wait)
+
+    def _execute(self, jobs):
+        """在一个事务中执行一批写操作"""
+        outcomes = []
+        try:
+            conn = connect(self.db_file, isolation_level=None)
+        except BaseException as e:
+            for future, _, _ in jobs:
+                future.set_exception(e)
+            return
+        self._conn = conn
+        try:
+            self._begin(conn)
+            for future, func, args in jobs:
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    result = func(conn, *args)
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((future, None, e))
+                else:
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((future, result, None))
+            retry_busy(lambda: conn.execute("COMMIT"))
+        except BaseException as e:
+            # 获取写锁失败、提交失败或事务被中止：整批失败
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, _, _ in jobs:
+                future.set_exception(e)
+            return
+        finally:
+            self._conn = None
+            conn.close()
+        self.transactions += 1
+        self.operations += len(jobs)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+# 数据库文件（规范化路径） -> WriteQueue，每个进程独立
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_file):
+    """获取密码库在当前进程中的写队列（每个数据库文件一个）"""
+    key = os.path.realpath(db_file)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = WriteQueue(key)
+        return queue
+
+
+def _reset_after_fork():
+    """子进程中没有父进程的写线程，重新创建写队列"""
+    global _queues_lock
+    _queues.clear()
+    _queues_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
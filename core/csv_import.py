@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CSV导入模块
+解析浏览器导出的CSV密码文件并批量写入数据库
+"""
+
+import csv
+from urllib.parse import urlparse
+
+
+# 每批写入数据库的记录数
+IMPORT_BATCH_SIZE = 1000
+
+
+def _detect_columns(header):
+    """
+    根据标题行确定URL、用户名和密码列的索引（支持不同的CSV格式）
+
+    Args:
+        header (list): 标题行
+
+    Returns:
+        tuple: (url_index, username_index, password_index)，无法识别的列为-1
+    """
+    url_index = -1
+    username_index = -1
+    password_index = -1
+
+    # 尝试匹配常见的列名
+    for i, col in enumerate(header):
+        col_lower = col.lower()
+        if 'url' in col_lower or '网站' in col_lower or 'site' in col_lower:
+            url_index = i
+        elif 'username' in col_lower or '用户名' in col_lower or 'user' in col_lower:
+            username_index = i
+        elif 'password' in col_lower or '密码' in col_lower or 'pass' in col_lower:
+            password_index = i
+
+    return url_index, username_index, password_index
+
+
+def _service_name_from_url(url):
+    """提取域名作为服务名称"""
+    try:
+        parsed_url = urlparse(url)
+        return parsed_url.netloc or url
+    except ValueError:
+        return url
+
+
+def read_csv_records(file_path):
+    """
+    逐行读取CSV文件中的密码记录
+
+    Args:
+        file_path (str): CSV文件路径
+
+    Yields:
+        tuple: (service_name, username, password)
+
+    Raises:
+        ValueError: 文件为空或无法识别文件格式
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        # 检测CSV格式
+        sample = file.read(1024)
+        file.seek(0)
+        if not sample:
+            raise ValueError("CSV文件为空！")
+        delimiter = csv.Sniffer().sniff(sample).delimiter
+
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV文件为空！")
+
+        url_index, username_index, password_index = _detect_columns(header)
+        if url_index == -1 or username_index == -1 or password_index == -1:
+            raise ValueError("无法自动识别CSV文件格式，请确保文件包含URL/网站、用户名和密码列！")
+
+        min_length = max(url_index, username_index, password_index)
+        for row in reader:
+            if len(row) <= min_length:
+                continue
+            url = row[url_index]
+            # 如果URL为空，跳过
+            if not url.strip():
+                continue
+            yield _service_name_from_url(url), row[username_index], row[password_index]
+
+
+def import_csv(db, file_path, batch_size=IMPORT_BATCH_SIZE, strategy=None, dry_run=False):
+    """
+    将CSV文件中的密码记录分批导入数据库，与已有记录按服务名称和用户名合并
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        file_path (str): CSV文件路径
+        batch_size (int): 每批写入的记录数
+        strategy (str): 合并策略（见 core.merge），None表示跳过已存在的记录
+        dry_run (bool): 为True时只返回差异报告，不写入数据库
+
+    Returns:
+        dict: 合并结果，见 core.merge.merge_records
+    """
+    from core.merge import merge_records, STRATEGY_SKIP
+    return merge_records(db, read_csv_records(file_path), strategy or STRATEGY_SKIP,
+                         dry_run, batch_size)
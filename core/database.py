@@ -6,27 +6,122 @@
 提供密码数据的存储和检索功能
 """
 
+import os
 import sqlite3
 import json
 import hashlib
-from config.settings import DATABASE_FILE
-from core.encryption import get_encryption
-from cryptography.fernet import Fernet
+import threading
+import itertools
+from datetime import datetime
+from pathlib import Path
+from config.settings import (
+    DATABASE_FILE, STORE_PASSWORD_FINGERPRINTS, BLIND_INDEX_MAX_PREFIX, ensure_data_dir,
+    BACKUP_DIR, BACKUP_KEEP, BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP,
+    HISTORY_KEEP_VERSIONS, HISTORY_KEEP_DAYS, HISTORY_PRUNE_BATCH_SIZE, HISTORY_PAGE_SIZE,
+    PREFETCH_HOT_ENTRIES
+)
+from core.concurrency import connect, enable_wal, get_write_queue, retry_busy
+from core.encryption import EncryptionManager
+from core.metrics import timed, timer
+from core.records import EntrySummary, ListingSnapshot
+from core import blind_index, collation
+
+
+# 数据库结构版本，每次修改表结构时递增
+SCHEMA_VERSION = 14
+
+# filter_passwords 中表示未归入任何文件夹的记录
+FOLDER_UNFILED = 0
+
+# 列表排序方式
+ORDER_NAME = "name"          # 按服务名称（加密名称时按ID）
+ORDER_USERNAME = "username"  # 按用户名（加密名称时按ID）
+ORDER_CREATED = "created"    # 最近创建的在前
+ORDER_UPDATED = "updated"    # 最近修改的在前
+ORDER_RECENT = "recent"      # 最近使用的在前
+ORDER_FREQUENT = "frequent"  # 使用次数多的在前
+ORDERS = (ORDER_NAME, ORDER_USERNAME, ORDER_CREATED, ORDER_UPDATED, ORDER_RECENT, ORDER_FREQUENT)
+# 不依赖使用统计的排序方式 -> 排序子句（明文模式, 加密名称时），都有对应的索引，按索引顺序读取
+_COLUMN_ORDERS = {
+    ORDER_NAME: ("p.sort_name, p.id", "p.id"),
+    ORDER_USERNAME: ("p.sort_username, p.id", "p.id"),
+    ORDER_CREATED: ("p.created_at DESC, p.id DESC", "p.created_at DESC, p.id DESC"),
+    ORDER_UPDATED: ("p.updated_at DESC, p.id DESC", "p.updated_at DESC, p.id DESC"),
+}
+
+# 同步（见 core.sync）使用的SQL表达式：下一个逻辑时钟值（大于本库见过的所有版本，
+# 包括从其他密码库收到的）、下一个本地变更序号，以及本库的副本ID
+SYNC_NEXT_CLOCK = '''(SELECT MAX(COALESCE((SELECT MAX(clock) FROM passwords), 0),
+                              COALESCE((SELECT MAX(clock) FROM sync_tombstones), 0)) + 1)'''
+SYNC_NEXT_SEQ = '''(SELECT MAX(COALESCE((SELECT MAX(seq) FROM passwords), 0),
+                            COALESCE((SELECT MAX(seq) FROM sync_tombstones), 0)) + 1)'''
+SYNC_REPLICA_ID = "(SELECT value FROM metadata WHERE key = 'replica_id')"
+# 插入新记录时直接写入同步列，省去触发器再更新一次该行
+SYNC_INSERT_COLUMNS = "uuid, clock, origin, seq"
+SYNC_INSERT_VALUES = f"lower(hex(randomblob(16))), {SYNC_NEXT_CLOCK}, {SYNC_REPLICA_ID}, {SYNC_NEXT_SEQ}"
+# 列表变更计数器加一（触发器中使用）
+LISTING_VERSION_BUMP = ("UPDATE metadata SET value = CAST(value AS INTEGER) + 1 "
+                        "WHERE key = 'listing_version'")
+# 除密码表以外的数据变更计数器加一（触发器中使用，见 has_changes_since_snapshot）
+DATA_VERSION_BUMP = ("UPDATE metadata SET value = CAST(value AS INTEGER) + 1 "
+                     "WHERE key = 'data_version'")
+# 判断快照后是否有修改的变更计数器：密码表的变更和删除由同步的变更序号记录，其他数据由 data_version 记录
+CHANGE_COUNTERS = f"SELECT {SYNC_NEXT_SEQ}, (SELECT value FROM metadata WHERE key = 'data_version')"
+# 属于密码库内容的元数据（结构版本、计数器等维护用的元数据不算修改）
+_CONTENT_METADATA = "('master_password_hash', 'salt', 'key_check', 'name_encryption', 'replica_id')"
 
 
 class PasswordDatabase:
     """密码数据库管理器"""
     
-    def __init__(self):
-        """初始化数据库"""
-        self.db_file = DATABASE_FILE
+    def __init__(self, db_file=None):
+        """
+        初始化数据库
+        
+        Args:
+            db_file (Path): 数据库文件路径，为None时使用默认的数据库文件
+        """
+        if db_file is None:
+            ensure_data_dir()
+            db_file = DATABASE_FILE
+            backup_dir = BACKUP_DIR
+        else:
+            # 自定义位置的数据库，快照保存在其所在目录下
+            backup_dir = Path(db_file).parent / "backups"
+        self.db_file = db_file
+        self.backup_dir = backup_dir
+        self._snapshot_lock = threading.Lock()
+        # 预先解密的常用记录：记录ID -> (读取时的原始列, 解密后的记录)
+        self._hot_records = {}
+        self._hot_lock = threading.Lock()
         self._create_tables()
         # 延迟初始化加密器，直到设置管理员密码
         self.encryption = None
+        # 是否加密存储服务名称和用户名
+        self.name_encryption = self.get_metadata('name_encryption') == '1'
+    
+    def _connect(self):
+        """打开数据库连接（带忙等待超时，见 core.concurrency）"""
+        with timer("db.connect"):
+            return connect(self.db_file)
+    
+    def _write(self, func, *args):
+        """
+        在当前进程的写队列中执行写操作（见 core.concurrency.WriteQueue）
+        
+        Args:
+            func (callable): func(conn, *args)，在写线程的事务中执行，不能自行提交
+            
+        Returns:
+            func 的返回值
+        """
+        return get_write_queue(self.db_file).run(func, *args)
     
     def _create_tables(self):
-        """创建数据表"""
-        with sqlite3.connect(self.db_file) as conn:
+        """创建数据表（多个进程同时打开时，升级表结构在写锁中依次进行）"""
+        with self._connect() as conn:
+            enable_wal(conn)
+            retry_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
             cursor = conn.cursor()
             # 创建密码表
             cursor.execute('''
@@ -48,8 +143,674 @@ class PasswordDatabase:
                 )
             ''')
             
+            self._migrate(cursor)
             conn.commit()
     
+    @staticmethod
+    def _add_column(cursor, table, column, declaration):
+        """为旧版本数据库的表补充新列"""
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            return True
+        return False
+    
+    def _migrate(self, cursor):
+        """升级表结构并记录结构版本"""
+        # 版本2：密码指纹列（用于检查重复使用的密码）和按更新时间查询的索引
+        self._add_column(cursor, 'passwords', 'password_fingerprint', 'TEXT')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_fingerprint
+            ON passwords (password_fingerprint)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_updated_at
+            ON passwords (updated_at)
+        ''')
+        
+        # 版本3：服务名称和用户名的盲索引表，以及明文模式下的前缀查找索引
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blind_index (
+                token TEXT NOT NULL,
+                entry_id INTEGER NOT NULL,
+                PRIMARY KEY (token, entry_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_blind_index_entry
+            ON blind_index (entry_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_service_name
+            ON passwords (service_name COLLATE NOCASE)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_username
+            ON passwords (username COLLATE NOCASE)
+        ''')
+        
+        # 版本4：规范化的（服务名称, 用户名）唯一键，导入时据此合并重复记录
+        if self._add_column(cursor, 'passwords', 'entry_key', 'TEXT'):
+            cursor.execute('''
+                SELECT value FROM metadata WHERE key = 'name_encryption'
+            ''')
+            result = cursor.fetchone()
+            if result and result[0] == '1':
+                # 加密模式下需要密钥才能计算唯一键，留待验证管理员密码后补齐
+                cursor.execute('''
+                    INSERT OR REPLACE INTO metadata (key, value)
+                    VALUES ('entry_keys_pending', '1')
+                ''')
+            else:
+                rows = cursor.execute('''
+                    SELECT id, service_name, username FROM passwords ORDER BY id
+                ''').fetchall()
+                self._backfill_entry_keys(cursor, (
+                    (record_id, blind_index.plain_entry_key(service_name, username))
+                    for record_id, service_name, username in rows
+                ))
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_entry_key
+            ON passwords (entry_key) WHERE entry_key IS NOT NULL
+        ''')
+        
+        # 版本5：密码历史版本。由触发器在密码被修改时保存旧密文，
+        # 因此编辑、导入覆盖等所有修改路径都会记录历史
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS password_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id INTEGER NOT NULL,
+                encrypted_password BLOB NOT NULL,
+                set_at TIMESTAMP,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_password_history_entry
+            ON password_history (entry_id, changed_at)
+        ''')
+        # 重新加密相同的密码会得到不同的密文，有指纹时按指纹判断密码是否真的改变
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_password_history_update
+            AFTER UPDATE OF encrypted_password ON passwords
+            WHEN old.encrypted_password IS NOT new.encrypted_password
+                 AND (old.password_fingerprint IS NULL OR new.password_fingerprint IS NULL
+                      OR old.password_fingerprint IS NOT new.password_fingerprint)
+            BEGIN
+                INSERT INTO password_history (entry_id, encrypted_password, set_at)
+                VALUES (old.id, old.encrypted_password, old.updated_at);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_password_history_delete
+            AFTER DELETE ON passwords
+            BEGIN
+                DELETE FROM password_history WHERE entry_id = old.id;
+            END
+        ''')
+        
+        # 版本6：只追加的访问审计日志（见 core.audit_log），记录删除后日志仍然保留
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                action TEXT NOT NULL,
+                entry_id INTEGER,
+                actor TEXT NOT NULL,
+                prev_hash TEXT NOT NULL,
+                hash TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_audit_log_entry ON audit_log (entry_id, ts)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_audit_log_ts ON audit_log (ts)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log (action, ts)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_update
+            BEFORE UPDATE ON audit_log
+            BEGIN
+                SELECT RAISE(ABORT, '审计日志只能追加，不能修改');
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_delete
+            BEFORE DELETE ON audit_log
+            BEGIN
+                SELECT RAISE(ABORT, '审计日志只能追加，不能删除');
+            END
+        ''')
+        
+        # 版本7：文件夹和标签。每个文件夹和标签的记录数由触发器增量维护，
+        # 侧边栏显示数量时不需要统计
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS folders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                parent_id INTEGER,
+                name TEXT NOT NULL,
+                entry_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # 同一父文件夹下名称唯一（忽略大小写），按父文件夹列出子文件夹时直接按名称顺序读取
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_folders_parent_name
+            ON folders (COALESCE(parent_id, 0), name COLLATE NOCASE)
+        ''')
+        self._add_column(cursor, 'passwords', 'folder_id', 'INTEGER')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_folder
+            ON passwords (folder_id, service_name)
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                entry_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entry_tags (
+                tag_id INTEGER NOT NULL,
+                entry_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, entry_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entry_tags_entry
+            ON entry_tags (entry_id, tag_id)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_entry_tags_insert
+            AFTER INSERT ON entry_tags
+            BEGIN
+                UPDATE tags SET entry_count = entry_count + 1 WHERE id = new.tag_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_entry_tags_delete
+            AFTER DELETE ON entry_tags
+            BEGIN
+                UPDATE tags SET entry_count = entry_count - 1 WHERE id = old.tag_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_tags_delete
+            AFTER DELETE ON tags
+            BEGIN
+                DELETE FROM entry_tags WHERE tag_id = old.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_delete_tags
+            AFTER DELETE ON passwords
+            BEGIN
+                DELETE FROM entry_tags WHERE entry_id = old.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_folder_insert
+            AFTER INSERT ON passwords
+            WHEN new.folder_id IS NOT NULL
+            BEGIN
+                UPDATE folders SET entry_count = entry_count + 1 WHERE id = new.folder_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_folder_update
+            AFTER UPDATE OF folder_id ON passwords
+            WHEN old.folder_id IS NOT new.folder_id
+            BEGIN
+                UPDATE folders SET entry_count = entry_count - 1 WHERE id = old.folder_id;
+                UPDATE folders SET entry_count = entry_count + 1 WHERE id = new.folder_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_folder_delete
+            AFTER DELETE ON passwords
+            WHEN old.folder_id IS NOT NULL
+            BEGIN
+                UPDATE folders SET entry_count = entry_count - 1 WHERE id = old.folder_id;
+            END
+        ''')
+        
+        # 版本8：记录的使用次数和最后使用时间（见 core.usage），单独成表，
+        # 批量写入时不修改密码表；两个索引分别支持按最近使用和按使用次数排序
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entry_usage (
+                entry_id INTEGER PRIMARY KEY,
+                access_count INTEGER NOT NULL DEFAULT 0,
+                last_access TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entry_usage_recent
+            ON entry_usage (last_access)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_entry_usage_frequent
+            ON entry_usage (access_count, last_access)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_delete_usage
+            AFTER DELETE ON passwords
+            BEGIN
+                DELETE FROM entry_usage WHERE entry_id = old.id;
+            END
+        ''')        
+        # 版本9：同步用的变更向量。每条记录有全局唯一的 uuid 和版本（逻辑时钟 clock, 副本ID origin），
+        # seq 是本库的变更序号，同步时只交换对方上次同步之后 seq 更大的记录；
+        # 删除的记录留下墓碑。版本和序号由触发器维护，所有写入路径都会记录
+        cursor.execute('''
+            INSERT OR IGNORE INTO metadata (key, value)
+            VALUES ('replica_id', lower(hex(randomblob(16))))
+        ''')
+        for column in ('uuid TEXT', 'clock INTEGER', 'origin TEXT', 'seq INTEGER'):
+            self._add_column(cursor, 'passwords', *column.split())
+        cursor.execute(f'''
+            UPDATE passwords
+            SET uuid = lower(hex(randomblob(16))), clock = 1, origin = {SYNC_REPLICA_ID}, seq = id
+            WHERE uuid IS NULL
+        ''')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_uuid ON passwords (uuid)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_clock ON passwords (clock)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_seq ON passwords (seq)
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_tombstones (
+                uuid TEXT PRIMARY KEY,
+                clock INTEGER NOT NULL,
+                origin TEXT NOT NULL,
+                seq INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sync_tombstones_clock ON sync_tombstones (clock)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sync_tombstones_seq ON sync_tombstones (seq)
+        ''')
+        # 每个对方副本已收到的最大变更序号（对方库中的 seq）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                replica_id TEXT PRIMARY KEY,
+                received_seq INTEGER NOT NULL,
+                synced_at TEXT
+            )
+        ''')
+        # 未写入同步列的新记录（如合并导入）：同步写入时保留对方的 uuid 和版本，否则生成新的
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_sync_insert
+            AFTER INSERT ON passwords
+            WHEN new.seq IS NULL
+            BEGIN
+                UPDATE passwords
+                SET uuid = COALESCE(new.uuid, lower(hex(randomblob(16)))),
+                    clock = COALESCE(new.clock, {SYNC_NEXT_CLOCK}),
+                    origin = COALESCE(new.origin, {SYNC_REPLICA_ID}),
+                    seq = {SYNC_NEXT_SEQ}
+                WHERE id = new.id;
+            END
+        ''')
+        # 修改内容的写入都会更新 updated_at；未指定版本也未改 uuid 时视为本库的修改，生成新版本
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_sync_update
+            AFTER UPDATE OF updated_at, clock, origin, uuid ON passwords
+            WHEN new.seq IS old.seq
+            BEGIN
+                UPDATE passwords
+                SET clock = CASE WHEN new.clock IS old.clock AND new.origin IS old.origin
+                                      AND new.uuid IS old.uuid
+                                 THEN {SYNC_NEXT_CLOCK} ELSE new.clock END,
+                    origin = CASE WHEN new.clock IS old.clock AND new.origin IS old.origin
+                                       AND new.uuid IS old.uuid
+                                  THEN {SYNC_REPLICA_ID} ELSE new.origin END,
+                    seq = {SYNC_NEXT_SEQ}
+                WHERE id = new.id;
+            END
+        ''')
+        self._create_sync_delete_trigger(cursor)
+        
+        # 版本10：安全笔记和附件（见 core.attachments），内容分块加密后存放在 content 列，
+        # 通过增量BLOB读写；content 是最后一列，列出附件只读取前面的元数据列
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attachments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                chunk_size INTEGER NOT NULL,
+                nonce_prefix BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                content BLOB NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_attachments_entry ON attachments (entry_id, kind)
+        ''')
+        # 每条记录最多一条笔记
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_attachments_note
+            ON attachments (entry_id) WHERE kind = 'note'
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_delete_attachments
+            AFTER DELETE ON passwords
+            BEGIN
+                DELETE FROM attachments WHERE entry_id = old.id;
+            END
+        ''')
+        
+        # 版本11：列表的变更计数器（见 core.listing_cache）。新增、删除记录或修改列表中显示的列时加一，
+        # 列表缓存文件中的计数器与之相同时缓存就是最新的
+        cursor.execute('''
+            INSERT OR IGNORE INTO metadata (key, value) VALUES ('listing_version', '0')
+        ''')
+        for name, event in (('insert', 'INSERT'), ('delete', 'DELETE'),
+                            ('update', 'UPDATE OF service_name, username, created_at, updated_at')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_passwords_listing_{name}
+                AFTER {event} ON passwords
+                BEGIN
+                    {LISTING_VERSION_BUMP};
+                END
+            ''')
+        
+        # 版本12：服务名称和用户名的排序键（见 core.collation），写入时计算，列表按排序键上的索引读取；
+        # 加密名称时排序键为NULL，避免泄露名称。先补齐排序键再建索引，升级时不必逐行维护索引
+        for column in ('sort_name', 'sort_username'):
+            self._add_column(cursor, 'passwords', column, 'TEXT')
+        self._fill_sort_keys(cursor)
+        for column in ('sort_name', 'sort_username'):
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_passwords_{column} ON passwords ({column})
+            ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_created_at ON passwords (created_at)
+        ''')
+        
+        # 版本13：被删除的记录是最后一次变更时，删除触发器原来算出的墓碑序号（删除后的最大序号加一）
+        # 等于该记录原来的序号，已读到该序号的一方（同步的对方、get_changes 的读取方）会漏掉这次删除。
+        # 墓碑的序号改为至少比被删除记录的序号大一，重建旧版本建立的触发器
+        trigger_sql = cursor.execute('''
+            SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_passwords_sync_delete'
+        ''').fetchone()[0]
+        if 'old.seq + 1' not in trigger_sql:
+            cursor.execute('''
+                DROP TRIGGER trg_passwords_sync_delete
+            ''')
+            self._create_sync_delete_trigger(cursor)
+        
+        # 版本14：除密码表以外的数据变更计数器。WAL模式下写入先进入 -wal 文件，数据库文件的修改时间
+        # 不能说明是否有修改，自动快照改为比较变更计数器；密码表由同步的变更序号记录，
+        # 文件夹、标签、附件和属于密码库内容的元数据由触发器维护 data_version。
+        # 使用统计和审计日志只记录访问，不算修改
+        cursor.execute('''
+            INSERT OR IGNORE INTO metadata (key, value) VALUES ('data_version', '0')
+        ''')
+        for table in ('folders', 'tags', 'entry_tags', 'attachments'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_data_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        {DATA_VERSION_BUMP};
+                    END
+                ''')
+        for event in ('INSERT', 'UPDATE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_metadata_data_{event.lower()}
+                AFTER {event} ON metadata
+                WHEN new.key IN {_CONTENT_METADATA}
+                BEGIN
+                    {DATA_VERSION_BUMP};
+                END
+            ''')
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO metadata (key, value)
+            VALUES (?, ?)
+        ''', ('schema_version', str(SCHEMA_VERSION)))
+    
+    @staticmethod
+    def _create_sync_delete_trigger(cursor):
+        """删除记录时留下墓碑：版本比被删除的版本新，变更序号比被删除记录的序号大"""
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_passwords_sync_delete
+            AFTER DELETE ON passwords
+            WHEN old.uuid IS NOT NULL
+            BEGIN
+                INSERT OR REPLACE INTO sync_tombstones (uuid, clock, origin, seq)
+                VALUES (old.uuid, MAX({SYNC_NEXT_CLOCK}, old.clock + 1), {SYNC_REPLICA_ID},
+                        MAX({SYNC_NEXT_SEQ}, old.seq + 1));
+            END
+        ''')
+    
+    @staticmethod
+    def _fill_sort_keys(cursor):
+        """
+        明文模式下补齐缺少的排序键（例如旧版本程序写入的记录）；
+        排序键的计算方法变化后（安装或卸载了 pypinyin）重新计算所有记录
+        """
+        cursor.execute('''
+            SELECT key, value FROM metadata WHERE key IN ('name_encryption', 'sort_key_version')
+        ''')
+        metadata = dict(cursor.fetchall())
+        if metadata.get('name_encryption') == '1':
+            return
+        if metadata.get('sort_key_version') == collation.SORT_KEY_VERSION:
+            condition = "WHERE sort_name IS NULL OR sort_username IS NULL"
+        else:
+            condition = ""
+        rows = cursor.execute(f'''
+            SELECT id, service_name, username FROM passwords {condition}
+        ''').fetchall()
+        cursor.executemany('''
+            UPDATE passwords SET sort_name = ?, sort_username = ? WHERE id = ?
+        ''', [(*collation.sort_keys(service_name, username), record_id)
+              for record_id, service_name, username in rows])
+        if rows:
+            # 名称没有变化，列表触发器不会触发；排序键变化改变了列表顺序，列表变更计数器加一
+            cursor.execute(LISTING_VERSION_BUMP)
+        cursor.execute('''
+            INSERT OR REPLACE INTO metadata (key, value) VALUES ('sort_key_version', ?)
+        ''', (collation.SORT_KEY_VERSION,))
+    
+    @staticmethod
+    def _backfill_entry_keys(cursor, keyed_rows):
+        """
+        为已有记录写入唯一键
+        
+        升级前已存在的重复记录中只有ID最小的一条获得唯一键，其余保持为NULL，
+        不会被自动删除
+        
+        Args:
+            keyed_rows (iterable): 按ID升序的 (id, entry_key) 元组
+        """
+        seen = set()
+        updates = []
+        for record_id, key in keyed_rows:
+            if key in seen:
+                continue
+            seen.add(key)
+            updates.append((key, record_id))
+        cursor.executemany('''
+            UPDATE passwords SET entry_key = ? WHERE id = ?
+        ''', updates)
+    
+    def _fill_pending_entry_keys(self):
+        """加密模式下，在加密器初始化后补齐升级时无法计算的唯一键"""
+        if not self.name_encryption or self.get_metadata('entry_keys_pending') != '1':
+            return
+        def backfill(conn):
+            cursor = conn.cursor()
+            rows = cursor.execute('''
+                SELECT id, service_name, username FROM passwords
+                WHERE entry_key IS NULL ORDER BY id
+            ''').fetchall()
+            self._backfill_entry_keys(cursor, (
+                (record_id, self.entry_key(self._decode_name(service_name),
+                                           self._decode_name(username)))
+                for record_id, service_name, username in rows
+            ))
+            cursor.execute('''
+                DELETE FROM metadata WHERE key = 'entry_keys_pending'
+            ''')
+        self._write(backfill)
+    
+    def entry_key(self, service_name, username):
+        """
+        计算记录的唯一键（规范化的服务名称和用户名组合，加密模式下为带密钥的令牌）
+        
+        Args:
+            service_name (str): 服务名称明文
+            username (str): 用户名明文
+            
+        Returns:
+            str: 唯一键
+        """
+        if self.name_encryption:
+            self._require_encryption()
+            return blind_index.entry_key_token(self.encryption, service_name, username)
+        return blind_index.plain_entry_key(service_name, username)
+    
+    def sort_keys(self, service_name, username):
+        """
+        计算记录的 (服务名称排序键, 用户名排序键)，加密名称时为 (None, None)
+        
+        Args:
+            service_name (str): 服务名称（明文）
+            username (str): 用户名（明文）
+        """
+        if self.name_encryption:
+            return None, None
+        return collation.sort_keys(service_name, username)
+    
+    def _fingerprint(self, password):
+        """计算需要保存的密码指纹，未启用指纹保存时返回None"""
+        if not STORE_PASSWORD_FINGERPRINTS:
+            return None
+        return self.encryption.fingerprint(password)
+    
+    def _require_encryption(self):
+        """检查加密器是否已初始化"""
+        if self.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+    
+    def _encode_name(self, value):
+        """将服务名称或用户名转换为存储形式（加密模式下为密文）"""
+        if not self.name_encryption:
+            return value
+        return self.encryption.encrypt(value).decode('ascii')
+    
+    def _decode_name(self, value):
+        """将存储的服务名称或用户名还原为明文"""
+        if not self.name_encryption:
+            return value
+        self._require_encryption()
+        try:
+            return self.encryption.decrypt(value.encode('ascii'))
+        except Exception as e:
+            raise Exception(f"解密服务名称或用户名失败: {str(e)}")
+    
+    def _write_blind_index(self, cursor, entry_id, service_name, username):
+        """重建一条记录的盲索引令牌（仅在加密模式下）"""
+        if not self.name_encryption:
+            return
+        cursor.execute('''
+            DELETE FROM blind_index WHERE entry_id = ?
+        ''', (entry_id,))
+        cursor.executemany('''
+            INSERT OR IGNORE INTO blind_index (token, entry_id)
+            VALUES (?, ?)
+        ''', [
+            (token, entry_id)
+            for token in blind_index.entry_tokens(self.encryption, service_name, username)
+        ])
+    
+    def decode_entry_names(self, entries):
+        """
+        将记录字典中的服务名称和用户名原地还原为明文（用于 iter_encrypted 等返回存储形式的接口）
+        
+        Args:
+            entries (list): 包含 service_name 和 username 的记录字典列表
+            
+        Returns:
+            list: 传入的记录列表
+        """
+        if self.name_encryption:
+            for entry in entries:
+                entry['service_name'] = self._decode_name(entry['service_name'])
+                entry['username'] = self._decode_name(entry['username'])
+        return entries
+    
+    def get_listing_version(self):
+        """
+        列表的变更计数器：新增、删除记录或修改列表中显示的列后增大
+        
+        Returns:
+            int: 计数器的值
+        """
+        value = self.get_metadata('listing_version')
+        return int(value) if value is not None else 0
+    
+    @timed("db.get_changes")
+    def get_changes(self, since_seq=0):
+        """
+        变更流：本库变更序号（同步用的 seq，见版本9）大于 since_seq 的记录和墓碑，
+        供内存中的索引（如 core.quick_switcher）增量更新。加密名称时需要已初始化加密器
+        
+        Args:
+            since_seq (int): 上次读取到的变更序号，0表示读取全部记录
+        
+        Returns:
+            tuple: (当前的最大变更序号,
+                    新增或修改的记录 [(id, uuid, service_name, username), ...]（名称为明文）,
+                    删除的记录的 uuid 列表)。
+                   最大变更序号小于 since_seq 时（例如恢复了较早的快照）调用方应从0重新读取
+        """
+        with self._connect() as conn:
+            # 先读取最大变更序号：读取期间新写入的记录下次会再读取一次，不会遗漏
+            seq = conn.execute(f"SELECT {SYNC_NEXT_SEQ} - 1").fetchone()[0]
+            rows = conn.execute('''
+                SELECT id, uuid, service_name, username FROM passwords WHERE seq > ?
+            ''', (since_seq,)).fetchall()
+            deleted = [uuid for (uuid,) in conn.execute('''
+                SELECT uuid FROM sync_tombstones WHERE seq > ?
+            ''', (since_seq,))]
+        decode = self._decode_name
+        return seq, [
+            (record_id, uuid, decode(service_name), decode(username))
+            for record_id, uuid, service_name, username in rows
+        ], deleted
+    
+    def get_metadata(self, key):
+        """
+        读取元数据
+        
+        Args:
+            key (str): 键
+            
+        Returns:
+            str or None: 值，不存在时返回None
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT value FROM metadata WHERE key = ?
+            ''', (key,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+    
     def set_master_password_hash(self, password_hash):
         """
         设置主密码哈希
@@ -57,13 +818,13 @@ class PasswordDatabase:
         Args:
             password_hash (str): 主密码的哈希值
         """
-        with sqlite3.connect(self.db_file) as conn:
+        def store(conn):
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO metadata (key, value)
                 VALUES (?, ?)
             ''', ('master_password_hash', password_hash))
-            conn.commit()
+        self._write(store)
     
     def get_master_password_hash(self):
         """
@@ -72,7 +833,7 @@ class PasswordDatabase:
         Returns:
             str or None: 主密码哈希值，如果不存在则返回None
         """
-        with sqlite3.connect(self.db_file) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT value FROM metadata WHERE key = ?
@@ -80,6 +841,7 @@ class PasswordDatabase:
             result = cursor.fetchone()
             return result[0] if result else None
     
+    @timed("db.set_master_password")
     def set_master_password(self, password):
         """
         设置主密码并初始化加密器
@@ -91,22 +853,19 @@ class PasswordDatabase:
         password_hash = hashlib.sha512(password.encode('utf-8')).hexdigest()
         self.set_master_password_hash(password_hash)
         
-        # 初始化加密器
-        from core.encryption import EncryptionManager
-        self.encryption = EncryptionManager()
-        # 使用主密码派生密钥
-        key, salt = self.encryption.derive_key_from_password(password)
-        self.encryption.key = key
-        self.encryption.cipher = Fernet(key)
+        # 使用主密码派生密钥并初始化加密器（无需读写密钥文件）
+        key, salt = EncryptionManager.derive_key_from_password(password)
+        self.encryption = EncryptionManager(key)
         
-        # 更新元数据表中的盐值
-        with sqlite3.connect(self.db_file) as conn:
+        # 更新元数据表中的盐值和密钥校验值
+        def store(conn):
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT OR REPLACE INTO metadata (key, value)
                 VALUES (?, ?)
-            ''', ('salt', salt.hex()))
-            conn.commit()
+            ''', (('salt', salt.hex()), ('key_check', self.key_check_value())))
+        self._write(store)
+        self._fill_pending_entry_keys()
     
     def verify_master_password(self, password):
         """
@@ -125,6 +884,7 @@ class PasswordDatabase:
         password_hash = hashlib.sha512(password.encode('utf-8')).hexdigest()
         return password_hash == stored_hash
     
+    @timed("db.unlock")
     def initialize_encryption_with_password(self, password):
         """
         使用主密码初始化加密器
@@ -133,7 +893,7 @@ class PasswordDatabase:
             password (str): 主密码
         """
         # 获取存储的盐值
-        with sqlite3.connect(self.db_file) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT value FROM metadata WHERE key = ?
@@ -145,14 +905,39 @@ class PasswordDatabase:
         else:
             salt = None
             
-        # 初始化加密器
-        from core.encryption import EncryptionManager
-        self.encryption = EncryptionManager()
-        # 使用主密码和盐值派生密钥
-        key, _ = self.encryption.derive_key_from_password(password, salt)
-        self.encryption.key = key
-        self.encryption.cipher = Fernet(key)
+        # 使用主密码和盐值派生密钥并初始化加密器（无需读写密钥文件）
+        key, _ = EncryptionManager.derive_key_from_password(password, salt)
+        self.encryption = EncryptionManager(key)
+        self.clear_hot_cache()
+        # 旧版本创建的密码库没有密钥校验值，确认管理员密码正确后补上
+        if self.get_metadata('key_check') is None and self.verify_master_password(password):
+            self._write(lambda conn: conn.execute('''
+                INSERT OR REPLACE INTO metadata (key, value)
+                VALUES ('key_check', ?)
+            ''', (self.key_check_value(),)))
+        self._fill_pending_entry_keys()
+    
+    def key_check_value(self):
+        """
+        计算当前密钥的校验值（带密钥的HMAC，不能用于离线猜测管理员密码）
+        
+        Returns:
+            str: 校验值
+        """
+        self._require_encryption()
+        return self.encryption.fingerprint("2fapm/key-check")
+    
+    def quick_check(self):
+        """
+        检查数据库文件结构（PRAGMA quick_check）
+        
+        Returns:
+            list: 检查结果，完好时为 ["ok"]
+        """
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("PRAGMA quick_check")]
     
+    @timed("db.add_password")
     def add_password(self, service_name, username, password):
         """
         添加密码记录
@@ -175,15 +960,81 @@ class PasswordDatabase:
         except Exception as e:
             raise Exception(f"加密密码失败: {str(e)}")
         
-        with sqlite3.connect(self.db_file) as conn:
+        fingerprint = self._fingerprint(password)
+        
+        def insert(conn):
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO passwords (service_name, username, encrypted_password)
-                VALUES (?, ?, ?)
-            ''', (service_name, username, encrypted_password))
-            conn.commit()
-            return cursor.lastrowid
+            try:
+                cursor.execute(f'''
+                    INSERT INTO passwords (service_name, username, encrypted_password,
+                                           password_fingerprint, entry_key, sort_name, sort_username,
+                                           {SYNC_INSERT_COLUMNS})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, {SYNC_INSERT_VALUES})
+                ''', (self._encode_name(service_name), self._encode_name(username),
+                      encrypted_password, fingerprint, self.entry_key(service_name, username),
+                      *self.sort_keys(service_name, username)))
+            except sqlite3.IntegrityError:
+                raise Exception(f"已存在相同服务名称和用户名的记录: {service_name} - {username}")
+            record_id = cursor.lastrowid
+            self._write_blind_index(cursor, record_id, service_name, username)
+            return record_id
+        return self._write(insert)
     
+    @timed("db.add_passwords")
+    def add_passwords(self, records):
+        """
+        批量添加密码记录（在同一个事务中插入）
+        
+        与已有记录重复时整批失败，需要合并重复记录时使用 core.merge
+        
+        Args:
+            records (iterable): (service_name, username, password) 元组序列
+            
+        Returns:
+            int: 添加的记录数
+        """
+        # 检查加密器是否已初始化
+        if self.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+        
+        # 加密密码
+        try:
+            records = list(records)
+            rows = [
+                (self._encode_name(service_name), self._encode_name(username),
+                 self.encryption.encrypt(password), self._fingerprint(password),
+                 self.entry_key(service_name, username), *self.sort_keys(service_name, username))
+                for service_name, username, password in records
+            ]
+        except Exception as e:
+            raise Exception(f"加密密码失败: {str(e)}")
+        
+        def insert(conn):
+            cursor = conn.cursor()
+            try:
+                if self.name_encryption:
+                    # 需要每条记录的ID来写入盲索引
+                    for (service_name, username, _), row in zip(records, rows):
+                        cursor.execute(f'''
+                            INSERT INTO passwords (service_name, username, encrypted_password,
+                                                   password_fingerprint, entry_key,
+                                                   sort_name, sort_username, {SYNC_INSERT_COLUMNS})
+                            VALUES (?, ?, ?, ?, ?, ?, ?, {SYNC_INSERT_VALUES})
+                        ''', row)
+                        self._write_blind_index(cursor, cursor.lastrowid, service_name, username)
+                else:
+                    cursor.executemany(f'''
+                        INSERT INTO passwords (service_name, username, encrypted_password,
+                                               password_fingerprint, entry_key,
+                                               sort_name, sort_username, {SYNC_INSERT_COLUMNS})
+                        VALUES (?, ?, ?, ?, ?, ?, ?, {SYNC_INSERT_VALUES})
+                    ''', rows)
+            except sqlite3.IntegrityError:
+                raise Exception("批量添加的记录与已有记录的服务名称和用户名重复")
+            return len(rows)
+        return self._write(insert)
+    
+    @timed("db.get_password")
     def get_password(self, record_id):
         """
         获取密码记录
@@ -194,119 +1045,1472 @@ class PasswordDatabase:
         Returns:
             dict or None: 密码记录，如果不存在则返回None
         """
-        with sqlite3.connect(self.db_file) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, service_name, username, encrypted_password
+                SELECT id, service_name, username, encrypted_password, folder_id
                 FROM passwords WHERE id = ?
             ''', (record_id,))
             result = cursor.fetchone()
             
             if result:
-                # 检查加密器是否已初始化
-                if self.encryption is None:
-                    raise Exception("加密器未初始化，请先验证管理员密码")
-                
-                # 解密密码
-                try:
-                    decrypted_password = self.encryption.decrypt(result[3])
-                    return {
-                        'id': result[0],
-                        'service_name': result[1],
-                        'username': result[2],
-                        'password': decrypted_password
-                    }
-                except Exception as e:
-                    raise Exception(f"解密密码失败: {str(e)}")
+                # 已预先解密且读取后未被修改的记录无需再次解密
+                cached = self._hot_records.get(record_id)
+                if cached is not None and cached[0] == result:
+                    return dict(cached[1])
+                return self._decrypt_row(result)
             return None
     
+    def _decrypt_row(self, row):
+        """解密一行（id, service_name, username, encrypted_password, folder_id）"""
+        # 检查加密器是否已初始化
+        if self.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+        
+        # 解密密码
+        try:
+            decrypted_password = self.encryption.decrypt(row[3])
+            return {
+                'id': row[0],
+                'service_name': self._decode_name(row[1]),
+                'username': self._decode_name(row[2]),
+                'password': decrypted_password,
+                'folder_id': row[4]
+            }
+        except Exception as e:
+            raise Exception(f"解密密码失败: {str(e)}")
+    
+    @timed("db.get_all_passwords")
     def get_all_passwords(self):
         """
         获取所有密码记录（不包括密码字段）
         
+        加密模式下需要解密全部服务名称和用户名，界面列表应使用
+        get_listing 和 get_names 按页解密
+        
         Returns:
-            list: 密码记录列表
+            list: EntrySummary 列表
         """
-        with sqlite3.connect(self.db_file) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id, service_name, username, created_at, updated_at
                 FROM passwords
-                ORDER BY service_name
+                ORDER BY sort_name, id
             ''')
-            results = cursor.fetchall()
-            
+            decode = self._decode_name
             return [
-                {
-                    'id': row[0],
-                    'service_name': row[1],
-                    'username': row[2],
-                    'created_at': row[3],
-                    'updated_at': row[4]
-                }
-                for row in results
+                EntrySummary(record_id, decode(service_name), decode(username), created_at, updated_at)
+                for record_id, service_name, username, created_at, updated_at in cursor
             ]
     
-    def update_password(self, record_id, service_name, username, password):
+    def count_passwords(self):
         """
-        更新密码记录
+        获取密码记录数
+        
+        Returns:
+            int: 记录数
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM passwords
+            ''')
+            return cursor.fetchone()[0]
+    
+    @timed("db.get_listing")
+    def get_listing(self, order=ORDER_NAME):
+        """
+        获取界面列表所需的记录（不解密）
+        
+        明文模式下按服务名称或用户名的排序键（见 core.collation）排序并包含名称；加密模式下密文无法排序，
+        按ID排序且 service_name 和 username 为None，由 get_names 按需解密。
+        按创建或修改时间排序时最新的在前，每种排序都按对应的索引顺序读取，不需要临时排序。
+        按最近使用或使用次数排序时，用过的记录按 entry_usage 上的索引顺序读取，
+        从未用过的记录排在后面并按名称（加密时按ID）排序
         
         Args:
-            record_id (int): 记录ID
-            service_name (str): 服务名称
-            username (str): 用户名
-            password (str): 明文密码
+            order (str): 排序方式，ORDERS 之一
             
         Returns:
-            bool: 更新是否成功
+            ListingSnapshot: 按列存储的列表快照，按下标读取时得到 EntrySummary
+                             （id, service_name, username, created_at, updated_at）
         """
-        # 检查加密器是否已初始化
-        if self.encryption is None:
-            raise Exception("加密器未初始化，请先验证管理员密码")
-        
-        # 加密密码
-        try:
-            encrypted_password = self.encryption.encrypt(password)
-        except Exception as e:
-            raise Exception(f"加密密码失败: {str(e)}")
+        if order not in ORDERS:
+            raise ValueError(f"未知的排序方式: {order}")
+        names = "p.service_name, p.username" if not self.name_encryption else "NULL, NULL"
+        name_order = self._column_order(ORDER_NAME)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # 逐行读取游标直接写入各列，不生成中间的行列表
+            if order in _COLUMN_ORDERS:
+                cursor.execute(f'''
+                    SELECT p.id, {names}, p.created_at, p.updated_at
+                    FROM passwords p
+                    ORDER BY {self._column_order(order)}
+                ''')
+                return ListingSnapshot.from_rows(cursor)
+            usage_order = ("u.last_access DESC" if order == ORDER_RECENT
+                           else "u.access_count DESC, u.last_access DESC")
+            unused = conn.cursor()
+            cursor.execute(f'''
+                SELECT p.id, {names}, p.created_at, p.updated_at
+                FROM entry_usage u JOIN passwords p ON p.id = u.entry_id
+                ORDER BY {usage_order}
+            ''')
+            unused.execute(f'''
+                SELECT p.id, {names}, p.created_at, p.updated_at
+                FROM passwords p
+                WHERE NOT EXISTS (SELECT 1 FROM entry_usage u WHERE u.entry_id = p.id)
+                ORDER BY {name_order}
+            ''')
+            return ListingSnapshot.from_rows(itertools.chain(cursor, unused))
+    
+    def _column_order(self, order):
+        """不依赖使用统计的排序方式对应的排序子句（passwords 表的别名为 p）"""
+        plain_order, encrypted_order = _COLUMN_ORDERS[order]
+        return encrypted_order if self.name_encryption else plain_order
+    
+    @timed("db.get_names")
+    def get_names(self, record_ids):
+        """
+        获取指定记录的服务名称和用户名（加密模式下只解密这些记录）
         
-        with sqlite3.connect(self.db_file) as conn:
+        Args:
+            record_ids (list): 记录ID列表
+            
+        Returns:
+            dict: 记录ID -> (service_name, username)
+        """
+        if not record_ids:
+            return {}
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                UPDATE passwords
-                SET service_name = ?, username = ?, encrypted_password = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (service_name, username, encrypted_password, record_id))
-            conn.commit()
-            return cursor.rowcount > 0
+                SELECT id, service_name, username
+                FROM passwords
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(list(record_ids)),))
+            return {
+                row[0]: (self._decode_name(row[1]), self._decode_name(row[2]))
+                for row in cursor.fetchall()
+            }
     
-    def delete_password(self, record_id):
+    @timed("db.find_passwords")
+    def find_passwords(self, service_name=None, username=None):
         """
-        删除密码记录
+        按服务名称和/或用户名精确查找记录（忽略大小写和首尾空白）
         
         Args:
-            record_id (int): 记录ID
+            service_name (str): 服务名称，None表示不限
+            username (str): 用户名，None表示不限
             
         Returns:
-            bool: 删除是否成功
+            list: EntrySummary 列表（id, service_name, username, created_at, updated_at）
+        """
+        if self.name_encryption:
+            self._require_encryption()
+            tokens = []
+            if service_name is not None:
+                tokens.append(blind_index.exact_token(
+                    self.encryption, blind_index.FIELD_SERVICE, service_name))
+            if username is not None:
+                tokens.append(blind_index.exact_token(
+                    self.encryption, blind_index.FIELD_USERNAME, username))
+            return self._select_by_tokens(tokens)
+        
+        conditions = []
+        params = []
+        if service_name is not None:
+            conditions.append("service_name = ? COLLATE NOCASE")
+            params.append(service_name.strip())
+        if username is not None:
+            conditions.append("username = ? COLLATE NOCASE")
+            params.append(username.strip())
+        return self._select_where(" AND ".join(conditions) or "1", params)
+    
+    @timed("db.search_passwords")
+    def search_passwords(self, prefix):
         """
-        with sqlite3.connect(self.db_file) as conn:
+        查找服务名称或用户名以指定前缀开头的记录（忽略大小写）
+        
+        Args:
+            prefix (str): 前缀
+            
+        Returns:
+            list: EntrySummary 列表（id, service_name, username, created_at, updated_at）
+        """
+        prefix = prefix.strip()
+        if self.name_encryption:
+            self._require_encryption()
+            normalized = blind_index.normalize(prefix)
+            results = []
+            for field in (blind_index.FIELD_SERVICE, blind_index.FIELD_USERNAME):
+                token = blind_index.prefix_token(self.encryption, field, prefix)
+                if token is None:
+                    # 前缀过短，没有对应的盲索引
+                    return []
+                results.extend(self._select_by_tokens([token]))
+            # 超过索引长度的前缀需要按明文再过滤一次，并去除重复记录
+            seen = set()
+            matched = []
+            for record in results:
+                if record['id'] in seen:
+                    continue
+                if blind_index.matches_prefix(normalized, record['service_name'], record['username']):
+                    seen.add(record['id'])
+                    matched.append(record)
+            return matched
+        
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return self._select_where(
+            "service_name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\'",
+            [pattern, pattern]
+        )
+    
+    def _select_where(self, condition, params):
+        """按条件查询记录（明文模式）"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, service_name, username, created_at, updated_at
+                FROM passwords
+                WHERE {condition}
+                ORDER BY sort_name, id
+            ''', params)
+            return list(map(EntrySummary._make, cursor))
+    
+    def _select_by_tokens(self, tokens):
+        """查询同时匹配所有盲索引令牌的记录并解密名称（加密模式）"""
+        if not tokens:
+            return []
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                DELETE FROM passwords WHERE id = ?
-            ''', (record_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-
-
-# 单例模式实例
-_db_instance = None
+                SELECT id, service_name, username, created_at, updated_at
+                FROM passwords
+                WHERE id IN (
+                    SELECT entry_id FROM blind_index
+                    WHERE token IN (SELECT value FROM json_each(?))
+                    GROUP BY entry_id
+                    HAVING COUNT(*) = ?
+                )
+                ORDER BY id
+            ''', (json.dumps(tokens), len(tokens)))
+            decode = self._decode_name
+            return [
+                EntrySummary(record_id, decode(service_name), decode(username), created_at, updated_at)
+                for record_id, service_name, username, created_at, updated_at in cursor
+            ]
+    
+    @timed("db.filter_passwords")
+    def filter_passwords(self, text=None, tag_ids=None, folder_id=None, order=ORDER_NAME):
+        """
+        按文本前缀、标签和文件夹组合筛选记录（一次查询）
+        
+        标签条件要求记录带有全部指定标签；文本条件与 search_passwords 相同，
+        加密模式下通过盲索引匹配
+        
+        Args:
+            text (str): 服务名称或用户名前缀，None或空字符串表示不限
+            tag_ids (list): 标签ID列表，None或空列表表示不限
+            folder_id (int): 文件夹ID，FOLDER_UNFILED 表示未归入文件夹的记录，None表示不限
+            order (str): 排序方式，ORDERS 之一，与 get_listing 相同
+            
+        Returns:
+            ListingSnapshot: 列表快照，格式与 get_listing 相同
+        """
+        if order not in ORDERS:
+            raise ValueError(f"未知的排序方式: {order}")
+        conditions = []
+        params = []
+        if folder_id == FOLDER_UNFILED:
+            conditions.append("folder_id IS NULL")
+        elif folder_id is not None:
+            conditions.append("folder_id = ?")
+            params.append(folder_id)
+        if tag_ids:
+            conditions.append('''id IN (
+                SELECT entry_id FROM entry_tags
+                WHERE tag_id IN (SELECT value FROM json_each(?))
+                GROUP BY entry_id
+                HAVING COUNT(*) = ?
+            )''')
+            params.extend((json.dumps(sorted(set(tag_ids))), len(set(tag_ids))))
+        
+        text = (text or "").strip()
+        normalized = blind_index.normalize(text)
+        recheck = False
+        if text:
+            condition, text_params, recheck = self.text_condition(text)
+            if condition is None:
+                return ListingSnapshot()
+            conditions.append(condition)
+            params.extend(text_params)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        names = "service_name, username" if not self.name_encryption or recheck else "NULL, NULL"
+        usage_join = ""
+        if order in _COLUMN_ORDERS:
+            order_by = self._column_order(order)
+        else:
+            # 筛选结果通常很少，直接按使用记录排序，从未用过的排在后面
+            usage_join = "LEFT JOIN entry_usage u ON u.entry_id = p.id"
+            usage_order = ("u.last_access DESC" if order == ORDER_RECENT
+                           else "u.access_count DESC, u.last_access DESC")
+            order_by = f"u.entry_id IS NULL, {usage_order}, {self._column_order(ORDER_NAME)}"
+        with self._connect() as conn:
+            rows = conn.execute(f'''
+                SELECT id, {names}, created_at, updated_at
+                FROM passwords p
+                {usage_join}
+                {where}
+                ORDER BY {order_by}
+            ''', params)
+            if not recheck:
+                return ListingSnapshot.from_rows(rows)
+            decode = self._decode_name
+            decoded = ((row[0], decode(row[1]), decode(row[2]), row[3], row[4]) for row in rows)
+            return ListingSnapshot.from_rows(
+                row for row in decoded if blind_index.matches_prefix(normalized, row[1], row[2])
+            )
+    
+    def text_condition(self, text, blind_index_table="blind_index"):
+        """
+        构造按服务名称或用户名前缀匹配的查询条件（用于 passwords 表）
+        
+        Args:
+            text (str): 前缀（已去除首尾空白，非空）
+            blind_index_table (str): 盲索引表名，ATTACH 的密码库需带上库名
+            
+        Returns:
+            tuple: (条件, 参数列表, 是否需要解密名称后按明文再过滤)，
+                   加密模式下前缀过短没有对应的盲索引时条件为None
+        """
+        if not self.name_encryption:
+            pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            return ("(service_name LIKE ? ESCAPE '\\' OR username LIKE ? ESCAPE '\\')",
+                    [pattern, pattern], False)
+        self._require_encryption()
+        tokens = [
+            blind_index.prefix_token(self.encryption, field, text)
+            for field in (blind_index.FIELD_SERVICE, blind_index.FIELD_USERNAME)
+        ]
+        if tokens[0] is None:
+            # 前缀过短，没有对应的盲索引
+            return None, [], False
+        # 超过索引长度的前缀需要按明文再过滤一次
+        recheck = len(blind_index.normalize(text)) > BLIND_INDEX_MAX_PREFIX
+        return (f"id IN (SELECT entry_id FROM {blind_index_table} WHERE token IN (?, ?))",
+                tokens, recheck)
+    
+    def create_tag(self, name):
+        """
+        创建标签（同名标签已存在时直接返回其ID，名称忽略大小写）
+        
+        Args:
+            name (str): 标签名称
+            
+        Returns:
+            int: 标签ID
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("标签名称不能为空")
+        def insert(conn):
+            conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+            return conn.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()[0]
+        return self._write(insert)
+    
+    def rename_tag(self, tag_id, name):
+        """
+        重命名标签
+        
+        Args:
+            tag_id (int): 标签ID
+            name (str): 新名称
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("标签名称不能为空")
+        def rename(conn):
+            try:
+                conn.execute("UPDATE tags SET name = ? WHERE id = ?", (name, tag_id))
+            except sqlite3.IntegrityError:
+                raise Exception(f"已存在同名标签: {name}")
+        self._write(rename)
+    
+    def delete_tag(self, tag_id):
+        """
+        删除标签（记录本身不受影响）
+        
+        Args:
+            tag_id (int): 标签ID
+        """
+        def delete(conn):
+            conn.execute("DELETE FROM tags WHERE id = ?", (tag_id,))
+        self._write(delete)
+    
+    def count_tags(self):
+        """
+        获取标签数
+        
+        Returns:
+            int: 标签数
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+    
+    def get_tags(self, offset=0, limit=-1):
+        """
+        按名称顺序分页获取标签及其记录数
+        
+        Args:
+            offset (int): 跳过的标签数
+            limit (int): 最多返回的标签数，-1表示不限
+            
+        Returns:
+            list: 标签字典列表（id, name, count）
+        """
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT id, name, entry_count FROM tags
+                ORDER BY name
+                LIMIT ? OFFSET ?
+            ''', (limit, offset)).fetchall()
+        return [{'id': row[0], 'name': row[1], 'count': row[2]} for row in rows]
+    
+    def get_entry_tags(self, record_id):
+        """
+        获取记录的标签名称
+        
+        Args:
+            record_id (int): 记录ID
+            
+        Returns:
+            list: 按名称排序的标签名称列表
+        """
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT t.name FROM entry_tags e
+                JOIN tags t ON t.id = e.tag_id
+                WHERE e.entry_id = ?
+                ORDER BY t.name
+            ''', (record_id,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def set_entry_tags(self, record_id, names):
+        """
+        设置记录的标签（替换原有标签，不存在的标签自动创建）
+        
+        Args:
+            record_id (int): 记录ID
+            names (iterable): 标签名称
+        """
+        names = sorted({name.strip() for name in names if name.strip()}, key=str.casefold)
+        def replace(conn):
+            conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                             [(name,) for name in names])
+            conn.execute('''
+                DELETE FROM entry_tags
+                WHERE entry_id = ?
+                  AND tag_id NOT IN (SELECT id FROM tags
+                                     WHERE name IN (SELECT value FROM json_each(?)))
+            ''', (record_id, json.dumps(names)))
+            conn.execute('''
+                INSERT OR IGNORE INTO entry_tags (tag_id, entry_id)
+                SELECT id, ? FROM tags WHERE name IN (SELECT value FROM json_each(?))
+            ''', (record_id, json.dumps(names)))
+        self._write(replace)
+    
+    def tag_entries(self, record_ids, tag_id):
+        """
+        为多条记录添加标签（一条语句）
+        
+        Args:
+            record_ids (list): 记录ID列表
+            tag_id (int): 标签ID
+            
+        Returns:
+            int: 新添加标签的记录数
+        """
+        def insert(conn):
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO entry_tags (tag_id, entry_id)
+                SELECT ?, id FROM passwords WHERE id IN (SELECT value FROM json_each(?))
+            ''', (tag_id, json.dumps(list(record_ids))))
+            return cursor.rowcount
+        return self._write(insert)
+    
+    def untag_entries(self, record_ids, tag_id):
+        """
+        从多条记录移除标签（一条语句）
+        
+        Args:
+            record_ids (list): 记录ID列表
+            tag_id (int): 标签ID
+            
+        Returns:
+            int: 移除标签的记录数
+        """
+        def delete(conn):
+            cursor = conn.execute('''
+                DELETE FROM entry_tags
+                WHERE tag_id = ? AND entry_id IN (SELECT value FROM json_each(?))
+            ''', (tag_id, json.dumps(list(record_ids))))
+            return cursor.rowcount
+        return self._write(delete)
+    
+    def create_folder(self, name, parent_id=None):
+        """
+        创建文件夹
+        
+        Args:
+            name (str): 文件夹名称
+            parent_id (int): 父文件夹ID，None表示顶层
+            
+        Returns:
+            int: 文件夹ID
+        """
+        name = name.strip()
+        if not name or '/' in name:
+            raise ValueError("文件夹名称不能为空，且不能包含 /")
+        def insert(conn):
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO folders (parent_id, name) VALUES (?, ?)", (parent_id, name)
+                )
+            except sqlite3.IntegrityError:
+                raise Exception(f"已存在同名文件夹: {name}")
+            return cursor.lastrowid
+        return self._write(insert)
+    
+    def rename_folder(self, folder_id, name):
+        """
+        重命名文件夹
+        
+        Args:
+            folder_id (int): 文件夹ID
+            name (str): 新名称
+        """
+        name = name.strip()
+        if not name or '/' in name:
+            raise ValueError("文件夹名称不能为空，且不能包含 /")
+        def rename(conn):
+            try:
+                conn.execute("UPDATE folders SET name = ? WHERE id = ?", (name, folder_id))
+            except sqlite3.IntegrityError:
+                raise Exception(f"已存在同名文件夹: {name}")
+        self._write(rename)
+    
+    def delete_folder(self, folder_id):
+        """
+        删除文件夹及其子文件夹，其中的记录移出文件夹（不删除记录）
+        
+        Args:
+            folder_id (int): 文件夹ID
+        """
+        def delete(conn):
+            subtree = '''
+                WITH RECURSIVE subtree(id) AS (
+                    SELECT ?
+                    UNION ALL
+                    SELECT f.id FROM folders f JOIN subtree s ON COALESCE(f.parent_id, 0) = s.id
+                )
+            '''
+            conn.execute(f'''
+                {subtree}
+                UPDATE passwords SET folder_id = NULL WHERE folder_id IN (SELECT id FROM subtree)
+            ''', (folder_id,))
+            conn.execute(f'''
+                {subtree}
+                DELETE FROM folders WHERE id IN (SELECT id FROM subtree)
+            ''', (folder_id,))
+        self._write(delete)
+    
+    def get_folders(self, parent_id=None):
+        """
+        获取子文件夹（按名称排序），用于逐层展开的文件夹树
+        
+        Args:
+            parent_id (int): 父文件夹ID，None表示顶层
+            
+        Returns:
+            list: 文件夹字典列表（id, name, count, has_children）
+        """
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT f.id, f.name, f.entry_count,
+                       EXISTS (SELECT 1 FROM folders c WHERE COALESCE(c.parent_id, 0) = f.id)
+                FROM folders f
+                WHERE COALESCE(f.parent_id, 0) = ?
+                ORDER BY f.name COLLATE NOCASE
+            ''', (parent_id or 0,)).fetchall()
+        return [
+            {'id': row[0], 'name': row[1], 'count': row[2], 'has_children': bool(row[3])}
+            for row in rows
+        ]
+    
+    def get_folder_paths(self):
+        """
+        获取全部文件夹的完整路径，用于选择文件夹
+        
+        Returns:
+            list: 按路径排序的 (id, 路径) 元组列表，路径形如 "工作/邮箱"
+        """
+        with self._connect() as conn:
+            rows = conn.execute('''
+                WITH RECURSIVE paths(id, path) AS (
+                    SELECT id, name FROM folders WHERE parent_id IS NULL
+                    UNION ALL
+                    SELECT f.id, p.path || '/' || f.name
+                    FROM folders f JOIN paths p ON f.parent_id = p.id
+                )
+                SELECT id, path FROM paths ORDER BY path COLLATE NOCASE
+            ''').fetchall()
+        return [(row[0], row[1]) for row in rows]
+    
+    def move_to_folder(self, record_ids, folder_id):
+        """
+        将多条记录移入文件夹（一条语句）
+        
+        Args:
+            record_ids (list): 记录ID列表
+            folder_id (int): 文件夹ID，None表示移出文件夹
+            
+        Returns:
+            int: 移动的记录数
+        """
+        def move(conn):
+            cursor = conn.execute('''
+                UPDATE passwords SET folder_id = ?
+                WHERE id IN (SELECT value FROM json_each(?)) AND folder_id IS NOT ?
+            ''', (folder_id, json.dumps(list(record_ids)), folder_id))
+            return cursor.rowcount
+        return self._write(move)
+    
+    def retag_entries(self, record_ids, add=(), remove=()):
+        """
+        批量修改多条记录的标签（一个事务，添加和移除各一条语句）
+        
+        Args:
+            record_ids (iterable): 记录ID
+            add (iterable): 要添加的标签名称，不存在的标签自动创建
+            remove (iterable): 要移除的标签ID
+            
+        Returns:
+            tuple: (新添加的标签数, 移除的标签数)，按记录和标签的组合计数
+        """
+        names = sorted({name.strip() for name in add if name.strip()}, key=str.casefold)
+        ids = json.dumps(list(record_ids))
+        tag_ids = json.dumps(list(remove))
+        
+        def retag(conn):
+            conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                             [(name,) for name in names])
+            added = conn.execute('''
+                INSERT OR IGNORE INTO entry_tags (tag_id, entry_id)
+                SELECT t.id, p.id FROM tags t, passwords p
+                WHERE t.name IN (SELECT value FROM json_each(?))
+                  AND p.id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(names), ids)).rowcount
+            removed = conn.execute('''
+                DELETE FROM entry_tags
+                WHERE tag_id IN (SELECT value FROM json_each(?))
+                  AND entry_id IN (SELECT value FROM json_each(?))
+            ''', (tag_ids, ids)).rowcount
+            return added, removed
+        return self._write(retag)
+    
+    def iter_encrypted(self, batch_size=1000):
+        """
+        分批读取所有密码记录（不解密），用于全库扫描
+        
+        加密模式下 service_name 和 username 也是存储形式，需要时使用 decode_entry_names 还原
+        
+        Args:
+            batch_size (int): 每批的记录数
+            
+        Yields:
+            list: (id, service_name, username, encrypted_password) 元组列表
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, service_name, username, encrypted_password
+                FROM passwords
+                ORDER BY id
+            ''')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+    
+    def iter_records(self, batch_size=1000, record_ids=None):
+        """
+        分批读取密码记录及其时间（不解密），用于导出
+        
+        Args:
+            batch_size (int): 每批的记录数
+            record_ids (iterable): 只读取这些记录，None表示全部记录
+            
+        Yields:
+            list: (id, service_name, username, encrypted_password, created_at, updated_at) 元组列表
+        """
+        condition = ""
+        params = ()
+        if record_ids is not None:
+            condition = "WHERE id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(record_ids)),)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT id, service_name, username, encrypted_password, created_at, updated_at
+                FROM passwords
+                {condition}
+                ORDER BY id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+    
+    @timed("db.count_reused")
+    def count_reused(self, password, exclude_id=None):
+        """
+        统计使用相同密码的其他记录数（通过已保存的密码指纹，无需解密）
+        
+        Args:
+            password (str): 明文密码
+            exclude_id (int): 不计入统计的记录ID（例如正在编辑的记录）
+            
+        Returns:
+            int: 使用相同密码的记录数
+        """
+        if self.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM passwords
+                WHERE password_fingerprint = ? AND id != ?
+            ''', (self.encryption.fingerprint(password), exclude_id or -1))
+            return cursor.fetchone()[0]
+    
+    def set_fingerprints(self, fingerprints):
+        """
+        批量保存密码指纹（用于为旧记录补充指纹）
+        
+        Args:
+            fingerprints (iterable): (id, fingerprint) 元组序列
+        """
+        def store(conn):
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE passwords SET password_fingerprint = ? WHERE id = ?
+            ''', [(fingerprint, record_id) for record_id, fingerprint in fingerprints])
+        self._write(store)
+    
+    def get_passwords_updated_before(self, days):
+        """
+        获取超过指定天数未更新的记录（按更新时间索引查询）
+        
+        Args:
+            days (int): 天数
+            
+        Returns:
+            list: 记录字典列表（id, service_name, username, updated_at）
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, service_name, username, updated_at
+                FROM passwords
+                WHERE updated_at < datetime('now', ?)
+                ORDER BY updated_at
+            ''', (f"-{int(days)} days",))
+            return self.decode_entry_names([
+                {
+                    'id': row[0],
+                    'service_name': row[1],
+                    'username': row[2],
+                    'updated_at': row[3]
+                }
+                for row in cursor.fetchall()
+            ])
+    
+    @timed("db.update_password")
+    def update_password(self, record_id, service_name, username, password):
+        """
+        更新密码记录
+        
+        Args:
+            record_id (int): 记录ID
+            service_name (str): 服务名称
+            username (str): 用户名
+            password (str): 明文密码
+            
+        Returns:
+            bool: 更新是否成功
+        """
+        # 检查加密器是否已初始化
+        if self.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+        
+        # 加密密码
+        try:
+            encrypted_password = self.encryption.encrypt(password)
+        except Exception as e:
+            raise Exception(f"加密密码失败: {str(e)}")
+        
+        fingerprint = self._fingerprint(password)
+        
+        def update(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute('''
+                    UPDATE passwords
+                    SET service_name = ?, username = ?, encrypted_password = ?,
+                        password_fingerprint = ?, entry_key = ?, sort_name = ?, sort_username = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (self._encode_name(service_name), self._encode_name(username),
+                      encrypted_password, fingerprint, self.entry_key(service_name, username),
+                      *self.sort_keys(service_name, username), record_id))
+            except sqlite3.IntegrityError:
+                raise Exception(f"已存在相同服务名称和用户名的记录: {service_name} - {username}")
+            updated = cursor.rowcount > 0
+            if updated:
+                self._write_blind_index(cursor, record_id, service_name, username)
+            return updated
+        return self._write(update)
+    
+    @timed("db.delete_password")
+    def delete_password(self, record_id):
+        """
+        删除密码记录
+        
+        Args:
+            record_id (int): 记录ID
+            
+        Returns:
+            bool: 删除是否成功
+        """
+        def delete(conn):
+            cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM passwords WHERE id = ?
+            ''', (record_id,))
+            deleted = cursor.rowcount > 0
+            cursor.execute('''
+                DELETE FROM blind_index WHERE entry_id = ?
+            ''', (record_id,))
+            return deleted
+        return self._write(delete)
+    
+    @timed("db.delete_passwords")
+    def delete_passwords(self, record_ids):
+        """
+        批量删除密码记录（一个事务中按ID集合删除，不逐条执行）
+        
+        Args:
+            record_ids (iterable): 记录ID
+            
+        Returns:
+            int: 删除的记录数
+        """
+        ids = json.dumps(list(record_ids))
+        
+        def delete(conn):
+            deleted = conn.execute('''
+                DELETE FROM passwords WHERE id IN (SELECT value FROM json_each(?))
+            ''', (ids,)).rowcount
+            conn.execute('''
+                DELETE FROM blind_index WHERE entry_id IN (SELECT value FROM json_each(?))
+            ''', (ids,))
+            return deleted
+        return self._write(delete)
+    
+    @timed("db.rotate_passwords")
+    def rotate_passwords(self, passwords):
+        """
+        批量更换密码：先在事务之外加密，再用一条 UPDATE ... FROM 语句写入（旧密码由触发器写入历史版本）
+        
+        Args:
+            passwords (dict): 记录ID -> 新的明文密码
+            
+        Returns:
+            int: 更新的记录数
+        """
+        self._require_encryption()
+        try:
+            rows = [
+                [record_id, self.encryption.encrypt(password).decode('ascii'),
+                 self._fingerprint(password)]
+                for record_id, password in passwords.items()
+            ]
+        except Exception as e:
+            raise Exception(f"加密密码失败: {str(e)}")
+        payload = json.dumps(rows)
+        
+        def update(conn):
+            return conn.execute('''
+                UPDATE passwords
+                SET encrypted_password = CAST(json_extract(new.value, '$[1]') AS BLOB),
+                    password_fingerprint = json_extract(new.value, '$[2]'),
+                    updated_at = CURRENT_TIMESTAMP
+                FROM json_each(?) AS new
+                WHERE passwords.id = json_extract(new.value, '$[0]')
+            ''', (payload,)).rowcount
+        return self._write(update)
+    
+    @timed("db.set_name_encryption")
+    def set_name_encryption(self, enabled):
+        """
+        开启或关闭服务名称和用户名的加密存储，并在同一事务中转换所有已有记录和附件名称
+        
+        Args:
+            enabled (bool): 是否加密
+        """
+        self._require_encryption()
+        if enabled == self.name_encryption:
+            return
+        self._fill_pending_entry_keys()
+        
+        def convert(conn):
+            cursor = conn.cursor()
+            rows = cursor.execute('''
+                SELECT id, service_name, username FROM passwords
+            ''').fetchall()
+            # 先按当前模式还原明文，再切换模式重新编码
+            plain_rows = [
+                (record_id, self._decode_name(service_name), self._decode_name(username))
+                for record_id, service_name, username in rows
+            ]
+            # 附件名称（见 core.attachments）与服务名称使用同一种编码，一起转换
+            attachment_names = [
+                (attachment_id, self._decode_name(name))
+                for attachment_id, name in cursor.execute('''
+                    SELECT id, name FROM attachments
+                ''')
+            ]
+            self.name_encryption = enabled
+            try:
+                # 升级前遗留的重复记录没有唯一键，保持为NULL
+                cursor.executemany('''
+                    UPDATE passwords
+                    SET service_name = ?, username = ?,
+                        entry_key = CASE WHEN entry_key IS NULL THEN NULL ELSE ? END,
+                        sort_name = ?, sort_username = ?
+                    WHERE id = ?
+                ''', [
+                    (self._encode_name(service_name), self._encode_name(username),
+                     self.entry_key(service_name, username), *self.sort_keys(service_name, username),
+                     record_id)
+                    for record_id, service_name, username in plain_rows
+                ])
+                cursor.executemany('''
+                    UPDATE attachments SET name = ? WHERE id = ?
+                ''', [(self._encode_name(name), attachment_id)
+                      for attachment_id, name in attachment_names])
+                cursor.execute('''
+                    DELETE FROM blind_index
+                ''')
+                for record_id, service_name, username in plain_rows:
+                    self._write_blind_index(cursor, record_id, service_name, username)
+                cursor.execute('''
+                    INSERT OR REPLACE INTO metadata (key, value)
+                    VALUES (?, ?)
+                ''', ('name_encryption', '1' if enabled else '0'))
+                cursor.execute('''
+                    INSERT OR REPLACE INTO metadata (key, value) VALUES ('sort_key_version', ?)
+                ''', (collation.SORT_KEY_VERSION,))
+            except Exception:
+                # 写队列回滚本次写操作的修改
+                self.name_encryption = not enabled
+                raise
+        
+        self._write(convert)
+    
+    def count_password_history(self, record_id):
+        """
+        获取记录的历史版本数
+        
+        Args:
+            record_id (int): 记录ID
+            
+        Returns:
+            int: 历史版本数
+        """
+        with self._connect() as conn:
+            return conn.execute('''
+                SELECT COUNT(*) FROM password_history WHERE entry_id = ?
+            ''', (record_id,)).fetchone()[0]
+    
+    @timed("db.get_password_history")
+    def get_password_history(self, record_id, limit=None, before=None):
+        """
+        按修改时间从新到旧分页获取记录的历史版本（沿 (entry_id, changed_at) 索引读取）
+        
+        Args:
+            record_id (int): 记录ID
+            limit (int): 本页最多返回的版本数，None表示使用默认配置
+            before (tuple): 上一页最后一个版本的 (changed_at, id)，None表示从最新版本开始
+            
+        Returns:
+            list: 历史版本列表，每项包含 id, password, set_at（开始使用时间）,
+                  changed_at（被替换的时间）
+        """
+        self._require_encryption()
+        if limit is None:
+            limit = HISTORY_PAGE_SIZE
+        if before is None:
+            condition, params = "", ()
+        else:
+            condition = "AND (changed_at < ? OR (changed_at = ? AND id < ?))"
+            params = (before[0], before[0], before[1])
+        with self._connect() as conn:
+            rows = conn.execute(f'''
+                SELECT id, encrypted_password, set_at, changed_at
+                FROM password_history
+                WHERE entry_id = ? {condition}
+                ORDER BY changed_at DESC, id DESC
+                LIMIT ?
+            ''', (record_id, *params, limit)).fetchall()
+        
+        history = []
+        for history_id, encrypted_password, set_at, changed_at in rows:
+            try:
+                password = self.encryption.decrypt(encrypted_password)
+            except Exception as e:
+                raise Exception(f"解密密码失败: {str(e)}")
+            history.append({
+                'id': history_id,
+                'password': password,
+                'set_at': set_at,
+                'changed_at': changed_at,
+            })
+        return history
+    
+    @timed("db.prune_history")
+    def prune_history(self, keep_versions=None, keep_days=None, batch_size=None):
+        """
+        按保留策略批量删除历史版本：每条记录只保留最新的 keep_versions 个版本，
+        并删除超过 keep_days 天的版本
+        
+        先用一次窗口查询找出全部要删除的版本，再分批交给写队列删除，
+        每批是一个单独的写操作，其他写操作不必等待整个清理完成
+        
+        Args:
+            keep_versions (int): 保留的版本数，None表示使用默认配置
+            keep_days (int): 保留的天数，None表示使用默认配置
+            batch_size (int): 每个事务删除的行数，None表示使用默认配置
+            
+        Returns:
+            int: 删除的历史版本数
+        """
+        if keep_versions is None:
+            keep_versions = HISTORY_KEEP_VERSIONS
+        if keep_days is None:
+            keep_days = HISTORY_KEEP_DAYS
+        if batch_size is None:
+            batch_size = HISTORY_PRUNE_BATCH_SIZE
+        if keep_versions is None and keep_days is None:
+            return 0
+        
+        with self._connect() as conn:
+            doomed = [row[0] for row in conn.execute('''
+                SELECT id FROM (
+                    SELECT id, changed_at,
+                           ROW_NUMBER() OVER (PARTITION BY entry_id
+                                              ORDER BY changed_at DESC, id DESC) AS version
+                    FROM password_history
+                )
+                WHERE (? IS NOT NULL AND version > ?)
+                   OR (? IS NOT NULL AND changed_at < datetime('now', ?))
+            ''', (keep_versions, keep_versions, keep_days, f"-{keep_days} days"))]
+
+        def delete(conn, batch):
+            conn.execute('''
+                DELETE FROM password_history
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (batch,))
+
+        for start in range(0, len(doomed), batch_size):
+            self._write(delete, json.dumps(doomed[start:start + batch_size]))
+        return len(doomed)
+    
+    def prune_history_async(self, callback=None):
+        """
+        在后台线程中清理历史版本
+        
+        Args:
+            callback (callable): 完成后在后台线程中调用，参数为删除的版本数
+            
+        Returns:
+            threading.Thread: 后台线程
+        """
+        def run():
+            removed = self.prune_history()
+            if callback is not None:
+                callback(removed)
+        
+        thread = threading.Thread(target=run, name="history-prune", daemon=True)
+        thread.start()
+        return thread
+    
+    @timed("db.record_usage")
+    def record_usage(self, usage):
+        """
+        在一个事务中累加多条记录的使用次数（见 core.usage 的批量写入）
+        
+        Args:
+            usage (dict): 记录ID -> (新增次数, 最后使用时间)，已删除的记录会被忽略
+        """
+        if not usage:
+            return
+        def accumulate(conn):
+            conn.executemany('''
+                INSERT INTO entry_usage (entry_id, access_count, last_access)
+                SELECT id, ?, ? FROM passwords WHERE id = ?
+                ON CONFLICT (entry_id) DO UPDATE
+                SET access_count = access_count + excluded.access_count,
+                    last_access = MAX(last_access, excluded.last_access)
+            ''', ((count, last_access, record_id)
+                  for record_id, (count, last_access) in usage.items()))
+        self._write(accumulate)
+    
+    def get_usage(self, record_id):
+        """
+        获取记录的使用次数和最后使用时间
+        
+        Returns:
+            tuple: (使用次数, 最后使用时间)，从未使用时为 (0, None)
+        """
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT access_count, last_access FROM entry_usage WHERE entry_id = ?
+            ''', (record_id,)).fetchone()
+        return row if row else (0, None)
+    
+    def hot_entry_ids(self, limit=None):
+        """
+        获取常用记录的ID：使用次数最多的和最近使用的各 limit 条（合并去重）
+        
+        Args:
+            limit (int): 每种排序取的条数，None表示使用默认配置
+            
+        Returns:
+            list: 记录ID列表
+        """
+        if limit is None:
+            limit = PREFETCH_HOT_ENTRIES
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT entry_id FROM (
+                    SELECT entry_id FROM entry_usage
+                    ORDER BY access_count DESC, last_access DESC LIMIT ?
+                )
+                UNION
+                SELECT entry_id FROM (
+                    SELECT entry_id FROM entry_usage ORDER BY last_access DESC LIMIT ?
+                )
+            ''', (limit, limit)).fetchall()
+        return [row[0] for row in rows]
+    
+    @timed("db.prefetch_hot_entries")
+    def prefetch_hot_entries(self, limit=None):
+        """
+        预先解密常用记录，之后 get_password 读取到相同的行时直接返回解密结果
+        
+        缓存按读取时的原始列校验，记录被修改后自动失效；更换密钥时清空
+        
+        Args:
+            limit (int): 每种排序取的条数，None表示使用默认配置
+            
+        Returns:
+            int: 缓存的记录数
+        """
+        self._require_encryption()
+        record_ids = self.hot_entry_ids(limit)
+        if not record_ids:
+            return 0
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT id, service_name, username, encrypted_password, folder_id
+                FROM passwords
+                WHERE id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(record_ids),)).fetchall()
+        hot = {}
+        for row in rows:
+            try:
+                hot[row[0]] = (row, self._decrypt_row(row))
+            except Exception:
+                # 无法解密的记录留给 get_password 报告错误
+                continue
+        with self._hot_lock:
+            self._hot_records = hot
+        return len(hot)
+    
+    def prefetch_hot_entries_async(self, callback=None):
+        """
+        在后台线程中预先解密常用记录
+        
+        Args:
+            callback (callable): 完成后在后台线程中调用，参数为缓存的记录数
+            
+        Returns:
+            threading.Thread: 后台线程
+        """
+        def run():
+            try:
+                count = self.prefetch_hot_entries()
+            except Exception:
+                count = 0
+            if callback is not None:
+                callback(count)
+        
+        thread = threading.Thread(target=run, name="hot-prefetch", daemon=True)
+        thread.start()
+        return thread
+    
+    def clear_hot_cache(self):
+        """清空预先解密的记录"""
+        with self._hot_lock:
+            self._hot_records = {}
+    
+    def _snapshot_prefix(self):
+        """快照文件名前缀（同一目录下可存放多个密码库的快照）"""
+        return f"{Path(self.db_file).stem}-"
+    
+    def list_snapshots(self):
+        """
+        列出已有的快照
+        
+        Returns:
+            list: 快照文件路径列表（Path），最新的在前
+        """
+        if not self.backup_dir.exists():
+            return []
+        prefix = self._snapshot_prefix()
+        return sorted(
+            (path for path in self.backup_dir.glob(f"{prefix}*.db")
+             if path.name[len(prefix):-3].replace('-', '').isdigit()),
+            key=lambda path: path.name,
+            reverse=True
+        )
+    
+    def has_changes_since_snapshot(self):
+        """
+        判断密码库在最新快照之后是否被修改过
+        
+        快照是密码库的完整副本，比较两者的变更计数器（CHANGE_COUNTERS）。
+        WAL模式下数据库文件的修改时间只在检查点时变化，打开密码库也会写入内容不变的页，
+        因此不比较文件的修改时间
+        
+        Returns:
+            bool: 没有快照、快照无法读取或变更计数器不同时返回True
+        """
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return True
+        try:
+            snapshot = sqlite3.connect(f"{snapshots[0].as_uri()}?mode=ro", uri=True)
+            try:
+                saved = snapshot.execute(CHANGE_COUNTERS).fetchone()
+            finally:
+                snapshot.close()
+        except sqlite3.DatabaseError:
+            return True
+        with self._connect() as conn:
+            return conn.execute(CHANGE_COUNTERS).fetchone() != saved
+    
+    @timed("db.create_snapshot")
+    def create_snapshot(self, pages_per_step=None, progress=None, prune=True):
+        """
+        使用 SQLite 备份API为正在使用的密码库创建一致的快照
+        
+        每一步只复制 pages_per_step 页，步与步之间释放锁，其他连接可以继续读写；
+        源数据库在备份过程中被其他连接修改时，SQLite 会自动重新复制。
+        完成后按 BACKUP_KEEP 删除最旧的快照
+        
+        Args:
+            pages_per_step (int): 每一步复制的页数，None表示使用默认配置
+            progress (callable): 进度回调，参数为 (剩余页数, 总页数)
+            prune (bool): 是否删除超出保留数量的旧快照
+            
+        Returns:
+            Path: 快照文件路径
+        """
+        if pages_per_step is None:
+            pages_per_step = BACKUP_PAGES_PER_STEP
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        
+        with self._snapshot_lock:
+            name = f"{self._snapshot_prefix()}{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+            path = self.backup_dir / name
+            tmp_path = path.with_suffix(".tmp")
+            source = self._connect()
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(
+                    target,
+                    pages=pages_per_step,
+                    progress=(lambda status, remaining, total: progress(remaining, total))
+                    if progress is not None else None,
+                    sleep=BACKUP_STEP_SLEEP
+                )
+            except BaseException:
+                target.close()
+                source.close()
+                tmp_path.unlink()
+                raise
+            # 快照是独立的单个文件，不使用WAL（否则读取快照时会在旁边留下 -wal 和 -shm 文件）
+            target.execute("PRAGMA journal_mode = DELETE")
+            target.close()
+            source.close()
+            # 复制完成后再改名，未完成的快照不会出现在快照列表中
+            os.replace(tmp_path, path)
+            if prune:
+                self.prune_snapshots()
+        return path
+    
+    def prune_snapshots(self, keep=None):
+        """
+        删除超出保留数量的旧快照
+        
+        Args:
+            keep (int): 保留的快照数量，None表示使用默认配置
+            
+        Returns:
+            list: 被删除的快照路径
+        """
+        if keep is None:
+            keep = BACKUP_KEEP
+        removed = self.list_snapshots()[keep:]
+        for path in removed:
+            path.unlink()
+        return removed
+    
+    @staticmethod
+    @timed("db.verify_snapshot")
+    def verify_snapshot(path):
+        """
+        检查快照的完整性（PRAGMA integrity_check）
+        
+        Args:
+            path (Path): 快照文件路径
+            
+        Returns:
+            tuple: (是否完好, 检查结果说明)
+        """
+        try:
+            conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True)
+            try:
+                rows = conn.execute("PRAGMA integrity_check").fetchall()
+                conn.execute("SELECT COUNT(*) FROM passwords").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+        messages = [row[0] for row in rows]
+        if messages == ["ok"]:
+            return True, "ok"
+        return False, "; ".join(messages[:10])
+    
+    def create_snapshot_async(self, callback=None):
+        """
+        在后台线程中创建快照并检查其完整性
+        
+        Args:
+            callback (callable): 完成后在后台线程中调用，参数为 (快照路径, 是否完好, 说明)，
+                                 创建失败时快照路径为None
+            
+        Returns:
+            threading.Thread: 后台线程
+        """
+        def run():
+            try:
+                path = self.create_snapshot()
+            except Exception as e:
+                if callback is not None:
+                    callback(None, False, str(e))
+                return
+            ok, message = self.verify_snapshot(path)
+            if callback is not None:
+                callback(path, ok, message)
+        
+        thread = threading.Thread(target=run, name="snapshot", daemon=True)
+        thread.start()
+        return thread
+    
+    def verify_snapshot_async(self, path, callback):
+        """
+        在后台线程中检查快照的完整性
+        
+        Args:
+            path (Path): 快照文件路径
+            callback (callable): 完成后在后台线程中调用，参数为 (快照路径, 是否完好, 说明)
+            
+        Returns:
+            threading.Thread: 后台线程
+        """
+        thread = threading.Thread(
+            target=lambda: callback(path, *self.verify_snapshot(path)),
+            name="snapshot-verify", daemon=True
+        )
+        thread.start()
+        return thread
+    
+    @timed("db.restore_snapshot")
+    def restore_snapshot(self, path):
+        """
+        用快照替换当前密码库
+        
+        先检查快照完整性并为当前密码库创建快照（可撤销本次恢复），
+        再通过备份API一步复制整个快照：复制在目标数据库的单个事务中完成，
+        其他连接只会看到恢复前或恢复后的完整状态。恢复后需要重新验证管理员密码
+        
+        Args:
+            path (Path): 快照文件路径
+            
+        Returns:
+            Path: 恢复前创建的快照路径
+        """
+        ok, message = self.verify_snapshot(path)
+        if not ok:
+            raise Exception(f"快照已损坏，无法恢复: {message}")
+        
+        # 恢复完成前不清理旧快照，以免删除正在恢复的快照
+        before_restore = self.create_snapshot(prune=False)
+        with self._snapshot_lock:
+            source = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True)
+            target = self._connect()
+            try:
+                # 备份API要求目标连接没有未完成的事务，不能在写队列的事务中执行（见 core.concurrency）；
+                # 一步复制整个快照，写锁被占用时退避后重试
+                retry_busy(lambda: source.backup(target))
+            finally:
+                target.close()
+                source.close()
+        self.prune_snapshots()
+        
+        # 快照可能来自不同的结构版本或名称加密设置
+        self._create_tables()
+        # 恢复后变更序号回到了快照时的值，换一个副本ID，其他密码库下次同步时重新读取全部变更
+        self._write(lambda conn: conn.execute('''
+            UPDATE metadata SET value = lower(hex(randomblob(16))) WHERE key = 'replica_id'
+        '''))
+        self.encryption = None
+        self.clear_hot_cache()
+        self.name_encryption = self.get_metadata('name_encryption') == '1'
+        return before_restore
 
 
 def get_database():
-    """获取数据库实例（单例模式）"""
-    global _db_instance
-    if _db_instance is None:
-        _db_instance = PasswordDatabase()
-    return _db_instance
+    """获取主窗口打开的密码库实例（由 core.vaults 的登记表管理，每个密码库只有一个实例）"""
+    from core.vaults import get_vault_registry
+    return get_vault_registry().active()
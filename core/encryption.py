@@ -9,31 +9,38 @@
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import base64
+import hashlib
+import hmac
 import os
-from config.settings import ENCRYPTION_KEY_FILE
+from config.settings import ENCRYPTION_KEY_FILE, ensure_data_dir
+from core.concurrency import load_or_create_file
+from core.metrics import timed
 
 
 class EncryptionManager:
     """加密管理器"""
     
-    def __init__(self):
-        """初始化"""
-        self.key = self._load_or_create_key()
+    def __init__(self, key=None):
+        """
+        初始化
+        
+        Args:
+            key (bytes): 加密密钥，为None时从密钥文件加载（不存在则创建）
+        """
+        if key is None:
+            key = self._load_or_create_key()
+        self.key = key
         self.cipher = Fernet(self.key)
+        self._subkeys = {}
     
     def _load_or_create_key(self):
-        """加载或创建加密密钥"""
-        if ENCRYPTION_KEY_FILE.exists():
-            with open(ENCRYPTION_KEY_FILE, 'rb') as f:
-                key = f.read()
-        else:
-            # 生成新的密钥
-            key = Fernet.generate_key()
-            with open(ENCRYPTION_KEY_FILE, 'wb') as f:
-                f.write(key)
-        return key
+        """加载或创建加密密钥（多个进程同时创建时只有一个密钥生效）"""
+        ensure_data_dir()
+        return load_or_create_file(ENCRYPTION_KEY_FILE, Fernet.generate_key)
     
+    @timed("crypto.encrypt")
     def encrypt(self, data):
         """
         加密数据
@@ -48,6 +55,7 @@ class EncryptionManager:
             data = data.encode('utf-8')
         return self.cipher.encrypt(data)
     
+    @timed("crypto.decrypt")
     def decrypt(self, encrypted_data):
         """
         解密数据
@@ -61,7 +69,44 @@ class EncryptionManager:
         decrypted_data = self.cipher.decrypt(encrypted_data)
         return decrypted_data.decode('utf-8')
     
-    def derive_key_from_password(self, password, salt=None):
+    def derive_subkey(self, purpose):
+        """
+        从主密钥派生用于特定用途的子密钥（HKDF-SHA256），不同用途的子密钥互相独立
+        
+        Args:
+            purpose (str): 用途标识，例如 "fingerprint"
+            
+        Returns:
+            bytes: 32字节子密钥
+        """
+        subkey = self._subkeys.get(purpose)
+        if subkey is None:
+            subkey = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=None,
+                info=f"2fapm/{purpose}".encode('utf-8'),
+            ).derive(base64.urlsafe_b64decode(self.key))
+            self._subkeys[purpose] = subkey
+        return subkey
+    
+    def fingerprint(self, data):
+        """
+        计算数据的带密钥HMAC指纹，相同明文得到相同指纹，但无法用于离线猜测
+        
+        Args:
+            data (str): 明文数据
+            
+        Returns:
+            str: 十六进制HMAC-SHA256指纹
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return hmac.new(self.derive_subkey("fingerprint"), data, hashlib.sha256).hexdigest()
+    
+    @staticmethod
+    @timed("crypto.kdf")
+    def derive_key_from_password(password, salt=None):
         """
         从密码派生加密密钥
         
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码导入模块
+可插拔的流式导入器：每种导出格式一个导入器类，逐条产出记录，
+统一交给 core.merge 的批量加密暂存和合并，导入大文件时内存占用保持不变
+
+支持的格式：Chrome/Firefox/Safari 导出的CSV、通用CSV、
+Bitwarden 未加密JSON（增量解析）和 KeePass 2 XML（iterparse 并及时清理元素）
+"""
+
+import csv
+import json
+import base64
+import struct
+from datetime import datetime, timedelta, timezone
+from xml.etree.ElementTree import iterparse
+
+from core.csv_import import IMPORT_BATCH_SIZE, read_csv_records, _service_name_from_url
+from core.metrics import timed
+
+
+# 格式检测时读取的文件头长度
+SNIFF_SIZE = 4096
+# 流式读取JSON时每次读取的字符数
+JSON_CHUNK_SIZE = 1 << 16
+# 流式读取JSON时单个值（如一个条目或被丢弃的顶层字段）的最大字符数，超过时视为无效文件
+JSON_MAX_VALUE_SIZE = 64 << 20
+
+# 已注册的导入器：名称 -> 导入器类（按注册顺序检测，通用格式最后注册）
+IMPORTERS = {}
+
+
+def register_importer(importer_class):
+    """注册导入器（类装饰器）"""
+    IMPORTERS[importer_class.name] = importer_class
+    return importer_class
+
+
+def _service_name(url, title):
+    """优先使用URL的域名作为服务名称，没有URL时使用标题"""
+    if url and url.strip():
+        return _service_name_from_url(url.strip())
+    return (title or "").strip()
+
+
+class Importer:
+    """
+    导入器基类
+
+    子类设置 name、label_key（界面显示名称的语言键）和 extensions，
+    并实现 detect 和 read
+    """
+
+    name = ""
+    label_key = ""
+    extensions = ()
+
+    def detect(self, head):
+        """
+        根据文件头判断是否为该格式
+
+        Args:
+            head (str): 文件开头的 SNIFF_SIZE 个字符
+
+        Returns:
+            bool: 是否匹配
+        """
+        raise NotImplementedError
+
+    def read(self, file_path):
+        """
+        逐条读取文件中的密码记录
+
+        Args:
+            file_path (str): 文件路径
+
+        Yields:
+            tuple: (service_name, username, password, updated_at)，updated_at 可为None
+        """
+        raise NotImplementedError
+
+
+class CsvImporter(Importer):
+    """按固定标题行识别的CSV导入器基类"""
+
+    extensions = (".csv",)
+    # 必须出现的列名（小写）
+    required_columns = frozenset()
+
+    def _header(self, head):
+        """解析文件头的标题行"""
+        first_line = head.lstrip('\ufeff').splitlines()[0] if head.strip() else ""
+        row = next(csv.reader([first_line]), [])
+        return [column.strip().lower() for column in row]
+
+    def detect(self, head):
+        return self.required_columns <= set(self._header(head))
+
+    def read(self, file_path):
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file)
+            header = [column.strip().lower() for column in next(reader, [])]
+            columns = {column: index for index, column in enumerate(header)}
+            width = len(header)
+            for row in reader:
+                if len(row) < width:
+                    row = row + [""] * (width - len(row))
+                record = self.convert({column: row[index] for column, index in columns.items()})
+                if record is not None:
+                    yield record
+
+    def convert(self, row):
+        """
+        将一行（列名 -> 值）转换为记录
+
+        Returns:
+            tuple or None: (service_name, username, password, updated_at)，无效行返回None
+        """
+        raise NotImplementedError
+
+
+@register_importer
+class FirefoxCsvImporter(CsvImporter):
+    """Firefox 导出的CSV（包含 httpRealm、formActionOrigin 和毫秒时间戳列）"""
+
+    name = "firefox_csv"
+    label_key = "importer_firefox_csv"
+    required_columns = frozenset({"url", "username", "password", "httprealm", "formactionorigin"})
+
+    def convert(self, row):
+        service_name = _service_name(row["url"], "")
+        if not service_name or not row["password"]:
+            return None
+        return (service_name, row["username"], row["password"],
+                row.get("timepasswordchanged") or None)
+
+
+@register_importer
+class SafariCsvImporter(CsvImporter):
+    """Safari 导出的CSV（Title, URL, Username, Password, Notes, OTPAuth）"""
+
+    name = "safari_csv"
+    label_key = "importer_safari_csv"
+    required_columns = frozenset({"title", "url", "username", "password", "otpauth"})
+
+    def convert(self, row):
+        service_name = _service_name(row["url"], row["title"])
+        if not service_name or not row["password"]:
+            return None
+        return service_name, row["username"], row["password"], None
+
+
+@register_importer
+class ChromeCsvImporter(CsvImporter):
+    """Chrome/Edge 导出的CSV（name, url, username, password[, note]）"""
+
+    name = "chrome_csv"
+    label_key = "importer_chrome_csv"
+    required_columns = frozenset({"name", "url", "username", "password"})
+
+    def convert(self, row):
+        service_name = _service_name(row["url"], row["name"])
+        if not service_name or not row["password"]:
+            return None
+        return service_name, row["username"], row["password"], None
+
+
+@register_importer
+class BitwardenJsonImporter(Importer):
+    """
+    Bitwarden 未加密JSON导出
+
+    文件只在顶层展开：items 数组中的条目逐个用 raw_decode 解码，
+    其他顶层字段（folders 等）整体解码后丢弃，缓冲区只保存尚未解码的部分
+    """
+
+    name = "bitwarden_json"
+    label_key = "importer_bitwarden_json"
+    extensions = (".json",)
+
+    # Bitwarden 条目类型：1 为登录信息
+    LOGIN_TYPE = 1
+
+    def detect(self, head):
+        stripped = head.lstrip('\ufeff').lstrip()
+        return stripped.startswith('{') and '"items"' in head and '"encrypted"' in head
+
+    def read(self, file_path):
+        for item in _iter_json_array(file_path, "items"):
+            if not isinstance(item, dict) or item.get("type") != self.LOGIN_TYPE:
+                continue
+            login = item.get("login") or {}
+            password = login.get("password")
+            if not password:
+                continue
+            uris = login.get("uris") or []
+            url = uris[0].get("uri") if uris and isinstance(uris[0], dict) else None
+            service_name = _service_name(url, item.get("name"))
+            if not service_name:
+                continue
+            updated_at = login.get("passwordRevisionDate") or item.get("revisionDate")
+            yield service_name, login.get("username") or "", password, updated_at
+
+
+class _JsonStream:
+    """
+    按需读取JSON文本的缓冲区
+
+    新读取的块先放在列表中，需要时才与缓冲区中尚未解码的部分合并一次；
+    一个值在缓冲区中解码失败时，至少再读取与缓冲区等长的内容后才重新解码，
+    很大的值总共只需解码和复制 O(log n) 次
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # 尚未合并到缓冲区的块及其总字符数
+        self.chunks = []
+        self.pending = 0
+
+    def read_chunk(self):
+        """读取一块内容放入待合并列表，文件结束时返回False"""
+        if self.eof:
+            return False
+        chunk = self.file.read(JSON_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.chunks.append(chunk)
+        self.pending += len(chunk)
+        return True
+
+    def merge(self):
+        """把待合并的块接到缓冲区中尚未解码的部分之后，已解码的部分丢弃"""
+        if not self.chunks:
+            return False
+        self.buffer = self.buffer[self.pos:] + "".join(self.chunks)
+        self.pos = 0
+        self.chunks = []
+        self.pending = 0
+        return True
+
+    def fill(self):
+        """读取更多内容（至少与缓冲区中尚未解码的部分等长），文件结束时返回False"""
+        remaining = len(self.buffer) - self.pos
+        if remaining > JSON_MAX_VALUE_SIZE:
+            raise ValueError(f"JSON格式无效：单个值超过 {JSON_MAX_VALUE_SIZE} 个字符")
+        target = max(remaining, 1)
+        while self.pending < target and self.read_chunk():
+            pass
+        return self.merge()
+
+    def next_char(self):
+        """跳过空白并返回下一个字符（不消耗），文件结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not (self.read_chunk() and self.merge()):
+                return ""
+
+    def expect(self, char):
+        """消耗指定的分隔符"""
+        if self.next_char() != char:
+            raise ValueError(f"JSON格式错误：此处应为 '{char}'")
+        self.pos += 1
+
+    def decode(self, decoder):
+        """解码一个完整的JSON值，缓冲区不足时继续读取"""
+        self.next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise ValueError("JSON格式错误或文件不完整")
+            # 数字可能在缓冲区末尾被截断（如 "1.5" 只读到 "1."），需要读到后续字符再确认
+            truncated = end == len(self.buffer) or (
+                isinstance(value, (int, float)) and self.buffer[end] in '.eE+-'
+            )
+            if truncated and self.read_chunk() and self.merge():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_array(file_path, key):
+    """
+    流式读取JSON对象中指定顶层键的数组元素
+
+    Args:
+        file_path (str): JSON文件路径
+        key (str): 顶层键
+
+    Yields:
+        数组中的每个元素
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8-sig') as file:
+        stream = _JsonStream(file)
+        stream.expect('{')
+        if stream.next_char() == '}':
+            return
+        while True:
+            name = stream.decode(decoder)
+            stream.expect(':')
+            if name == key and stream.next_char() == '[':
+                stream.expect('[')
+                if stream.next_char() == ']':
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.decode(decoder)
+                        if stream.next_char() == ',':
+                            stream.pos += 1
+                            continue
+                        stream.expect(']')
+                        break
+            else:
+                stream.decode(decoder)
+            if stream.next_char() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+# KeePass 时间的起点（KDBX 4 中时间保存为自该时刻起的秒数的Base64编码）
+_KEEPASS_EPOCH = datetime(1, 1, 1, tzinfo=timezone.utc)
+
+
+def _keepass_time(text):
+    """解析 KeePass 时间（ISO 8601 或 KDBX 4 的Base64秒数）"""
+    if not text:
+        return None
+    text = text.strip()
+    if 'T' in text or '-' in text:
+        return text
+    try:
+        seconds = struct.unpack('<q', base64.b64decode(text))[0]
+        return _KEEPASS_EPOCH + timedelta(seconds=seconds)
+    except (ValueError, struct.error, OverflowError):
+        return None
+
+
+@register_importer
+class KeePassXmlImporter(Importer):
+    """
+    KeePass 2 XML 导出
+
+    使用 iterparse 逐个处理 Entry，处理后立即从父元素中移除；
+    跳过历史版本（History 中的 Entry）和回收站中的条目
+    """
+
+    name = "keepass_xml"
+    label_key = "importer_keepass_xml"
+    extensions = (".xml",)
+
+    def detect(self, head):
+        return "<KeePassFile" in head
+
+    def read(self, file_path):
+        stack = []
+        # 每层 Group 的 UUID，用于判断条目是否在回收站中
+        group_uuids = []
+        recycle_bin = None
+        history_depth = 0
+        for event, element in iterparse(file_path, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                stack.append(element)
+                if tag == 'Group':
+                    group_uuids.append(None)
+                elif tag == 'History':
+                    history_depth += 1
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if tag == 'RecycleBinUUID':
+                recycle_bin = (element.text or "").strip() or None
+            elif tag == 'UUID' and parent is not None and parent.tag == 'Group':
+                group_uuids[-1] = (element.text or "").strip()
+            elif tag == 'History':
+                history_depth -= 1
+            elif tag == 'Group':
+                group_uuids.pop()
+                if parent is not None:
+                    parent.remove(element)
+            elif tag == 'Entry' and history_depth == 0:
+                in_recycle_bin = recycle_bin is not None and recycle_bin in group_uuids
+                record = None if in_recycle_bin else self._convert(element)
+                if parent is not None:
+                    parent.remove(element)
+                element.clear()
+                if record is not None:
+                    yield record
+
+    @staticmethod
+    def _convert(entry):
+        """将 Entry 元素转换为记录"""
+        fields = {}
+        for string in entry.iterfind('String'):
+            fields[string.findtext('Key', '')] = string.findtext('Value', '')
+        password = fields.get('Password')
+        if not password:
+            return None
+        service_name = _service_name(fields.get('URL'), fields.get('Title'))
+        if not service_name:
+            return None
+        updated_at = _keepass_time(entry.findtext('Times/LastModificationTime'))
+        return service_name, fields.get('UserName', ''), password, updated_at
+
+
+@register_importer
+class GenericCsvImporter(Importer):
+    """通用CSV：按标题行中的关键字猜测URL、用户名和密码列"""
+
+    name = "generic_csv"
+    label_key = "importer_generic_csv"
+    extensions = (".csv",)
+
+    def detect(self, head):
+        return bool(head.strip()) and not head.lstrip().startswith(('{', '<'))
+
+    def read(self, file_path):
+        for service_name, username, password in read_csv_records(file_path):
+            yield service_name, username, password, None
+
+
+def detect_importer(file_path):
+    """
+    根据文件内容选择导入器
+
+    Args:
+        file_path (str): 文件路径
+
+    Returns:
+        Importer or None: 匹配的导入器实例，无法识别时返回None
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        head = file.read(SNIFF_SIZE)
+    for importer_class in IMPORTERS.values():
+        importer = importer_class()
+        if importer.detect(head):
+            return importer
+    return None
+
+
+def get_importer(name):
+    """
+    按名称获取导入器
+
+    Args:
+        name (str): 导入器名称
+
+    Returns:
+        Importer: 导入器实例
+    """
+    if name not in IMPORTERS:
+        raise ValueError(f"未知的导入格式: {name}")
+    return IMPORTERS[name]()
+
+
+@timed("import.import_file")
+def import_file(db, file_path, importer=None, strategy=None, dry_run=False,
+                batch_size=IMPORT_BATCH_SIZE):
+    """
+    导入密码文件并与已有记录合并
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        file_path (str): 文件路径
+        importer (Importer): 导入器，None表示根据文件内容自动选择
+        strategy (str): 合并策略（见 core.merge），None表示跳过已存在的记录
+        dry_run (bool): 为True时只返回差异报告，不写入数据库
+        batch_size (int): 每批加密暂存的记录数
+
+    Returns:
+        dict: 合并结果，见 core.merge.merge_records
+    """
+    from core.merge import merge_records, STRATEGY_SKIP
+
+    if importer is None:
+        importer = detect_importer(file_path)
+        if importer is None:
+            raise ValueError("无法识别导入文件的格式！")
+    return merge_records(db, importer.read(file_path), strategy or STRATEGY_SKIP,
+                         dry_run, batch_size)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码库完整性校验模块
+流式读取全部记录，在多个进程中分批解密以校验每条密文的认证标签，
+并核对元数据（盐值、管理员密码校验值、密钥校验值、结构版本）和数据库文件结构。
+未验证管理员密码时只能检查元数据和密文格式
+"""
+
+import base64
+import binascii
+
+from core.metrics import timed
+
+
+# 字段名称（出现问题的列）
+FIELD_PASSWORD = "password"
+FIELD_SERVICE = "service_name"
+FIELD_USERNAME = "username"
+
+# 问题原因
+REASON_AUTH = "auth"        # 认证标签校验失败：密文被修改或密钥错误
+REASON_FORMAT = "format"    # 不是有效的Fernet令牌
+REASON_ENCODING = "encoding"    # 解密成功但不是有效的UTF-8文本
+
+# 元数据问题代码
+PROBLEM_SALT_MISSING = "salt_missing"
+PROBLEM_SALT_INVALID = "salt_invalid"
+PROBLEM_MASTER_HASH_MISSING = "master_hash_missing"
+PROBLEM_MASTER_HASH_INVALID = "master_hash_invalid"
+PROBLEM_KEY_MISMATCH = "key_mismatch"
+PROBLEM_SCHEMA_VERSION = "schema_version"
+PROBLEM_NAME_ENCRYPTION = "name_encryption"
+PROBLEM_STRUCTURE = "structure"
+
+# Fernet令牌：版本(1) 时间戳(8) IV(16) 密文(16的倍数，至少16) HMAC(32)
+_FERNET_VERSION = 0x80
+_FERNET_OVERHEAD = 57
+_FERNET_MIN_LENGTH = _FERNET_OVERHEAD + 16
+# 报告中最多列出的问题记录数
+REPORT_LIMIT = 10000
+
+
+def _token_format_ok(token):
+    """检查密文是否具有Fernet令牌的格式（不需要密钥）"""
+    try:
+        raw = base64.urlsafe_b64decode(token)
+    except (binascii.Error, ValueError, TypeError):
+        return False
+    return (len(raw) >= _FERNET_MIN_LENGTH and raw[0] == _FERNET_VERSION
+            and (len(raw) - _FERNET_OVERHEAD) % 16 == 0)
+
+
+def _check_field(encryption, token):
+    """检查单个加密字段，返回问题原因，正常时返回None"""
+    if encryption is None:
+        return None if _token_format_ok(token) else REASON_FORMAT
+    try:
+        encryption.cipher.decrypt(token).decode('utf-8')
+    except UnicodeDecodeError:
+        return REASON_ENCODING
+    except Exception:
+        return REASON_AUTH if _token_format_ok(token) else REASON_FORMAT
+    return None
+
+
+def _verify_batch(encryption, job):
+    """
+    校验一批记录（在工作进程中执行，只返回有问题的记录ID，明文不离开该进程）
+
+    Args:
+        job (tuple): (name_encryption, rows)，rows 为 iter_encrypted 返回的记录
+
+    Returns:
+        tuple: (校验的记录数, [(id, 字段, 原因), ...])
+    """
+    name_encryption, rows = job
+    bad = []
+    for record_id, service_name, username, encrypted_password in rows:
+        fields = [(FIELD_PASSWORD, encrypted_password)]
+        if name_encryption:
+            fields.append((FIELD_SERVICE, service_name.encode('ascii', 'replace')))
+            fields.append((FIELD_USERNAME, username.encode('ascii', 'replace')))
+        for field, token in fields:
+            reason = _check_field(encryption, token)
+            if reason is not None:
+                bad.append((record_id, field, reason))
+    return len(rows), bad
+
+
+def check_metadata(db):
+    """
+    核对元数据和数据库文件结构
+
+    Args:
+        db (PasswordDatabase): 数据库实例
+
+    Returns:
+        list: (问题代码, 说明) 列表，没有问题时为空列表
+    """
+    from core.database import SCHEMA_VERSION
+
+    problems = []
+    salt = db.get_metadata('salt')
+    if salt is None:
+        problems.append((PROBLEM_SALT_MISSING, ""))
+    else:
+        try:
+            if len(bytes.fromhex(salt)) != 16:
+                problems.append((PROBLEM_SALT_INVALID, salt))
+        except ValueError:
+            problems.append((PROBLEM_SALT_INVALID, salt))
+
+    master_hash = db.get_master_password_hash()
+    if master_hash is None:
+        problems.append((PROBLEM_MASTER_HASH_MISSING, ""))
+    elif len(master_hash) != 128 or any(c not in "0123456789abcdef" for c in master_hash):
+        problems.append((PROBLEM_MASTER_HASH_INVALID, master_hash[:16]))
+
+    if db.encryption is not None:
+        key_check = db.get_metadata('key_check')
+        if key_check is not None and key_check != db.key_check_value():
+            problems.append((PROBLEM_KEY_MISMATCH, ""))
+
+    schema_version = db.get_metadata('schema_version')
+    if schema_version != str(SCHEMA_VERSION):
+        problems.append((PROBLEM_SCHEMA_VERSION, f"{schema_version} != {SCHEMA_VERSION}"))
+
+    name_encryption = db.get_metadata('name_encryption')
+    if name_encryption not in (None, '0', '1'):
+        problems.append((PROBLEM_NAME_ENCRYPTION, name_encryption))
+
+    messages = db.quick_check()
+    if messages != ["ok"]:
+        problems.append((PROBLEM_STRUCTURE, "; ".join(messages[:10])))
+    return problems
+
+
+@timed("integrity.verify_vault")
+def verify_vault(db, batch_size=None, workers=None, progress=None):
+    """
+    校验整个密码库
+
+    已验证管理员密码时解密每条记录以校验认证标签（名称加密时同时校验服务名称和用户名），
+    未验证或密钥与密钥校验值不符时只检查密文格式
+
+    Args:
+        db (PasswordDatabase): 数据库实例
+        batch_size (int): 每批校验的记录数，None表示使用默认配置
+        workers (int): 并行校验的进程数，None表示使用默认配置
+        progress (callable): 进度回调，参数为已校验的记录数
+
+    Returns:
+        dict: 校验报告
+            total: 校验的记录数
+            authenticated: 是否解密校验了认证标签
+            bad: 有问题的记录列表（id, field, reason），最多 REPORT_LIMIT 条
+            bad_count: 有问题的记录总数
+            problems: 元数据问题列表，见 check_metadata
+    """
+    from config.settings import VAULT_SCAN_BATCH_SIZE, VAULT_SCAN_WORKERS
+    from core.parallel import map_batches
+
+    if batch_size is None:
+        batch_size = VAULT_SCAN_BATCH_SIZE
+    if workers is None:
+        workers = VAULT_SCAN_WORKERS
+
+    problems = check_metadata(db)
+    encryption = db.encryption
+    if any(code == PROBLEM_KEY_MISMATCH for code, _ in problems):
+        # 密钥错误时每条记录都会解密失败，只检查密文格式
+        encryption = None
+    if encryption is None:
+        # 格式检查很快，无需启动工作进程
+        workers = 1
+    jobs = ((db.name_encryption, rows) for rows in db.iter_encrypted(batch_size))
+
+    total = 0
+    bad = []
+    bad_ids = set()
+    for count, failures in map_batches(_verify_batch, jobs, encryption, workers):
+        total += count
+        for record_id, field, reason in failures:
+            bad_ids.add(record_id)
+            if len(bad) < REPORT_LIMIT:
+                bad.append({'id': record_id, 'field': field, 'reason': reason})
+        if progress is not None:
+            progress(total)
+    return {
+        'total': total,
+        'authenticated': encryption is not None,
+        'bad': bad,
+        'bad_count': len(bad_ids),
+        'problems': problems,
+    }
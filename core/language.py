@@ -24,7 +24,7 @@ class LanguageManager(QObject):
                 "app_title": "2FA Password Manager",
                 "show_qr": "Show QR Code",
                 "add_password": "Add Password",
-                "import_csv": "Import CSV",
+                "import_csv": "Import",
                 "edit_password": "Edit Password",
                 "delete_password": "Delete Password",
                 "refresh_list": "Refresh List",
@@ -67,12 +67,12 @@ class LanguageManager(QObject):
                 
                 # 清空数据
                 "confirm_reset": "Confirm Reset",
-                "reset_message": "Are you sure you want to clear all data and unbind 2FA? This operation cannot be undone!",
+                "reset_message": "Are you sure you want to clear all data, including snapshots, and unbind 2FA? This operation cannot be undone!",
                 "reset_success": "All data cleared!",
                 "reset_failed": "Failed to clear data",
                 
                 # 导入CSV
-                "import_csv_title": "Select CSV File",
+                "import_csv_title": "Select File to Import",
                 "csv_filter": "CSV Files (*.csv)",
                 "bind_2fa_first": "Warning",
                 "bind_2fa_message": "Please bind 2FA device before importing passwords!",
@@ -100,6 +100,7 @@ class LanguageManager(QObject):
                 "hide": "Hide",
                 "copy": "Copy",
                 "close": "Close",
+                "warning": "Warning",
                 "copy_success": "Success",
                 "copy_success_message": "Password copied to clipboard",
                 "copy_failed": "Copy failed: {error}",
@@ -153,13 +154,235 @@ class LanguageManager(QObject):
                 "2fa_verification": "2FA Verification",
                 "enter_6_digit_code": "Please enter 6-digit code:",
                 "2fa_required_to_change_password": "2FA verification is required to change password",
+
+                # 性能统计
+                "tools_menu": "Tools",
+                "stats_menu": "Performance Statistics...",
+                "stats_title": "Performance Statistics",
+                "stats_enable": "Enable instrumentation",
+                "stats_operation": "Operation",
+                "stats_count": "Count",
+                "stats_errors": "Errors",
+                "stats_export": "Export",
+                "stats_reset": "Reset",
+                "stats_exported": "Metrics written to:\n{json_file}\n{prom_file}",
+
+                # 泄露密码检查
+                "breach_menu": "Check Breached Passwords...",
+                "breach_title": "Breached Password Check",
+                "breach_select_file": "Select breach index or HIBP SHA-1 list",
+                "breach_file_filter": "Breach index (*.idx);;HIBP SHA-1 list (*.txt)",
+                "breach_building": "Building breach index...",
+                "breach_scanning": "Scanning vault: {count} entries checked",
+                "breach_none": "No vault entries were found in the breach list.",
+                "breach_found": "{count} entries use a password found in the breach list. Please change them.",
+                "breach_failed": "Breach check failed: {error}",
+
+                # 密码审计
+                "audit_menu": "Password Audit...",
+                "audit_title": "Password Audit",
+                "audit_summary": "Audited {total} entries: {reused} share a password with another entry, {weak} are weak, {old} have not been changed for a long time.",
+                "audit_reused": "Reused",
+                "audit_weak": "Weak",
+                "audit_old": "Old",
+                "audit_group": "Group",
+                "audit_entropy": "Entropy (bits)",
+                "audit_updated_at": "Updated At",
+                "audit_running": "Auditing vault: {count} entries checked",
+                "audit_failed": "Password audit failed: {error}",
+                "password_reused": "Password Reused",
+                "password_reused_message": "This password is already used by {count} other entries. Save anyway?",
+
+                # 名称加密与搜索
+                "search_placeholder": "Search by service name or username prefix...",
+                "name_encryption_menu": "Encrypt Service Names and Usernames",
+                "name_encryption_enable_confirm": "Encrypt all service names and usernames? Searching will then require the master password.",
+                "name_encryption_disable_confirm": "Store service names and usernames in plain text again?",
+                "name_encryption_failed": "Failed to convert names: {error}",
+
+                # 导入合并
+                "import_strategy_title": "Import Options",
+                "import_strategy_prompt": "When an entry with the same service and username already exists:",
+                "import_strategy_skip": "Keep the existing entry",
+                "import_strategy_overwrite": "Overwrite with the imported password",
+                "import_strategy_newest": "Keep whichever was changed more recently",
+                "import_preview_title": "Import Preview",
+                "import_preview_message": "{new} new, {updated} updated, {unchanged} unchanged, {skipped} kept as is, {duplicates} duplicates in the file.\nImport now?",
+                "import_nothing": "Nothing to import: {unchanged} unchanged, {skipped} kept as is.",
+                "import_action_new": "New",
+                "import_action_update": "Update",
+                "import_action_skip": "Keep",
+                "import_result": "Imported {new} new and updated {updated} entries",
+
+                # 导入格式
+                "import_file_filter": "Supported files (*.csv *.json *.xml);;All files (*)",
+                "import_unknown_format": "Unrecognized file format. Supported: Chrome/Firefox/Safari CSV, Bitwarden JSON (unencrypted), KeePass 2 XML and CSV files with URL, username and password columns.",
+                "import_detected": "Importing {format}...",
+                "importer_chrome_csv": "Chrome/Edge CSV",
+                "importer_firefox_csv": "Firefox CSV",
+                "importer_safari_csv": "Safari CSV",
+                "importer_bitwarden_json": "Bitwarden JSON",
+                "importer_keepass_xml": "KeePass 2 XML",
+                "importer_generic_csv": "CSV",
+
+                # 加密导出与恢复
+                "export_menu": "Export Encrypted Backup...",
+                "restore_menu": "Restore from Encrypted Backup...",
+                "export_title": "Export Encrypted Backup",
+                "restore_title": "Restore from Encrypted Backup",
+                "export_file_filter": "Encrypted backup (*.tfapm);;All files (*)",
+                "export_password_title": "Backup Password",
+                "export_password_label": "Backup password:",
+                "export_password_required": "Please enter a backup password",
+                "export_running": "Exported {count} entries...",
+                "export_done": "Exported {count} entries",
+                "export_unreadable": "{count} entries could not be decrypted and were left out (ids in details).",
+                "export_failed": "Export failed: {error}",
+                "reset_export_prompt": "Export an encrypted backup before clearing all data?",
+
+                # 快照备份
+                "snapshot_menu": "Create Snapshot",
+                "restore_snapshot_menu": "Restore from Snapshot...",
+                "snapshot_running": "Creating snapshot...",
+                "snapshot_done": "Snapshot created and verified: {name}",
+                "snapshot_failed": "Snapshot failed: {error}",
+                "snapshot_corrupt": "Snapshot {name} failed the integrity check: {error}",
+                "snapshot_none": "No snapshots yet",
+                "restore_snapshot_title": "Restore from Snapshot",
+                "restore_snapshot_select": "Select a snapshot to restore:",
+                "restore_snapshot_confirm": "The vault will be replaced with the snapshot taken at {time}. A snapshot of the current vault is created first. Continue?",
+                "restore_snapshot_done": "Snapshot restored. The previous vault was saved as {name}. Please verify the master password again.",
+                "restore_snapshot_failed": "Restore failed: {error}",
+
+                # 完整性校验
+                "verify_menu": "Verify Vault Integrity",
+                "verify_running": "Verifying... {count} entries checked",
+                "verify_failed": "Verification failed: {error}",
+                "verify_title": "Vault Integrity",
+                "verify_ok": "All {total} entries and the vault metadata passed verification",
+                "verify_format_only": "(master password not verified: only the ciphertext format was checked)",
+                "verify_issues": "Checked {total} entries: {bad_count} damaged entries, {problem_count} metadata problems. See details for the entry IDs.",
+                "verify_bad_entry": "Entry {id}: {field} - {reason}",
+                "verify_field_password": "password",
+                "verify_field_service_name": "service name",
+                "verify_field_username": "username",
+                "verify_reason_auth": "authentication failed (modified or wrong key)",
+                "verify_reason_format": "not a valid ciphertext",
+                "verify_reason_encoding": "decrypted to invalid text",
+                "verify_problem_salt_missing": "Key salt is missing",
+                "verify_problem_salt_invalid": "Key salt is invalid",
+                "verify_problem_master_hash_missing": "Master password verifier is missing",
+                "verify_problem_master_hash_invalid": "Master password verifier is invalid",
+                "verify_problem_key_mismatch": "The current key does not match the vault key check value",
+                "verify_problem_schema_version": "Unexpected schema version",
+                "verify_problem_name_encryption": "Invalid name encryption flag",
+                "verify_problem_structure": "Database file structure is damaged",
+
+                # 密码历史版本
+                "history_label": "Previous passwords ({count}, double-click to show):",
+                "history_item": "Replaced {changed_at}    {password}",
+                "history_copy": "Copy Selected Version",
+
+                # 文件夹和标签
+                "sidebar_all": "All Entries",
+                "sidebar_folders": "Folders",
+                "sidebar_unfiled": "Unfiled",
+                "sidebar_tags": "Tags ({count})",
+                "sidebar_load_more": "Load more ({count} remaining)...",
+                "folder_new": "New Folder...",
+                "folder_rename": "Rename Folder...",
+                "folder_delete": "Delete Folder",
+                "folder_delete_confirm": "Delete this folder and its subfolders? Entries in them are kept and become unfiled.",
+                "folder_name_prompt": "Folder name:",
+                "tag_rename": "Rename Tag...",
+                "tag_delete": "Delete Tag",
+                "tag_delete_confirm": "Delete this tag? Entries are kept.",
+                "tag_name_prompt": "Tag name:",
+                "folder_label": "Folder:",
+                "tags_label": "Tags:",
+                "tags_placeholder": "Comma separated",
+                "no_folder": "(None)",
+
+                # 使用统计和排序
+                "sort_name": "Sort by name",
+                "sort_username": "Sort by username",
+                "sort_created": "Newest first",
+                "sort_updated": "Recently modified",
+                "sort_recent": "Recently used",
+                "sort_frequent": "Most used",
+
+                # 多密码库
+                "vaults_menu": "Search All Vaults...",
+                "vault_search_title": "Search All Vaults",
+                "vault_column": "Vault",
+                "vault_unlock": "Unlock Vaults...",
+                "vault_add": "Add Vault...",
+                "vault_summary": "{count} vaults, {locked} locked (names encrypted; unlock to include them)",
+                "vault_password_prompt": "Master password for vault \"{name}\":",
+                "vault_unlock_failed": "Incorrect master password: {names}",
+
+                # 密码库同步
+                "sync_menu": "Sync with Vault...",
+                "sync_title": "Sync with Vault",
+                "sync_same_vault": "Cannot sync a vault with itself",
+                "sync_running": "Syncing...",
+                "sync_done": "Sync complete: {received} changes received, {sent} sent, {merged} duplicates merged",
+                "sync_failed": "Sync failed: {error}",
+
+                # 安全笔记和附件
+                "note_label": "Secure note:",
+                "note_save": "Save Note",
+                "note_saved": "The note has been saved",
+                "attachments_label": "Attachments ({count}):",
+                "attachment_item": "{name} ({size})",
+                "attachment_add": "Add Attachment...",
+                "attachment_save": "Save As...",
+                "attachment_delete": "Delete Attachment",
+                "attachment_delete_confirm": "Delete attachment \"{name}\"?",
+                "attachment_saved": "Saved to {path}",
+
+                # 批量操作
+                "bulk_menu": "Selection",
+                "bulk_delete": "Delete Selected",
+                "bulk_add_tags": "Add Tags...",
+                "bulk_remove_tag": "Remove Tag...",
+                "bulk_move": "Move to Folder...",
+                "bulk_rotate": "Rotate Passwords",
+                "bulk_export": "Export Selected...",
+                "bulk_verify_title": "Verify 2FA",
+                "bulk_verify_message": "Verify 2FA to change {count} entries:",
+                "bulk_delete_confirm": "Delete the {count} selected entries?",
+                "bulk_deleted": "Deleted {count} entries",
+                "bulk_tags_prompt": "Tags to add (comma separated):",
+                "bulk_tagged": "Added {count} tags to the selected entries",
+                "bulk_remove_tag_prompt": "Tag to remove:",
+                "bulk_no_tags": "There are no tags yet",
+                "bulk_untagged": "Removed the tag from {count} entries",
+                "bulk_move_prompt": "Move to folder:",
+                "bulk_no_folder": "(No folder)",
+                "bulk_moved": "Moved {count} entries",
+                "bulk_rotate_confirm": "Generate new random passwords for the {count} selected entries? The old passwords are kept in the password history.",
+                "bulk_rotated": "Changed {count} passwords",
+                "bulk_failed": "Operation failed: {error}",
+
+                # 密码生成器
+                "generate_password": "Generate",
+                "generate_random": "Random password",
+                "generate_passphrase": "Passphrase",
+
+                # 快速切换面板
+                "quick_switcher_menu": "Quick Switcher...",
+                "quick_switcher_title": "Quick Switcher",
+                "quick_switcher_placeholder": "Type part of a service name or username, e.g. gthb for github",
+                "quick_switcher_building": "Building the search index...",
+                "quick_switcher_failed": "Failed to build the search index: {error}",
             },
             "zh": {
                 # 主窗口
                 "app_title": "2FA密码管理器",
                 "show_qr": "显示配对二维码",
                 "add_password": "添加密码",
-                "import_csv": "导入CSV",
+                "import_csv": "导入",
                 "edit_password": "编辑密码",
                 "delete_password": "删除密码",
                 "refresh_list": "刷新列表",
@@ -202,12 +425,12 @@ class LanguageManager(QObject):
                 
                 # 清空数据
                 "confirm_reset": "确认清空",
-                "reset_message": "确定要清空所有数据并解绑2FA吗？此操作不可恢复！",
+                "reset_message": "确定要清空所有数据（包括快照）并解绑2FA吗？此操作不可恢复！",
                 "reset_success": "所有数据已清空！",
                 "reset_failed": "清空数据失败",
                 
                 # 导入CSV
-                "import_csv_title": "选择CSV文件",
+                "import_csv_title": "选择要导入的文件",
                 "csv_filter": "CSV文件 (*.csv)",
                 "bind_2fa_first": "警告",
                 "bind_2fa_message": "请先绑定2FA设备再导入密码！",
@@ -235,6 +458,7 @@ class LanguageManager(QObject):
                 "hide": "隐藏",
                 "copy": "复制",
                 "close": "关闭",
+                "warning": "警告",
                 "copy_success": "成功",
                 "copy_success_message": "密码已复制到剪贴板",
                 "copy_failed": "复制密码失败: {error}",
@@ -288,6 +512,228 @@ class LanguageManager(QObject):
                 "2fa_verification": "2FA验证",
                 "enter_6_digit_code": "请输入6位验证码:",
                 "2fa_required_to_change_password": "必须通过2FA验证才能更改密码",
+
+                # 性能统计
+                "tools_menu": "工具",
+                "stats_menu": "性能统计...",
+                "stats_title": "性能统计",
+                "stats_enable": "启用性能指标记录",
+                "stats_operation": "操作",
+                "stats_count": "次数",
+                "stats_errors": "错误",
+                "stats_export": "导出",
+                "stats_reset": "清空",
+                "stats_exported": "指标已写入:\n{json_file}\n{prom_file}",
+
+                # 泄露密码检查
+                "breach_menu": "检查泄露密码...",
+                "breach_title": "泄露密码检查",
+                "breach_select_file": "选择泄露密码索引或HIBP SHA-1列表",
+                "breach_file_filter": "泄露密码索引 (*.idx);;HIBP SHA-1列表 (*.txt)",
+                "breach_building": "正在构建泄露密码索引...",
+                "breach_scanning": "正在扫描密码库：已检查 {count} 条记录",
+                "breach_none": "未发现出现在泄露列表中的密码。",
+                "breach_found": "{count} 条记录使用了出现在泄露列表中的密码，请尽快修改。",
+                "breach_failed": "泄露密码检查失败: {error}",
+
+                # 密码审计
+                "audit_menu": "密码审计...",
+                "audit_title": "密码审计",
+                "audit_summary": "共审计 {total} 条记录：{reused} 条与其他记录使用相同密码，{weak} 条为弱密码，{old} 条长期未修改。",
+                "audit_reused": "重复使用",
+                "audit_weak": "弱密码",
+                "audit_old": "长期未修改",
+                "audit_group": "分组",
+                "audit_entropy": "熵（比特）",
+                "audit_updated_at": "更新时间",
+                "audit_running": "正在审计密码库：已检查 {count} 条记录",
+                "audit_failed": "密码审计失败: {error}",
+                "password_reused": "密码重复",
+                "password_reused_message": "该密码已被其他 {count} 条记录使用，仍要保存吗？",
+
+                # 名称加密与搜索
+                "search_placeholder": "按服务名称或用户名前缀搜索...",
+                "name_encryption_menu": "加密服务名称和用户名",
+                "name_encryption_enable_confirm": "确定要加密所有服务名称和用户名吗？加密后搜索需要先验证管理员密码。",
+                "name_encryption_disable_confirm": "确定要恢复以明文存储服务名称和用户名吗？",
+                "name_encryption_failed": "转换名称失败: {error}",
+
+                # 导入合并
+                "import_strategy_title": "导入选项",
+                "import_strategy_prompt": "已存在相同服务名称和用户名的记录时：",
+                "import_strategy_skip": "保留已有记录",
+                "import_strategy_overwrite": "用导入的密码覆盖",
+                "import_strategy_newest": "保留修改时间较新的一条",
+                "import_preview_title": "导入预览",
+                "import_preview_message": "新增 {new} 条，覆盖 {updated} 条，未变化 {unchanged} 条，保留原记录 {skipped} 条，文件内重复 {duplicates} 条。\n是否立即导入？",
+                "import_nothing": "没有需要导入的记录：未变化 {unchanged} 条，保留原记录 {skipped} 条。",
+                "import_action_new": "新增",
+                "import_action_update": "覆盖",
+                "import_action_skip": "保留",
+                "import_result": "成功导入 {new} 条新记录，覆盖 {updated} 条记录",
+
+                # 导入格式
+                "import_file_filter": "支持的文件 (*.csv *.json *.xml);;所有文件 (*)",
+                "import_unknown_format": "无法识别文件格式。支持 Chrome/Firefox/Safari 导出的CSV、Bitwarden JSON（未加密）、KeePass 2 XML，以及包含URL、用户名和密码列的CSV文件。",
+                "import_detected": "正在导入 {format}...",
+                "importer_chrome_csv": "Chrome/Edge CSV",
+                "importer_firefox_csv": "Firefox CSV",
+                "importer_safari_csv": "Safari CSV",
+                "importer_bitwarden_json": "Bitwarden JSON",
+                "importer_keepass_xml": "KeePass 2 XML",
+                "importer_generic_csv": "CSV",
+
+                # 加密导出与恢复
+                "export_menu": "导出加密备份...",
+                "restore_menu": "从加密备份恢复...",
+                "export_title": "导出加密备份",
+                "restore_title": "从加密备份恢复",
+                "export_file_filter": "加密备份 (*.tfapm);;所有文件 (*)",
+                "export_password_title": "备份密码",
+                "export_password_label": "备份密码:",
+                "export_password_required": "请输入备份密码",
+                "export_running": "已导出 {count} 条记录...",
+                "export_done": "成功导出 {count} 条记录",
+                "export_unreadable": "{count} 条记录无法解密，未包含在备份中（ID见详细信息）。",
+                "export_failed": "导出失败: {error}",
+                "reset_export_prompt": "清空前是否先导出加密备份？",
+
+                # 快照备份
+                "snapshot_menu": "创建快照",
+                "restore_snapshot_menu": "从快照恢复...",
+                "snapshot_running": "正在创建快照...",
+                "snapshot_done": "快照已创建并通过完整性检查: {name}",
+                "snapshot_failed": "创建快照失败: {error}",
+                "snapshot_corrupt": "快照 {name} 未通过完整性检查: {error}",
+                "snapshot_none": "暂无快照",
+                "restore_snapshot_title": "从快照恢复",
+                "restore_snapshot_select": "选择要恢复的快照:",
+                "restore_snapshot_confirm": "当前密码库将被替换为 {time} 的快照，恢复前会先为当前密码库创建快照。是否继续？",
+                "restore_snapshot_done": "已从快照恢复，恢复前的密码库已保存为 {name}。请重新验证管理员密码。",
+                "restore_snapshot_failed": "恢复失败: {error}",
+
+                # 完整性校验
+                "verify_menu": "校验密码库完整性",
+                "verify_running": "正在校验... 已检查 {count} 条记录",
+                "verify_failed": "校验失败: {error}",
+                "verify_title": "密码库完整性",
+                "verify_ok": "全部 {total} 条记录和密码库元数据均通过校验",
+                "verify_format_only": "（未验证管理员密码，仅检查了密文格式）",
+                "verify_issues": "已检查 {total} 条记录：{bad_count} 条记录损坏，{problem_count} 项元数据问题，详细信息中列出了记录ID。",
+                "verify_bad_entry": "记录 {id}：{field} - {reason}",
+                "verify_field_password": "密码",
+                "verify_field_service_name": "服务名称",
+                "verify_field_username": "用户名",
+                "verify_reason_auth": "认证失败（已被修改或密钥错误）",
+                "verify_reason_format": "不是有效的密文",
+                "verify_reason_encoding": "解密结果不是有效文本",
+                "verify_problem_salt_missing": "缺少密钥盐值",
+                "verify_problem_salt_invalid": "密钥盐值无效",
+                "verify_problem_master_hash_missing": "缺少管理员密码校验值",
+                "verify_problem_master_hash_invalid": "管理员密码校验值无效",
+                "verify_problem_key_mismatch": "当前密钥与密码库的密钥校验值不符",
+                "verify_problem_schema_version": "结构版本不符",
+                "verify_problem_name_encryption": "名称加密标志无效",
+                "verify_problem_structure": "数据库文件结构已损坏",
+
+                # 密码历史版本
+                "history_label": "历史版本（{count} 个，双击显示）:",
+                "history_item": "{changed_at} 被替换    {password}",
+                "history_copy": "复制所选版本",
+
+                # 文件夹和标签
+                "sidebar_all": "全部记录",
+                "sidebar_folders": "文件夹",
+                "sidebar_unfiled": "未归档",
+                "sidebar_tags": "标签（{count}）",
+                "sidebar_load_more": "加载更多（还有 {count} 个）...",
+                "folder_new": "新建文件夹...",
+                "folder_rename": "重命名文件夹...",
+                "folder_delete": "删除文件夹",
+                "folder_delete_confirm": "确定删除该文件夹及其子文件夹吗？其中的记录会保留并移出文件夹。",
+                "folder_name_prompt": "文件夹名称:",
+                "tag_rename": "重命名标签...",
+                "tag_delete": "删除标签",
+                "tag_delete_confirm": "确定删除该标签吗？记录不受影响。",
+                "tag_name_prompt": "标签名称:",
+                "folder_label": "文件夹:",
+                "tags_label": "标签:",
+                "tags_placeholder": "用逗号分隔",
+                "no_folder": "（无）",
+
+                # 使用统计和排序
+                "sort_name": "按名称排序",
+                "sort_username": "按用户名排序",
+                "sort_created": "最新添加",
+                "sort_updated": "最近修改",
+                "sort_recent": "最近使用",
+                "sort_frequent": "最常使用",
+
+                # 多密码库
+                "vaults_menu": "搜索所有密码库...",
+                "vault_search_title": "搜索所有密码库",
+                "vault_column": "密码库",
+                "vault_unlock": "解锁密码库...",
+                "vault_add": "添加密码库...",
+                "vault_summary": "共 {count} 个密码库，{locked} 个未解锁（名称已加密，解锁后才能搜索）",
+                "vault_password_prompt": "密码库“{name}”的管理员密码：",
+                "vault_unlock_failed": "管理员密码错误：{names}",
+
+                # 密码库同步
+                "sync_menu": "与密码库同步...",
+                "sync_title": "与密码库同步",
+                "sync_same_vault": "不能与当前密码库自身同步",
+                "sync_running": "正在同步...",
+                "sync_done": "同步完成：收到 {received} 项变更，发出 {sent} 项，合并 {merged} 条重复记录",
+                "sync_failed": "同步失败：{error}",
+
+                # 安全笔记和附件
+                "note_label": "安全笔记：",
+                "note_save": "保存笔记",
+                "note_saved": "笔记已保存",
+                "attachments_label": "附件（{count}）：",
+                "attachment_item": "{name}（{size}）",
+                "attachment_add": "添加附件...",
+                "attachment_save": "另存为...",
+                "attachment_delete": "删除附件",
+                "attachment_delete_confirm": "确定要删除附件“{name}”吗？",
+                "attachment_saved": "已保存到 {path}",
+
+                # 批量操作
+                "bulk_menu": "批量操作",
+                "bulk_delete": "删除选中的记录",
+                "bulk_add_tags": "添加标签...",
+                "bulk_remove_tag": "移除标签...",
+                "bulk_move": "移动到文件夹...",
+                "bulk_rotate": "更换密码",
+                "bulk_export": "导出选中的记录...",
+                "bulk_verify_title": "验证2FA",
+                "bulk_verify_message": "请验证2FA以修改 {count} 条记录:",
+                "bulk_delete_confirm": "确定要删除选中的 {count} 条记录吗？",
+                "bulk_deleted": "已删除 {count} 条记录",
+                "bulk_tags_prompt": "要添加的标签（用逗号分隔）:",
+                "bulk_tagged": "已为选中的记录添加 {count} 个标签",
+                "bulk_remove_tag_prompt": "要移除的标签:",
+                "bulk_no_tags": "还没有标签",
+                "bulk_untagged": "已从 {count} 条记录移除标签",
+                "bulk_move_prompt": "移动到文件夹:",
+                "bulk_no_folder": "（不放入文件夹）",
+                "bulk_moved": "已移动 {count} 条记录",
+                "bulk_rotate_confirm": "确定要为选中的 {count} 条记录生成新的随机密码吗？旧密码会保留在密码历史中。",
+                "bulk_rotated": "已更换 {count} 个密码",
+                "bulk_failed": "操作失败: {error}",
+
+                # 密码生成器
+                "generate_password": "生成",
+                "generate_random": "随机密码",
+                "generate_passphrase": "口令短语",
+
+                # 快速切换面板
+                "quick_switcher_menu": "快速切换...",
+                "quick_switcher_title": "快速切换",
+                "quick_switcher_placeholder": "输入服务名称或用户名的一部分，例如 gthb 可找到 github",
+                "quick_switcher_building": "正在建立搜索索引...",
+                "quick_switcher_failed": "建立搜索索引失败: {error}",
             }
         }
     
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+列表缓存模块
+把按名称排序的完整列表（ID、服务名称、用户名、时间戳）保存在密码库旁边的缓存文件中，
+启动时直接从缓存文件显示第一屏，不必等待数据库查询
+
+- 文件由固定的文件头、段表和按8字节对齐的各列组成，各列就是内存中 ListingSnapshot 的数组，
+  通过 mmap 映射后每列整块复制，不逐行解析
+- 文件头记录密码库的副本ID、是否加密名称和列表变更计数器（由数据库触发器维护）。
+  计数器与密码库一致时缓存就是最新的；不一致时先显示缓存，再由后台读取数据库后替换
+- 加密名称时列表中本来就没有名称（只有ID和时间戳），缓存文件不会包含解密后的名称
+- 文件先写入临时文件再原子地替换，损坏或不完整的缓存文件（CRC校验失败）会被忽略
+"""
+
+import os
+import sys
+import mmap
+import zlib
+import struct
+import threading
+from pathlib import Path
+
+from config.settings import LISTING_CACHE_SUFFIX
+from core.database import ORDER_NAME
+from core.metrics import timed
+from core.records import ListingSnapshot
+
+
+# 文件头：魔数、格式版本、标志、列表变更计数器、行数、副本ID、段数、段表和各列的CRC32
+_MAGIC = b"2FAPMLST"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ32sII")
+# 段表中的一项：偏移、长度
+_SECTION = struct.Struct("<QQ")
+_ALIGNMENT = 8
+
+# 标志位
+_FLAG_NAME_ENCRYPTION = 1
+_FLAG_BIG_ENDIAN = 2
+_NATIVE_FLAGS = _FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+
+
+def _flags(name_encryption):
+    """文件头中的标志（数组按本机字节序保存，换了字节序的机器上缓存无效）"""
+    return _NATIVE_FLAGS | (_FLAG_NAME_ENCRYPTION if name_encryption else 0)
+
+
+def _padding(size):
+    """对齐到8字节需要补充的字节数"""
+    return -size % _ALIGNMENT
+
+
+def encode_listing(snapshot, version, replica_id, name_encryption):
+    """
+    把列表快照编码为缓存文件内容
+
+    Args:
+        snapshot (ListingSnapshot): 列表快照
+        version (int): 读取列表之前的列表变更计数器
+        replica_id (str): 密码库的副本ID
+        name_encryption (bool): 密码库是否加密名称
+
+    Returns:
+        bytes: 文件内容
+    """
+    buffers = [memoryview(buffer).cast('B') for buffer in snapshot.to_buffers()]
+    table_size = _SECTION.size * len(buffers)
+    offset = _HEADER.size + table_size + _padding(_HEADER.size + table_size)
+    table = bytearray()
+    body = bytearray()
+    for buffer in buffers:
+        table += _SECTION.pack(offset, buffer.nbytes)
+        body += buffer
+        body += bytes(_padding(buffer.nbytes))
+        offset += buffer.nbytes + _padding(buffer.nbytes)
+    table += bytes(_padding(_HEADER.size + len(table)))
+    crc = zlib.crc32(body, zlib.crc32(table))
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, _flags(name_encryption), version, len(snapshot),
+                          replica_id.encode('ascii'), len(buffers), crc)
+    return b"".join((header, table, body))
+
+
+def decode_listing(data):
+    """
+    解析缓存文件内容（可以是 mmap 对象）
+
+    Returns:
+        tuple: (ListingSnapshot, 列表变更计数器, 副本ID, 是否加密名称)
+
+    Raises:
+        ValueError: 文件格式不对、已损坏或来自字节序不同的机器
+    """
+    view = memoryview(data)
+    sections = []
+    try:
+        if len(view) < _HEADER.size:
+            raise ValueError("列表缓存文件不完整")
+        magic, format_version, flags, version, count, replica_id, section_count, crc = \
+            _HEADER.unpack_from(view)
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            raise ValueError("不是列表缓存文件或格式版本不同")
+        if flags & _FLAG_BIG_ENDIAN != _NATIVE_FLAGS:
+            raise ValueError("列表缓存文件来自字节序不同的机器")
+        if zlib.crc32(view[_HEADER.size:]) != crc:
+            raise ValueError("列表缓存文件已损坏")
+        for index in range(section_count):
+            offset, length = _SECTION.unpack_from(view, _HEADER.size + index * _SECTION.size)
+            if offset + length > len(view):
+                raise ValueError("列表缓存文件不完整")
+            sections.append(view[offset:offset + length])
+        snapshot = ListingSnapshot.from_buffers(sections)
+        if len(snapshot) != count:
+            raise ValueError("列表缓存文件的行数不一致")
+        return snapshot, version, replica_id.decode('ascii'), bool(flags & _FLAG_NAME_ENCRYPTION)
+    finally:
+        # 释放对映射内存的引用，之后才能关闭 mmap
+        for section in sections:
+            section.release()
+        view.release()
+
+
+class ListingCache:
+    """一个密码库的列表缓存文件"""
+
+    def __init__(self, db, path=None):
+        """
+        初始化列表缓存
+
+        Args:
+            db (PasswordDatabase): 密码库
+            path (Path): 缓存文件路径，None表示密码库文件名加 LISTING_CACHE_SUFFIX
+        """
+        self.db = db
+        self.path = Path(path) if path else Path(f"{db.db_file}{LISTING_CACHE_SUFFIX}")
+        # 缓存文件中的列表变更计数器（未读取或写入过时为None）
+        self.version = None
+        self._lock = threading.Lock()
+
+    @timed("listing_cache.load")
+    def load(self):
+        """
+        读取缓存的列表
+
+        Returns:
+            tuple: (ListingSnapshot 或 None, 是否与密码库一致)。
+                   缓存文件不存在、已损坏或属于其他密码库时返回 (None, False)
+        """
+        current = self.db.get_listing_version()
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                snapshot, version, replica_id, name_encryption = decode_listing(mapped)
+        except (OSError, ValueError, struct.error):
+            return None, False
+        if replica_id != self.db.get_metadata('replica_id') or name_encryption != self.db.name_encryption:
+            return None, False
+        self.version = version
+        return snapshot, version == current
+
+    @timed("listing_cache.save")
+    def save(self, snapshot, version):
+        """
+        写入缓存文件（先写临时文件再原子地替换）。缓存文件已经是同一个计数器时不再写入
+
+        Args:
+            snapshot (ListingSnapshot): 按名称排序的完整列表
+            version (int): 读取列表之前的列表变更计数器
+
+        Returns:
+            bool: 是否写入（目录不可写等错误不影响使用，只是下次启动没有缓存）
+        """
+        with self._lock:
+            if version == self.version and self.path.exists():
+                return False
+            data = encode_listing(snapshot, version, self.db.get_metadata('replica_id'),
+                                  self.db.name_encryption)
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                # 明文模式下缓存中有服务名称和用户名，文件只有所有者可读写
+                fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self.path)
+            except OSError:
+                return False
+            finally:
+                temp_path.unlink(missing_ok=True)
+            self.version = version
+            return True
+
+    def fetch(self):
+        """
+        从数据库读取按名称排序的完整列表并更新缓存文件
+
+        计数器在读取列表之前读取：读取期间有写入时缓存中的计数器偏旧，下次启动会重新读取，而不会误认为最新
+
+        Returns:
+            ListingSnapshot: 列表快照
+        """
+        version = self.db.get_listing_version()
+        snapshot = self.db.get_listing(ORDER_NAME)
+        self.save(snapshot, version)
+        return snapshot
+
+    def discard(self):
+        """删除缓存文件"""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.version = None
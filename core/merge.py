@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+导入合并模块
+导入的记录先分批加密写入临时暂存表，再用集合化的SQL一次性与密码库比较和合并：
+按规范化的（服务名称, 用户名）唯一键识别重复记录，支持跳过、覆盖和保留较新三种策略，
+并可在写入前生成差异报告
+"""
+
+import re
+from datetime import datetime, timezone
+
+from core.concurrency import retry_busy
+from core.metrics import timed
+
+
+# 合并策略
+STRATEGY_SKIP = "skip"              # 已存在的记录保持不变
+STRATEGY_OVERWRITE = "overwrite"    # 用导入的密码覆盖已存在的记录
+STRATEGY_NEWEST = "newest"          # 导入记录的修改时间较新时才覆盖
+STRATEGIES = (STRATEGY_SKIP, STRATEGY_OVERWRITE, STRATEGY_NEWEST)
+
+# 差异报告中最多列出的变更记录数
+REPORT_LIMIT = 1000
+
+# 各策略下已存在且密码不同的记录是否被覆盖（s 为暂存表，p 为密码表）
+_UPDATE_CONDITIONS = {
+    STRATEGY_SKIP: "0",
+    STRATEGY_OVERWRITE: "1",
+    STRATEGY_NEWEST: "s.source_updated_at > p.updated_at",
+}
+
+# 已存在记录的密码指纹：未保存指纹（关闭了指纹保存或旧版本写入的记录）时使用合并前解密算出的指纹，
+# 仍为NULL（无法解密）时视为未知，既不算未变化也不覆盖
+_EXISTING_FINGERPRINT = "COALESCE(p.password_fingerprint, s.existing_fingerprint)"
+
+
+def normalize_timestamp(value):
+    """
+    将导入文件中的修改时间转换为数据库使用的UTC时间格式（YYYY-MM-DD HH:MM:SS）
+
+    Args:
+        value: ISO 8601字符串、Unix时间戳（秒或毫秒）、datetime或None
+
+    Returns:
+        str or None: 转换后的时间，无法识别时返回None
+    """
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, datetime):
+            moment = value
+        elif isinstance(value, (int, float)) or str(value).isdigit():
+            seconds = float(value)
+            # 大于该值时按毫秒处理（浏览器导出常用毫秒或微秒）
+            while seconds > 1e11:
+                seconds /= 1000
+            moment = datetime.fromtimestamp(seconds, timezone.utc)
+        else:
+            text = str(value).strip().replace('Z', '+00:00')
+            try:
+                moment = datetime.fromisoformat(text)
+            except ValueError:
+                # 较早的Python版本不支持非6位的小数秒，去掉小数部分后重试
+                moment = datetime.fromisoformat(re.sub(r'\.\d+', '', text))
+    except (ValueError, OverflowError, OSError):
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    # isoformat 总是输出4位年份，strftime 在部分平台上不补零
+    return moment.isoformat(' ', 'seconds')
+
+
+class ImportMerger:
+    """
+    导入合并器
+
+    用法：多次调用 add 分批暂存记录，然后调用 report 查看差异，或调用 apply 写入密码库。
+    暂存表是该连接的临时表，合并结束后随连接关闭一起删除
+    """
+
+    def __init__(self, db, strategy=STRATEGY_SKIP):
+        """
+        初始化导入合并器
+
+        Args:
+            db (PasswordDatabase): 已初始化加密器的数据库实例
+            strategy (str): 合并策略，STRATEGIES 之一
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"未知的合并策略: {strategy}")
+        if db.encryption is None:
+            raise Exception("加密器未初始化，请先验证管理员密码")
+        self.db = db
+        self.strategy = strategy
+        self.received = 0
+        self.conn = db._connect()
+        # 手动管理事务：暂存按批提交，合并在单个事务中完成
+        self.conn.isolation_level = None
+        self.conn.execute('''
+            CREATE TEMP TABLE import_staging (
+                entry_key TEXT PRIMARY KEY,
+                service_name TEXT NOT NULL,
+                username TEXT NOT NULL,
+                encrypted_password BLOB NOT NULL,
+                fingerprint TEXT NOT NULL,
+                sort_name TEXT,
+                sort_username TEXT,
+                source_updated_at TEXT,
+                seq INTEGER NOT NULL,
+                existing_fingerprint TEXT
+            )
+        ''')
+
+    def close(self):
+        """关闭连接并丢弃暂存表"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @timed("merge.add")
+    def add(self, records):
+        """
+        加密并暂存一批记录
+
+        同一批或不同批中唯一键相同的记录只保留一条：保留较新策略下保留修改时间较新的一条，
+        其他策略下保留最后出现的一条
+
+        Args:
+            records (iterable): (service_name, username, password) 或
+                                (service_name, username, password, updated_at) 元组序列
+        """
+        db = self.db
+        encryption = db.encryption
+        rows = []
+        for record in records:
+            service_name, username, password = record[0], record[1], record[2]
+            updated_at = normalize_timestamp(record[3]) if len(record) > 3 else None
+            rows.append((
+                db.entry_key(service_name, username),
+                db._encode_name(service_name),
+                db._encode_name(username),
+                encryption.encrypt(password),
+                encryption.fingerprint(password),
+                *db.sort_keys(service_name, username),
+                updated_at,
+                self.received + len(rows),
+            ))
+        if not rows:
+            return
+
+        if self.strategy == STRATEGY_NEWEST:
+            keep_condition = ("WHERE COALESCE(excluded.source_updated_at, '') >= "
+                              "COALESCE(import_staging.source_updated_at, '')")
+        else:
+            keep_condition = ""
+        self.conn.execute("BEGIN")
+        self.conn.executemany(f'''
+            INSERT INTO import_staging (entry_key, service_name, username, encrypted_password,
+                                        fingerprint, sort_name, sort_username, source_updated_at, seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (entry_key) DO UPDATE SET
+                service_name = excluded.service_name,
+                username = excluded.username,
+                encrypted_password = excluded.encrypted_password,
+                fingerprint = excluded.fingerprint,
+                sort_name = excluded.sort_name,
+                sort_username = excluded.sort_username,
+                source_updated_at = excluded.source_updated_at,
+                seq = excluded.seq
+            {keep_condition}
+        ''', rows)
+        self.conn.execute("COMMIT")
+        self.received += len(rows)
+
+    def add_all(self, records, batch_size=1000):
+        """
+        分批加密并暂存记录（内存占用与 batch_size 成正比）
+
+        Args:
+            records (iterable): 记录元组序列，格式见 add
+            batch_size (int): 每批暂存的记录数
+        """
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                batch = []
+        self.add(batch)
+
+    def _fill_existing_fingerprints(self):
+        """
+        为已存在但没有保存密码指纹的记录解密并计算指纹（只保存在暂存表中，不写入密码表），
+        否则这些记录在每次重复导入时都会被当作密码不同而覆盖
+        """
+        encryption = self.db.encryption
+        rows = self.conn.execute('''
+            SELECT s.entry_key, p.encrypted_password
+            FROM temp.import_staging s
+            JOIN passwords p ON p.entry_key = s.entry_key
+            WHERE p.password_fingerprint IS NULL AND s.existing_fingerprint IS NULL
+        ''').fetchall()
+        fingerprints = []
+        for entry_key, encrypted_password in rows:
+            try:
+                fingerprints.append((encryption.fingerprint(encryption.decrypt(encrypted_password)),
+                                     entry_key))
+            except Exception:
+                # 无法解密的记录保持未知
+                continue
+        self.conn.executemany('''
+            UPDATE temp.import_staging SET existing_fingerprint = ? WHERE entry_key = ?
+        ''', fingerprints)
+
+    def _diff(self):
+        """用一次连接查询统计新增、覆盖、未变化和跳过的记录数"""
+        self._fill_existing_fingerprints()
+        update_condition = _UPDATE_CONDITIONS[self.strategy]
+        staged, new, unchanged, updated = self.conn.execute(f'''
+            SELECT COUNT(*),
+                   COALESCE(SUM(p.id IS NULL), 0),
+                   COALESCE(SUM(p.id IS NOT NULL AND {_EXISTING_FINGERPRINT} = s.fingerprint), 0),
+                   COALESCE(SUM(p.id IS NOT NULL AND {_EXISTING_FINGERPRINT} != s.fingerprint
+                                AND ({update_condition})), 0)
+            FROM temp.import_staging s
+            LEFT JOIN passwords p ON p.entry_key = s.entry_key
+        ''').fetchone()
+        return {
+            'strategy': self.strategy,
+            'received': self.received,
+            'duplicates': self.received - staged,
+            'new': new,
+            'updated': updated,
+            'unchanged': unchanged,
+            'skipped': staged - new - unchanged - updated,
+        }
+
+    @timed("merge.report")
+    def report(self, limit=REPORT_LIMIT):
+        """
+        生成差异报告（不写入密码库）
+
+        Args:
+            limit (int): 最多列出的变更记录数
+
+        Returns:
+            dict: strategy, received, duplicates（导入文件内重复的记录数）, new, updated,
+                  unchanged, skipped 计数，以及 changes 变更列表
+                  （action 为 new/update/skip，service_name, username）
+        """
+        report = self._diff()
+        update_condition = _UPDATE_CONDITIONS[self.strategy]
+        rows = self.conn.execute(f'''
+            SELECT CASE WHEN p.id IS NULL THEN 'new'
+                        WHEN {_EXISTING_FINGERPRINT} IS NOT NULL AND {update_condition} THEN 'update'
+                        ELSE 'skip' END,
+                   s.service_name, s.username
+            FROM temp.import_staging s
+            LEFT JOIN passwords p ON p.entry_key = s.entry_key
+            WHERE p.id IS NULL OR {_EXISTING_FINGERPRINT} IS NOT s.fingerprint
+            ORDER BY s.seq
+            LIMIT ?
+        ''', (limit,)).fetchall()
+        report['changes'] = [
+            {
+                'action': action,
+                'service_name': self.db._decode_name(service_name),
+                'username': self.db._decode_name(username),
+            }
+            for action, service_name, username in rows
+        ]
+        return report
+
+    @timed("merge.apply")
+    def apply(self):
+        """
+        将暂存的记录合并到密码库（单个事务）
+
+        Returns:
+            dict: 与 report 相同的计数（不含 changes）
+        """
+        from config.settings import STORE_PASSWORD_FINGERPRINTS
+
+        conn = self.conn
+        # 暂存表只在本连接中可见，不能交给写队列执行（见 core.concurrency）
+        retry_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
+        try:
+            report = self._diff()
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM passwords").fetchone()[0]
+
+            # 先覆盖已存在且密码不同的记录，再插入新记录，避免新插入的记录被再次匹配
+            if report['updated']:
+                conn.execute(f'''
+                    UPDATE passwords AS p
+                    SET encrypted_password = s.encrypted_password,
+                        password_fingerprint = CASE WHEN ? THEN s.fingerprint END,
+                        updated_at = COALESCE(s.source_updated_at, CURRENT_TIMESTAMP)
+                    FROM temp.import_staging AS s
+                    WHERE p.entry_key = s.entry_key
+                      AND {_EXISTING_FINGERPRINT} != s.fingerprint
+                      AND ({_UPDATE_CONDITIONS[self.strategy]})
+                ''', (STORE_PASSWORD_FINGERPRINTS,))
+            conn.execute('''
+                INSERT INTO passwords (service_name, username, encrypted_password,
+                                       password_fingerprint, entry_key, sort_name, sort_username,
+                                       updated_at)
+                SELECT service_name, username, encrypted_password,
+                       CASE WHEN ? THEN fingerprint END, entry_key, sort_name, sort_username,
+                       COALESCE(source_updated_at, CURRENT_TIMESTAMP)
+                FROM temp.import_staging
+                WHERE true
+                ORDER BY seq
+                ON CONFLICT (entry_key) WHERE entry_key IS NOT NULL DO NOTHING
+            ''', (STORE_PASSWORD_FINGERPRINTS,))
+
+            if self.db.name_encryption and report['new']:
+                self._write_blind_index(last_id)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return report
+
+    def _write_blind_index(self, last_id, batch_size=1000):
+        """为新插入的记录写入盲索引令牌（加密模式）"""
+        db = self.db
+        reader = self.conn.execute('''
+            SELECT id, service_name, username FROM passwords WHERE id > ?
+        ''', (last_id,))
+        writer = self.conn.cursor()
+        while True:
+            rows = reader.fetchmany(batch_size)
+            if not rows:
+                break
+            for record_id, service_name, username in rows:
+                db._write_blind_index(writer, record_id, db._decode_name(service_name),
+                                      db._decode_name(username))
+
+
+def merge_records(db, records, strategy=STRATEGY_SKIP, dry_run=False, batch_size=1000):
+    """
+    将记录合并到密码库
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        records (iterable): 记录元组序列，格式见 ImportMerger.add
+        strategy (str): 合并策略
+        dry_run (bool): 为True时只生成差异报告，不写入密码库
+        batch_size (int): 每批加密暂存的记录数
+
+    Returns:
+        dict: 合并结果（dry_run 时为包含 changes 的差异报告）
+    """
+    with ImportMerger(db, strategy) as merger:
+        merger.add_all(records, batch_size)
+        if dry_run:
+            return merger.report()
+        return merger.apply()
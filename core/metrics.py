@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能指标模块
+记录各操作的延迟直方图、调用次数和错误次数，并导出为JSON和Prometheus文本格式
+未启用时每次调用只多一次属性检查
+"""
+
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+
+from config.settings import METRICS_ENABLED
+
+
+# 直方图桶上界（秒），最后一个桶为 +Inf
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """单个操作的延迟直方图"""
+
+    __slots__ = ('bucket_counts', 'count', 'errors', 'total', 'max')
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds, error=False):
+        """记录一次调用"""
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """
+        根据桶分布估算分位数（桶内线性插值）
+
+        Args:
+            q (float): 分位，例如0.95
+
+        Returns:
+            float: 估算的延迟（秒）
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.50),
+            'p95_seconds': self.quantile(0.95),
+            'p99_seconds': self.quantile(0.99),
+            'buckets': {
+                **{str(bound): n for bound, n in zip(LATENCY_BUCKETS, self.bucket_counts)},
+                '+Inf': self.bucket_counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """性能指标注册表"""
+
+    def __init__(self, enabled=False):
+        """
+        初始化
+
+        Args:
+            enabled (bool): 是否启用记录
+        """
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        """
+        记录一次操作
+
+        Args:
+            name (str): 操作名称，例如 db.get_password
+            seconds (float): 耗时（秒）
+            error (bool): 操作是否抛出异常
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds, error)
+
+    def reset(self):
+        """清空所有已记录的数据"""
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        获取当前所有操作的统计数据
+
+        Returns:
+            dict: 操作名称 -> 统计字典
+        """
+        with self._lock:
+            return {name: h.to_dict() for name, h in sorted(self._histograms.items())}
+
+    def to_json(self):
+        """导出为JSON文本"""
+        return json.dumps({
+            'generated_at': time.time(),
+            'operations': self.snapshot(),
+        }, indent=2)
+
+    def to_prometheus(self):
+        """导出为Prometheus文本格式"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            lines = [
+                "# HELP tfapm_operation_seconds Latency of instrumented operations.",
+                "# TYPE tfapm_operation_seconds histogram",
+            ]
+            for name, h in items:
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, h.bucket_counts):
+                    cumulative += n
+                    lines.append(
+                        f'tfapm_operation_seconds_bucket{{op="{name}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'tfapm_operation_seconds_bucket{{op="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'tfapm_operation_seconds_sum{{op="{name}"}} {h.total}')
+                lines.append(f'tfapm_operation_seconds_count{{op="{name}"}} {h.count}')
+            lines.append("# HELP tfapm_operation_errors_total Failed instrumented operations.")
+            lines.append("# TYPE tfapm_operation_errors_total counter")
+            for name, h in items:
+                lines.append(f'tfapm_operation_errors_total{{op="{name}"}} {h.errors}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_file, prom_file):
+        """
+        将指标写入JSON和Prometheus文本文件（先写临时文件再替换，避免读到半个文件）
+
+        Args:
+            json_file (Path): JSON输出文件
+            prom_file (Path): Prometheus文本输出文件
+        """
+        for path, content in ((json_file, self.to_json()), (prom_file, self.to_prometheus())):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+
+# 全局指标注册表
+_registry = MetricsRegistry(enabled=METRICS_ENABLED)
+
+
+def get_metrics():
+    """获取全局指标注册表"""
+    return _registry
+
+
+def timed(name):
+    """
+    装饰器：记录被装饰函数的耗时和异常
+
+    Args:
+        name (str): 操作名称
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                registry.observe(name, time.perf_counter() - start, error=True)
+                raise
+            registry.observe(name, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(name):
+    """
+    上下文管理器：记录代码块的耗时和异常
+
+    Args:
+        name (str): 操作名称
+    """
+    registry = _registry
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        registry.observe(name, time.perf_counter() - start, error=True)
+        raise
+    registry.observe(name, time.perf_counter() - start)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并行批量解密模块
+在多个进程中对密码记录分批解密并处理，主进程只接收处理结果
+
+工作进程不用 fork 直接复制主进程：主进程中有图形界面、写队列和列表缓存等线程，
+fork 时其他线程持有的锁会以锁定状态复制到子进程中。支持时由 forkserver 启动工作进程
+（服务进程预先导入本模块和加密模块，之后每个工作进程从服务进程 fork），否则使用 spawn
+"""
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.encryption import EncryptionManager
+
+
+# 工作进程中的加密器
+_worker_encryption = None
+
+
+def _init_worker(key):
+    """工作进程初始化：使用主进程的密钥创建加密器"""
+    global _worker_encryption
+    _worker_encryption = EncryptionManager(key)
+
+
+def _mp_context():
+    """工作进程的启动方式：forkserver（Windows 上不可用时为 spawn）"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # 服务进程启动前设置才生效，之后的调用不改变已运行的服务进程
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _run_batch(func, batch):
+    """在工作进程中处理一批记录"""
+    return func(_worker_encryption, batch)
+
+
+def map_batches(func, batches, encryption, workers=None, window=None):
+    """
+    按顺序对每批记录执行 func(encryption, batch)，可在多个进程中并行执行
+
+    func 必须是模块级函数，以便传递给工作进程；为避免明文在进程间传递，
+    func 应只返回处理结果（如哈希值、评分），而不是解密后的密码。
+
+    Args:
+        func (callable): 处理函数，接收 (EncryptionManager, batch)
+        batches (iterable): 记录批次
+        encryption (EncryptionManager): 已初始化的加密器
+        workers (int): 进程数，None表示使用CPU核心数，1表示在当前进程中执行
+        window (int): 同时提交的最大批次数，用于限制内存占用，默认为进程数的2倍
+
+    Yields:
+        每批记录的处理结果（与输入顺序一致）
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for batch in batches:
+            yield func(encryption, batch)
+        return
+
+    if window is None:
+        window = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=_mp_context(),
+        initializer=_init_worker, initargs=(encryption.key,)
+    ) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_run_batch, func, batch))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
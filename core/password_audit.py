@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码审计模块
+分批解密整个密码库，找出重复使用、强度不足和长期未修改的密码
+重复检测基于带密钥的HMAC指纹，一次遍历即可完成分组，无需两两比较
+"""
+
+import math
+import string
+
+from core.metrics import timed
+
+
+# 字符类别：小写字母、大写字母、数字、ASCII符号、其他字符（如中文）
+_CLASS_LOWER = 'a'
+_CLASS_UPPER = 'A'
+_CLASS_DIGIT = '0'
+_CLASS_SYMBOL = '!'
+_CLASS_POOL_SIZES = {
+    _CLASS_LOWER: 26,
+    _CLASS_UPPER: 26,
+    _CLASS_DIGIT: 10,
+    _CLASS_SYMBOL: 33,
+}
+# 非ASCII字符按较大的字符集估算
+_OTHER_POOL_SIZE = 100
+
+# 将每个ASCII字符映射为其类别代码，str.translate 可一次性完成整串映射
+_CLASS_TABLE = str.maketrans({
+    **{c: _CLASS_LOWER for c in string.ascii_lowercase},
+    **{c: _CLASS_UPPER for c in string.ascii_uppercase},
+    **{c: _CLASS_DIGIT for c in string.digits},
+    **{c: _CLASS_SYMBOL for c in string.punctuation + ' '},
+})
+_KNOWN_CLASSES = frozenset(_CLASS_POOL_SIZES)
+
+# 每种类别组合对应的 log2(字符集大小)，预先计算避免逐条求对数
+_LOG2_POOL = {}
+for _mask in range(32):
+    _pool = sum(size for bit, size in enumerate(_CLASS_POOL_SIZES.values()) if _mask & (1 << bit))
+    if _mask & 16:
+        _pool += _OTHER_POOL_SIZE
+    _LOG2_POOL[_mask] = math.log2(_pool) if _pool else 0.0
+_CLASS_BITS = {cls: 1 << bit for bit, cls in enumerate(_CLASS_POOL_SIZES)}
+
+
+def estimate_entropy_batch(passwords):
+    """
+    批量估算密码熵（比特）
+
+    按字符集大小和有效长度估算：重复出现的字符只按一半长度计入。
+    每个密码只做一次 translate 和一次集合运算，全部查表完成。
+
+    Args:
+        passwords (list): 明文密码列表
+
+    Returns:
+        list: 与输入一一对应的熵估算值
+    """
+    log2_pool = _LOG2_POOL
+    class_bits = _CLASS_BITS
+    known = _KNOWN_CLASSES
+    table = _CLASS_TABLE
+    results = []
+    for password in passwords:
+        if not password:
+            results.append(0.0)
+            continue
+        classes = set(password.translate(table))
+        mask = 0
+        for cls in classes & known:
+            mask |= class_bits[cls]
+        if classes - known:
+            mask |= 16
+        unique = len(set(password))
+        effective_length = unique + (len(password) - unique) * 0.5
+        results.append(effective_length * log2_pool[mask])
+    return results
+
+
+def _audit_batch(encryption, batch):
+    """
+    解密一批记录并计算指纹和熵（在工作进程中执行，明文不离开该进程）
+
+    Returns:
+        list: (id, service_name, username, fingerprint, entropy) 元组列表，
+              解密失败时 fingerprint 为None
+    """
+    ids = []
+    passwords = []
+    results = []
+    for record_id, service_name, username, encrypted_password in batch:
+        try:
+            passwords.append(encryption.decrypt(encrypted_password))
+            ids.append((record_id, service_name, username))
+        except Exception:
+            results.append((record_id, service_name, username, None, 0.0))
+    entropies = estimate_entropy_batch(passwords)
+    for (record_id, service_name, username), password, entropy in zip(ids, passwords, entropies):
+        results.append((record_id, service_name, username, encryption.fingerprint(password), entropy))
+    return results
+
+
+@timed("audit.audit_vault")
+def audit_vault(db, weak_bits=None, max_age_days=None, batch_size=None, workers=None,
+                persist_fingerprints=None, progress=None):
+    """
+    审计整个密码库
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        weak_bits (float): 弱密码的熵阈值，None表示使用默认配置
+        max_age_days (int): 过旧密码的天数阈值，None表示使用默认配置
+        batch_size (int): 每批解密的记录数，None表示使用默认配置
+        workers (int): 并行解密的进程数，None表示使用默认配置
+        persist_fingerprints (bool): 是否将指纹写回数据库，None表示使用默认配置
+        progress (callable): 进度回调，参数为已审计的记录数
+
+    Returns:
+        dict: 审计报告
+            total: 审计的记录数
+            reused: 重复使用同一密码的记录组列表
+            weak: 弱密码记录列表（含 entropy）
+            old: 长期未修改的记录列表（含 updated_at）
+            unreadable: 无法解密的记录列表
+    """
+    from config.settings import (
+        AUDIT_WEAK_BITS, AUDIT_MAX_AGE_DAYS, VAULT_SCAN_BATCH_SIZE,
+        VAULT_SCAN_WORKERS, STORE_PASSWORD_FINGERPRINTS
+    )
+    from core.parallel import map_batches
+
+    if db.encryption is None:
+        raise Exception("加密器未初始化，请先验证管理员密码")
+    if weak_bits is None:
+        weak_bits = AUDIT_WEAK_BITS
+    if max_age_days is None:
+        max_age_days = AUDIT_MAX_AGE_DAYS
+    if batch_size is None:
+        batch_size = VAULT_SCAN_BATCH_SIZE
+    if workers is None:
+        workers = VAULT_SCAN_WORKERS
+    if persist_fingerprints is None:
+        persist_fingerprints = STORE_PASSWORD_FINGERPRINTS
+
+    groups = {}
+    weak = []
+    unreadable = []
+    total = 0
+    batches = db.iter_encrypted(batch_size)
+    for results in map_batches(_audit_batch, batches, db.encryption, workers):
+        for record_id, service_name, username, fingerprint, entropy in results:
+            entry = {'id': record_id, 'service_name': service_name, 'username': username}
+            if fingerprint is None:
+                unreadable.append(entry)
+                continue
+            groups.setdefault(fingerprint, []).append(entry)
+            if entropy < weak_bits:
+                weak.append(dict(entry, entropy=round(entropy, 1)))
+        total += len(results)
+        if progress is not None:
+            progress(total)
+
+    # 扫描结束后再写回指纹，避免在读取游标未关闭时写入
+    if persist_fingerprints:
+        db.set_fingerprints(
+            (entry['id'], fingerprint)
+            for fingerprint, entries in groups.items() for entry in entries
+        )
+
+    reused = [entries for entries in groups.values() if len(entries) > 1]
+    reused.sort(key=len, reverse=True)
+    weak.sort(key=lambda entry: entry['entropy'])
+    # 只还原需要展示的记录的名称
+    for entries in reused:
+        db.decode_entry_names(entries)
+    db.decode_entry_names(weak)
+    db.decode_entry_names(unreadable)
+    return {
+        'total': total,
+        'reused': reused,
+        'weak': weak,
+        'old': db.get_passwords_updated_before(max_age_days),
+        'unreadable': unreadable,
+    }
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码生成器模块
+按策略生成随机密码和口令短语，批量更换密码时一次生成成千上万个
+
+- 随机字节一次从 os.urandom 读取一大块放在缓冲区中（RandomBuffer），每个字节只取用一次，
+  不再为每个字符调用一次 secrets.choice
+- 字节映射到字符集时使用拒绝采样：字符集大小为 k 时只接受小于 256 - 256 % k 的字节，
+  每个字符出现的概率严格相等；接受和映射由一次 bytes.translate 完成
+- 要求每种字符类别都出现时，不满足要求的密码整个丢弃重新生成，结果在满足要求的密码中仍是均匀分布
+- 口令短语从单词表中均匀抽取单词（每个单词用两个随机字节，同样拒绝采样）
+"""
+
+import os
+import math
+import string
+import threading
+import weakref
+from array import array
+from pathlib import Path
+
+from config.settings import (
+    GENERATOR_BUFFER_SIZE, GENERATOR_DEFAULT_LENGTH, GENERATOR_DEFAULT_EXCLUDE,
+    PASSPHRASE_DEFAULT_WORDS, PASSPHRASE_SEPARATOR, PASSPHRASE_WORDLIST_FILE
+)
+from core.metrics import timed
+
+
+# 自带的单词表
+_BUNDLED_WORDLIST = Path(__file__).with_name("wordlist.txt")
+
+# 字符类别（名称 -> 字符）
+_CHARACTER_CLASSES = (
+    ("lowercase", string.ascii_lowercase),
+    ("uppercase", string.ascii_uppercase),
+    ("digits", string.digits),
+    ("symbols", string.punctuation),
+)
+
+
+class PasswordPolicy:
+    """随机密码策略：长度、使用的字符类别、排除的字符"""
+
+    def __init__(self, length=None, lowercase=True, uppercase=True, digits=True, symbols=True,
+                 exclude=None, require_each=True):
+        """
+        初始化密码策略
+
+        Args:
+            length (int): 密码长度，None表示使用默认配置
+            lowercase, uppercase, digits, symbols (bool): 是否使用小写字母、大写字母、数字、符号
+            exclude (str): 不使用的字符（例如容易混淆的 "Il1O0"），None表示使用默认配置
+            require_each (bool): 每种使用的字符类别是否至少出现一次
+        """
+        self.length = GENERATOR_DEFAULT_LENGTH if length is None else length
+        self.exclude = GENERATOR_DEFAULT_EXCLUDE if exclude is None else exclude
+        self.require_each = require_each
+        enabled = {"lowercase": lowercase, "uppercase": uppercase, "digits": digits, "symbols": symbols}
+        excluded = set(self.exclude)
+        # 去掉排除的字符后的各个类别（排除后为空的类别不再参与）
+        self.classes = []
+        for name, characters in _CHARACTER_CLASSES:
+            if enabled[name]:
+                characters = "".join(c for c in characters if c not in excluded)
+                if characters:
+                    self.classes.append(characters)
+        self.alphabet = "".join(self.classes)
+        if self.length < 1:
+            raise ValueError("密码长度必须大于0")
+        if not self.alphabet:
+            raise ValueError("密码策略中没有可用的字符")
+        if require_each and self.length < len(self.classes):
+            raise ValueError("密码长度小于要求出现的字符类别数")
+
+    def entropy_bits(self):
+        """密码的熵（比特，按字符集大小和长度计算，要求每种类别出现时略有高估）"""
+        return self.length * math.log2(len(self.alphabet))
+
+
+class PassphrasePolicy:
+    """口令短语策略：单词数、分隔符、是否首字母大写、是否附加一位数字"""
+
+    def __init__(self, words=None, separator=None, capitalize=False, include_digit=False):
+        """
+        初始化口令短语策略
+
+        Args:
+            words (int): 单词数，None表示使用默认配置
+            separator (str): 单词之间的分隔符，None表示使用默认配置
+            capitalize (bool): 每个单词首字母大写
+            include_digit (bool): 在最后附加一位随机数字（用于要求包含数字的网站）
+        """
+        self.words = PASSPHRASE_DEFAULT_WORDS if words is None else words
+        self.separator = PASSPHRASE_SEPARATOR if separator is None else separator
+        self.capitalize = capitalize
+        self.include_digit = include_digit
+        if self.words < 1:
+            raise ValueError("口令短语至少需要一个单词")
+
+    def entropy_bits(self, wordlist_size):
+        """口令短语的熵（比特）"""
+        bits = self.words * math.log2(wordlist_size)
+        if self.include_digit:
+            bits += math.log2(10)
+        return bits
+
+
+# 所有随机字节缓冲区（fork 后在子进程中清空）
+_buffers = weakref.WeakSet()
+
+
+class RandomBuffer:
+    """
+    随机字节缓冲区：一次从 os.urandom 读取 size 个字节，按需取用，用完后重新读取。
+    取出的字节不会再次返回；超过缓冲区大小的请求直接读取 os.urandom
+    """
+
+    def __init__(self, size=None):
+        self.size = size or GENERATOR_BUFFER_SIZE
+        self._buffer = b""
+        self._position = 0
+        self._lock = threading.Lock()
+        _buffers.add(self)
+
+    def read(self, count):
+        """读取 count 个随机字节"""
+        if count > self.size:
+            return os.urandom(count)
+        with self._lock:
+            if len(self._buffer) - self._position < count:
+                self._buffer = os.urandom(self.size)
+                self._position = 0
+            start = self._position
+            self._position += count
+            return self._buffer[start:self._position]
+
+    def discard(self):
+        """丢弃缓冲区中剩余的字节"""
+        with self._lock:
+            self._buffer = b""
+            self._position = 0
+
+
+def _byte_sampler(alphabet):
+    """
+    单字节拒绝采样的转换表：接受的字节 b 映射为 alphabet[b % k]，其余字节删除
+
+    Returns:
+        tuple: (转换表, 要删除的字节, 接受率)
+    """
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[b % size]) for b in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256)), limit / 256
+
+
+def _load_wordlist(path):
+    """读取单词表（每行一个单词，忽略空行，去重并保持原顺序）"""
+    words = tuple(dict.fromkeys(
+        line.strip() for line in Path(path).read_text(encoding='utf-8').splitlines() if line.strip()
+    ))
+    if len(words) < 2:
+        raise ValueError(f"单词表中的单词太少: {path}")
+    return words
+
+
+class PasswordGenerator:
+    """密码生成器"""
+
+    def __init__(self, buffer_size=None, wordlist_file=None):
+        """
+        初始化密码生成器
+
+        Args:
+            buffer_size (int): 随机字节缓冲区大小，None表示使用默认配置
+            wordlist_file (Path): 口令短语单词表，None表示使用默认配置
+        """
+        self.random = RandomBuffer(buffer_size)
+        self.wordlist_file = wordlist_file or PASSPHRASE_WORDLIST_FILE or _BUNDLED_WORDLIST
+        self._words = None
+        # 字符集 -> 拒绝采样转换表
+        self._samplers = {}
+
+    @property
+    def words(self):
+        """口令短语单词表（第一次使用时读取）"""
+        if self._words is None:
+            self._words = _load_wordlist(self.wordlist_file)
+        return self._words
+
+    def _characters(self, alphabet, count):
+        """从字符集中均匀抽取 count 个字符（返回字符串）"""
+        sampler = self._samplers.get(alphabet)
+        if sampler is None:
+            sampler = self._samplers[alphabet] = _byte_sampler(alphabet)
+        table, rejected, rate = sampler
+        chunks = []
+        missing = count
+        while missing > 0:
+            # 按接受率多读一些，通常一次就够
+            accepted = self.random.read(int(missing / rate) + 16).translate(table, rejected)
+            chunks.append(accepted[:missing])
+            missing -= len(chunks[-1])
+        return b"".join(chunks).decode('ascii')
+
+    def _indices(self, size, count):
+        """在 [0, size) 中均匀抽取 count 个整数（每个用两个随机字节）"""
+        if size > 65536:
+            raise ValueError("单词表不能超过65536个单词")
+        limit = 65536 - 65536 % size
+        result = []
+        while len(result) < count:
+            values = array('H', self.random.read(2 * (count - len(result) + 8)))
+            result.extend(value % size for value in values if value < limit)
+        return result[:count]
+
+    @timed("generator.passwords")
+    def passwords(self, count, policy=None):
+        """
+        批量生成随机密码
+
+        Args:
+            count (int): 数量
+            policy (PasswordPolicy): 密码策略，None表示默认策略
+
+        Returns:
+            list: 密码列表
+        """
+        policy = policy or PasswordPolicy()
+        length = policy.length
+        required = [frozenset(characters) for characters in policy.classes] if policy.require_each else []
+        result = []
+        while len(result) < count:
+            missing = count - len(result)
+            text = self._characters(policy.alphabet, missing * length)
+            for start in range(0, missing * length, length):
+                password = text[start:start + length]
+                if required:
+                    present = set(password)
+                    if any(present.isdisjoint(characters) for characters in required):
+                        # 缺少某个类别：丢弃，少的部分在下一轮补上
+                        continue
+                result.append(password)
+        return result
+
+    def password(self, policy=None):
+        """生成一个随机密码"""
+        return self.passwords(1, policy)[0]
+
+    @timed("generator.passphrases")
+    def passphrases(self, count, policy=None):
+        """
+        批量生成口令短语
+
+        Args:
+            count (int): 数量
+            policy (PassphrasePolicy): 口令短语策略，None表示默认策略
+
+        Returns:
+            list: 口令短语列表
+        """
+        policy = policy or PassphrasePolicy()
+        words = self.words
+        if policy.capitalize:
+            words = tuple(word.capitalize() for word in words)
+        indices = self._indices(len(words), count * policy.words)
+        digits = self._characters(string.digits, count) if policy.include_digit else None
+        result = []
+        join = policy.separator.join
+        for i in range(count):
+            start = i * policy.words
+            phrase = join([words[index] for index in indices[start:start + policy.words]])
+            if digits:
+                phrase += digits[i]
+            result.append(phrase)
+        return result
+
+    def passphrase(self, policy=None):
+        """生成一个口令短语"""
+        return self.passphrases(1, policy)[0]
+
+    def generate(self, count, policy=None):
+        """
+        批量生成（批量更换密码使用的接口），按策略类型生成随机密码或口令短语
+
+        Args:
+            count (int): 数量
+            policy (PasswordPolicy | PassphrasePolicy): 策略，None表示默认的随机密码策略
+
+        Returns:
+            list: 生成的密码
+        """
+        if isinstance(policy, PassphrasePolicy):
+            return self.passphrases(count, policy)
+        return self.passwords(count, policy)
+
+    def entropy_bits(self, policy):
+        """按策略生成的密码的熵（比特）"""
+        if isinstance(policy, PassphrasePolicy):
+            return policy.entropy_bits(len(self.words))
+        return policy.entropy_bits()
+
+
+# 单例模式实例
+_generator_instance = None
+
+
+def get_password_generator():
+    """获取密码生成器实例（单例模式）"""
+    global _generator_instance
+    if _generator_instance is None:
+        _generator_instance = PasswordGenerator()
+    return _generator_instance
+
+
+def _discard_after_fork():
+    """子进程不能继续使用父进程缓冲区中的随机字节，否则父子进程会生成相同的密码"""
+    for buffer in list(_buffers):
+        # fork 时其他线程可能正持有锁，子进程中换一把新锁
+        buffer._lock = threading.Lock()
+        buffer.discard()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_discard_after_fork)
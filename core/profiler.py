@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动性能分析模块
+统计冷启动过程中各模块的导入耗时和各初始化阶段的耗时
+"""
+
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+
+class _TimingLoader:
+    """包装真实的加载器，统计模块执行耗时"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 恢复真实加载器，避免影响依赖 __loader__ 的代码
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler._timed_import(module.__name__):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder:
+    """元路径查找器，为每个新导入的模块套上计时加载器"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        if loader is None or not hasattr(loader, 'exec_module'):
+            return spec
+        spec.loader = _TimingLoader(loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    """启动性能分析器"""
+
+    def __init__(self, budget_ms=None):
+        """
+        初始化
+
+        Args:
+            budget_ms (float): 冷启动时间预算（毫秒），None表示不检查
+        """
+        self.budget_ms = budget_ms
+        self.enabled = False
+        self.imports = {}
+        self.stages = []
+        self._stack = []
+        self._finder = None
+        self._start = time.perf_counter()
+
+    def enable(self):
+        """开始统计模块导入耗时"""
+        if self.enabled:
+            return
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+        self.enabled = True
+
+    def disable(self):
+        """停止统计模块导入耗时"""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+        self.enabled = False
+
+    @contextmanager
+    def _timed_import(self, name):
+        """记录单个模块的导入耗时（区分自身耗时和累计耗时）"""
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self.imports[name] = {
+                'self_ms': (elapsed - frame[2]) * 1000,
+                'cumulative_ms': elapsed * 1000,
+                'nested': len(self._stack) > 0,
+            }
+
+    @contextmanager
+    def stage(self, name):
+        """
+        统计一个初始化阶段的耗时
+
+        Args:
+            name (str): 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                'name': name,
+                'start_ms': (start - self._start) * 1000,
+                'duration_ms': (time.perf_counter() - start) * 1000,
+            })
+
+    def elapsed_ms(self):
+        """获取从分析器创建到现在的耗时（毫秒）"""
+        return (time.perf_counter() - self._start) * 1000
+
+    def report(self, top=25):
+        """
+        生成分析报告
+
+        Args:
+            top (int): 按自身耗时排序保留的模块数量
+
+        Returns:
+            dict: 分析报告
+        """
+        modules = sorted(
+            ({'module': name, **data} for name, data in self.imports.items()),
+            key=lambda item: item['self_ms'],
+            reverse=True
+        )
+        import_total = sum(
+            data['cumulative_ms'] for data in self.imports.values() if not data['nested']
+        )
+        total_ms = self.elapsed_ms()
+        return {
+            'total_ms': total_ms,
+            'budget_ms': self.budget_ms,
+            'over_budget': self.budget_ms is not None and total_ms > self.budget_ms,
+            'import_total_ms': import_total,
+            'module_count': len(self.imports),
+            'stages': list(self.stages),
+            'modules': modules[:top],
+        }
+
+    def format_report(self, report=None):
+        """
+        将分析报告格式化为文本
+
+        Args:
+            report (dict): 分析报告，None则重新生成
+
+        Returns:
+            str: 报告文本
+        """
+        if report is None:
+            report = self.report()
+        lines = [
+            "== Startup profile ==",
+            f"total: {report['total_ms']:.1f} ms"
+            + (f" (budget {report['budget_ms']} ms)" if report['budget_ms'] is not None else ""),
+            f"imports: {report['import_total_ms']:.1f} ms across {report['module_count']} modules",
+            "",
+            "stages:",
+        ]
+        for stage in report['stages']:
+            lines.append(
+                f"  {stage['name']:<32} {stage['duration_ms']:>9.1f} ms"
+                f"  (at {stage['start_ms']:.1f} ms)"
+            )
+        lines.append("")
+        lines.append("slowest modules (self / cumulative):")
+        for module in report['modules']:
+            lines.append(
+                f"  {module['module']:<40} {module['self_ms']:>8.1f} ms"
+                f" {module['cumulative_ms']:>9.1f} ms"
+            )
+        if report['over_budget']:
+            lines.append("")
+            lines.append(
+                f"WARNING: cold start exceeded budget by "
+                f"{report['total_ms'] - report['budget_ms']:.1f} ms"
+            )
+        return "\n".join(lines)
+
+    def write_report(self, path, report=None):
+        """
+        将分析报告写入JSON文件
+
+        Args:
+            path (Path): 输出文件路径
+            report (dict): 分析报告，None则重新生成
+        """
+        if report is None:
+            report = self.report(top=len(self.imports))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+# 单例模式实例
+_profiler_instance = None
+
+
+def get_profiler():
+    """获取启动分析器实例（单例模式）"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        _profiler_instance = StartupProfiler()
+    return _profiler_instance
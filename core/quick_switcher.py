@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+快速切换索引模块
+在内存中为服务名称和用户名建立字符和三元组倒排索引，快速切换面板（Ctrl+K）每次按键都在索引中
+模糊匹配，结果按匹配程度排序，只返回前若干条，不再对数据库执行 LIKE 查询
+
+- 索引从 PasswordDatabase.get_changes 的变更流增量更新：记住已读取的变更序号，
+  每次只读取之后新增、修改和删除的记录
+- 每条记录的服务名称和用户名各是一个文档（编号为 槽位*2 + 字段），文本经 collation.search_text 折叠，
+  忽略大小写、全角半角和重音
+- 倒排表中出现次数少的用有序数组保存，多的（超过文档数的1/32）用位图保存，
+  求交集时位图转为整数按位与，只有真正的候选才在Python中逐个检查
+- 匹配等级从高到低：前缀、单词开头、子串、子序列（"gthb" 匹配 "github"）、
+  三元组相似（至少一半的三元组相同，容忍错字）。高等级的结果已经够数时不再检查低等级，
+  每个等级最多检查 QUICK_SWITCHER_SCAN_LIMIT 个候选，每次按键的耗时基本不随密码库增大
+- 只在界面线程中使用，不加锁
+"""
+
+import re
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict, namedtuple
+from itertools import chain, islice
+
+from config.settings import QUICK_SWITCHER_RESULTS, QUICK_SWITCHER_SCAN_LIMIT
+from core.collation import fold, search_text
+from core.metrics import timed
+
+
+# 搜索结果：记录ID、服务名称、用户名、匹配分数（可比较的元组，越大越好）
+SwitchResult = namedtuple("SwitchResult", ("id", "service_name", "username", "score"))
+
+# 匹配等级
+MATCH_PREFIX = 4        # 以查询开头
+MATCH_WORD = 3          # 某个单词以查询开头（前一个字符不是字母或数字）
+MATCH_SUBSTRING = 2     # 包含查询
+MATCH_SUBSEQUENCE = 1   # 按顺序包含查询的每个字符
+MATCH_SIMILAR = 0       # 至少一半的三元组相同
+
+# 倒排表的文档数超过文档总数的 1/_DENSE_RATIO 时改用位图
+_DENSE_RATIO = 32
+# 变更超过已索引记录数的 1/_REBUILD_RATIO 时整体重建，不逐条更新
+_REBUILD_RATIO = 4
+
+# 每个字节中为1的位
+_BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+_NONZERO_BYTE = re.compile(rb'[^\x00]')
+
+
+def _trigrams(text):
+    """文本中所有的三元组"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _iter_bits(value):
+    """按从小到大的顺序列出整数中为1的位（先由正则表达式跳过全0的字节）"""
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+    for match in _NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        for bit in _BIT_POSITIONS[data[match.start()]]:
+            yield base + bit
+
+
+class _Postings:
+    """一个字符或三元组的倒排表：有序的文档编号数组，或位图"""
+
+    __slots__ = ("keys", "bits", "count")
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else array('I')
+        self.bits = None
+        self.count = len(self.keys)
+
+    def densify(self):
+        """改用位图保存"""
+        self.bits = bytearray(self.as_int().to_bytes((self.keys[-1] >> 3) + 1, 'little'))
+        self.keys = None
+
+    def add(self, key):
+        if self.bits is None:
+            insort(self.keys, key)
+        else:
+            index = key >> 3
+            if index >= len(self.bits):
+                self.bits.extend(bytes(index + 1 - len(self.bits)))
+            self.bits[index] |= 1 << (key & 7)
+        self.count += 1
+
+    def discard(self, key):
+        if self.bits is None:
+            index = bisect_left(self.keys, key)
+            del self.keys[index]
+        else:
+            self.bits[key >> 3] &= ~(1 << (key & 7))
+        self.count -= 1
+
+    def __contains__(self, key):
+        if self.bits is None:
+            index = bisect_left(self.keys, key)
+            return index < len(self.keys) and self.keys[index] == key
+        index = key >> 3
+        return index < len(self.bits) and self.bits[index] >> (key & 7) & 1 == 1
+
+    def __iter__(self):
+        if self.bits is None:
+            return iter(self.keys)
+        return _iter_bits(int.from_bytes(self.bits, 'little'))
+
+    def as_int(self):
+        """位图形式的整数（数组形式时临时构建位图）"""
+        if self.bits is not None:
+            return int.from_bytes(self.bits, 'little')
+        bits = bytearray((self.keys[-1] >> 3) + 1 if self.keys else 0)
+        for key in self.keys:
+            bits[key >> 3] |= 1 << (key & 7)
+        return int.from_bytes(bits, 'little')
+
+
+def _intersect(postings):
+    """
+    按从小到大的顺序列出同时出现在所有倒排表中的文档编号
+
+    最短的倒排表是数组时逐个检查是否在其他表中；都是位图时转为整数按位与
+    """
+    postings = sorted(postings, key=lambda item: item.count)
+    first, rest = postings[0], postings[1:]
+    if first.bits is None:
+        for key in first.keys:
+            if all(key in item for item in rest):
+                yield key
+        return
+    value = first.as_int()
+    for item in rest:
+        value &= item.as_int()
+    yield from _iter_bits(value)
+
+
+class QuickSwitchIndex:
+    """一个密码库的快速切换索引"""
+
+    def __init__(self, db, limit=None, scan_limit=None):
+        """
+        初始化快速切换索引（第一次 refresh 时读取全部记录）
+
+        Args:
+            db (PasswordDatabase): 密码库
+            limit (int): 最多返回的结果数，None表示使用默认配置
+            scan_limit (int): 每个匹配等级最多检查的候选数，None表示使用默认配置
+        """
+        self.db = db
+        self.limit = limit or QUICK_SWITCHER_RESULTS
+        self.scan_limit = scan_limit or QUICK_SWITCHER_SCAN_LIMIT
+        self.clear()
+
+    def clear(self):
+        """清空索引，下次 refresh 时重新读取全部记录（例如恢复快照之后）"""
+        # 已读取的变更序号和密码库的副本ID
+        self.seq = 0
+        self.replica_id = None
+        # 槽位 -> (记录ID, 服务名称, 用户名)，空闲槽位为None
+        self._entries = []
+        self._free = []
+        # uuid -> 槽位
+        self._slots = {}
+        # 文档编号 -> 折叠后的文本
+        self._texts = []
+        # 服务名称和用户名各一个 (文本, 文档编号) 的有序列表，用于前缀匹配
+        self._sorted = ([], [])
+        self._chars = {}
+        self._trigrams = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    @timed("quick_switcher.refresh")
+    def refresh(self):
+        """
+        读取上次之后的变更并更新索引。变更较多（例如导入了大量记录）时整体重建
+
+        Returns:
+            int: 读取到的变更数
+        """
+        replica_id = self.db.get_metadata('replica_id')
+        if replica_id != self.replica_id:
+            self.clear()
+        seq, rows, deleted = self.db.get_changes(self.seq)
+        if seq < self.seq or (self._slots and
+                              len(rows) + len(deleted) > len(self._slots) // _REBUILD_RATIO):
+            # 变更序号变小说明密码库被替换（例如恢复了较早的快照）
+            self.clear()
+            seq, rows, deleted = self.db.get_changes(0)
+        if not self._slots:
+            self._build(rows)
+        else:
+            for uuid in deleted:
+                self._remove(uuid)
+            for row in rows:
+                self._update(*row)
+        self.seq = seq
+        self.replica_id = replica_id
+        return len(rows) + len(deleted)
+
+    def _build(self, rows):
+        """从全部记录建立索引（按名称顺序分配槽位，同一匹配等级内先检查名称靠前的记录）"""
+        rows = sorted(
+            (search_text(service_name), search_text(username), record_id, uuid, service_name, username)
+            for record_id, uuid, service_name, username in rows
+        )
+        texts = self._texts
+        chars = defaultdict(lambda: array('I'))
+        trigrams = defaultdict(lambda: array('I'))
+        for slot, (name_text, user_text, record_id, uuid, service_name, username) in enumerate(rows):
+            self._slots[uuid] = slot
+            self._entries.append((record_id, service_name, username))
+            for key, text in ((slot * 2, name_text), (slot * 2 + 1, user_text)):
+                texts.append(text)
+                for char in set(text):
+                    chars[char].append(key)
+                for trigram in _trigrams(text):
+                    trigrams[trigram].append(key)
+        for field in (0, 1):
+            self._sorted[field].extend(sorted(zip(texts[field::2], range(field, len(texts), 2))))
+        threshold = len(texts) // _DENSE_RATIO
+        for target, source in ((self._chars, chars), (self._trigrams, trigrams)):
+            for token, keys in source.items():
+                postings = target[token] = _Postings(keys)
+                if postings.count > threshold:
+                    postings.densify()
+
+    def _update(self, record_id, uuid, service_name, username):
+        """写入一条新增或修改的记录（名称没有变化时不重建其文档）"""
+        slot = self._slots.get(uuid)
+        if slot is not None:
+            if self._entries[slot] == (record_id, service_name, username):
+                return
+            self._remove(uuid)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._entries)
+            self._entries.append(None)
+            self._texts.extend((None, None))
+        self._slots[uuid] = slot
+        self._entries[slot] = (record_id, service_name, username)
+        self._add_document(slot * 2, search_text(service_name))
+        self._add_document(slot * 2 + 1, search_text(username))
+
+    def _remove(self, uuid):
+        """删除一条记录（不在索引中时忽略）"""
+        slot = self._slots.pop(uuid, None)
+        if slot is None:
+            return
+        self._remove_document(slot * 2)
+        self._remove_document(slot * 2 + 1)
+        self._entries[slot] = None
+        self._free.append(slot)
+
+    def _add_document(self, key, text):
+        self._texts[key] = text
+        insort(self._sorted[key & 1], (text, key))
+        threshold = len(self._texts) // _DENSE_RATIO
+        for table, tokens in ((self._chars, set(text)), (self._trigrams, _trigrams(text))):
+            for token in tokens:
+                postings = table.get(token)
+                if postings is None:
+                    postings = table[token] = _Postings()
+                postings.add(key)
+                if postings.bits is None and postings.count > threshold:
+                    postings.densify()
+
+    def _remove_document(self, key):
+        text = self._texts[key]
+        self._texts[key] = None
+        ordered = self._sorted[key & 1]
+        del ordered[bisect_left(ordered, (text, key))]
+        for table, tokens in ((self._chars, set(text)), (self._trigrams, _trigrams(text))):
+            for token in tokens:
+                postings = table[token]
+                postings.discard(key)
+                if not postings.count:
+                    del table[token]
+
+    def _candidates(self, table, tokens):
+        """同时包含所有字符或三元组的文档；某个不在索引中时为空"""
+        postings = []
+        for token in tokens:
+            item = table.get(token)
+            if item is None:
+                return iter(())
+            postings.append(item)
+        return _intersect(postings)
+
+    @timed("quick_switcher.search")
+    def search(self, query, limit=None):
+        """
+        模糊查找记录
+
+        Args:
+            query (str): 用户输入的查询（忽略大小写、全角半角和重音）
+            limit (int): 最多返回的结果数，None表示使用初始化时的设置
+
+        Returns:
+            list: 按分数从高到低排列的 SwitchResult
+        """
+        limit = limit or self.limit
+        query = fold(query)
+        if not query:
+            return []
+        texts = self._texts
+        # 槽位 -> 分数 (匹配等级, 是否匹配服务名称, 同一等级内的得分, 文本越短越好)
+        found = {}
+
+        def offer(key, level, points):
+            slot = key >> 1
+            score = (level, 1 - (key & 1), points, -len(texts[key]))
+            current = found.get(slot)
+            if current is None or current < score:
+                found[slot] = score
+
+        # 前缀：在有序列表中二分查找，先服务名称后用户名，各自按字母顺序取够数即止
+        for ordered in self._sorted:
+            start = bisect_left(ordered, (query,))
+            for text, key in islice(ordered, start, start + limit):
+                if not text.startswith(query):
+                    break
+                offer(key, MATCH_PREFIX, 0)
+            if len(found) >= limit:
+                return self._results(found, limit)
+
+        # 单词开头和子串：包含查询的所有三元组（查询少于3个字符时包含所有字符）的文档
+        if len(query) >= 3:
+            candidates = self._candidates(self._trigrams, _trigrams(query))
+        else:
+            candidates = self._candidates(self._chars, set(query))
+        for key in islice(candidates, self.scan_limit):
+            text = texts[key]
+            position = text.find(query)
+            if position > 0:
+                offer(key, MATCH_SUBSTRING if text[position - 1].isalnum() else MATCH_WORD, -position)
+        if len(found) >= limit or len(query) < 2:
+            return self._results(found, limit)
+
+        # 子序列：包含查询的所有字符，再用正则表达式检查顺序，字符越紧凑得分越高。
+        # 每个字符之前只跳过不是该字符的部分（"g[^t]*t[^h]*h..."），不会回溯
+        escaped = [re.escape(char) for char in query]
+        pattern = re.compile(escaped[0] + "".join(f"[^{char}]*{char}" for char in escaped[1:]))
+        for key in islice(self._candidates(self._chars, set(query)), self.scan_limit):
+            if key >> 1 in found:
+                continue
+            match = pattern.search(texts[key])
+            if match:
+                offer(key, MATCH_SUBSEQUENCE, len(query) - (match.end() - match.start()))
+        if len(found) >= limit:
+            return self._results(found, limit)
+
+        # 三元组相似：至少一半的三元组相同。满足条件的文档一定出现在最短的若干个倒排表之一中，
+        # 只从这些表中取候选，再数每个候选在多少个表中出现（数组形式的表临时转为集合）
+        grams = _trigrams(query)
+        required = (len(grams) + 1) // 2
+        postings = sorted((self._trigrams[trigram] for trigram in grams if trigram in self._trigrams),
+                          key=lambda item: item.count)
+        if len(grams) >= 2 and len(postings) >= required:
+            sparse = [set(item.keys) for item in postings if item.bits is None]
+            dense = [item.bits for item in postings if item.bits is not None]
+            sources = chain.from_iterable(postings[:len(postings) - required + 1])
+            for key in islice(sources, self.scan_limit):
+                if key >> 1 in found:
+                    continue
+                index, bit = key >> 3, 1 << (key & 7)
+                shared = (sum(1 for keys in sparse if key in keys)
+                          + sum(1 for bits in dense if index < len(bits) and bits[index] & bit))
+                if shared >= required:
+                    offer(key, MATCH_SIMILAR, shared)
+        return self._results(found, limit)
+
+    def _results(self, found, limit):
+        """分数最高的 limit 条结果"""
+        entries = self._entries
+        return [
+            SwitchResult(*entries[slot], score)
+            for slot, score in heapq.nlargest(limit, found.items(), key=lambda item: item[1])
+        ]
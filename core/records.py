@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+记录类型模块
+数据库接口返回的紧凑记录类型，以及界面列表使用的按列存储的列表快照。
+
+EntrySummary 是没有 __dict__ 的元组，兼容原来的字典用法（record['id']、dict(record)）；
+ListingSnapshot 把列表按列保存：ID在 array('q') 中，服务名称和用户名各是一段UTF-8字节加偏移数组，
+时间戳按值去重后保存编号。百万条记录的列表不再需要百万个字典和数百万个字符串对象
+"""
+
+import json
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+
+
+_ENTRY_FIELDS = ("id", "service_name", "username", "created_at", "updated_at")
+_ENTRY_INDEX = {name: index for index, name in enumerate(_ENTRY_FIELDS)}
+
+
+class EntrySummary(namedtuple("EntrySummary", _ENTRY_FIELDS)):
+    """
+    列表中的一条记录（不含密码）
+
+    既可以按属性访问（record.service_name），也可以像原来的字典一样按键访问（record['service_name']）
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = _ENTRY_INDEX[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def keys(self):
+        """字段名（使 dict(record) 得到原来的字典）"""
+        return self._fields
+
+    def get(self, key, default=None):
+        """按键读取，键不存在时返回默认值"""
+        index = _ENTRY_INDEX.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+
+class PackedStrings(Sequence):
+    """
+    只追加的字符串列：所有字符串的UTF-8编码连续存放在一个 bytearray 中，
+    第i个字符串是 data[offsets[i]:offsets[i + 1]]，读取时才解码
+    """
+
+    __slots__ = ("_data", "_offsets", "_nulls")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('q', [0])
+        # 值为None的位置（通常为空，只有出现None时才创建）
+        self._nulls = None
+
+    def append(self, value):
+        """追加一个字符串（可以为None）"""
+        if value is None:
+            if self._nulls is None:
+                self._nulls = set()
+            self._nulls.add(len(self._offsets) - 1)
+        else:
+            self._data += value.encode('utf-8')
+        self._offsets.append(len(self._data))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if self._nulls and index in self._nulls:
+            return None
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def take(self, indices):
+        """按下标取出若干个字符串组成新的列（直接复制字节，不解码）"""
+        result = PackedStrings()
+        data = result._data
+        append_offset = result._offsets.append
+        source = self._data
+        offsets = self._offsets
+        nulls = self._nulls
+        for position, index in enumerate(indices):
+            if nulls and index in nulls:
+                if result._nulls is None:
+                    result._nulls = set()
+                result._nulls.add(position)
+            data += source[offsets[index]:offsets[index + 1]]
+            append_offset(len(data))
+        return result
+
+    def nbytes(self):
+        """占用的字节数（近似值）"""
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+    def to_buffers(self):
+        """导出为 (偏移数组, UTF-8字节, 值为None的下标数组)，用于写入列表缓存文件"""
+        return self._offsets, self._data, array('q', sorted(self._nulls or ()))
+
+    @classmethod
+    def from_buffers(cls, offsets, data, nulls):
+        """从 to_buffers 导出的缓冲区（可以是内存映射文件的切片）构建，每列整块复制"""
+        result = cls()
+        result._offsets = array('q')
+        result._offsets.frombytes(offsets)
+        result._data = bytearray(data)
+        positions = array('q')
+        positions.frombytes(nulls)
+        result._nulls = set(positions) or None
+        if len(result._offsets) < 1 or result._offsets[-1] != len(result._data):
+            raise ValueError("字符串列的偏移数组与数据长度不一致")
+        return result
+
+
+class InternedStrings(Sequence):
+    """
+    按值去重的字符串列：每个不同的值只保存一次，每行保存值的编号。
+    适合重复较多的列，例如批量导入时大量相同的时间戳
+    """
+
+    __slots__ = ("_values", "_index", "_codes")
+
+    def __init__(self):
+        self._values = []
+        self._index = {}
+        self._codes = array('I')
+
+    def append(self, value):
+        """追加一个值（可以为None）"""
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self._values)
+            self._values.append(value)
+        self._codes.append(code)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._values[code] for code in self._codes[index]]
+        return self._values[self._codes[index]]
+
+    def take(self, indices):
+        """按下标取出若干个值组成新的列（共用去重后的值）"""
+        result = InternedStrings()
+        result._values = list(self._values)
+        result._index = dict(self._index)
+        result._codes = array('I', map(self._codes.__getitem__, indices))
+        return result
+
+    def nbytes(self):
+        """占用的字节数（近似值，不含去重字典）"""
+        return (self._codes.itemsize * len(self._codes)
+                + sum(len(value) for value in self._values if isinstance(value, str)))
+
+    def to_buffers(self):
+        """导出为 (编号数组, 去重后的值的JSON)，用于写入列表缓存文件"""
+        return self._codes, json.dumps(self._values).encode('utf-8')
+
+    @classmethod
+    def from_buffers(cls, codes, values):
+        """从 to_buffers 导出的缓冲区构建"""
+        result = cls()
+        result._values = json.loads(bytes(values))
+        result._index = {value: code for code, value in enumerate(result._values)}
+        result._codes.frombytes(codes)
+        if result._codes and max(result._codes) >= len(result._values):
+            raise ValueError("编号超出去重后的值的范围")
+        return result
+
+
+class ListingSnapshot(Sequence):
+    """
+    按列存储的列表快照（get_listing 和 filter_passwords 的返回值）
+
+    按下标读取时才创建 EntrySummary；界面模型直接按列读取单元格，不创建记录对象
+    """
+
+    __slots__ = ("ids", "service_names", "usernames", "created_at", "updated_at")
+
+    def __init__(self):
+        self.ids = array('q')
+        self.service_names = PackedStrings()
+        self.usernames = PackedStrings()
+        self.created_at = InternedStrings()
+        self.updated_at = InternedStrings()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        从 (id, service_name, username, created_at, updated_at) 行构建（可以直接传入游标，逐行读取）
+
+        Args:
+            rows (iterable): 行序列
+
+        Returns:
+            ListingSnapshot: 列表快照
+        """
+        snapshot = cls()
+        append_id = snapshot.ids.append
+        append_service = snapshot.service_names.append
+        append_username = snapshot.usernames.append
+        append_created = snapshot.created_at.append
+        append_updated = snapshot.updated_at.append
+        for record_id, service_name, username, created_at, updated_at in rows:
+            append_id(record_id)
+            append_service(service_name)
+            append_username(username)
+            append_created(created_at)
+            append_updated(updated_at)
+        return snapshot
+
+    @classmethod
+    def from_records(cls, records):
+        """从记录字典或 EntrySummary 序列构建"""
+        return cls.from_rows(
+            (record['id'], record['service_name'], record['username'],
+             record['created_at'], record['updated_at'])
+            for record in records
+        )
+
+    def without(self, record_ids):
+        """
+        去掉指定记录后的新快照（按列复制，不重新查询数据库，其余行的顺序不变）
+
+        Args:
+            record_ids (iterable): 要去掉的记录ID
+
+        Returns:
+            ListingSnapshot: 新快照
+        """
+        record_ids = set(record_ids)
+        keep = [index for index, record_id in enumerate(self.ids) if record_id not in record_ids]
+        snapshot = ListingSnapshot()
+        snapshot.ids = array('q', map(self.ids.__getitem__, keep))
+        snapshot.service_names = self.service_names.take(keep)
+        snapshot.usernames = self.usernames.take(keep)
+        snapshot.created_at = self.created_at.take(keep)
+        snapshot.updated_at = self.updated_at.take(keep)
+        return snapshot
+
+    def to_buffers(self):
+        """
+        按列导出为缓冲区列表（顺序固定，数组为本机字节序），用于写入列表缓存文件
+
+        Returns:
+            list: ID、服务名称（3个）、用户名（3个）、创建时间（2个）、更新时间（2个）共11个缓冲区
+        """
+        return [self.ids, *self.service_names.to_buffers(), *self.usernames.to_buffers(),
+                *self.created_at.to_buffers(), *self.updated_at.to_buffers()]
+
+    @classmethod
+    def from_buffers(cls, buffers):
+        """从 to_buffers 导出的缓冲区构建（每列整块复制，不逐行解析）"""
+        if len(buffers) != 11:
+            raise ValueError("列表快照需要11个缓冲区")
+        snapshot = cls()
+        snapshot.ids.frombytes(buffers[0])
+        snapshot.service_names = PackedStrings.from_buffers(*buffers[1:4])
+        snapshot.usernames = PackedStrings.from_buffers(*buffers[4:7])
+        snapshot.created_at = InternedStrings.from_buffers(*buffers[7:9])
+        snapshot.updated_at = InternedStrings.from_buffers(*buffers[9:11])
+        count = len(snapshot.ids)
+        if not (len(snapshot.service_names) == len(snapshot.usernames) == len(snapshot.created_at)
+                == len(snapshot.updated_at) == count):
+            raise ValueError("列表快照各列的行数不一致")
+        return snapshot
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return EntrySummary(self.ids[index], self.service_names[index], self.usernames[index],
+                            self.created_at[index], self.updated_at[index])
+
+    def nbytes(self):
+        """占用的字节数（近似值）"""
+        return (self.ids.itemsize * len(self.ids) + self.service_names.nbytes()
+                + self.usernames.nbytes() + self.created_at.nbytes() + self.updated_at.nbytes())
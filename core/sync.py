@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码库同步模块
+在两个密码库文件之间做增量双向同步。每条记录有全局唯一的 uuid 和版本（逻辑时钟, 副本ID），
+删除留下墓碑，版本和本库的变更序号由 core.database 中的触发器维护。
+同步时只读取对方上次同步之后的变更（变更序号大于水位线），按版本决定取舍，
+分批交给本库的写队列写入；文件夹、标签、附件和使用统计只属于本库，不参与同步
+"""
+
+from pathlib import Path
+
+from config.settings import DATABASE_FILE, SYNC_BATCH_SIZE
+from core.audit_log import utc_now
+from core.concurrency import connect
+from core.database import SYNC_NEXT_CLOCK, SYNC_NEXT_SEQ, SYNC_REPLICA_ID
+from core.metrics import timed
+
+
+# 对方变更中比本库新的记录：本库没有该 uuid 的记录和墓碑，或对方的版本更新
+_CHANGED_ROWS = '''
+    SELECT r.uuid, r.clock, r.origin, r.service_name, r.username, r.encrypted_password,
+           r.created_at, r.updated_at
+    FROM peer.passwords r
+    LEFT JOIN main.passwords l ON l.uuid = r.uuid
+    LEFT JOIN main.sync_tombstones t ON t.uuid = r.uuid
+    WHERE r.seq > ?
+      AND (l.uuid IS NULL OR (r.clock, r.origin) > (l.clock, l.origin))
+      AND (t.uuid IS NULL OR (r.clock, r.origin) > (t.clock, t.origin))
+    ORDER BY r.seq
+'''
+
+# 对方的墓碑中比本库新的
+_CHANGED_TOMBSTONES = '''
+    SELECT r.uuid, r.clock, r.origin
+    FROM peer.sync_tombstones r
+    LEFT JOIN main.passwords l ON l.uuid = r.uuid
+    LEFT JOIN main.sync_tombstones t ON t.uuid = r.uuid
+    WHERE r.seq > ?
+      AND (l.uuid IS NULL OR (r.clock, r.origin) > (l.clock, l.origin))
+      AND (t.uuid IS NULL OR (r.clock, r.origin) > (t.clock, t.origin))
+    ORDER BY r.seq
+'''
+
+# 写入墓碑，已有更新的墓碑时保留原墓碑
+_UPSERT_TOMBSTONE = f'''
+    INSERT INTO sync_tombstones (uuid, clock, origin, seq)
+    VALUES (?, ?, ?, {SYNC_NEXT_SEQ})
+    ON CONFLICT (uuid) DO UPDATE
+    SET clock = excluded.clock, origin = excluded.origin, seq = excluded.seq
+    WHERE (excluded.clock, excluded.origin) > (clock, origin)
+'''
+
+# 合并重复记录时废弃一个 uuid：墓碑的版本比该 uuid 的所有已知版本都新（与删除触发器相同）
+_RETIRE_UUID = f'''
+    INSERT OR REPLACE INTO sync_tombstones (uuid, clock, origin, seq)
+    VALUES (?, MAX({SYNC_NEXT_CLOCK}, ? + 1), {SYNC_REPLICA_ID}, {SYNC_NEXT_SEQ})
+'''
+
+
+def resolve_vault_path(path):
+    """
+    将同步对象转换为密码库文件路径（目录表示其中的默认密码库文件）
+
+    Args:
+        path (Path): 密码库文件或目录
+
+    Returns:
+        Path: 密码库文件路径
+    """
+    path = Path(path).expanduser()
+    if path.is_dir():
+        path = path / Path(DATABASE_FILE).name
+    if not path.exists():
+        raise ValueError(f"密码库文件不存在: {path}")
+    return path
+
+
+def _empty_stats():
+    """同步统计"""
+    return {'inserted': 0, 'updated': 0, 'deleted': 0, 'merged': 0, 'skipped': 0}
+
+
+class _Puller:
+    """把一个密码库（对方）的变更拉取到另一个密码库（本库）"""
+
+    def __init__(self, db, peer, batch_size):
+        self.db = db
+        self.peer = peer
+        self.batch_size = batch_size
+        self.stats = _empty_stats()
+
+    def run(self):
+        """读取对方的变更并分批写入本库"""
+        db, peer = self.db, self.peer
+        db._require_encryption()
+        peer._require_encryption()
+        if Path(db.db_file).resolve() == Path(peer.db_file).resolve():
+            raise ValueError("不能与同一个密码库同步")
+        replica_id = db.get_metadata('replica_id')
+        peer_replica_id = peer.get_metadata('replica_id')
+        if replica_id == peer_replica_id:
+            raise ValueError("两个密码库的副本ID相同（可能是复制的密码库文件），不能同步")
+
+        # 读取变更需要同时打开两个密码库（ATTACH），使用单独的只读连接；写入交给本库的写队列
+        conn = connect(db.db_file, isolation_level=None)
+        try:
+            conn.execute("ATTACH DATABASE ? AS peer", (str(peer.db_file),))
+            row = conn.execute('''
+                SELECT received_seq FROM sync_peers WHERE replica_id = ?
+            ''', (peer_replica_id,)).fetchone()
+            watermark = row[0] if row else 0
+
+            # 在同一个读事务中读取变更和新的水位线，两者对应对方的同一个状态
+            conn.execute("BEGIN")
+            try:
+                rows = conn.execute(_CHANGED_ROWS, (watermark,)).fetchall()
+                tombstones = conn.execute(_CHANGED_TOMBSTONES, (watermark,)).fetchall()
+                new_watermark = conn.execute('''
+                    SELECT MAX(COALESCE((SELECT MAX(seq) FROM peer.passwords), 0),
+                               COALESCE((SELECT MAX(seq) FROM peer.sync_tombstones), 0))
+                ''').fetchone()[0]
+            finally:
+                conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE peer")
+        finally:
+            conn.close()
+
+        def apply(conn, prepared, last):
+            cursor = conn.cursor()
+            for kind, change in prepared:
+                if kind == 'row':
+                    self._apply_row(cursor, change)
+                else:
+                    self._apply_tombstone(cursor, *change)
+            if last:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO sync_peers (replica_id, received_seq, synced_at)
+                    VALUES (?, ?, ?)
+                ''', (peer_replica_id, new_watermark, utc_now()))
+
+        changes = [('row', row) for row in rows] + [('tombstone', row) for row in tombstones]
+        batches = [changes[start:start + self.batch_size]
+                   for start in range(0, len(changes), self.batch_size)] or [[]]
+        for index, batch in enumerate(batches):
+            # 解密和重新加密在写操作之外完成，写锁只在写入时持有；每批是一个写操作，失败时只回滚这一批
+            prepared = [(kind, self._prepare(row) if kind == 'row' else row)
+                        for kind, row in batch]
+            db._write(apply, prepared, index == len(batches) - 1)
+        return self.stats
+
+    def _prepare(self, row):
+        """用对方的密钥解密一条记录，再按本库的设置加密"""
+        db, peer = self.db, self.peer
+        uuid, clock, origin, service_name, username, encrypted_password, created_at, updated_at = row
+        try:
+            service_name = peer._decode_name(service_name)
+            username = peer._decode_name(username)
+            password = peer.encryption.decrypt(encrypted_password)
+        except Exception as e:
+            raise Exception(f"解密对方密码库的记录失败: {str(e)}")
+        return {
+            'uuid': uuid,
+            'version': (clock, origin),
+            'service_name': service_name,
+            'username': username,
+            'stored': (db._encode_name(service_name), db._encode_name(username),
+                       db.encryption.encrypt(password), db._fingerprint(password),
+                       db.entry_key(service_name, username), *db.sort_keys(service_name, username)),
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+
+    def _apply_row(self, cursor, change):
+        """
+        写入对方一条更新的记录
+
+        服务名称和用户名与本库另一条记录（不同 uuid）相同时两者合并为一条：
+        保留较小的 uuid 和较新的内容，另一个 uuid 留下墓碑。两边按相同的规则合并，结果一致
+        """
+        uuid = change['uuid']
+        version = change['version']
+        local = cursor.execute('''
+            SELECT id, clock, origin FROM passwords WHERE uuid = ?
+        ''', (uuid,)).fetchone()
+        # 读取变更之后本库可能又有修改，重新比较版本
+        if local is None:
+            local_version = cursor.execute('''
+                SELECT clock, origin FROM sync_tombstones WHERE uuid = ?
+            ''', (uuid,)).fetchone()
+        else:
+            local_version = local[1:]
+        if local_version is not None and tuple(local_version) >= version:
+            self.stats['skipped'] += 1
+            return
+        other = cursor.execute('''
+            SELECT id, uuid, clock, origin FROM passwords WHERE entry_key = ? AND uuid != ?
+        ''', (change['stored'][4], uuid)).fetchone()
+
+        if other is None:
+            self._write(cursor, local, change)
+            return
+
+        self.stats['merged'] += 1
+        other_id, other_uuid, other_clock, other_origin = other
+        if (other_clock, other_origin) > version:
+            # 本库的记录更新：保留其内容，必要时改用对方的 uuid
+            if local is not None:
+                self._merge_into(cursor, local[0], other_id)
+            if other_uuid < uuid:
+                cursor.execute(_RETIRE_UUID, (uuid, version[0]))
+            else:
+                cursor.execute('''
+                    DELETE FROM sync_tombstones WHERE uuid = ?
+                ''', (uuid,))
+                cursor.execute('''
+                    UPDATE passwords SET uuid = ? WHERE id = ?
+                ''', (uuid, other_id))
+                cursor.execute(_RETIRE_UUID, (other_uuid, other_clock))
+        elif other_uuid < uuid:
+            # 对方的内容写入本库已有的记录
+            if local is not None:
+                self._merge_into(cursor, local[0], other_id)
+            else:
+                cursor.execute(_RETIRE_UUID, (uuid, version[0]))
+            self._write(cursor, (other_id,), dict(change, uuid=other_uuid))
+        elif local is not None:
+            self._merge_into(cursor, other_id, local[0])
+            self._write(cursor, local, change)
+        else:
+            # 对方的内容和 uuid 写入本库已有的记录，保留其文件夹、标签和附件
+            cursor.execute(_RETIRE_UUID, (other_uuid, other_clock))
+            self._write(cursor, (other_id,), change)
+
+    def _write(self, cursor, local, change):
+        """插入或覆盖一条记录，保留对方的 uuid 和版本"""
+        db = self.db
+        clock, origin = change['version']
+        cursor.execute('''
+            DELETE FROM sync_tombstones WHERE uuid = ?
+        ''', (change['uuid'],))
+        if local is not None:
+            cursor.execute('''
+                UPDATE passwords
+                SET uuid = ?, service_name = ?, username = ?, encrypted_password = ?,
+                    password_fingerprint = ?, entry_key = ?, sort_name = ?, sort_username = ?,
+                    updated_at = ?, clock = ?, origin = ?
+                WHERE id = ?
+            ''', (change['uuid'], *change['stored'], change['updated_at'], clock, origin, local[0]))
+            entry_id = local[0]
+            self.stats['updated'] += 1
+        else:
+            cursor.execute(f'''
+                INSERT INTO passwords (service_name, username, encrypted_password,
+                                       password_fingerprint, entry_key, sort_name, sort_username,
+                                       created_at, updated_at, uuid, clock, origin, seq)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {SYNC_NEXT_SEQ})
+            ''', (*change['stored'], change['created_at'], change['updated_at'],
+                  change['uuid'], clock, origin))
+            entry_id = cursor.lastrowid
+            self.stats['inserted'] += 1
+        db._write_blind_index(cursor, entry_id, change['service_name'], change['username'])
+
+    @classmethod
+    def _merge_into(cls, cursor, entry_id, target_id):
+        """合并本库的两条记录：标签和附件移到保留的记录上（重复的丢弃），然后删除另一条"""
+        cursor.execute('''
+            UPDATE OR IGNORE entry_tags SET entry_id = ? WHERE entry_id = ?
+        ''', (target_id, entry_id))
+        cursor.execute('''
+            UPDATE OR IGNORE attachments SET entry_id = ? WHERE entry_id = ?
+        ''', (target_id, entry_id))
+        cls._delete(cursor, entry_id)
+
+    @staticmethod
+    def _delete(cursor, entry_id):
+        """删除本库的一条记录（触发器写入墓碑）"""
+        cursor.execute('''
+            DELETE FROM passwords WHERE id = ?
+        ''', (entry_id,))
+        cursor.execute('''
+            DELETE FROM blind_index WHERE entry_id = ?
+        ''', (entry_id,))
+
+    def _apply_tombstone(self, cursor, uuid, clock, origin):
+        """应用对方的墓碑：删除本库中较旧的记录，并以对方的版本保存墓碑"""
+        local = cursor.execute('''
+            SELECT id, clock, origin FROM passwords WHERE uuid = ?
+        ''', (uuid,)).fetchone()
+        if local is not None:
+            if (local[1], local[2]) >= (clock, origin):
+                self.stats['skipped'] += 1
+                return
+            self._delete(cursor, local[0])
+            self.stats['deleted'] += 1
+        cursor.execute(_UPSERT_TOMBSTONE, (uuid, clock, origin))
+
+
+@timed("sync.pull")
+def pull_changes(db, peer, batch_size=None):
+    """
+    把对方密码库上次同步之后的变更合并到本库
+
+    两边修改了同一条记录时版本较新（逻辑时钟较大，相同时副本ID较大）的一方获胜，
+    结果与同步的方向和次数无关
+
+    Args:
+        db (PasswordDatabase): 本库，已初始化加密器
+        peer (PasswordDatabase): 对方密码库，已初始化加密器
+        batch_size (int): 每个事务写入的记录数，None表示使用默认配置
+
+    Returns:
+        dict: 统计（inserted, updated, deleted, merged, skipped）
+    """
+    return _Puller(db, peer, batch_size or SYNC_BATCH_SIZE).run()
+
+
+@timed("sync.sync_vaults")
+def sync_vaults(db, peer, batch_size=None):
+    """
+    双向同步两个密码库：先拉取对方的变更，再把本库的变更推送给对方
+
+    Args:
+        db (PasswordDatabase): 本库，已初始化加密器
+        peer (PasswordDatabase): 对方密码库，已初始化加密器
+        batch_size (int): 每个事务写入的记录数，None表示使用默认配置
+
+    Returns:
+        dict: {'pulled': 本库的统计, 'pushed': 对方的统计}
+    """
+    pulled = pull_changes(db, peer, batch_size)
+    pushed = pull_changes(peer, db, batch_size)
+    return {'pulled': pulled, 'pushed': pushed}
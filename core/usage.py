@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+使用统计模块
+记录每条密码记录的使用次数和最后使用时间。打开记录时只在内存中累加，
+达到条数阈值或定时器到期时在一个事务中批量写入，查看记录不会变成一次数据库写入
+"""
+
+import threading
+
+from config.settings import USAGE_FLUSH_SIZE, USAGE_FLUSH_INTERVAL
+from core.audit_log import utc_now
+from core.metrics import timed
+
+
+class UsageTracker:
+    """
+    缓冲写入的使用统计
+
+    record 只在内存中累加；后台线程每隔 flush_interval 秒写入一次，
+    累计的记录数达到 flush_size 时立即写入
+    """
+
+    def __init__(self, db, flush_size=None, flush_interval=None):
+        """
+        初始化使用统计
+
+        Args:
+            db (PasswordDatabase): 数据库实例
+            flush_size (int): 触发写入的记录数，None表示使用默认配置
+            flush_interval (float): 定时写入的间隔（秒），None表示使用默认配置
+        """
+        self.db = db
+        self.flush_size = USAGE_FLUSH_SIZE if flush_size is None else flush_size
+        self.flush_interval = USAGE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        # 记录ID -> (新增次数, 最后使用时间)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def record(self, entry_id):
+        """
+        记录一次使用（只在内存中累加）
+
+        Args:
+            entry_id (int): 记录ID
+        """
+        with self._lock:
+            count, _ = self._pending.get(entry_id, (0, None))
+            self._pending[entry_id] = (count + 1, utc_now())
+            pending = len(self._pending)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="usage", daemon=True)
+                self._flusher.start()
+        if pending >= self.flush_size:
+            self.flush()
+
+    def _run(self):
+        """后台定时写入"""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 写入失败的统计已合并回内存，下次再试
+                pass
+
+    @timed("usage.flush")
+    def flush(self):
+        """
+        将累计的使用统计写入数据库
+
+        Returns:
+            int: 写入的记录数
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                self.db.record_usage(pending)
+            except Exception:
+                with self._lock:
+                    for entry_id, (count, last_access) in pending.items():
+                        newer_count, newer_access = self._pending.get(entry_id, (0, last_access))
+                        self._pending[entry_id] = (count + newer_count, max(last_access, newer_access))
+                raise
+            return len(pending)
+
+    def close(self):
+        """停止后台线程并写入剩余的统计"""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+
+# 单例模式实例
+_usage_tracker_instance = None
+
+
+def get_usage_tracker():
+    """获取使用统计实例（单例模式）"""
+    global _usage_tracker_instance
+    if _usage_tracker_instance is None:
+        from core.database import get_database
+        _usage_tracker_instance = UsageTracker(get_database())
+    return _usage_tracker_instance
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+加密导出模块
+将整个密码库流式写入由导出密码保护的单个文件，可在其他设备上验证和恢复
+
+文件格式（所有整数均为大端序）:
+    文件头   magic(8) version(u16) kdf_iterations(u32) salt(16) nonce_prefix(4)
+    数据块   type(1)='C' length(u32) AES-256-GCM密文（明文为该块记录的JSON数组）
+    结尾块   type(1)='T' length(u32) AES-256-GCM密文（明文为 record_count(u64) chunk_count(u64)）
+
+第i块的nonce为 nonce_prefix + i(u64)，附加认证数据为 文件头 + type + i(u64)，
+因此任何块被修改、删除、重排或截断都会在读取时被发现
+"""
+
+import os
+import json
+import struct
+import base64
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from core.encryption import EncryptionManager
+from core.metrics import timed
+
+
+EXPORT_MAGIC = b"TFAPMEXP"
+EXPORT_VERSION = 1
+# 与管理员密码相同的PBKDF2迭代次数（见 EncryptionManager.derive_key_from_password）
+KDF_ITERATIONS = 100000
+# 每个数据块包含的记录数
+EXPORT_CHUNK_RECORDS = 1000
+# 单个块允许的最大长度，防止损坏的长度字段导致一次读取过多数据
+MAX_FRAME_LENGTH = 64 * 1024 * 1024
+
+FRAME_CHUNK = b"C"
+FRAME_TRAILER = b"T"
+
+_HEADER = struct.Struct(">8sHI16s4s")
+_FRAME = struct.Struct(">cI")
+_INDEX = struct.Struct(">Q")
+_TRAILER = struct.Struct(">QQ")
+
+
+def _derive_export_key(password, salt):
+    """从导出密码派生AES-256密钥"""
+    key, _ = EncryptionManager.derive_key_from_password(password, salt)
+    return base64.urlsafe_b64decode(key)
+
+
+def _nonce(nonce_prefix, index):
+    return nonce_prefix + _INDEX.pack(index)
+
+
+def _aad(header, frame_type, index):
+    return header + frame_type + _INDEX.pack(index)
+
+
+def _encrypt_frame(export_key, header, frame_type, index, plaintext):
+    """加密并封装一个块"""
+    nonce_prefix = header[-4:]
+    ciphertext = AESGCM(export_key).encrypt(
+        _nonce(nonce_prefix, index), plaintext, _aad(header, frame_type, index)
+    )
+    return _FRAME.pack(frame_type, len(ciphertext)) + ciphertext
+
+
+def _encrypt_chunk(encryption, job):
+    """
+    解密一批记录并加密为导出数据块（在工作进程中执行，明文不离开该进程）
+
+    Args:
+        job (tuple): (export_key, header, index, name_encryption, rows)
+
+    Returns:
+        tuple: (块字节, 导出的记录数, 无法解密的记录ID列表)
+    """
+    export_key, header, index, name_encryption, rows = job
+    records = []
+    unreadable = []
+    for record_id, service_name, username, encrypted_password, created_at, updated_at in rows:
+        try:
+            if name_encryption:
+                service_name = encryption.decrypt(service_name.encode('ascii'))
+                username = encryption.decrypt(username.encode('ascii'))
+            password = encryption.decrypt(encrypted_password)
+        except Exception:
+            unreadable.append(record_id)
+            continue
+        records.append([service_name, username, password, created_at, updated_at])
+    plaintext = json.dumps(records, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _encrypt_frame(export_key, header, FRAME_CHUNK, index, plaintext), len(records), unreadable
+
+
+@timed("export.export_vault")
+def export_vault(db, file_path, password, chunk_records=EXPORT_CHUNK_RECORDS, workers=None,
+                 progress=None, record_ids=None):
+    """
+    将密码库（或选中的记录）导出为加密文件（先写入临时文件，完成后再替换目标文件）
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        file_path (str): 导出文件路径
+        password (str): 导出密码
+        chunk_records (int): 每个数据块的记录数
+        workers (int): 并行处理的进程数，None表示使用默认配置
+        progress (callable): 进度回调，参数为已导出的记录数
+        record_ids (iterable): 只导出这些记录，None表示导出全部记录
+
+    Returns:
+        dict: records（导出的记录数）, chunks（数据块数）, unreadable（无法解密的记录ID列表）
+    """
+    from config.settings import VAULT_SCAN_WORKERS
+    from core.parallel import map_batches
+
+    if db.encryption is None:
+        raise Exception("加密器未初始化，请先验证管理员密码")
+    if not password:
+        raise ValueError("导出密码不能为空")
+    if workers is None:
+        workers = VAULT_SCAN_WORKERS
+
+    salt = os.urandom(16)
+    header = _HEADER.pack(EXPORT_MAGIC, EXPORT_VERSION, KDF_ITERATIONS, salt, os.urandom(4))
+    export_key = _derive_export_key(password, salt)
+    jobs = (
+        (export_key, header, index, db.name_encryption, rows)
+        for index, rows in enumerate(db.iter_records(chunk_records, record_ids))
+    )
+
+    record_count = 0
+    chunk_count = 0
+    unreadable = []
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(header)
+            for frame, count, failed in map_batches(_encrypt_chunk, jobs, db.encryption, workers):
+                out.write(frame)
+                record_count += count
+                chunk_count += 1
+                unreadable.extend(failed)
+                if progress is not None:
+                    progress(record_count)
+            out.write(_encrypt_frame(export_key, header, FRAME_TRAILER, chunk_count,
+                                     _TRAILER.pack(record_count, chunk_count)))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {'records': record_count, 'chunks': chunk_count, 'unreadable': unreadable}
+
+
+class ExportReader:
+    """
+    加密导出文件读取器
+
+    迭代时逐块读取、校验并解密，只在内存中保留当前块；
+    读到结尾块并核对记录数和块数后迭代才正常结束
+    """
+
+    def __init__(self, file_path, password):
+        """
+        打开导出文件并派生密钥
+
+        Args:
+            file_path (str): 导出文件路径
+            password (str): 导出密码
+        """
+        self._file = open(file_path, 'rb')
+        header = self._file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            self.close()
+            raise ValueError("不是有效的导出文件")
+        magic, version, iterations, salt, nonce_prefix = _HEADER.unpack(header)
+        if magic != EXPORT_MAGIC:
+            self.close()
+            raise ValueError("不是有效的导出文件")
+        if version != EXPORT_VERSION or iterations != KDF_ITERATIONS:
+            self.close()
+            raise ValueError("不支持的导出文件版本")
+        self.header = header
+        self._nonce_prefix = nonce_prefix
+        self._aesgcm = AESGCM(_derive_export_key(password, salt))
+        self.record_count = 0
+        self.chunk_count = 0
+        self.complete = False
+
+    def close(self):
+        """关闭文件"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _read_frame(self):
+        """读取并解密下一个块，返回 (type, 明文)"""
+        frame_header = self._file.read(_FRAME.size)
+        if len(frame_header) != _FRAME.size:
+            raise ValueError("导出文件不完整：缺少结尾块")
+        frame_type, length = _FRAME.unpack(frame_header)
+        if frame_type not in (FRAME_CHUNK, FRAME_TRAILER) or length > MAX_FRAME_LENGTH:
+            raise ValueError(f"导出文件已损坏：第 {self.chunk_count + 1} 块格式错误")
+        ciphertext = self._file.read(length)
+        if len(ciphertext) != length:
+            raise ValueError("导出文件不完整：数据块被截断")
+        index = self.chunk_count
+        try:
+            plaintext = self._aesgcm.decrypt(
+                _nonce(self._nonce_prefix, index), ciphertext, _aad(self.header, frame_type, index)
+            )
+        except InvalidTag:
+            if index == 0:
+                raise ValueError("导出密码错误或文件已损坏")
+            raise ValueError(f"导出文件已损坏：第 {index + 1} 块校验失败")
+        return frame_type, plaintext
+
+    def __iter__(self):
+        """
+        逐条返回记录
+
+        Yields:
+            tuple: (service_name, username, password, updated_at, created_at)
+        """
+        while True:
+            frame_type, plaintext = self._read_frame()
+            if frame_type == FRAME_TRAILER:
+                record_count, chunk_count = _TRAILER.unpack(plaintext)
+                if record_count != self.record_count or chunk_count != self.chunk_count:
+                    raise ValueError("导出文件已损坏：记录数与结尾块不一致")
+                if self._file.read(1):
+                    raise ValueError("导出文件已损坏：结尾块之后存在多余数据")
+                self.complete = True
+                return
+            self.chunk_count += 1
+            records = json.loads(plaintext)
+            self.record_count += len(records)
+            for service_name, username, password, created_at, updated_at in records:
+                yield service_name, username, password, updated_at, created_at
+
+    @timed("export.verify")
+    def verify(self):
+        """
+        校验整个文件（不保留记录）
+
+        Returns:
+            int: 文件中的记录数
+        """
+        for _ in self:
+            pass
+        return self.record_count
+
+
+@timed("export.restore_export")
+def restore_export(db, file_path, password, strategy=None, dry_run=False):
+    """
+    将导出文件恢复到当前密码库，按服务名称和用户名与已有记录合并
+
+    整个文件校验通过后才会写入密码库，文件损坏时不会写入任何记录
+
+    Args:
+        db (PasswordDatabase): 已初始化加密器的数据库实例
+        file_path (str): 导出文件路径
+        password (str): 导出密码
+        strategy (str): 合并策略（见 core.merge），None表示跳过已存在的记录
+        dry_run (bool): 为True时只返回差异报告，不写入数据库
+
+    Returns:
+        dict: 合并结果，见 core.merge.merge_records
+    """
+    from core.merge import merge_records, STRATEGY_SKIP
+
+    with ExportReader(file_path, password) as reader:
+        return merge_records(db, reader, strategy or STRATEGY_SKIP, dry_run)
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多密码库模块
+登记和打开多个密码库，每个密码库是独立的 PasswordDatabase 实例，有自己的连接和密钥。
+多个密码库可以并行解锁（PBKDF2计算时释放GIL），跨库搜索把各库 ATTACH 到同一个连接上，
+用一条 UNION ALL 查询完成
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import (
+    DATABASE_FILE, VAULT_FILE, EXTRA_VAULTS, VAULTS_FILE, VAULT_UNLOCK_WORKERS
+)
+from core import blind_index
+from core.database import PasswordDatabase
+from core.metrics import timed
+
+
+# 一个连接上最多可以 ATTACH 的数据库数（SQLite 默认的 SQLITE_MAX_ATTACHED）
+ATTACH_LIMIT = 10
+
+
+@lru_cache(maxsize=256)
+def vault_key(path):
+    """密码库的唯一标识（规范化的绝对路径）"""
+    return str(Path(path).expanduser().resolve())
+
+
+class VaultRegistry:
+    """
+    密码库登记表
+
+    已知的密码库来自主窗口打开的密码库、默认数据库、登记文件（VAULTS_FILE）
+    以及环境变量或命令行指定的额外密码库；密码库在第一次使用时才打开
+    """
+
+    def __init__(self, vaults_file=None, active_file=None, extra_vaults=None):
+        """
+        初始化密码库登记表
+
+        Args:
+            vaults_file (Path): 登记文件，None表示使用默认配置
+            active_file (Path): 主窗口打开的密码库，None表示使用默认配置
+            extra_vaults (list): 额外的密码库路径，None表示使用默认配置
+        """
+        self.vaults_file = Path(vaults_file) if vaults_file is not None else VAULTS_FILE
+        self.active_file = Path(active_file) if active_file is not None else VAULT_FILE
+        self.extra_vaults = list(EXTRA_VAULTS if extra_vaults is None else extra_vaults)
+        # 密码库标识 -> PasswordDatabase
+        self._open = {}
+        self._lock = threading.Lock()
+        # 跨库搜索的连接：一组密码库标识 -> 已 ATTACH 这些密码库的连接，
+        # 重复搜索时不必重新 ATTACH 和读取各库的表结构
+        self._search_connections = {}
+        self._search_lock = threading.Lock()
+
+    def _load(self):
+        """读取登记文件"""
+        if not self.vaults_file.exists():
+            return []
+        try:
+            with open(self.vaults_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"无法读取密码库列表 {self.vaults_file}: {e}")
+        return [{'name': entry['name'], 'path': Path(entry['path'])} for entry in entries]
+
+    def _save(self, entries):
+        """写入登记文件（先写临时文件再替换）"""
+        self.vaults_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.vaults_file.with_name(self.vaults_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump([{'name': entry['name'], 'path': str(entry['path'])} for entry in entries],
+                      f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.vaults_file)
+
+    def known_vaults(self):
+        """
+        获取所有已知的密码库（按标识去重，主窗口打开的密码库在最前）
+
+        Returns:
+            list: 字典列表（key, name, path）
+        """
+        candidates = [{'name': None, 'path': self.active_file}]
+        candidates.append({'name': None, 'path': Path(DATABASE_FILE)})
+        candidates.extend(self._load())
+        candidates.extend({'name': None, 'path': path} for path in self.extra_vaults)
+
+        vaults = {}
+        for entry in candidates:
+            key = vault_key(entry['path'])
+            if key in vaults:
+                # 登记文件中的名称优先
+                if entry['name'] and not vaults[key]['name']:
+                    vaults[key]['name'] = entry['name']
+                continue
+            vaults[key] = {'key': key, 'name': entry['name'], 'path': Path(key)}
+        for vault in vaults.values():
+            if not vault['name']:
+                vault['name'] = vault['path'].stem
+        return list(vaults.values())
+
+    def add_vault(self, path, name=None):
+        """
+        登记一个密码库（已登记时更新名称）
+
+        Args:
+            path (Path): 密码库文件路径，不存在时在第一次打开时创建
+            name (str): 显示名称，None表示使用文件名
+
+        Returns:
+            str: 密码库标识
+        """
+        key = vault_key(path)
+        name = (name or "").strip() or Path(key).stem
+        entries = [entry for entry in self._load() if vault_key(entry['path']) != key]
+        entries.append({'name': name, 'path': Path(key)})
+        self._save(entries)
+        return key
+
+    def remove_vault(self, path):
+        """
+        取消登记一个密码库（不删除文件）
+
+        Returns:
+            bool: 是否曾经登记
+        """
+        key = vault_key(path)
+        entries = self._load()
+        remaining = [entry for entry in entries if vault_key(entry['path']) != key]
+        if len(remaining) == len(entries):
+            return False
+        self._save(remaining)
+        self.close(key)
+        return True
+
+    def open(self, path=None):
+        """
+        打开密码库（已打开时返回同一实例）
+
+        Args:
+            path (Path): 密码库文件路径，None表示主窗口打开的密码库
+
+        Returns:
+            PasswordDatabase: 数据库实例
+        """
+        key = vault_key(self.active_file if path is None else path)
+        with self._lock:
+            db = self._open.get(key)
+            if db is None:
+                if key == vault_key(DATABASE_FILE):
+                    db = PasswordDatabase()
+                else:
+                    Path(key).parent.mkdir(parents=True, exist_ok=True)
+                    db = PasswordDatabase(Path(key))
+                self._open[key] = db
+            return db
+
+    def active(self):
+        """主窗口打开的密码库"""
+        return self.open()
+
+    def open_vaults(self):
+        """
+        已打开的密码库
+
+        Returns:
+            dict: 密码库标识 -> PasswordDatabase
+        """
+        with self._lock:
+            return dict(self._open)
+
+    def close(self, path):
+        """关闭密码库（丢弃实例和其中的密钥），不能关闭主窗口打开的密码库"""
+        key = vault_key(path)
+        if key == vault_key(self.active_file):
+            return
+        with self._lock:
+            db = self._open.pop(key, None)
+        self.close_search_connections()
+        if db is not None:
+            db.encryption = None
+            db.clear_hot_cache()
+
+    def locked_for_search(self):
+        """
+        跨库搜索前需要解锁的密码库（名称加密且未解锁）
+
+        Returns:
+            list: known_vaults 中的字典
+        """
+        locked = []
+        for vault in self.known_vaults():
+            if not vault['path'].exists():
+                continue
+            db = self.open(vault['path'])
+            if db.name_encryption and db.encryption is None:
+                locked.append(vault)
+        return locked
+
+    @timed("vaults.unlock")
+    def unlock(self, passwords, workers=None):
+        """
+        并行解锁多个密码库，每个密码库在单独的线程中验证管理员密码并派生密钥
+
+        Args:
+            passwords (dict): 密码库路径 -> 管理员密码
+            workers (int): 线程数，None表示使用默认配置
+
+        Returns:
+            dict: 密码库标识 -> 是否解锁成功
+        """
+        jobs = [(self.open(path), password) for path, password in passwords.items()]
+        if not jobs:
+            return {}
+        if workers is None:
+            workers = VAULT_UNLOCK_WORKERS or len(jobs)
+
+        def unlock_one(job):
+            db, password = job
+            if not db.verify_master_password(password):
+                return False
+            db.initialize_encryption_with_password(password)
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as executor:
+            results = list(executor.map(unlock_one, jobs))
+        return {vault_key(db.db_file): ok for (db, _), ok in zip(jobs, results)}
+
+    @timed("vaults.search")
+    def search(self, text):
+        """
+        在所有已知的密码库中查找服务名称或用户名以指定前缀开头的记录
+
+        各库以只读方式 ATTACH 到同一个连接上，用一条 UNION ALL 查询完成
+        （超过 ATTACH_LIMIT 个密码库时分组查询）。名称加密且未解锁的密码库被跳过，
+        见 locked_for_search
+
+        Args:
+            text (str): 前缀
+
+        Returns:
+            list: 记录字典列表（vault, vault_name, id, service_name, username,
+                  created_at, updated_at），按服务名称和用户名排序
+        """
+        text = (text or "").strip()
+        if not text:
+            return []
+        targets = []
+        for vault in self.known_vaults():
+            if not vault['path'].exists():
+                continue
+            db = self.open(vault['path'])
+            if db.name_encryption and db.encryption is None:
+                continue
+            targets.append((vault, db))
+
+        records = []
+        with self._search_lock:
+            for start in range(0, len(targets), ATTACH_LIMIT):
+                group = targets[start:start + ATTACH_LIMIT]
+                records.extend(self._search_group(self._search_connection(group), group, text))
+        records.sort(key=lambda record: (record['service_name'].casefold(),
+                                         record['username'].casefold(), record['vault_name']))
+        return records
+
+    def _search_connection(self, targets):
+        """获取（或创建）以只读方式 ATTACH 了这组密码库的连接，库名依次为 v0, v1, ..."""
+        keys = tuple(vault['key'] for vault, _ in targets)
+        conn = self._search_connections.get(keys)
+        if conn is None:
+            conn = sqlite3.connect("file::memory:", uri=True, check_same_thread=False)
+            for index, key in enumerate(keys):
+                conn.execute(f"ATTACH DATABASE ? AS v{index}", (Path(key).as_uri() + "?mode=ro",))
+            self._search_connections[keys] = conn
+        return conn
+
+    def close_search_connections(self):
+        """关闭跨库搜索的连接（密码库被关闭或取消登记时）"""
+        with self._search_lock:
+            connections, self._search_connections = self._search_connections, {}
+        for conn in connections.values():
+            conn.close()
+
+    @staticmethod
+    def _search_group(conn, targets, text):
+        """在一组（不超过 ATTACH_LIMIT 个）已 ATTACH 的密码库中用一条查询搜索"""
+        normalized = blind_index.normalize(text)
+        selects = []
+        params = []
+        rechecks = {}
+        for index, (vault, db) in enumerate(targets):
+            condition, condition_params, rechecks[index] = db.text_condition(
+                text, f"v{index}.blind_index")
+            if condition is None:
+                continue
+            selects.append(f'''
+                SELECT {index}, id, service_name, username, created_at, updated_at
+                FROM v{index}.passwords
+                WHERE {condition}
+            ''')
+            params.extend(condition_params)
+        if not selects:
+            return []
+        rows = conn.execute(" UNION ALL ".join(selects), params).fetchall()
+
+        records = []
+        for index, record_id, service_name, username, created_at, updated_at in rows:
+            vault, db = targets[index]
+            service_name = db._decode_name(service_name)
+            username = db._decode_name(username)
+            if rechecks[index] and not blind_index.matches_prefix(normalized, service_name, username):
+                continue
+            records.append({
+                'vault': vault['key'],
+                'vault_name': vault['name'],
+                'id': record_id,
+                'service_name': service_name,
+                'username': username,
+                'created_at': created_at,
+                'updated_at': updated_at
+            })
+        return records
+
+
+# 单例模式实例
+_registry_instance = None
+
+
+def get_vault_registry():
+    """获取密码库登记表实例（单例模式）"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = VaultRegistry()
+    return _registry_instance
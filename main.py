@@ -13,27 +13,96 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from ui.main_window import MainWindow
-from config.settings import APP_TITLE
-from core.database import get_database
+
+def _apply_path_arguments(argv):
+    """
+    处理 --data-dir DIR 和 --vault PATH 参数（可多次使用 --vault，第一个在主窗口中打开），
+    写入对应的环境变量并从参数列表中移除。数据文件路径在导入配置时确定，必须在此之前调用
+    
+    Returns:
+        list: 移除这些参数后的参数列表
+    """
+    remaining = []
+    vaults = []
+    args = iter(argv)
+    for arg in args:
+        option, has_value, value = arg.partition("=")
+        if option in ("--data-dir", "--vault"):
+            if not has_value:
+                value = next(args, None)
+                if value is None:
+                    sys.exit(f"{option} 参数缺少路径")
+            if option == "--data-dir":
+                os.environ["TFAPM_DATA_DIR"] = value
+            else:
+                vaults.append(value)
+        else:
+            remaining.append(arg)
+    if vaults:
+        os.environ["TFAPM_VAULT"] = vaults[0]
+        os.environ["TFAPM_VAULTS"] = os.pathsep.join(vaults[1:])
+    return remaining
+
+
+sys.argv = _apply_path_arguments(sys.argv)
+
+from core.profiler import get_profiler
+from config import settings
+
 
 def main():
     """主函数"""
-    app = QApplication(sys.argv)
-    app.setApplicationName(APP_TITLE)
-    
+    profiler = get_profiler()
+    profile_startup = settings.PROFILE_STARTUP or "--profile-startup" in sys.argv
+    if profile_startup:
+        # 必须在导入界面模块之前启用，才能统计到各模块的导入耗时
+        profiler.budget_ms = settings.STARTUP_BUDGET_MS
+        profiler.enable()
+        sys.argv = [arg for arg in sys.argv if arg != "--profile-startup"]
+
+    with profiler.stage("import PyQt5"):
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QTimer
+    with profiler.stage("import ui.main_window"):
+        from ui.main_window import MainWindow
+    with profiler.stage("import core.database"):
+        from core.database import get_database
+
+    with profiler.stage("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName(settings.APP_TITLE)
+
     # 获取数据库实例
-    db = get_database()
-    
+    with profiler.stage("get_database"):
+        db = get_database()
+
     # 创建主窗口
-    window = MainWindow()
-    
+    with profiler.stage("MainWindow"):
+        window = MainWindow()
+
     # 显示主窗口
-    window.show()
-    
+    with profiler.stage("window.show"):
+        window.show()
+
+    if profile_startup:
+        # 事件循环处理完第一批事件后再输出报告，以包含首次绘制的耗时
+        QTimer.singleShot(0, lambda: _finish_startup_profile(profiler))
+
     # 运行应用
     sys.exit(app.exec_())
 
+
+def _finish_startup_profile(profiler):
+    """输出启动分析报告"""
+    profiler.disable()
+    report = profiler.report()
+    print(profiler.format_report(report), file=sys.stderr)
+    try:
+        settings.ensure_data_dir()
+        profiler.write_report(settings.STARTUP_PROFILE_FILE)
+    except OSError as e:
+        print(f"无法写入启动分析报告: {e}", file=sys.stderr)
+
+
 if __name__ == "__main__":
     main()
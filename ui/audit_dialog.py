@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码审计结果对话框
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView
+)
+
+from core.language import get_language_manager
+
+
+class AuditDialog(QDialog):
+    """密码审计结果对话框类"""
+
+    def __init__(self, report, parent=None):
+        """
+        初始化密码审计结果对话框
+
+        Args:
+            report (dict): audit_vault 返回的审计报告
+        """
+        super().__init__(parent)
+        self.report = report
+        self.lang_manager = get_language_manager()
+        self.init_ui()
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle(self.lang_manager.get_text("audit_title"))
+        self.resize(640, 420)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        # 摘要
+        summary = QLabel(self.lang_manager.get_text_with_args(
+            "audit_summary",
+            total=self.report['total'],
+            reused=sum(len(group) for group in self.report['reused']),
+            weak=len(self.report['weak']),
+            old=len(self.report['old'])
+        ))
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+
+        # 结果标签页
+        tabs = QTabWidget()
+        reused_rows = [
+            (str(group_index + 1), entry['service_name'], entry['username'])
+            for group_index, group in enumerate(self.report['reused'])
+            for entry in group
+        ]
+        tabs.addTab(
+            self._create_table([self.lang_manager.get_text("audit_group")], reused_rows),
+            self.lang_manager.get_text("audit_reused")
+        )
+        weak_rows = [
+            (f"{entry['entropy']:.0f}", entry['service_name'], entry['username'])
+            for entry in self.report['weak']
+        ]
+        tabs.addTab(
+            self._create_table([self.lang_manager.get_text("audit_entropy")], weak_rows),
+            self.lang_manager.get_text("audit_weak")
+        )
+        old_rows = [
+            (entry['updated_at'], entry['service_name'], entry['username'])
+            for entry in self.report['old']
+        ]
+        tabs.addTab(
+            self._create_table([self.lang_manager.get_text("audit_updated_at")], old_rows),
+            self.lang_manager.get_text("audit_old")
+        )
+        layout.addWidget(tabs)
+
+        # 按钮布局
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        close_button = QPushButton(self.lang_manager.get_text("close"))
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+
+    def _create_table(self, first_headers, rows):
+        """创建只读结果表格"""
+        table = QTableWidget(len(rows), 3)
+        table.setHorizontalHeaderLabels(first_headers + [
+            self.lang_manager.get_text("service_name"),
+            self.lang_manager.get_text("username"),
+        ])
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        return table
@@ -11,21 +11,32 @@ import hashlib
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QTableWidget, QTableWidgetItem,
+    QPushButton, QTableView, QAbstractItemView,
     QLabel, QStatusBar, QMessageBox, QHeaderView,
-    QDialog, QLineEdit, QFormLayout, QDialogButtonBox
+    QDialog, QLineEdit, QFormLayout, QDialogButtonBox, QSplitter, QComboBox
 )
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap, QKeySequence
 
 from core.auth import get_auth
-from core.database import get_database
+from core.database import get_database, ORDER_NAME, ORDER_RECENT, ORDER_FREQUENT, ORDERS
+from core.usage import get_usage_tracker
+from core.audit_log import get_audit_log, ACTION_VIEW, ACTION_ADD, ACTION_EDIT, ACTION_DELETE
 from core.language import get_language_manager
+from core.password_generator import get_password_generator, PasswordPolicy
+from core.listing_cache import ListingCache
+from core.quick_switcher import QuickSwitchIndex
 from ui.auth_dialog import AuthDialog
 from ui.password_dialog import PasswordDialog
 from ui.qr_dialog import QRDialog
 from ui.password_detail_dialog import PasswordDetailDialog
-from config.settings import WINDOW_WIDTH, WINDOW_HEIGHT, APP_TITLE
+from ui.password_table_model import PasswordTableModel
+from ui.sidebar import VaultSidebar
+from config.settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, APP_TITLE, BACKUP_INTERVAL_MINUTES, VERIFY_ON_STARTUP,
+    HISTORY_PRUNE_INTERVAL_MINUTES, LISTING_CACHE_ENABLED, LISTING_RESIZE_SAMPLE_ROWS,
+    QUICK_SWITCHER_SHORTCUT
+)
 
 
 class SetMasterPasswordDialog(QDialog):
@@ -77,6 +88,54 @@ class SetMasterPasswordDialog(QDialog):
         return password
 
 
+class ExportPasswordDialog(QDialog):
+    """导出密码对话框"""
+    
+    def __init__(self, parent=None, confirm=True):
+        super().__init__(parent)
+        self.lang_manager = get_language_manager()
+        self.setWindowTitle(self.lang_manager.get_text("export_password_title"))
+        self.setModal(True)
+        self.setMinimumWidth(300)
+        
+        layout = QFormLayout(self)
+        
+        self.password_edit = QLineEdit()
+        self.password_edit.setEchoMode(QLineEdit.Password)
+        layout.addRow(self.lang_manager.get_text("export_password_label"), self.password_edit)
+        
+        # 导出时需要再次输入确认，恢复时不需要
+        self.confirm_edit = None
+        if confirm:
+            self.confirm_edit = QLineEdit()
+            self.confirm_edit.setEchoMode(QLineEdit.Password)
+            layout.addRow(self.lang_manager.get_text("confirm_password_label"), self.confirm_edit)
+        
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel,
+            Qt.Horizontal, self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+    
+    def get_password(self):
+        """获取密码"""
+        password = self.password_edit.text()
+        
+        if not password:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), 
+                              self.lang_manager.get_text("export_password_required"))
+            return None
+            
+        if self.confirm_edit is not None and password != self.confirm_edit.text():
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), 
+                              self.lang_manager.get_text("password_mismatch"))
+            return None
+            
+        return password
+
+
 class ChangeMasterPasswordDialog(QDialog):
     """更改管理员密码对话框"""
     
@@ -159,16 +218,63 @@ class ChangeMasterPasswordDialog(QDialog):
 class MainWindow(QMainWindow):
     """主窗口类"""
     
+    # 后台快照完成信号（快照路径, 是否完好, 说明），用于回到界面线程显示结果
+    snapshot_finished = pyqtSignal(object, bool, str)
+    # 后台完整性校验完成信号（校验报告，或校验时发生的异常）
+    integrity_finished = pyqtSignal(object)
+    # 后台同步完成信号（同步统计，或同步时发生的异常）
+    sync_finished = pyqtSignal(object)
+    # 后台读取列表完成信号（列表快照或异常, 开始读取时的列表加载序号）
+    listing_fetched = pyqtSignal(object, int)
+    # 后台建立快速切换索引完成信号（索引, 异常或None, 开始建立时的索引序号）
+    quick_switcher_built = pyqtSignal(object, object, int)
+    
     def __init__(self):
         """初始化主窗口"""
         super().__init__()
         self.auth = get_auth()
         self.db = get_database()
+        self.audit_log = get_audit_log()
+        self.usage = get_usage_tracker()
         self.last_verification_time = 0
         self.verification_timeout = 10  # 10秒内不需要重复验证
+        # 列表缓存：启动时先显示缓存的列表，与密码库不一致时在后台重新读取
+        self.listing_cache = ListingCache(self.db) if LISTING_CACHE_ENABLED else None
+        self.listing_cache_used = False
+        # 每次重新加载列表时加一，后台读取完成时据此判断结果是否已过时
+        self.listing_generation = 0
+        self.listing_fetched.connect(self.on_listing_fetched)
+        # 快速切换面板的索引：第一次加载列表后在后台建立，之后每次打开面板时在后台按变更流增量更新
+        self.quick_switcher_index = None
+        self.quick_switcher_building = False
+        # 后台任务开始后又有更新请求
+        self.quick_switcher_stale = False
+        # 丢弃索引时加一（如恢复快照），后台建立完成时据此判断结果是否已过时
+        self.quick_switcher_generation = 0
+        # 正在显示的快速切换面板（等待索引建立完成）
+        self.quick_switcher_dialog = None
+        self.quick_switcher_built.connect(self.on_quick_switcher_built)
         self.init_ui()
-        self.check_first_time_setup()
-        self.check_and_setup_master_password()
+        # 定时在后台为密码库创建快照
+        self.snapshot_finished.connect(self.on_snapshot_finished)
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(self.auto_snapshot)
+        self.snapshot_timer.start(BACKUP_INTERVAL_MINUTES * 60 * 1000)
+        # 定时在后台按保留策略清理密码历史版本（启动后先清理一次）
+        self.history_prune_timer = QTimer(self)
+        self.history_prune_timer.timeout.connect(self.db.prune_history_async)
+        self.history_prune_timer.start(HISTORY_PRUNE_INTERVAL_MINUTES * 60 * 1000)
+        QTimer.singleShot(0, self.db.prune_history_async)
+        # 启动时在后台校验密码库（未解锁时只检查元数据和密文格式）
+        self.integrity_finished.connect(self.on_integrity_finished)
+        self.sync_finished.connect(self.on_sync_finished)
+        self.unlocked_verification_started = False
+        if VERIFY_ON_STARTUP:
+            QTimer.singleShot(0, self.verify_integrity_in_background)
+        # 首次使用提示和管理员密码设置放到事件循环中执行，
+        # 使主窗口先完成首次绘制，不计入冷启动时间
+        QTimer.singleShot(0, self.check_first_time_setup)
+        QTimer.singleShot(0, self.check_and_setup_master_password)
     
     def init_ui(self):
         """初始化用户界面"""
@@ -201,7 +307,7 @@ class MainWindow(QMainWindow):
         self.add_button.clicked.connect(self.add_password)
         
         self.import_button = QPushButton(self.lang_manager.get_text("import_csv"))
-        self.import_button.clicked.connect(self.import_csv)
+        self.import_button.clicked.connect(self.import_passwords)
         
         self.edit_button = QPushButton(self.lang_manager.get_text("edit_password"))
         self.edit_button.clicked.connect(self.edit_password)
@@ -240,20 +346,34 @@ class MainWindow(QMainWindow):
         top_layout.addLayout(button_layout)
         top_layout.addWidget(self.lang_button)
         
+        # 创建搜索框（按服务名称或用户名前缀查找）
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(self.lang_manager.get_text("search_placeholder"))
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.returnPressed.connect(self.refresh_password_list)
+        self.search_edit.textChanged.connect(self.on_search_text_changed)
+        
+        # 创建排序方式选择（按名称、用户名、添加或修改时间、最近使用、最常使用）
+        self.sort_combo = QComboBox()
+        for order in ORDERS:
+            self.sort_combo.addItem(self.lang_manager.get_text(f"sort_{order}"), order)
+        self.sort_combo.currentIndexChanged.connect(self.refresh_password_list)
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_edit)
+        search_layout.addWidget(self.sort_combo)
+        
         # 创建密码列表
-        self.password_table = QTableWidget()
-        self.password_table.setColumnCount(4)
-        self.password_table.setHorizontalHeaderLabels([
-            self.lang_manager.get_text("id"),
-            self.lang_manager.get_text("service_name"),
-            self.lang_manager.get_text("username"),
-            self.lang_manager.get_text("created_at")
-        ])
-        self.password_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.password_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.password_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.password_table.itemSelectionChanged.connect(self.on_selection_changed)
-        self.password_table.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.password_model = PasswordTableModel(self.db, self)
+        self.password_table = QTableView()
+        self.password_table.setModel(self.password_model)
+        self.password_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.password_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.password_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.password_table.verticalHeader().setVisible(False)
+        self.password_table.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.password_table.doubleClicked.connect(self.on_item_double_clicked)
+        self.password_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.password_table.customContextMenuRequested.connect(self.show_bulk_menu)
         
         # 设置表格列宽
         header = self.password_table.horizontalHeader()
@@ -261,10 +381,71 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(1, QHeaderView.Stretch)
         header.setSectionResizeMode(2, QHeaderView.Stretch)
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        # 按内容调整列宽时只参考前面若干行，不随记录数增长
+        header.setResizeContentsPrecision(LISTING_RESIZE_SAMPLE_ROWS)
+        
+        # 创建工具菜单
+        self.tools_menu = self.menuBar().addMenu(self.lang_manager.get_text("tools_menu"))
+        self.stats_action = self.tools_menu.addAction(self.lang_manager.get_text("stats_menu"))
+        self.stats_action.triggered.connect(self.show_stats)
+        self.breach_action = self.tools_menu.addAction(self.lang_manager.get_text("breach_menu"))
+        self.breach_action.triggered.connect(self.check_breached_passwords)
+        self.audit_action = self.tools_menu.addAction(self.lang_manager.get_text("audit_menu"))
+        self.audit_action.triggered.connect(self.audit_passwords)
+        self.verify_action = self.tools_menu.addAction(self.lang_manager.get_text("verify_menu"))
+        self.verify_action.triggered.connect(self.verify_integrity)
+        self.tools_menu.addSeparator()
+        self.export_action = self.tools_menu.addAction(self.lang_manager.get_text("export_menu"))
+        self.export_action.triggered.connect(lambda: self.export_vault())
+        self.restore_action = self.tools_menu.addAction(self.lang_manager.get_text("restore_menu"))
+        self.restore_action.triggered.connect(self.restore_vault)
+        self.snapshot_action = self.tools_menu.addAction(self.lang_manager.get_text("snapshot_menu"))
+        self.snapshot_action.triggered.connect(self.create_snapshot)
+        self.restore_snapshot_action = self.tools_menu.addAction(
+            self.lang_manager.get_text("restore_snapshot_menu"))
+        self.restore_snapshot_action.triggered.connect(self.restore_snapshot)
+        self.tools_menu.addSeparator()
+        self.quick_switcher_action = self.tools_menu.addAction(
+            self.lang_manager.get_text("quick_switcher_menu"))
+        self.quick_switcher_action.setShortcut(QKeySequence(QUICK_SWITCHER_SHORTCUT))
+        self.quick_switcher_action.triggered.connect(self.show_quick_switcher)
+        self.vaults_action = self.tools_menu.addAction(self.lang_manager.get_text("vaults_menu"))
+        self.vaults_action.triggered.connect(self.search_vaults)
+        self.sync_action = self.tools_menu.addAction(self.lang_manager.get_text("sync_menu"))
+        self.sync_action.triggered.connect(self.sync_with_vault)
+        self.name_encryption_action = self.tools_menu.addAction(
+            self.lang_manager.get_text("name_encryption_menu"))
+        self.name_encryption_action.setCheckable(True)
+        self.name_encryption_action.setChecked(self.db.name_encryption)
+        self.name_encryption_action.triggered.connect(self.toggle_name_encryption)
+        
+        # 创建批量操作菜单（作用于列表中选中的所有记录，也是列表的右键菜单）
+        self.bulk_menu = self.menuBar().addMenu(self.lang_manager.get_text("bulk_menu"))
+        self.bulk_actions = {}
+        for key, handler in (("bulk_delete", self.delete_selected),
+                             ("bulk_add_tags", self.tag_selected),
+                             ("bulk_remove_tag", self.untag_selected),
+                             ("bulk_move", self.move_selected),
+                             ("bulk_rotate", self.rotate_selected),
+                             ("bulk_export", self.export_selected)):
+            action = self.bulk_menu.addAction(self.lang_manager.get_text(key))
+            action.triggered.connect(handler)
+            action.setEnabled(False)
+            self.bulk_actions[key] = action
+        
+        # 创建文件夹和标签侧边栏，与密码列表并排显示
+        self.sidebar = VaultSidebar(self.db)
+        self.sidebar.filter_changed.connect(self.refresh_password_list)
+        splitter = QSplitter(Qt.Horizontal)
+        splitter.addWidget(self.sidebar)
+        splitter.addWidget(self.password_table)
+        splitter.setStretchFactor(1, 1)
+        splitter.setSizes([200, WINDOW_WIDTH - 200])
         
         # 添加部件到主布局
         main_layout.addLayout(top_layout)
-        main_layout.addWidget(self.password_table)
+        main_layout.addLayout(search_layout)
+        main_layout.addWidget(splitter)
         
         # 创建状态栏
         self.status_bar = QStatusBar()
@@ -308,8 +489,7 @@ class MainWindow(QMainWindow):
     def show_qr_code(self):
         """显示配对二维码"""
         # 检查密码库是否为空
-        records = self.db.get_all_passwords()
-        if len(records) > 0:
+        if self.db.count_passwords() > 0:
             # 密码库不为空，必须验证当前2FA验证码
             if not self.verify_2fa("验证2FA", "密码库中有密码，必须验证当前2FA验证码才能重新配对:"):
                 return
@@ -323,23 +503,30 @@ class MainWindow(QMainWindow):
         if not self.verify_master_password():
             return
             
-        dialog = PasswordDialog(self)
+        dialog = PasswordDialog(self, folders=self.db.get_folder_paths())
         if dialog.exec_():
             data = dialog.get_data()
             if data:
-                self.db.add_password(
-                    data['service_name'],
-                    data['username'],
-                    data['password']
-                )
+                if not self.confirm_password_reuse(data['password']):
+                    return
+                try:
+                    record_id = self.db.add_password(
+                        data['service_name'],
+                        data['username'],
+                        data['password']
+                    )
+                except Exception as e:
+                    QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+                    return
+                self.audit_log.log(ACTION_ADD, record_id)
+                self.save_folder_and_tags(record_id, data)
                 self.refresh_password_list()
                 self.status_bar.showMessage("密码添加成功")
     
     def edit_password(self):
         """编辑密码"""
-        selected_row = self.password_table.currentRow()
-        if selected_row >= 0:
-            record_id = int(self.password_table.item(selected_row, 0).text())
+        record_id = self.selected_record_id()
+        if record_id is not None:
             # 验证管理员密码
             if not self.verify_master_password():
                 return
@@ -347,23 +534,59 @@ class MainWindow(QMainWindow):
                 # 获取完整记录
                 record = self.db.get_password(record_id)
                 if record:
-                    dialog = PasswordDialog(self, record)
+                    self.usage.record(record_id)
+                    record['tags'] = self.db.get_entry_tags(record_id)
+                    dialog = PasswordDialog(self, record, self.db.get_folder_paths())
                     if dialog.exec_():
                         data = dialog.get_data()
                         if data:
-                            self.db.update_password(
-                                record_id,
-                                data['service_name'],
-                                data['username'],
-                                data['password']
-                            )
+                            if not self.confirm_password_reuse(data['password'], record_id):
+                                return
+                            try:
+                                self.db.update_password(
+                                    record_id,
+                                    data['service_name'],
+                                    data['username'],
+                                    data['password']
+                                )
+                            except Exception as e:
+                                QMessageBox.warning(self, self.lang_manager.get_text("warning"),
+                                                    str(e))
+                                return
+                            self.audit_log.log(ACTION_EDIT, record_id)
+                            self.save_folder_and_tags(record_id, data)
                             self.refresh_password_list()
                             self.status_bar.showMessage("密码更新成功")
     
+    def save_folder_and_tags(self, record_id, data):
+        """保存对话框中设置的文件夹和标签，并刷新侧边栏中的数量"""
+        self.db.move_to_folder([record_id], data['folder_id'])
+        self.db.set_entry_tags(record_id, data['tags'])
+        self.sidebar.reload()
+    
+    def confirm_password_reuse(self, password, exclude_id=None):
+        """密码已被其他记录使用时提示用户确认"""
+        from config.settings import STORE_PASSWORD_FINGERPRINTS
+        if not STORE_PASSWORD_FINGERPRINTS:
+            return True
+        count = self.db.count_reused(password, exclude_id)
+        if count == 0:
+            return True
+        reply = QMessageBox.question(
+            self,
+            self.lang_manager.get_text("password_reused"),
+            self.lang_manager.get_text_with_args("password_reused_message", count=count),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        return reply == QMessageBox.Yes
+    
     def delete_password(self):
-        """删除密码"""
-        selected_row = self.password_table.currentRow()
-        if selected_row >= 0:
+        """删除密码（选中多条记录时批量删除）"""
+        if len(self.selected_record_ids()) > 1:
+            self.delete_selected()
+            return
+        record_id = self.selected_record_id()
+        if record_id is not None:
             reply = QMessageBox.question(
                 self, 
                 "确认删除", 
@@ -372,8 +595,9 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                record_id = int(self.password_table.item(selected_row, 0).text())
                 if self.db.delete_password(record_id):
+                    self.audit_log.log(ACTION_DELETE, record_id)
+                    self.sidebar.reload()
                     self.refresh_password_list()
                     self.status_bar.showMessage("密码删除成功")
                 else:
@@ -381,40 +605,294 @@ class MainWindow(QMainWindow):
     
     def refresh_password_list(self):
         """刷新密码列表"""
-        # 获取所有密码记录
-        records = self.db.get_all_passwords()
-        
         # 检查是否已绑定2FA设备
         from config.settings import SECRET_KEY_FILE
         is_bound = SECRET_KEY_FILE.exists()
         
         # 如果没有绑定2FA设备且有密码记录，显示提示
-        if not is_bound and len(records) > 0:
+        if not is_bound and self.db.count_passwords() > 0:
             self.status_bar.showMessage("请先绑定2FA设备，否则密码不可访问")
             # 清空表格
-            self.password_table.setRowCount(0)
+            self.password_model.set_records([])
             return
         
-        # 设置表格行数
-        self.password_table.setRowCount(len(records))
+        # 获取列表记录（加密名称时由模型按页解密），搜索文本与侧边栏的文件夹和标签组合筛选
+        self.listing_generation += 1
+        search_text = self.search_edit.text().strip()
+        folder_id, tag_ids = self.sidebar.current_filter()
+        order = self.sort_combo.currentData()
+        if order in (ORDER_RECENT, ORDER_FREQUENT):
+            # 按使用情况排序前先写入内存中累计的统计
+            self.usage.flush()
+        if search_text or folder_id is not None or tag_ids:
+            if search_text and self.db.name_encryption and self.db.encryption is None:
+                if not self.verify_master_password():
+                    return
+            records = self.db.filter_passwords(search_text, tag_ids, folder_id, order)
+        else:
+            records = self.load_listing(order)
+        self.password_model.set_records(records)
+        self.on_selection_changed()
+        
+        self.status_bar.showMessage(f"共 {len(records)} 条记录")
+        if self.quick_switcher_index is None:
+            self.build_quick_switcher_in_background()
+    
+    def load_listing(self, order):
+        """
+        读取不筛选的完整列表
         
-        # 填充数据
-        for row, record in enumerate(records):
-            self.password_table.setItem(row, 0, QTableWidgetItem(str(record['id'])))
-            self.password_table.setItem(row, 1, QTableWidgetItem(record['service_name']))
-            self.password_table.setItem(row, 2, QTableWidgetItem(record['username']))
-            self.password_table.setItem(row, 3, QTableWidgetItem(record['created_at']))
+        按名称排序时使用列表缓存：第一次加载（启动时）直接使用缓存文件，缓存与密码库不一致时
+        在后台重新读取后替换；之后从数据库读取，并在后台线程中更新缓存文件
+        """
+        import threading
+        if self.listing_cache is None or order != ORDER_NAME:
+            return self.db.get_listing(order)
+        if not self.listing_cache_used:
+            self.listing_cache_used = True
+            records, fresh = self.listing_cache.load()
+            if records is not None:
+                if not fresh:
+                    self.fetch_listing_in_background()
+                return records
+        version = self.db.get_listing_version()
+        records = self.db.get_listing(order)
+        threading.Thread(target=self.listing_cache.save, args=(records, version),
+                         name="listing-cache", daemon=True).start()
+        return records
+    
+    def fetch_listing_in_background(self):
+        """在后台线程中从数据库读取完整列表并更新缓存文件，结果通过 listing_fetched 信号返回"""
+        import threading
+        generation = self.listing_generation
         
-        # 调整列宽
-        self.password_table.resizeColumnsToContents()
+        def run():
+            try:
+                records = self.listing_cache.fetch()
+            except Exception as e:
+                records = e
+            self.listing_fetched.emit(records, generation)
         
+        threading.Thread(target=run, name="listing", daemon=True).start()
+    
+    def on_listing_fetched(self, records, generation):
+        """后台读取完成：列表在此期间没有重新加载过时，用最新的列表替换缓存中的列表"""
+        if isinstance(records, Exception) or generation != self.listing_generation:
+            return
+        self.password_model.set_records(records)
+        self.on_selection_changed()
         self.status_bar.showMessage(f"共 {len(records)} 条记录")
     
+    def on_search_text_changed(self, text):
+        """搜索框内容改变时的处理（加密名称时需按回车搜索，避免每次输入都验证密码）"""
+        if not text or not self.db.name_encryption or self.db.encryption is not None:
+            self.refresh_password_list()
+    
+    def selected_record_id(self):
+        """获取选中记录的ID，未选中时返回None"""
+        rows = self.password_table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.password_model.record_id(rows[0].row())
+    
+    def selected_record_ids(self):
+        """获取所有选中记录的ID"""
+        record_id = self.password_model.record_id
+        rows = self.password_table.selectionModel().selectedRows()
+        return [record_id(index.row()) for index in rows]
+    
     def on_selection_changed(self):
-        """选择改变时的处理"""
-        has_selection = len(self.password_table.selectedItems()) > 0
-        self.edit_button.setEnabled(has_selection)
+        """选择改变时的处理（只能编辑一条记录，批量操作作用于所有选中的记录）"""
+        selection = self.password_table.selectionModel()
+        has_selection = selection.hasSelection()
+        self.edit_button.setEnabled(has_selection and len(selection.selectedRows()) == 1)
         self.delete_button.setEnabled(has_selection)
+        for action in self.bulk_actions.values():
+            action.setEnabled(has_selection)
+    
+    def show_bulk_menu(self, pos):
+        """在列表中显示批量操作的右键菜单"""
+        if self.password_table.selectionModel().hasSelection():
+            self.bulk_menu.exec_(self.password_table.viewport().mapToGlobal(pos))
+    
+    def verify_bulk(self, count):
+        """批量修改前验证一次2FA（整批只验证一次）"""
+        return self.verify_2fa(
+            self.lang_manager.get_text("bulk_verify_title"),
+            self.lang_manager.get_text_with_args("bulk_verify_message", count=count)
+        )
+    
+    def run_bulk(self, operation):
+        """执行批量操作，失败时提示错误，成功时返回操作的结果"""
+        try:
+            return operation()
+        except Exception as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"),
+                                self.lang_manager.get_text_with_args("bulk_failed", error=str(e)))
+            return None
+    
+    def remove_from_list(self, record_ids):
+        """从列表中去掉已删除的记录（在内存中更新一次，不重新查询，保留滚动位置）"""
+        scroll_bar = self.password_table.verticalScrollBar()
+        position = scroll_bar.value()
+        self.password_model.remove_records(record_ids)
+        scroll_bar.setValue(position)
+        self.on_selection_changed()
+    
+    def refresh_if_filtered(self):
+        """按文件夹或标签筛选时，修改了文件夹或标签的记录可能不再符合筛选条件，需要重新查询"""
+        self.sidebar.reload()
+        folder_id, tag_ids = self.sidebar.current_filter()
+        if folder_id is not None or tag_ids:
+            self.refresh_password_list()
+    
+    def delete_selected(self):
+        """批量删除选中的记录（一个事务）"""
+        record_ids = self.selected_record_ids()
+        if not record_ids:
+            return
+        reply = QMessageBox.question(
+            self,
+            "确认删除",
+            self.lang_manager.get_text_with_args("bulk_delete_confirm", count=len(record_ids)),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes or not self.verify_bulk(len(record_ids)):
+            return
+        deleted = self.run_bulk(lambda: self.db.delete_passwords(record_ids))
+        if deleted is None:
+            return
+        self.audit_log.log_many(ACTION_DELETE, record_ids)
+        self.sidebar.reload()
+        self.remove_from_list(record_ids)
+        self.status_bar.showMessage(
+            self.lang_manager.get_text_with_args("bulk_deleted", count=deleted))
+    
+    def tag_selected(self):
+        """为选中的记录添加标签"""
+        from PyQt5.QtWidgets import QInputDialog
+        record_ids = self.selected_record_ids()
+        if not record_ids:
+            return
+        text, ok = QInputDialog.getText(self, self.lang_manager.get_text("bulk_add_tags"),
+                                        self.lang_manager.get_text("bulk_tags_prompt"))
+        names = [name for name in text.split(",") if name.strip()]
+        if not ok or not names or not self.verify_bulk(len(record_ids)):
+            return
+        result = self.run_bulk(lambda: self.db.retag_entries(record_ids, add=names))
+        if result is None:
+            return
+        self.refresh_if_filtered()
+        self.status_bar.showMessage(
+            self.lang_manager.get_text_with_args("bulk_tagged", count=result[0]))
+    
+    def untag_selected(self):
+        """从选中的记录移除一个标签"""
+        from PyQt5.QtWidgets import QInputDialog
+        record_ids = self.selected_record_ids()
+        if not record_ids:
+            return
+        tags = self.db.get_tags()
+        if not tags:
+            QMessageBox.information(self, self.lang_manager.get_text("bulk_remove_tag"),
+                                    self.lang_manager.get_text("bulk_no_tags"))
+            return
+        name, ok = QInputDialog.getItem(self, self.lang_manager.get_text("bulk_remove_tag"),
+                                        self.lang_manager.get_text("bulk_remove_tag_prompt"),
+                                        [tag['name'] for tag in tags], 0, False)
+        if not ok or not self.verify_bulk(len(record_ids)):
+            return
+        tag_id = next(tag['id'] for tag in tags if tag['name'] == name)
+        result = self.run_bulk(lambda: self.db.retag_entries(record_ids, remove=[tag_id]))
+        if result is None:
+            return
+        self.refresh_if_filtered()
+        self.status_bar.showMessage(
+            self.lang_manager.get_text_with_args("bulk_untagged", count=result[1]))
+    
+    def move_selected(self):
+        """将选中的记录移入文件夹"""
+        from PyQt5.QtWidgets import QInputDialog
+        record_ids = self.selected_record_ids()
+        if not record_ids:
+            return
+        choices = [(None, self.lang_manager.get_text("bulk_no_folder"))]
+        choices.extend(self.db.get_folder_paths())
+        path, ok = QInputDialog.getItem(self, self.lang_manager.get_text("bulk_move"),
+                                        self.lang_manager.get_text("bulk_move_prompt"),
+                                        [path for _, path in choices], 0, False)
+        if not ok or not self.verify_bulk(len(record_ids)):
+            return
+        folder_id = next(folder_id for folder_id, folder_path in choices if folder_path == path)
+        moved = self.run_bulk(lambda: self.db.move_to_folder(record_ids, folder_id))
+        if moved is None:
+            return
+        self.refresh_if_filtered()
+        self.status_bar.showMessage(
+            self.lang_manager.get_text_with_args("bulk_moved", count=moved))
+    
+    def rotate_selected(self):
+        """为选中的记录生成新的随机密码（一次验证，一个事务）"""
+        record_ids = self.selected_record_ids()
+        if not record_ids:
+            return
+        reply = QMessageBox.question(
+            self,
+            self.lang_manager.get_text("bulk_rotate"),
+            self.lang_manager.get_text_with_args("bulk_rotate_confirm", count=len(record_ids)),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        if self.db.encryption is None and not self.verify_master_password():
+            return
+        if not self.verify_bulk(len(record_ids)):
+            return
+        generated = get_password_generator().generate(len(record_ids), PasswordPolicy())
+        passwords = dict(zip(record_ids, generated))
+        rotated = self.run_bulk(lambda: self.db.rotate_passwords(passwords))
+        if rotated is None:
+            return
+        self.audit_log.log_many(ACTION_EDIT, record_ids)
+        self.status_bar.showMessage(
+            self.lang_manager.get_text_with_args("bulk_rotated", count=rotated))
+    
+    def export_selected(self):
+        """将选中的记录导出为加密文件"""
+        record_ids = self.selected_record_ids()
+        if record_ids:
+            self.export_vault(record_ids)
+    
+    def toggle_name_encryption(self, checked):
+        """开启或关闭服务名称和用户名的加密存储"""
+        # 先恢复勾选状态，转换成功后再更新
+        self.name_encryption_action.setChecked(self.db.name_encryption)
+        if not self.verify_master_password():
+            return
+        reply = QMessageBox.question(
+            self,
+            self.lang_manager.get_text("name_encryption_menu"),
+            self.lang_manager.get_text(
+                "name_encryption_enable_confirm" if checked else "name_encryption_disable_confirm"
+            ),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        from PyQt5.QtWidgets import QApplication
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.db.set_name_encryption(checked)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("name_encryption_failed",
+                                                                      error=str(e)))
+            return
+        QApplication.restoreOverrideCursor()
+        self.name_encryption_action.setChecked(self.db.name_encryption)
+        self.refresh_password_list()
     
     def closeEvent(self, event):
         """窗口关闭事件"""
@@ -426,17 +904,216 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            self.export_metrics()
+            # 写入缓冲区中尚未写入的审计日志和使用统计
+            self.audit_log.close()
+            self.usage.close()
             event.accept()
         else:
             event.ignore()
     
-    def on_item_double_clicked(self, item):
-        """双击项目时的处理"""
-        # 获取行号
-        row = item.row()
-        # 获取记录ID
-        record_id = int(self.password_table.item(row, 0).text())
+    def show_stats(self):
+        """显示性能统计面板"""
+        from ui.stats_dialog import StatsDialog
+        dialog = StatsDialog(self)
+        dialog.exec_()
+    
+    def export_metrics(self):
+        """启用性能指标时，将指标导出到数据目录"""
+        from core.metrics import get_metrics
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return
+        from config.settings import METRICS_JSON_FILE, METRICS_PROM_FILE, ensure_data_dir
+        try:
+            ensure_data_dir()
+            metrics.export(METRICS_JSON_FILE, METRICS_PROM_FILE)
+        except OSError:
+            pass
+    
+    def check_breached_passwords(self):
+        """使用本地泄露密码列表检查密码库"""
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return
+        
+        from PyQt5.QtWidgets import QFileDialog, QApplication
+        from config.settings import BREACH_INDEX_FILE, DATA_DIR, ensure_data_dir
+        from core.breach import BreachIndex, build_index, scan_vault
+        
+        start_dir = str(BREACH_INDEX_FILE if BREACH_INDEX_FILE.exists() else DATA_DIR)
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            self.lang_manager.get_text("breach_select_file"),
+            start_dir,
+            self.lang_manager.get_text("breach_file_filter")
+        )
+        if not file_path:
+            return
         
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            index_path = file_path
+            if not file_path.endswith(".idx"):
+                # 文本列表需要先构建为二进制索引
+                self.status_bar.showMessage(self.lang_manager.get_text("breach_building"))
+                QApplication.processEvents()
+                ensure_data_dir()
+                build_index(file_path, BREACH_INDEX_FILE)
+                index_path = BREACH_INDEX_FILE
+            
+            def on_progress(count):
+                self.status_bar.showMessage(
+                    self.lang_manager.get_text_with_args("breach_scanning", count=count)
+                )
+                QApplication.processEvents()
+            
+            with BreachIndex(index_path) as index:
+                compromised = scan_vault(self.db, index, progress=on_progress)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("breach_failed", error=str(e)))
+            return
+        QApplication.restoreOverrideCursor()
+        
+        if not compromised:
+            self.status_bar.showMessage(self.lang_manager.get_text("breach_none"))
+            QMessageBox.information(self, self.lang_manager.get_text("breach_title"),
+                                    self.lang_manager.get_text("breach_none"))
+            return
+        
+        message = self.lang_manager.get_text_with_args("breach_found", count=len(compromised))
+        self.status_bar.showMessage(message)
+        box = QMessageBox(QMessageBox.Warning, self.lang_manager.get_text("breach_title"), message,
+                          QMessageBox.Ok, self)
+        box.setDetailedText("\n".join(
+            f"[{entry['id']}] {entry['service_name']} - {entry['username']}" for entry in compromised
+        ))
+        box.exec_()
+    
+    def audit_passwords(self):
+        """审计密码库中重复使用、强度不足和长期未修改的密码"""
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return
+        
+        from PyQt5.QtWidgets import QApplication
+        from core.password_audit import audit_vault
+        from ui.audit_dialog import AuditDialog
+        
+        def on_progress(count):
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("audit_running", count=count)
+            )
+            QApplication.processEvents()
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            report = audit_vault(self.db, progress=on_progress)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("audit_failed", error=str(e)))
+            return
+        QApplication.restoreOverrideCursor()
+        
+        self.status_bar.showMessage(self.lang_manager.get_text("ready"))
+        dialog = AuditDialog(report, self)
+        dialog.exec_()
+    
+    def verify_integrity(self):
+        """解密校验全部记录和元数据，列出损坏的记录"""
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return
+        
+        from PyQt5.QtWidgets import QApplication
+        from core.integrity import verify_vault
+        
+        def on_progress(count):
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("verify_running", count=count)
+            )
+            QApplication.processEvents()
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            report = verify_vault(self.db, progress=on_progress)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("verify_failed", error=str(e)))
+            return
+        QApplication.restoreOverrideCursor()
+        self.show_integrity_report(report)
+    
+    def verify_integrity_in_background(self):
+        """在后台线程中校验密码库，结果通过 integrity_finished 信号返回"""
+        import threading
+        from core.integrity import verify_vault
+        
+        def run():
+            try:
+                result = verify_vault(self.db)
+            except Exception as e:
+                result = e
+            self.integrity_finished.emit(result)
+        
+        threading.Thread(target=run, name="integrity", daemon=True).start()
+    
+    def on_integrity_finished(self, result):
+        """后台校验完成：只在发现问题时提示"""
+        if isinstance(result, Exception):
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("verify_failed", error=str(result)))
+        elif result['bad_count'] or result['problems']:
+            self.show_integrity_report(result)
+        else:
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("verify_ok", total=result['total']))
+    
+    def show_integrity_report(self, report):
+        """显示完整性校验报告"""
+        lang = self.lang_manager
+        if not report['bad_count'] and not report['problems']:
+            message = lang.get_text_with_args("verify_ok", total=report['total'])
+            if not report['authenticated']:
+                message += "\n" + lang.get_text("verify_format_only")
+            self.status_bar.showMessage(message)
+            QMessageBox.information(self, lang.get_text("verify_title"), message)
+            return
+        
+        message = lang.get_text_with_args(
+            "verify_issues", total=report['total'], bad_count=report['bad_count'],
+            problem_count=len(report['problems'])
+        )
+        if not report['authenticated']:
+            message += "\n" + lang.get_text("verify_format_only")
+        details = [
+            lang.get_text("verify_problem_" + code) + (f": {detail}" if detail else "")
+            for code, detail in report['problems']
+        ]
+        details.extend(
+            lang.get_text_with_args(
+                "verify_bad_entry", id=entry['id'],
+                field=lang.get_text("verify_field_" + entry['field']),
+                reason=lang.get_text("verify_reason_" + entry['reason'])
+            )
+            for entry in report['bad']
+        )
+        self.status_bar.showMessage(message)
+        box = QMessageBox(QMessageBox.Warning, lang.get_text("verify_title"), message,
+                          QMessageBox.Ok, self)
+        box.setDetailedText("\n".join(details))
+        box.exec_()
+    
+    def on_item_double_clicked(self, index):
+        """双击项目时的处理"""
+        self.open_entry(self.password_model.record_id(index.row()))
+    
+    def open_entry(self, record_id):
+        """验证后显示一条记录的详情"""
         # 验证管理员密码
         if not self.verify_master_password():
             return
@@ -447,14 +1124,16 @@ class MainWindow(QMainWindow):
                 # 获取完整记录
                 record = self.db.get_password(record_id)
                 if record:
+                    self.audit_log.log(ACTION_VIEW, record_id)
+                    self.usage.record(record_id)
                     # 显示密码详情对话框
                     dialog = PasswordDetailDialog(record, self)
                     dialog.exec_()
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"获取密码详情时发生错误: {str(e)}")
     
-    def import_csv(self):
-        """导入CSV文件"""
+    def import_passwords(self):
+        """导入其他密码管理器或浏览器导出的文件"""
         # 验证管理员密码
         if not self.verify_master_password():
             return
@@ -465,102 +1144,415 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先绑定2FA设备再导入密码！")
             return
         
-        # 选择CSV文件
+        # 选择导入文件
         from PyQt5.QtWidgets import QFileDialog
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
-            "选择CSV文件", 
+            self.lang_manager.get_text("import_csv_title"), 
             "", 
-            "CSV文件 (*.csv)"
+            self.lang_manager.get_text("import_file_filter")
         )
         
         if not file_path:
             return
         
-        # 读取并解析CSV文件
+        # 根据文件内容选择导入器
+        from core.importers import detect_importer
         try:
-            import csv
-            with open(file_path, 'r', encoding='utf-8') as file:
-                # 检测CSV格式
-                sample = file.read(1024)
-                file.seek(0)
-                sniffer = csv.Sniffer()
-                delimiter = sniffer.sniff(sample).delimiter
-                
-                reader = csv.reader(file, delimiter=delimiter)
-                rows = list(reader)
-                
-                # 检查是否有标题行
-                if len(rows) < 1:
-                    QMessageBox.warning(self, "警告", "CSV文件为空！")
-                    return
-                
-                # 确定列索引（支持不同的CSV格式）
-                header = rows[0]
-                url_index = -1
-                username_index = -1
-                password_index = -1
-                
-                # 尝试匹配常见的列名
-                for i, col in enumerate(header):
-                    col_lower = col.lower()
-                    if 'url' in col_lower or '网站' in col_lower or 'site' in col_lower:
-                        url_index = i
-                    elif 'username' in col_lower or '用户名' in col_lower or 'user' in col_lower:
-                        username_index = i
-                    elif 'password' in col_lower or '密码' in col_lower or 'pass' in col_lower:
-                        password_index = i
-                
-                # 如果无法自动匹配，提示用户
-                if url_index == -1 or username_index == -1 or password_index == -1:
-                    QMessageBox.warning(
-                        self, 
-                        "警告", 
-                        "无法自动识别CSV文件格式，请确保文件包含URL/网站、用户名和密码列！"
-                    )
+            importer = detect_importer(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", str(e))
+            return
+        if importer is None:
+            QMessageBox.warning(self, "警告", self.lang_manager.get_text("import_unknown_format"))
+            return
+        self.status_bar.showMessage(self.lang_manager.get_text_with_args(
+            "import_detected", format=self.lang_manager.get_text(importer.label_key)))
+        
+        self.merge_records_with_preview(importer.read(file_path))
+    
+    def choose_merge_strategy(self):
+        """选择与已有记录重复时的合并策略，取消时返回None"""
+        from PyQt5.QtWidgets import QInputDialog
+        from core.merge import STRATEGIES
+        labels = [self.lang_manager.get_text(f"import_strategy_{strategy}") for strategy in STRATEGIES]
+        label, ok = QInputDialog.getItem(
+            self,
+            self.lang_manager.get_text("import_strategy_title"),
+            self.lang_manager.get_text("import_strategy_prompt"),
+            labels, 0, False
+        )
+        if not ok:
+            return None
+        return STRATEGIES[labels.index(label)]
+    
+    def merge_records_with_preview(self, records):
+        """分批加密暂存记录，预览差异并确认后合并到数据库"""
+        strategy = self.choose_merge_strategy()
+        if strategy is None:
+            return
+        
+        from PyQt5.QtWidgets import QApplication
+        from core.csv_import import IMPORT_BATCH_SIZE
+        from core.merge import ImportMerger
+        try:
+            with ImportMerger(self.db, strategy) as merger:
+                QApplication.setOverrideCursor(Qt.WaitCursor)
+                try:
+                    merger.add_all(records, IMPORT_BATCH_SIZE)
+                    report = merger.report()
+                finally:
+                    QApplication.restoreOverrideCursor()
+                if not self.confirm_import(report):
                     return
-                
-                # 导入数据
-                imported_count = 0
-                for row in rows[1:]:  # 跳过标题行
-                    if len(row) > max(url_index, username_index, password_index):
-                        url = row[url_index]
-                        username = row[username_index]
-                        password = row[password_index]
-                        
-                        # 如果URL为空，跳过
-                        if not url.strip():
-                            continue
-                            
-                        # 提取域名作为服务名称
-                        from urllib.parse import urlparse
-                        try:
-                            parsed_url = urlparse(url)
-                            service_name = parsed_url.netloc or url
-                        except:
-                            service_name = url
-                        
-                        # 添加到数据库（使用加密）
-                        try:
-                            self.db.add_password(service_name, username, password)
-                            imported_count += 1
-                        except Exception as e:
-                            QMessageBox.critical(self, "错误", f"导入密码记录时发生错误: {str(e)}")
-                            return
-                
-                # 刷新列表
-                self.refresh_password_list()
-                
-                # 显示结果
-                QMessageBox.information(
-                    self, 
-                    "导入完成", 
-                    f"成功导入 {imported_count} 条密码记录！"
-                )
-                self.status_bar.showMessage(f"成功导入 {imported_count} 条密码记录")
-                
+                result = merger.apply()
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"导入文件时发生错误: {str(e)}")
+            return
+        
+        # 刷新列表
+        self.refresh_password_list()
+        
+        # 显示结果
+        message = self.lang_manager.get_text_with_args("import_result", **result)
+        QMessageBox.information(self, "导入完成", message)
+        self.status_bar.showMessage(message)
+    
+    def export_vault(self, record_ids=None):
+        """将密码库（或指定的记录）导出为加密文件，成功时返回True"""
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return False
+        
+        from PyQt5.QtWidgets import QFileDialog, QApplication
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.lang_manager.get_text("export_title"),
+            "passwords.tfapm",
+            self.lang_manager.get_text("export_file_filter")
+        )
+        if not file_path:
+            return False
+        
+        dialog = ExportPasswordDialog(self, confirm=True)
+        if not dialog.exec_():
+            return False
+        password = dialog.get_password()
+        if not password:
+            return False
+        
+        from core.vault_export import export_vault
+        
+        def on_progress(count):
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("export_running", count=count)
+            )
+            QApplication.processEvents()
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = export_vault(self.db, file_path, password, progress=on_progress,
+                                  record_ids=record_ids)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("export_failed", error=str(e)))
+            return False
+        QApplication.restoreOverrideCursor()
+        
+        message = self.lang_manager.get_text_with_args("export_done", count=result['records'])
+        self.status_bar.showMessage(message)
+        if result['unreadable']:
+            box = QMessageBox(QMessageBox.Warning, self.lang_manager.get_text("export_title"),
+                              message + "\n" + self.lang_manager.get_text_with_args(
+                                  "export_unreadable", count=len(result['unreadable'])),
+                              QMessageBox.Ok, self)
+            box.setDetailedText(", ".join(str(record_id) for record_id in result['unreadable']))
+            box.exec_()
+        else:
+            QMessageBox.information(self, self.lang_manager.get_text("export_title"), message)
+        return True
+    
+    def restore_vault(self):
+        """从加密导出文件恢复密码"""
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return
+        
+        from PyQt5.QtWidgets import QFileDialog
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            self.lang_manager.get_text("restore_title"),
+            "",
+            self.lang_manager.get_text("export_file_filter")
+        )
+        if not file_path:
+            return
+        
+        dialog = ExportPasswordDialog(self, confirm=False)
+        if not dialog.exec_():
+            return
+        password = dialog.get_password()
+        if not password:
+            return
+        
+        from core.vault_export import ExportReader
+        try:
+            reader = ExportReader(file_path, password)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+            return
+        with reader:
+            # 整个文件校验通过后才会写入，损坏或被篡改的文件不会导入任何记录
+            self.merge_records_with_preview(reader)
+    
+    def create_snapshot(self):
+        """在后台创建快照并检查完整性，结果通过 snapshot_finished 信号返回"""
+        self.status_bar.showMessage(self.lang_manager.get_text("snapshot_running"))
+        self.db.create_snapshot_async(self.snapshot_finished.emit)
+    
+    def auto_snapshot(self):
+        """定时快照：密码库在上次快照后有修改时才创建"""
+        if self.db.has_changes_since_snapshot():
+            self.create_snapshot()
+    
+    def on_snapshot_finished(self, path, ok, message):
+        """显示后台快照的结果"""
+        if path is None:
+            text = self.lang_manager.get_text_with_args("snapshot_failed", error=message)
+        elif not ok:
+            text = self.lang_manager.get_text_with_args("snapshot_corrupt", name=path.name, error=message)
+        else:
+            self.status_bar.showMessage(
+                self.lang_manager.get_text_with_args("snapshot_done", name=path.name))
+            return
+        self.status_bar.showMessage(text)
+        QMessageBox.warning(self, self.lang_manager.get_text("warning"), text)
+    
+    def show_quick_switcher(self):
+        """打开快速切换面板，选中记录后显示其详情；索引在后台更新，完成前面板显示正在建立索引"""
+        from ui.quick_switcher_dialog import QuickSwitcherDialog
+        # 加密名称时建立索引需要解密所有名称
+        if self.db.name_encryption and self.db.encryption is None:
+            if not self.verify_master_password():
+                return
+        dialog = QuickSwitcherDialog(self)
+        self.quick_switcher_dialog = dialog
+        self.build_quick_switcher_in_background()
+        try:
+            accepted = dialog.exec_() == QDialog.Accepted
+        finally:
+            self.quick_switcher_dialog = None
+        if accepted and dialog.selected_id is not None:
+            self.open_entry(dialog.selected_id)
+    
+    def build_quick_switcher_in_background(self):
+        """
+        在后台线程中建立或增量更新快速切换索引，结果通过 quick_switcher_built 信号返回
+        
+        已有后台任务时记下需要再更新一次，该任务完成后立即按变更流增量更新；
+        加密名称且未验证管理员密码时无法解密名称，不建立
+        """
+        import threading
+        if self.quick_switcher_building:
+            self.quick_switcher_stale = True
+            return
+        if self.db.name_encryption and self.db.encryption is None:
+            return
+        index = self.quick_switcher_index
+        if index is None or index.db is not self.db:
+            index = QuickSwitchIndex(self.db)
+        self.quick_switcher_building = True
+        self.quick_switcher_stale = False
+        generation = self.quick_switcher_generation
+        
+        def run():
+            try:
+                index.refresh()
+            except Exception as e:
+                self.quick_switcher_built.emit(index, e, generation)
+            else:
+                self.quick_switcher_built.emit(index, None, generation)
+        
+        threading.Thread(target=run, name="quick-switcher", daemon=True).start()
+    
+    def on_quick_switcher_built(self, index, error, generation):
+        """后台建立完成：保存索引并交给正在等待的面板"""
+        self.quick_switcher_building = False
+        if generation != self.quick_switcher_generation:
+            # 建立期间索引被丢弃，面板仍在等待时重新建立
+            if self.quick_switcher_dialog is not None:
+                self.build_quick_switcher_in_background()
+            return
+        self.quick_switcher_index = index if error is None else None
+        if error is None and self.quick_switcher_stale:
+            # 任务开始后又有更新请求（例如面板在预先建立期间打开），再增量更新一次
+            self.build_quick_switcher_in_background()
+            return
+        if self.quick_switcher_dialog is not None:
+            self.quick_switcher_dialog.set_index(index, error)
+    
+    def search_vaults(self):
+        """在所有密码库中搜索"""
+        from ui.vault_search_dialog import VaultSearchDialog
+        dialog = VaultSearchDialog(self)
+        dialog.exec_()
+    
+    def sync_with_vault(self):
+        """与另一个密码库文件双向同步，在后台线程中执行"""
+        if self.db.encryption is None and not self.verify_master_password():
+            return
+        
+        from PyQt5.QtWidgets import QFileDialog, QInputDialog
+        from core.sync import resolve_vault_path
+        from core.vaults import get_vault_registry, vault_key
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, self.lang_manager.get_text("sync_title"), "", "SQLite (*.db);;All Files (*)")
+        if not file_path:
+            return
+        try:
+            path = resolve_vault_path(file_path)
+        except ValueError as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+            return
+        
+        registry = get_vault_registry()
+        peer = registry.open(path)
+        if peer is self.db:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"),
+                                self.lang_manager.get_text("sync_same_vault"))
+            return
+        if peer.encryption is None:
+            password, ok = QInputDialog.getText(
+                self, self.lang_manager.get_text("sync_title"),
+                self.lang_manager.get_text_with_args("vault_password_prompt", name=path.stem),
+                QLineEdit.Password
+            )
+            if not ok:
+                return
+            if not registry.unlock({path: password}).get(vault_key(path)):
+                QMessageBox.warning(self, self.lang_manager.get_text("warning"),
+                                    self.lang_manager.get_text_with_args(
+                                        "vault_unlock_failed", names=path.stem))
+                return
+        
+        import threading
+        from core.sync import sync_vaults
+        
+        def run():
+            try:
+                result = sync_vaults(self.db, peer)
+            except Exception as e:
+                result = e
+            self.sync_finished.emit(result)
+        
+        self.sync_action.setEnabled(False)
+        self.status_bar.showMessage(self.lang_manager.get_text("sync_running"))
+        threading.Thread(target=run, name="sync", daemon=True).start()
+    
+    def on_sync_finished(self, result):
+        """显示同步结果并刷新列表"""
+        self.sync_action.setEnabled(True)
+        if isinstance(result, Exception):
+            text = self.lang_manager.get_text_with_args("sync_failed", error=str(result))
+            self.status_bar.showMessage(text)
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), text)
+            return
+        self.sidebar.reload()
+        self.refresh_password_list()
+        pulled, pushed = result['pulled'], result['pushed']
+        self.status_bar.showMessage(self.lang_manager.get_text_with_args(
+            "sync_done",
+            received=pulled['inserted'] + pulled['updated'] + pulled['deleted'],
+            sent=pushed['inserted'] + pushed['updated'] + pushed['deleted'],
+            merged=pulled['merged'] + pushed['merged']
+        ))
+    
+    def restore_snapshot(self):
+        """用选择的快照替换当前密码库"""
+        from datetime import datetime
+        from PyQt5.QtWidgets import QInputDialog, QApplication
+        
+        # 验证管理员密码
+        if not self.verify_master_password():
+            return
+        
+        snapshots = self.db.list_snapshots()
+        if not snapshots:
+            QMessageBox.information(self, self.lang_manager.get_text("restore_snapshot_title"),
+                                    self.lang_manager.get_text("snapshot_none"))
+            return
+        labels = [
+            f"{datetime.fromtimestamp(path.stat().st_mtime):%Y-%m-%d %H:%M:%S}"
+            f"  ({path.stat().st_size / 1024:.0f} KB)"
+            for path in snapshots
+        ]
+        label, ok = QInputDialog.getItem(
+            self,
+            self.lang_manager.get_text("restore_snapshot_title"),
+            self.lang_manager.get_text("restore_snapshot_select"),
+            labels, 0, False
+        )
+        if not ok:
+            return
+        path = snapshots[labels.index(label)]
+        
+        reply = QMessageBox.question(
+            self,
+            self.lang_manager.get_text("restore_snapshot_title"),
+            self.lang_manager.get_text_with_args("restore_snapshot_confirm", time=label.split("  ")[0]),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            before_restore = self.db.restore_snapshot(path)
         except Exception as e:
-            QMessageBox.critical(self, "错误", f"导入CSV文件时发生错误: {str(e)}")
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, self.lang_manager.get_text("error"),
+                                 self.lang_manager.get_text_with_args("restore_snapshot_failed",
+                                                                     error=str(e)))
+            return
+        QApplication.restoreOverrideCursor()
+        
+        # 恢复后加密器已重置，快照中的管理员密码可能与当前不同
+        self.name_encryption_action.setChecked(self.db.name_encryption)
+        # 丢弃恢复前的索引，正在后台建立的索引完成后也不再使用
+        self.quick_switcher_index = None
+        self.quick_switcher_generation += 1
+        self.sidebar.reload()
+        self.refresh_password_list()
+        message = self.lang_manager.get_text_with_args("restore_snapshot_done", name=before_restore.name)
+        self.status_bar.showMessage(message)
+        QMessageBox.information(self, self.lang_manager.get_text("restore_snapshot_title"), message)
+    
+    def confirm_import(self, report):
+        """显示导入差异报告并确认是否写入"""
+        if report['new'] == 0 and report['updated'] == 0:
+            QMessageBox.information(
+                self,
+                self.lang_manager.get_text("import_preview_title"),
+                self.lang_manager.get_text_with_args("import_nothing", **report)
+            )
+            return False
+        box = QMessageBox(
+            QMessageBox.Question,
+            self.lang_manager.get_text("import_preview_title"),
+            self.lang_manager.get_text_with_args("import_preview_message", **report),
+            QMessageBox.Yes | QMessageBox.No,
+            self
+        )
+        box.setDetailedText("\n".join(
+            f"[{self.lang_manager.get_text('import_action_' + change['action'])}] "
+            f"{change['service_name']} - {change['username']}"
+            for change in report['changes']
+        ))
+        return box.exec_() == QMessageBox.Yes
     
     def switch_language(self):
         """切换语言"""
@@ -574,6 +1566,7 @@ class MainWindow(QMainWindow):
         """语言切换时的处理"""
         # 更新窗口标题
         self.setWindowTitle(self.lang_manager.get_text("app_title"))
+        self.sidebar.reload()
         
         # 更新按钮文本
         self.qr_button.setText(self.lang_manager.get_text("show_qr"))
@@ -583,6 +1576,29 @@ class MainWindow(QMainWindow):
         self.delete_button.setText(self.lang_manager.get_text("delete_password"))
         self.refresh_button.setText(self.lang_manager.get_text("refresh_list"))
         self.reset_button.setText(self.lang_manager.get_text("reset_data"))
+        self.change_password_button.setText(self.lang_manager.get_text("change_master_password"))
+        
+        # 更新菜单文本
+        self.tools_menu.setTitle(self.lang_manager.get_text("tools_menu"))
+        self.stats_action.setText(self.lang_manager.get_text("stats_menu"))
+        self.breach_action.setText(self.lang_manager.get_text("breach_menu"))
+        self.audit_action.setText(self.lang_manager.get_text("audit_menu"))
+        self.verify_action.setText(self.lang_manager.get_text("verify_menu"))
+        self.export_action.setText(self.lang_manager.get_text("export_menu"))
+        self.restore_action.setText(self.lang_manager.get_text("restore_menu"))
+        self.snapshot_action.setText(self.lang_manager.get_text("snapshot_menu"))
+        self.restore_snapshot_action.setText(self.lang_manager.get_text("restore_snapshot_menu"))
+        self.quick_switcher_action.setText(self.lang_manager.get_text("quick_switcher_menu"))
+        self.vaults_action.setText(self.lang_manager.get_text("vaults_menu"))
+        self.sync_action.setText(self.lang_manager.get_text("sync_menu"))
+        self.name_encryption_action.setText(self.lang_manager.get_text("name_encryption_menu"))
+        self.bulk_menu.setTitle(self.lang_manager.get_text("bulk_menu"))
+        for key, action in self.bulk_actions.items():
+            action.setText(self.lang_manager.get_text(key))
+        self.search_edit.setPlaceholderText(self.lang_manager.get_text("search_placeholder"))
+        for index in range(self.sort_combo.count()):
+            self.sort_combo.setItemText(
+                index, self.lang_manager.get_text(f"sort_{self.sort_combo.itemData(index)}"))
         
         # 更新语言切换按钮文本
         if language == "en":
@@ -591,16 +1607,11 @@ class MainWindow(QMainWindow):
             self.lang_button.setText(self.lang_manager.get_text("switch_to_en"))
         
         # 更新表格列标题
-        self.password_table.setHorizontalHeaderLabels([
-            self.lang_manager.get_text("id"),
-            self.lang_manager.get_text("service_name"),
-            self.lang_manager.get_text("username"),
-            self.lang_manager.get_text("created_at")
-        ])
+        self.password_model.headerDataChanged.emit(Qt.Horizontal, 0, self.password_model.columnCount() - 1)
         
         # 更新状态栏
-        records = self.db.get_all_passwords()
-        self.status_bar.showMessage(self.lang_manager.get_text_with_args("records_count", count=len(records)))
+        self.status_bar.showMessage(self.lang_manager.get_text_with_args(
+            "records_count", count=self.db.count_passwords()))
     
     def reset_data(self):
         """清空所有数据"""
@@ -612,15 +1623,44 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            # 清空前提示导出加密备份，导出未完成时不清空
+            if self.db.count_passwords() > 0:
+                reply = QMessageBox.question(
+                    self,
+                    self.lang_manager.get_text("confirm_reset"),
+                    self.lang_manager.get_text("reset_export_prompt"),
+                    QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+                )
+                if reply == QMessageBox.Cancel:
+                    return
+                if reply == QMessageBox.Yes and not self.export_vault():
+                    return
+            
             # 删除数据库文件
-            from config.settings import DATABASE_FILE, ENCRYPTION_KEY_FILE, SECRET_KEY_FILE
+            from config.settings import ENCRYPTION_KEY_FILE, SECRET_KEY_FILE
             import os
             
             try:
-                # 删除数据库文件
-                if DATABASE_FILE.exists():
-                    os.remove(DATABASE_FILE)
+                # 缓冲区中的审计日志和使用统计随旧数据库一起删除，不写入新数据库
+                self.audit_log.flush()
+                self.usage.flush()
                 
+                # 删除当前打开的密码库文件（先关闭跨库搜索中 ATTACH 它的连接）
+                from core.vaults import get_vault_registry
+                get_vault_registry().close_search_connections()
+                database_file = Path(self.db.db_file)
+                if database_file.exists():
+                    os.remove(database_file)
+
+                # 删除列表缓存文件（明文模式下其中有旧密码库的服务名称和用户名）
+                if self.listing_cache is not None:
+                    self.listing_cache.discard()
+                    self.listing_cache_used = False
+
+                # 删除旧密码库的快照（其加密密钥文件随后被删除，快照恢复后也无法解密）
+                for snapshot in self.db.list_snapshots():
+                    snapshot.unlink()
+
                 # 删除加密密钥文件
                 if ENCRYPTION_KEY_FILE.exists():
                     os.remove(ENCRYPTION_KEY_FILE)
@@ -634,8 +1674,12 @@ class MainWindow(QMainWindow):
                 self.db = get_database()
                 # 确保表已创建
                 self.db._create_tables()
+                self.db.name_encryption = False
+                self.name_encryption_action.setChecked(False)
                 
                 # 刷新列表
+                self.sidebar.db = self.db
+                self.sidebar.reload()
                 self.refresh_password_list()
                 
                 self.status_bar.showMessage(self.lang_manager.get_text("data_cleared"))
@@ -649,10 +1693,9 @@ class MainWindow(QMainWindow):
         """检查并设置管理员密码"""
         # 检查是否需要设置管理员密码
         # 只有在数据库为空且未设置管理员密码时才允许设置
-        records = self.db.get_all_passwords()
         master_hash = self.db.get_master_password_hash()
         
-        if len(records) == 0 and master_hash is None:
+        if self.db.count_passwords() == 0 and master_hash is None:
             # 显示设置管理员密码对话框
             dialog = SetMasterPasswordDialog(self)
             if dialog.exec_():
@@ -698,6 +1741,15 @@ class MainWindow(QMainWindow):
             if self.db.verify_master_password(password):
                 # 初始化加密器
                 self.db.initialize_encryption_with_password(password)
+                # 在后台预先解密常用记录，第一次打开时无需等待解密
+                self.db.prefetch_hot_entries_async()
+                # 启用启动校验时，首次解锁后在后台解密校验全部记录
+                if VERIFY_ON_STARTUP and not self.unlocked_verification_started:
+                    self.unlocked_verification_started = True
+                    self.verify_integrity_in_background()
+                # 加密名称时，列表中尚未解密的名称现在可以显示
+                if self.db.name_encryption:
+                    self.password_model.reload_names()
                 return True
             else:
                 QMessageBox.warning(self, self.lang_manager.get_text("warning"), 
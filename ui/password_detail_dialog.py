@@ -7,7 +7,7 @@
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTextEdit, QMessageBox
+    QTextEdit, QPlainTextEdit, QMessageBox, QListWidget, QListWidgetItem, QFileDialog
 )
 from PyQt5.QtCore import Qt
 try:
@@ -17,23 +17,44 @@ except ImportError:
     PYPERCLIP_AVAILABLE = False
 
 from core.language import get_language_manager
+from core.audit_log import get_audit_log, ACTION_COPY
+from core import attachments
+
+# 历史版本列表中的掩码
+HISTORY_MASK = "······"
+
+
+def format_size(size):
+    """将字节数格式化为便于阅读的形式"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
 
 
 class PasswordDetailDialog(QDialog):
     """密码详情对话框"""
     
-    def __init__(self, record, parent=None):
+    def __init__(self, record, parent=None, db=None):
         """初始化密码详情对话框"""
         super().__init__(parent)
+        if db is None:
+            from core.database import get_database
+            db = get_database()
+        self.db = db
         self.record = record
         self.real_password = record['password']
         self.lang_manager = get_language_manager()
+        # 历史版本按页加载，记录已加载的最后一个版本作为下一页的起点
+        self.history_total = self.db.count_password_history(record['id'])
+        self.history_loaded = 0
+        self.history_cursor = None
         self.init_ui()
     
     def init_ui(self):
         """初始化用户界面"""
         self.setWindowTitle(self.lang_manager.get_text("password_detail"))
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 700 if self.history_total else 540)
         self.setModal(True)
         
         layout = QVBoxLayout()
@@ -75,10 +96,59 @@ class PasswordDetailDialog(QDialog):
         
         layout.addLayout(password_layout)
         
+        # 历史版本（滚动到底部时加载下一页，双击显示或隐藏该版本的密码）
+        if self.history_total:
+            layout.addWidget(QLabel(self.lang_manager.get_text_with_args(
+                "history_label", count=self.history_total)))
+            self.history_list = QListWidget()
+            self.history_list.itemDoubleClicked.connect(self.toggle_history_item)
+            self.history_list.verticalScrollBar().valueChanged.connect(self.on_history_scrolled)
+            layout.addWidget(self.history_list)
+            
+            history_button_layout = QHBoxLayout()
+            history_button_layout.addStretch()
+            self.copy_history_button = QPushButton(self.lang_manager.get_text("history_copy"))
+            self.copy_history_button.clicked.connect(self.copy_history_password)
+            history_button_layout.addWidget(self.copy_history_button)
+            layout.addLayout(history_button_layout)
+            self.load_history_page()
+        
+        # 安全笔记
+        layout.addWidget(QLabel(self.lang_manager.get_text("note_label")))
+        self.note_edit = QPlainTextEdit()
+        self.note_edit.setMaximumHeight(80)
+        self.note_edit.setPlainText(attachments.get_note(self.db, self.record['id']))
+        layout.addWidget(self.note_edit)
+        
+        # 附件（列表只读取名称和大小，保存时才逐块解密内容）
+        self.attachments_label = QLabel()
+        layout.addWidget(self.attachments_label)
+        self.attachment_list = QListWidget()
+        self.attachment_list.setMaximumHeight(80)
+        layout.addWidget(self.attachment_list)
+        attachment_button_layout = QHBoxLayout()
+        add_attachment_button = QPushButton(self.lang_manager.get_text("attachment_add"))
+        add_attachment_button.clicked.connect(self.add_attachment)
+        attachment_button_layout.addWidget(add_attachment_button)
+        save_attachment_button = QPushButton(self.lang_manager.get_text("attachment_save"))
+        save_attachment_button.clicked.connect(self.save_attachment)
+        attachment_button_layout.addWidget(save_attachment_button)
+        delete_attachment_button = QPushButton(self.lang_manager.get_text("attachment_delete"))
+        delete_attachment_button.clicked.connect(self.delete_attachment)
+        attachment_button_layout.addWidget(delete_attachment_button)
+        attachment_button_layout.addStretch()
+        layout.addLayout(attachment_button_layout)
+        self.load_attachments()
+        
         # 按钮布局
         button_layout = QHBoxLayout()
         button_layout.addStretch()
         
+        # 保存笔记按钮
+        save_note_button = QPushButton(self.lang_manager.get_text("note_save"))
+        save_note_button.clicked.connect(self.save_note)
+        button_layout.addWidget(save_note_button)
+        
         # 关闭按钮
         close_button = QPushButton(self.lang_manager.get_text("close"))
         close_button.clicked.connect(self.accept)
@@ -100,8 +170,124 @@ class PasswordDetailDialog(QDialog):
             self.password_display.setText("······")
             self.show_password_button.setText(self.lang_manager.get_text("show"))
     
+    def load_history_page(self):
+        """加载下一页历史版本"""
+        if self.history_loaded >= self.history_total:
+            return
+        try:
+            page = self.db.get_password_history(self.record['id'], before=self.history_cursor)
+        except Exception as e:
+            QMessageBox.critical(self, self.lang_manager.get_text("error"), str(e))
+            return
+        if not page:
+            # 加载期间历史版本被后台清理
+            self.history_total = self.history_loaded
+            return
+        for version in page:
+            item = QListWidgetItem(self.format_history_item(version, False))
+            item.setData(Qt.UserRole, version)
+            item.setData(Qt.UserRole + 1, False)
+            self.history_list.addItem(item)
+        self.history_loaded += len(page)
+        self.history_cursor = (page[-1]['changed_at'], page[-1]['id'])
+    
+    def format_history_item(self, version, revealed):
+        """历史版本列表项的文本"""
+        password = version['password'] if revealed else HISTORY_MASK
+        return self.lang_manager.get_text_with_args(
+            "history_item", changed_at=version['changed_at'], password=password)
+    
+    def on_history_scrolled(self, value):
+        """滚动到列表底部时加载下一页"""
+        if value >= self.history_list.verticalScrollBar().maximum():
+            self.load_history_page()
+    
+    def toggle_history_item(self, item):
+        """显示或隐藏历史版本的密码"""
+        revealed = not item.data(Qt.UserRole + 1)
+        item.setData(Qt.UserRole + 1, revealed)
+        item.setText(self.format_history_item(item.data(Qt.UserRole), revealed))
+    
+    def copy_history_password(self):
+        """复制所选历史版本的密码"""
+        item = self.history_list.currentItem()
+        if item is None:
+            return
+        self.copy_to_clipboard(item.data(Qt.UserRole)['password'])
+    
+    def load_attachments(self):
+        """重新读取附件列表（读取失败时提示，详情对话框仍可打开）"""
+        self.attachment_list.clear()
+        try:
+            records = attachments.list_attachments(self.db, self.record['id'])
+        except Exception as e:
+            records = []
+            QMessageBox.critical(self, self.lang_manager.get_text("error"), str(e))
+        for attachment in records:
+            item = QListWidgetItem(self.lang_manager.get_text_with_args(
+                "attachment_item", name=attachment['name'], size=format_size(attachment['size'])))
+            item.setData(Qt.UserRole, attachment)
+            self.attachment_list.addItem(item)
+        self.attachments_label.setText(self.lang_manager.get_text_with_args(
+            "attachments_label", count=len(records)))
+    
+    def _run_attachment_action(self, func, *args):
+        """执行附件操作，失败时提示并返回False"""
+        try:
+            func(self.db, *args)
+        except Exception as e:
+            QMessageBox.critical(self, self.lang_manager.get_text("error"), str(e))
+            return False
+        return True
+    
+    def save_note(self):
+        """保存安全笔记"""
+        if self._run_attachment_action(
+                attachments.set_note, self.record['id'], self.note_edit.toPlainText()):
+            QMessageBox.information(self, self.lang_manager.get_text("note_save"),
+                                    self.lang_manager.get_text("note_saved"))
+    
+    def add_attachment(self):
+        """选择文件并加密保存为附件"""
+        path, _ = QFileDialog.getOpenFileName(self, self.lang_manager.get_text("attachment_add"))
+        if path and self._run_attachment_action(
+                attachments.add_attachment, self.record['id'], path):
+            self.load_attachments()
+    
+    def save_attachment(self):
+        """将所选附件解密保存到文件"""
+        item = self.attachment_list.currentItem()
+        if item is None:
+            return
+        attachment = item.data(Qt.UserRole)
+        path, _ = QFileDialog.getSaveFileName(
+            self, self.lang_manager.get_text("attachment_save"), attachment['name'])
+        if path and self._run_attachment_action(
+                attachments.save_attachment, attachment['id'], path):
+            QMessageBox.information(
+                self, self.lang_manager.get_text("attachment_save"),
+                self.lang_manager.get_text_with_args("attachment_saved", path=path))
+    
+    def delete_attachment(self):
+        """删除所选附件"""
+        item = self.attachment_list.currentItem()
+        if item is None:
+            return
+        attachment = item.data(Qt.UserRole)
+        reply = QMessageBox.question(
+            self, self.lang_manager.get_text("attachment_delete"),
+            self.lang_manager.get_text_with_args("attachment_delete_confirm", name=attachment['name']),
+            QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes and self._run_attachment_action(
+                attachments.delete_attachment, attachment['id']):
+            self.load_attachments()
+    
     def copy_password(self):
         """复制密码到剪贴板"""
+        self.copy_to_clipboard(self.real_password)
+    
+    def copy_to_clipboard(self, text):
+        """复制文本到剪贴板并提示结果，复制成功时记录审计日志"""
         if not PYPERCLIP_AVAILABLE:
             QMessageBox.critical(
                 self, 
@@ -111,7 +297,8 @@ class PasswordDetailDialog(QDialog):
             return
             
         try:
-            pyperclip.copy(self.real_password)
+            pyperclip.copy(text)
+            get_audit_log().log(ACTION_COPY, self.record['id'])
             QMessageBox.information(
                 self, 
                 self.lang_manager.get_text("copy_success"), 
@@ -7,20 +7,28 @@
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLabel, QLineEdit, QPushButton, QMessageBox
+    QLabel, QLineEdit, QPushButton, QMessageBox, QComboBox, QMenu
 )
 from PyQt5.QtCore import Qt
 
 from core.language import get_language_manager
+from core.password_generator import get_password_generator, PassphrasePolicy
 
 
 class PasswordDialog(QDialog):
     """密码管理对话框类"""
     
-    def __init__(self, parent=None, record=None):
-        """初始化密码管理对话框"""
+    def __init__(self, parent=None, record=None, folders=None):
+        """
+        初始化密码管理对话框
+        
+        Args:
+            record (dict): 编辑的记录，可包含 folder_id 和 tags
+            folders (list): 可选的文件夹 (id, 路径) 列表
+        """
         super().__init__(parent)
         self.record = record
+        self.folders = folders or []
         self.data = {}
         self.lang_manager = get_language_manager()
         self.init_ui()
@@ -33,7 +41,7 @@ class PasswordDialog(QDialog):
             self.setWindowTitle(self.lang_manager.get_text("add_password_title"))
         
         self.setModal(True)
-        self.setFixedSize(400, 250)
+        self.setFixedSize(400, 310)
         
         # 创建布局
         layout = QVBoxLayout()
@@ -47,18 +55,38 @@ class PasswordDialog(QDialog):
         self.username_field = QLineEdit()
         self.password_field = QLineEdit()
         self.password_field.setEchoMode(QLineEdit.Password)
+        self.generate_button = QPushButton(self.lang_manager.get_text("generate_password"))
+        generate_menu = QMenu(self.generate_button)
+        generate_menu.addAction(self.lang_manager.get_text("generate_random"), self.generate_password)
+        generate_menu.addAction(self.lang_manager.get_text("generate_passphrase"),
+                                lambda: self.generate_password(PassphrasePolicy()))
+        self.generate_button.setMenu(generate_menu)
+        password_layout = QHBoxLayout()
+        password_layout.addWidget(self.password_field)
+        password_layout.addWidget(self.generate_button)
+        self.folder_field = QComboBox()
+        self.folder_field.addItem(self.lang_manager.get_text("no_folder"), None)
+        for folder_id, path in self.folders:
+            self.folder_field.addItem(path, folder_id)
+        self.tags_field = QLineEdit()
+        self.tags_field.setPlaceholderText(self.lang_manager.get_text("tags_placeholder"))
         
         # 如果是编辑模式，填充现有数据
         if self.record:
             self.service_name_field.setText(self.record.get('service_name', ''))
             self.username_field.setText(self.record.get('username', ''))
+            index = self.folder_field.findData(self.record.get('folder_id'))
+            self.folder_field.setCurrentIndex(max(index, 0))
+            self.tags_field.setText(", ".join(self.record.get('tags', [])))
             # 注意：出于安全考虑，不显示现有密码
             # 用户需要重新输入密码
         
         # 添加字段到表单
         form_layout.addRow(self.lang_manager.get_text("service_label"), self.service_name_field)
         form_layout.addRow(self.lang_manager.get_text("username_label"), self.username_field)
-        form_layout.addRow(self.lang_manager.get_text("password_label"), self.password_field)
+        form_layout.addRow(self.lang_manager.get_text("password_label"), password_layout)
+        form_layout.addRow(self.lang_manager.get_text("folder_label"), self.folder_field)
+        form_layout.addRow(self.lang_manager.get_text("tags_label"), self.tags_field)
         
         layout.addLayout(form_layout)
         
@@ -81,6 +109,11 @@ class PasswordDialog(QDialog):
         # 设置默认焦点
         self.service_name_field.setFocus()
     
+    def generate_password(self, policy=None):
+        """生成随机密码填入密码框，并显示出来供用户查看"""
+        self.password_field.setText(get_password_generator().generate(1, policy)[0])
+        self.password_field.setEchoMode(QLineEdit.Normal)
+    
     def accept(self):
         """接受输入"""
         service_name = self.service_name_field.text().strip()
@@ -107,7 +140,9 @@ class PasswordDialog(QDialog):
         self.data = {
             'service_name': service_name,
             'username': username,
-            'password': password
+            'password': password,
+            'folder_id': self.folder_field.currentData(),
+            'tags': [tag.strip() for tag in self.tags_field.text().split(',') if tag.strip()]
         }
         
         super().accept()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+密码列表数据模型
+列表保存为按列存储的 ListingSnapshot，单元格直接从列中读取，不为每行创建对象。
+加密服务名称和用户名时，只在行第一次显示时按页解密，滚动到的页才会被解密
+"""
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from core.language import get_language_manager
+from core.records import ListingSnapshot
+
+
+class PasswordTableModel(QAbstractTableModel):
+    """密码列表数据模型类"""
+
+    # 每次解密的行数
+    PAGE_SIZE = 100
+    # 名称尚未解密（如未验证管理员密码）时显示的占位符
+    PLACEHOLDER = "••••••"
+
+    COLUMN_ID = 0
+    COLUMN_SERVICE = 1
+    COLUMN_USERNAME = 2
+    COLUMN_CREATED_AT = 3
+
+    def __init__(self, db, parent=None):
+        """
+        初始化密码列表数据模型
+
+        Args:
+            db (PasswordDatabase): 数据库实例
+        """
+        super().__init__(parent)
+        self.db = db
+        self.lang_manager = get_language_manager()
+        self._records = ListingSnapshot()
+        # 记录ID -> (service_name, username)
+        self._names = {}
+
+    def set_records(self, records):
+        """
+        设置列表记录
+
+        Args:
+            records (ListingSnapshot or list): get_listing 或 filter_passwords 返回的列表快照，
+                                              也可以是记录列表
+        """
+        if not isinstance(records, ListingSnapshot):
+            records = ListingSnapshot.from_records(records)
+        self.beginResetModel()
+        self._records = records
+        self._names = {}
+        self.endResetModel()
+
+    def remove_records(self, record_ids):
+        """
+        从列表中去掉指定记录（批量删除后调用）：在内存中过滤快照并一次刷新视图，
+        不重新查询数据库，其余记录已解密的名称保留
+
+        Args:
+            record_ids (iterable): 记录ID
+        """
+        record_ids = set(record_ids)
+        self.beginResetModel()
+        self._records = self._records.without(record_ids)
+        for record_id in record_ids:
+            self._names.pop(record_id, None)
+        self.endResetModel()
+
+    def record_id(self, row):
+        """获取指定行的记录ID"""
+        return self._records.ids[row]
+
+    def reload_names(self):
+        """丢弃已解密的名称并重新显示（如加密器初始化后）"""
+        self._names = {}
+        if self._records:
+            self.dataChanged.emit(
+                self.index(0, self.COLUMN_SERVICE),
+                self.index(len(self._records) - 1, self.COLUMN_USERNAME)
+            )
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 4
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or orientation != Qt.Horizontal:
+            return None
+        return self.lang_manager.get_text(
+            ("id", "service_name", "username", "created_at")[section]
+        )
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        records = self._records
+        row = index.row()
+        column = index.column()
+        if column == self.COLUMN_ID:
+            return str(records.ids[row])
+        if column == self.COLUMN_CREATED_AT:
+            return records.created_at[row]
+        names_column = records.service_names if column == self.COLUMN_SERVICE else records.usernames
+        value = names_column[row]
+        if value is not None:
+            return value
+        names = self._names.get(records.ids[row])
+        if names is None:
+            names = self._load_page(row)
+            if names is None:
+                return self.PLACEHOLDER
+        return names[0] if column == self.COLUMN_SERVICE else names[1]
+
+    def _load_page(self, row):
+        """解密指定行所在页的名称，返回该行的名称"""
+        if self.db.encryption is None:
+            return None
+        start = row - row % self.PAGE_SIZE
+        page_ids = [
+            record_id for record_id in self._records.ids[start:start + self.PAGE_SIZE]
+            if record_id not in self._names
+        ]
+        try:
+            self._names.update(self.db.get_names(page_ids))
+        except Exception:
+            return None
+        return self._names.get(self._records.ids[row])
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+快速切换面板
+"""
+
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+from PyQt5.QtCore import Qt
+
+from core.language import get_language_manager
+
+
+class QuickSwitcherDialog(QDialog):
+    """快速切换面板类：输入时模糊查找服务名称和用户名，回车打开选中的记录"""
+
+    def __init__(self, parent=None):
+        """
+        初始化快速切换面板（索引由 set_index 传入，之前可以先输入，显示正在建立索引）
+        """
+        super().__init__(parent)
+        # 已更新的快速切换索引（建立完成前为None）
+        self.index = None
+        self.lang_manager = get_language_manager()
+        # 选中的记录ID（取消时为None）
+        self.selected_id = None
+        self.init_ui()
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle(self.lang_manager.get_text("quick_switcher_title"))
+        self.resize(520, 360)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(self.lang_manager.get_text("quick_switcher_placeholder"))
+        self.search_edit.textChanged.connect(self.run_search)
+        self.search_edit.returnPressed.connect(self.open_current)
+        layout.addWidget(self.search_edit)
+
+        self.result_list = QListWidget()
+        self.result_list.itemActivated.connect(self.open_current)
+        layout.addWidget(self.result_list)
+        self.show_status(self.lang_manager.get_text("quick_switcher_building"))
+
+    def show_status(self, text):
+        """在结果列表中显示一行不可选的状态文字"""
+        self.result_list.clear()
+        item = QListWidgetItem(text)
+        item.setFlags(Qt.NoItemFlags)
+        self.result_list.addItem(item)
+
+    def set_index(self, index, error=None):
+        """
+        索引建立完成，按已输入的内容查找
+
+        Args:
+            index (QuickSwitchIndex): 已更新的快速切换索引
+            error (Exception): 建立索引时发生的异常，None表示成功
+        """
+        if error is not None:
+            self.show_status(self.lang_manager.get_text_with_args("quick_switcher_failed", error=str(error)))
+            return
+        self.index = index
+        self.run_search(self.search_edit.text())
+
+    def keyPressEvent(self, event):
+        """输入查询时用上下方向键移动结果列表中的选中项"""
+        step = {Qt.Key_Up: -1, Qt.Key_Down: 1}.get(event.key())
+        if step is not None and self.result_list.count():
+            row = self.result_list.currentRow() + step
+            self.result_list.setCurrentRow(min(max(row, 0), self.result_list.count() - 1))
+            return
+        super().keyPressEvent(event)
+
+    def run_search(self, text):
+        """每次输入后查找并显示结果（索引建立完成前不查找）"""
+        if self.index is None:
+            return
+        self.result_list.clear()
+        for result in self.index.search(text):
+            item = QListWidgetItem(f"{result.service_name}  —  {result.username}")
+            item.setData(Qt.UserRole, result.id)
+            self.result_list.addItem(item)
+        if self.result_list.count():
+            self.result_list.setCurrentRow(0)
+
+    def open_current(self, *args):
+        """打开选中的记录"""
+        item = self.result_list.currentItem()
+        if item is None:
+            return
+        self.selected_id = item.data(Qt.UserRole)
+        self.accept()
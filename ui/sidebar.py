@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文件夹和标签侧边栏
+文件夹逐层展开时才读取子文件夹，标签按页加载，
+记录数来自触发器维护的计数列，展开节点不需要统计整个密码库
+"""
+
+from PyQt5.QtWidgets import (
+    QTreeWidget, QTreeWidgetItem, QAbstractItemView, QMenu, QInputDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from core.database import FOLDER_UNFILED
+from core.language import get_language_manager
+
+
+# 节点类型
+NODE_ALL = "all"
+NODE_FOLDERS = "folders"
+NODE_FOLDER = "folder"
+NODE_UNFILED = "unfiled"
+NODE_TAGS = "tags"
+NODE_TAG = "tag"
+NODE_MORE = "more"
+
+# 节点的子节点是否已加载
+_LOADED_ROLE = Qt.UserRole + 1
+
+
+class VaultSidebar(QTreeWidget):
+    """文件夹和标签侧边栏，可同时选择一个文件夹和多个标签"""
+
+    # 筛选条件改变（文件夹ID或None, 标签ID列表）
+    filter_changed = pyqtSignal(object, list)
+
+    # 每次加载的标签数
+    TAG_PAGE_SIZE = 200
+
+    def __init__(self, db, parent=None):
+        """
+        初始化侧边栏
+
+        Args:
+            db (PasswordDatabase): 数据库实例
+        """
+        super().__init__(parent)
+        self.db = db
+        self.lang_manager = get_language_manager()
+        self.setHeaderHidden(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.itemExpanded.connect(self.on_item_expanded)
+        self.itemSelectionChanged.connect(self.on_selection_changed)
+        self.itemClicked.connect(self.on_item_clicked)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        self.reload()
+
+    def _node(self, parent, kind, node_id, text, expandable=False):
+        """创建节点"""
+        item = QTreeWidgetItem(parent, [text])
+        item.setData(0, Qt.UserRole, (kind, node_id))
+        if expandable:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            item.setData(0, _LOADED_ROLE, False)
+        return item
+
+    def reload(self):
+        """重新加载侧边栏，保留已展开的节点和选择"""
+        expanded = set()
+        selected = set()
+        tag_limit = self.TAG_PAGE_SIZE
+        if self.topLevelItemCount():
+            iterator = self._iter_items(self.invisibleRootItem())
+            for item in iterator:
+                key = item.data(0, Qt.UserRole)
+                if item.isExpanded():
+                    expanded.add(key)
+                if item.isSelected():
+                    selected.add(key)
+            tag_limit = max(tag_limit, self._loaded_tag_count())
+
+        self.blockSignals(True)
+        self.clear()
+        lang = self.lang_manager
+        self._node(self, NODE_ALL, None, lang.get_text("sidebar_all"))
+        self.folders_item = self._node(self, NODE_FOLDERS, None, lang.get_text("sidebar_folders"), True)
+        self.tags_item = self._node(
+            self, NODE_TAGS, None,
+            lang.get_text_with_args("sidebar_tags", count=self.db.count_tags()), True
+        )
+        # 按层次恢复展开状态，只加载之前展开过的节点
+        pending = [self.folders_item, self.tags_item]
+        while pending:
+            item = pending.pop()
+            if item.data(0, Qt.UserRole) in expanded:
+                if item is self.tags_item:
+                    self.load_tags(tag_limit)
+                    item.setData(0, _LOADED_ROLE, True)
+                else:
+                    self.load_children(item)
+                item.setExpanded(True)
+                pending.extend(item.child(i) for i in range(item.childCount()))
+        for item in self._iter_items(self.invisibleRootItem()):
+            if item.data(0, Qt.UserRole) in selected:
+                item.setSelected(True)
+        self.blockSignals(False)
+
+    def _iter_items(self, parent):
+        """遍历已加载的节点"""
+        for i in range(parent.childCount()):
+            child = parent.child(i)
+            yield child
+            yield from self._iter_items(child)
+
+    def _loaded_tag_count(self):
+        """已加载的标签数"""
+        return sum(
+            1 for i in range(self.tags_item.childCount())
+            if self.tags_item.child(i).data(0, Qt.UserRole)[0] == NODE_TAG
+        )
+
+    def on_item_expanded(self, item):
+        """第一次展开节点时加载子节点"""
+        if item.data(0, _LOADED_ROLE) is False:
+            item.setData(0, _LOADED_ROLE, True)
+            if item is self.tags_item:
+                self.load_tags(self.TAG_PAGE_SIZE)
+            else:
+                self.load_children(item)
+
+    def load_children(self, item):
+        """加载文件夹节点的子文件夹"""
+        item.setData(0, _LOADED_ROLE, True)
+        kind, folder_id = item.data(0, Qt.UserRole)
+        if kind == NODE_FOLDERS:
+            self._node(item, NODE_UNFILED, None, self.lang_manager.get_text("sidebar_unfiled"))
+        for folder in self.db.get_folders(folder_id):
+            self._node(item, NODE_FOLDER, folder['id'],
+                       f"{folder['name']} ({folder['count']})", folder['has_children'])
+
+    def load_tags(self, limit):
+        """加载下一页标签（从已加载的标签之后开始）"""
+        more = [
+            self.tags_item.child(i) for i in range(self.tags_item.childCount())
+            if self.tags_item.child(i).data(0, Qt.UserRole)[0] == NODE_MORE
+        ]
+        for item in more:
+            self.tags_item.removeChild(item)
+        offset = self._loaded_tag_count()
+        for tag in self.db.get_tags(offset, limit):
+            self._node(self.tags_item, NODE_TAG, tag['id'], f"{tag['name']} ({tag['count']})")
+        remaining = self.db.count_tags() - self._loaded_tag_count()
+        if remaining > 0:
+            self._node(self.tags_item, NODE_MORE, None,
+                       self.lang_manager.get_text_with_args("sidebar_load_more", count=remaining))
+
+    def on_item_clicked(self, item):
+        """点击“加载更多”时加载下一页标签"""
+        if item.data(0, Qt.UserRole)[0] == NODE_MORE:
+            self.load_tags(self.TAG_PAGE_SIZE)
+
+    def current_filter(self):
+        """
+        获取当前选择对应的筛选条件
+
+        Returns:
+            tuple: (folder_id, tag_ids)，folder_id 为None表示不限文件夹
+        """
+        folder_id = None
+        tag_ids = []
+        for item in self.selectedItems():
+            kind, node_id = item.data(0, Qt.UserRole)
+            if kind == NODE_FOLDER:
+                folder_id = node_id
+            elif kind == NODE_UNFILED:
+                folder_id = FOLDER_UNFILED
+            elif kind == NODE_TAG:
+                tag_ids.append(node_id)
+        return folder_id, tag_ids
+
+    def on_selection_changed(self):
+        """选择改变时发出筛选条件"""
+        folder_id, tag_ids = self.current_filter()
+        self.filter_changed.emit(folder_id, tag_ids)
+
+    def show_context_menu(self, position):
+        """文件夹和标签的右键菜单"""
+        item = self.itemAt(position)
+        if item is None:
+            return
+        kind, node_id = item.data(0, Qt.UserRole)
+        lang = self.lang_manager
+        menu = QMenu(self)
+        if kind in (NODE_FOLDERS, NODE_FOLDER):
+            menu.addAction(lang.get_text("folder_new"), lambda: self.create_folder(node_id))
+        if kind == NODE_FOLDER:
+            menu.addAction(lang.get_text("folder_rename"), lambda: self.rename_folder(node_id))
+            menu.addAction(lang.get_text("folder_delete"), lambda: self.delete_folder(node_id))
+        if kind == NODE_TAG:
+            menu.addAction(lang.get_text("tag_rename"), lambda: self.rename_tag(node_id))
+            menu.addAction(lang.get_text("tag_delete"), lambda: self.delete_tag(node_id))
+        if not menu.isEmpty():
+            menu.exec_(self.viewport().mapToGlobal(position))
+
+    def _ask_name(self, prompt_key):
+        """输入名称，取消时返回None"""
+        name, ok = QInputDialog.getText(self, self.lang_manager.get_text(prompt_key),
+                                        self.lang_manager.get_text(prompt_key))
+        return name if ok and name.strip() else None
+
+    def _run(self, func, *args):
+        """执行修改并刷新，失败时提示"""
+        try:
+            func(*args)
+        except Exception as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+            return
+        self.reload()
+        self.on_selection_changed()
+
+    def create_folder(self, parent_id):
+        """新建文件夹"""
+        name = self._ask_name("folder_name_prompt")
+        if name is not None:
+            self._run(self.db.create_folder, name, parent_id)
+
+    def rename_folder(self, folder_id):
+        """重命名文件夹"""
+        name = self._ask_name("folder_name_prompt")
+        if name is not None:
+            self._run(self.db.rename_folder, folder_id, name)
+
+    def delete_folder(self, folder_id):
+        """删除文件夹（记录移出文件夹）"""
+        reply = QMessageBox.question(self, self.lang_manager.get_text("folder_delete"),
+                                     self.lang_manager.get_text("folder_delete_confirm"),
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self._run(self.db.delete_folder, folder_id)
+
+    def rename_tag(self, tag_id):
+        """重命名标签"""
+        name = self._ask_name("tag_name_prompt")
+        if name is not None:
+            self._run(self.db.rename_tag, tag_id, name)
+
+    def delete_tag(self, tag_id):
+        """删除标签（记录不受影响）"""
+        reply = QMessageBox.question(self, self.lang_manager.get_text("tag_delete"),
+                                     self.lang_manager.get_text("tag_delete_confirm"),
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self._run(self.db.delete_tag, tag_id)
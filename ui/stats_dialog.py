@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能统计对话框
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+)
+from PyQt5.QtCore import Qt, QTimer
+
+from core.language import get_language_manager
+from core.metrics import get_metrics
+from config.settings import METRICS_JSON_FILE, METRICS_PROM_FILE, ensure_data_dir
+
+
+class StatsDialog(QDialog):
+    """性能统计对话框类"""
+
+    # 自动刷新间隔（毫秒）
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent=None):
+        """初始化性能统计对话框"""
+        super().__init__(parent)
+        self.metrics = get_metrics()
+        self.lang_manager = get_language_manager()
+        self.init_ui()
+        self.refresh()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(self.REFRESH_INTERVAL)
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle(self.lang_manager.get_text("stats_title"))
+        self.resize(720, 400)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        # 启用开关
+        self.enable_checkbox = QCheckBox(self.lang_manager.get_text("stats_enable"))
+        self.enable_checkbox.setChecked(self.metrics.enabled)
+        self.enable_checkbox.toggled.connect(self.on_enable_toggled)
+        layout.addWidget(self.enable_checkbox)
+
+        # 统计表格
+        self.table = QTableWidget()
+        self.table.setColumnCount(7)
+        self.table.setHorizontalHeaderLabels([
+            self.lang_manager.get_text("stats_operation"),
+            self.lang_manager.get_text("stats_count"),
+            self.lang_manager.get_text("stats_errors"),
+            "mean (ms)", "p50 (ms)", "p95 (ms)", "max (ms)",
+        ])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        # 按钮布局
+        button_layout = QHBoxLayout()
+
+        export_button = QPushButton(self.lang_manager.get_text("stats_export"))
+        export_button.clicked.connect(self.export)
+
+        reset_button = QPushButton(self.lang_manager.get_text("stats_reset"))
+        reset_button.clicked.connect(self.reset)
+
+        close_button = QPushButton(self.lang_manager.get_text("close"))
+        close_button.clicked.connect(self.accept)
+
+        button_layout.addWidget(export_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        """刷新统计数据"""
+        snapshot = self.metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, data) in enumerate(snapshot.items()):
+            values = [
+                name,
+                str(data['count']),
+                str(data['errors']),
+                f"{data['mean_seconds'] * 1000:.3f}",
+                f"{data['p50_seconds'] * 1000:.3f}",
+                f"{data['p95_seconds'] * 1000:.3f}",
+                f"{data['max_seconds'] * 1000:.3f}",
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def on_enable_toggled(self, checked):
+        """启用或停用指标记录"""
+        self.metrics.enabled = checked
+
+    def export(self):
+        """导出指标文件"""
+        try:
+            ensure_data_dir()
+            self.metrics.export(METRICS_JSON_FILE, METRICS_PROM_FILE)
+            QMessageBox.information(
+                self,
+                self.lang_manager.get_text("stats_title"),
+                self.lang_manager.get_text_with_args(
+                    "stats_exported", json_file=METRICS_JSON_FILE, prom_file=METRICS_PROM_FILE
+                )
+            )
+        except OSError as e:
+            QMessageBox.critical(self, self.lang_manager.get_text("error"), str(e))
+
+    def reset(self):
+        """清空统计数据"""
+        self.metrics.reset()
+        self.refresh()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨密码库搜索对话框
+"""
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+    QInputDialog, QFileDialog, QMessageBox
+)
+
+from core.language import get_language_manager
+from core.vaults import get_vault_registry
+
+
+class VaultSearchDialog(QDialog):
+    """跨密码库搜索对话框类"""
+
+    def __init__(self, parent=None, registry=None):
+        """
+        初始化跨密码库搜索对话框
+
+        Args:
+            registry (VaultRegistry): 密码库登记表，None表示使用全局登记表
+        """
+        super().__init__(parent)
+        self.registry = registry if registry is not None else get_vault_registry()
+        self.lang_manager = get_language_manager()
+        self.init_ui()
+        self.update_summary()
+
+    def init_ui(self):
+        """初始化用户界面"""
+        self.setWindowTitle(self.lang_manager.get_text("vault_search_title"))
+        self.resize(640, 420)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(self.lang_manager.get_text("search_placeholder"))
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.run_search)
+        layout.addWidget(self.search_edit)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels([
+            self.lang_manager.get_text("vault_column"),
+            self.lang_manager.get_text("service_name"),
+            self.lang_manager.get_text("username"),
+        ])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.unlock_button = QPushButton(self.lang_manager.get_text("vault_unlock"))
+        self.unlock_button.clicked.connect(self.unlock_vaults)
+        add_button = QPushButton(self.lang_manager.get_text("vault_add"))
+        add_button.clicked.connect(self.add_vault)
+        close_button = QPushButton(self.lang_manager.get_text("close"))
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.unlock_button)
+        button_layout.addWidget(add_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def update_summary(self):
+        """显示密码库数量和需要解锁的密码库"""
+        locked = self.registry.locked_for_search()
+        self.summary_label.setText(self.lang_manager.get_text_with_args(
+            "vault_summary",
+            count=sum(1 for vault in self.registry.known_vaults() if vault['path'].exists()),
+            locked=len(locked)
+        ))
+        self.unlock_button.setEnabled(bool(locked))
+
+    def unlock_vaults(self):
+        """依次输入各密码库的管理员密码，然后并行解锁"""
+        passwords = {}
+        for vault in self.registry.locked_for_search():
+            password, ok = QInputDialog.getText(
+                self, self.lang_manager.get_text("vault_unlock"),
+                self.lang_manager.get_text_with_args("vault_password_prompt", name=vault['name']),
+                QLineEdit.Password
+            )
+            if not ok:
+                return
+            passwords[vault['path']] = password
+        results = self.registry.unlock(passwords)
+        failed = [vault['name'] for vault in self.registry.known_vaults()
+                  if results.get(vault['key']) is False]
+        if failed:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"),
+                                self.lang_manager.get_text_with_args(
+                                    "vault_unlock_failed", names=", ".join(failed)))
+        self.update_summary()
+        self.run_search()
+
+    def add_vault(self):
+        """登记一个密码库文件"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, self.lang_manager.get_text("vault_add"), "", "SQLite (*.db);;All Files (*)")
+        if not path:
+            return
+        try:
+            self.registry.add_vault(path)
+        except Exception as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+            return
+        self.update_summary()
+        self.run_search()
+
+    def run_search(self):
+        """在所有密码库中搜索"""
+        try:
+            records = self.registry.search(self.search_edit.text())
+        except Exception as e:
+            QMessageBox.warning(self, self.lang_manager.get_text("warning"), str(e))
+            return
+        self.table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            for column, value in enumerate((record['vault_name'], record['service_name'],
+                                            record['username'])):
+                self.table.setItem(row, column, QTableWidgetItem(value))